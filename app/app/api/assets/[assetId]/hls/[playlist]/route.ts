@@ -0,0 +1,70 @@
+/**
+ * Serve an HLS playlist for an asset's proxy ladder.
+ * GET /api/assets/[assetId]/hls/[playlist]?projectId=xxx
+ *
+ * The asset service rewrites segment URIs to signed GCS URLs; nested
+ * playlists stay relative and come back through this route with projectId.
+ */
+
+import { NextRequest, NextResponse } from "next/server";
+import {
+  isAssetServiceEnabled,
+  getAssetHlsPlaylistFromService,
+} from "@/app/lib/server/asset-service-client";
+import { verifyAuth } from "@/app/lib/server/auth";
+
+export const runtime = "nodejs";
+export const dynamic = "force-dynamic";
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ assetId: string; playlist: string }> }
+) {
+  if (!isAssetServiceEnabled()) {
+    return NextResponse.json(
+      { error: "Asset service not configured" },
+      { status: 503 }
+    );
+  }
+
+  const userId = await verifyAuth(request);
+  if (!userId) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const { assetId, playlist } = await params;
+  const { searchParams } = new URL(request.url);
+  const projectId = searchParams.get("projectId");
+
+  if (!projectId || !assetId || !playlist.endsWith(".m3u8")) {
+    return NextResponse.json(
+      { error: "projectId, assetId and an .m3u8 playlist are required" },
+      { status: 400 }
+    );
+  }
+
+  try {
+    const body = await getAssetHlsPlaylistFromService(
+      userId,
+      projectId,
+      assetId,
+      playlist,
+      `projectId=${encodeURIComponent(projectId)}`
+    );
+    return new NextResponse(body, {
+      headers: {
+        "Content-Type": "application/vnd.apple.mpegurl",
+        "Cache-Control": "private, max-age=300", // segment URLs are signed for 1h+
+      },
+    });
+  } catch (err) {
+    if (err instanceof Error && err.message === "Playlist not found") {
+      return NextResponse.json({ error: "Playlist not found" }, { status: 404 });
+    }
+    console.error("HLS playlist failed:", err);
+    return NextResponse.json(
+      { error: "Failed to get playlist" },
+      { status: 500 }
+    );
+  }
+}
@@ -1,15 +1,20 @@
 /**
  * Returns a short-lived signed URL for direct GCS playback (no proxy).
- * GET /api/assets/[assetId]/playback-url?projectId=xxx
+ * GET /api/assets/[assetId]/playback-url?projectId=xxx[&variant=proxy|hls][&maxHeight=540]
  *
  * Use this URL as video/audio src so the browser loads from GCS directly,
  * avoiding proxy lag in production. CORS must be configured on the GCS bucket.
+ *
+ * variant=proxy returns a low-res editing proxy (falls back to the original
+ * until the proxy step has run). variant=hls returns the HLS master playlist
+ * route when an HLS ladder exists.
  */
 
 import { NextRequest, NextResponse } from "next/server";
 import {
   isAssetServiceEnabled,
-  getAssetFromService,
+  getAssetPlaybackUrlFromService,
+  type PlaybackVariant,
 } from "@/app/lib/server/asset-service-client";
 import { verifyAuth } from "@/app/lib/server/auth";
 
@@ -35,6 +40,8 @@ export async function GET(
   const { assetId } = await params;
   const { searchParams } = new URL(request.url);
   const projectId = searchParams.get("projectId");
+  const variantParam = searchParams.get("variant") ?? "original";
+  const maxHeight = Number(searchParams.get("maxHeight")) || undefined;
 
   if (!projectId || !assetId) {
     return NextResponse.json(
@@ -43,9 +50,31 @@ export async function GET(
     );
   }
 
+  if (!["original", "proxy", "hls"].includes(variantParam)) {
+    return NextResponse.json(
+      { error: "variant must be original, proxy or hls" },
+      { status: 400 }
+    );
+  }
+  const variant = variantParam as PlaybackVariant;
+
   try {
-    const asset = await getAssetFromService(userId, projectId, assetId);
-    if (!asset.signedUrl) {
+    const playback = await getAssetPlaybackUrlFromService(
+      userId,
+      projectId,
+      assetId,
+      variant,
+      maxHeight
+    );
+
+    let url = playback.url;
+    if (variant === "hls" && playback.available && playback.playlist) {
+      // Playlists are rewritten server-side with signed segment URLs
+      url = `/api/assets/${encodeURIComponent(assetId)}/hls/${encodeURIComponent(
+        playback.playlist
+      )}?projectId=${encodeURIComponent(projectId)}`;
+    }
+    if (!url) {
       return NextResponse.json(
         { error: "Asset file not available for playback" },
         { status: 404 }
@@ -53,7 +82,7 @@ export async function GET(
     }
 
     return NextResponse.json(
-      { url: asset.signedUrl },
+      { url, variant: playback.variant, height: playback.height ?? null },
       {
         headers: {
           "Cache-Control": "private, max-age=300", // 5 min - signed URLs typically valid 1h+
@@ -0,0 +1,85 @@
+/**
+ * Get a time slice of an asset's word transcript or face boxes.
+ * GET /api/assets/[assetId]/tracks/[track]?projectId=xxx&start=0&end=30
+ *
+ * These arrays are stored outside the pipeline state; start/end are seconds
+ * (start inclusive, end exclusive) and both are optional.
+ */
+
+import { NextRequest, NextResponse } from "next/server";
+import {
+  isAssetServiceEnabled,
+  getAssetTrackFromService,
+  type AssetTrackName,
+} from "@/app/lib/server/asset-service-client";
+import { verifyAuth } from "@/app/lib/server/auth";
+
+export const runtime = "nodejs";
+export const dynamic = "force-dynamic";
+
+const TRACKS: AssetTrackName[] = ["transcript-words", "face-boxes"];
+
+function parseSeconds(value: string | null): number | undefined | null {
+  if (value === null || value === "") return undefined;
+  const n = Number(value);
+  return Number.isFinite(n) ? n : null;
+}
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ assetId: string; track: string }> }
+) {
+  if (!isAssetServiceEnabled()) {
+    return NextResponse.json(
+      { error: "Asset service not configured" },
+      { status: 503 }
+    );
+  }
+
+  const userId = await verifyAuth(request);
+  if (!userId) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const { assetId, track } = await params;
+  const { searchParams } = new URL(request.url);
+  const projectId = searchParams.get("projectId");
+  const start = parseSeconds(searchParams.get("start"));
+  const end = parseSeconds(searchParams.get("end"));
+
+  if (!projectId || !assetId || !TRACKS.includes(track as AssetTrackName)) {
+    return NextResponse.json(
+      { error: "projectId, assetId and a known track are required" },
+      { status: 400 }
+    );
+  }
+  if (start === null || end === null) {
+    return NextResponse.json(
+      { error: "start and end must be numbers (seconds)" },
+      { status: 400 }
+    );
+  }
+
+  try {
+    const data = await getAssetTrackFromService(
+      userId,
+      projectId,
+      assetId,
+      track as AssetTrackName,
+      start,
+      end
+    );
+    return NextResponse.json(data, {
+      headers: { "Cache-Control": "private, max-age=60" },
+    });
+  } catch (err) {
+    if (err instanceof Error && err.message === "Track not found") {
+      return NextResponse.json({ error: "Track not found" }, { status: 404 });
+    }
+    console.error("Track fetch failed:", err);
+    return NextResponse.json(
+      { error: "Failed to get track" },
+      { status: 500 }
+    );
+  }
+}
@@ -17,6 +17,9 @@ const startJobSchema = z.object({
   projectId: z.string().min(1, "Project ID is required"),
   assetName: z.string().optional(),
   params: z.record(z.any()).optional(),
+  start: z.number().min(0).optional(),
+  end: z.number().positive().optional(),
+  maxHeight: z.number().int().min(16).optional(),
 }).refine(
   (data) => (data.assetId ? !data.imageUrl : !!data.imageUrl),
   { message: "Either assetId or imageUrl is required" }
@@ -63,8 +66,17 @@ export async function GET(request: NextRequest) {
   }
 
   try {
-    const jobs = await listVideoEffectJobs(assetId ?? undefined, imageUrl ?? undefined);
-    return NextResponse.json({ jobs });
+    const searchParams = request.nextUrl.searchParams;
+    const limit = Number(searchParams.get("limit")) || undefined;
+    const status = searchParams.get("status")?.split(",").filter(Boolean);
+    const view = searchParams.get("view") === "compact" ? "compact" : undefined;
+    const page = await listVideoEffectJobs(assetId ?? undefined, imageUrl ?? undefined, {
+      limit,
+      startAfter: searchParams.get("startAfter") ?? undefined,
+      status,
+      view,
+    });
+    return NextResponse.json(page);
   } catch (error) {
     console.error("Failed to list video effect jobs", error);
     const message = error instanceof Error ? error.message : "Unknown error";
@@ -93,6 +105,9 @@ export async function POST(request: NextRequest) {
       assetName: payload.assetName,
       effectId: payload.effectId,
       params: payload.params ?? {},
+      start: payload.start,
+      end: payload.end,
+      maxHeight: payload.maxHeight,
     });
     return NextResponse.json({ job }, { status: 201 });
   } catch (error) {
@@ -33,6 +33,7 @@ import { useProjectStore } from "@/app/lib/store/project-store";
 import { useAssetsStore } from "@/app/lib/store/assets-store";
 import { useAssetHighlightStore } from "@/app/lib/store/asset-highlight-store";
 import { usePipelineStates } from "@/app/lib/hooks/usePipelineStates";
+import { useTranscriptWords } from "@/app/lib/hooks/useTranscriptWords";
 import { useShortcuts } from "@/app/hooks/use-shortcuts";
 import { usePageReloadBlocker } from "@/app/hooks/use-page-reload-blocker";
 import { useAutoSave } from "@/app/lib/hooks/useAutoSave";
@@ -209,9 +210,13 @@ export function EditorLayout() {
 
   // Resolve asset refs (asset://...) to signed GCS URLs for direct playback
   const { layers: playbackResolvedLayers } = usePlaybackResolvedLayers(visibleLayers, projectId);
+  // Preview plays low-res editing proxies; panels that act on the media keep the originals
+  const { layers: previewResolvedLayers } = usePlaybackResolvedLayers(visibleLayers, projectId, {
+    variant: "proxy",
+  });
 
   // Pass through maskSrc as-is (GCS signed URLs and playback paths have CORS / are resolved)
-  const layersWithProxiedMasks = useMemo(() => playbackResolvedLayers, [playbackResolvedLayers]);
+  const layersWithProxiedMasks = useMemo(() => previewResolvedLayers, [previewResolvedLayers]);
   const currentTime = useProjectStore((s) => s.currentTime);
   const setCurrentTime = useProjectStore((s) => s.setCurrentTime);
   const getDuration = useProjectStore((s) => s.getDuration);
@@ -223,6 +228,8 @@ export function EditorLayout() {
   // Get assets and pipeline states to build transcriptions at runtime
   const assets = useAssetsStore((s) => s.assets);
   const { states: pipelineStates } = usePipelineStates(projectId);
+  // Word segments of long transcripts are stored outside the pipeline state
+  const transcriptWords = useTranscriptWords(projectId, pipelineStates);
 
   // Build transcriptions from pipeline metadata at runtime (not stored in project)
   const transcriptions = useMemo(() => {
@@ -247,7 +254,7 @@ export function EditorLayout() {
         assetName: asset.name,
         assetUrl: asset.url,
         transcript: transcript ?? "",
-        segments: segments ?? [],
+        segments: segments ?? transcriptWords[asset.id] ?? [],
         status: "completed",
         languageCodes: [],
         createdAt: new Date().toISOString(),
@@ -256,7 +263,7 @@ export function EditorLayout() {
     }
     
     return result;
-  }, [assets, pipelineStates]);
+  }, [assets, pipelineStates, transcriptWords]);
 
   const handleReloadBlocked = useCallback(() => {
     setReloadDialogOpen(true);
@@ -167,7 +167,7 @@ export function ImageEffectsPanel({ clip }: ImageEffectsPanelProps) {
       try {
         const authHeaders = await getAuthHeaders();
         const response = await fetch(
-          `/api/video-effects?${params}`,
+          `/api/video-effects?${params}&view=compact`,
           { signal: controller.signal, headers: authHeaders }
         );
         if (!response.ok) return;
@@ -13,6 +13,7 @@ import { useProjectStore } from "@/app/lib/store/project-store";
 import { useProjectsListStore } from "@/app/lib/store/projects-list-store";
 import { useAssetsStore } from "@/app/lib/store/assets-store";
 import { usePipelineStates } from "@/app/lib/hooks/usePipelineStates";
+import { useTranscriptWords } from "@/app/lib/hooks/useTranscriptWords";
 import { useAutoSave } from "@/app/lib/hooks/useAutoSave";
 import { usePlaybackResolvedLayers } from "@/app/lib/hooks/usePlaybackResolvedLayers";
 import type { ProjectTranscription } from "@/app/types/transcription";
@@ -83,7 +84,9 @@ export function MobileEditorLayout() {
   const layers = project.layers;
   const visibleLayers = useMemo(() => layers.filter((l) => !l.hidden), [layers]);
 
-  const { layers: playbackResolvedLayers } = usePlaybackResolvedLayers(visibleLayers, projectId);
+  const { layers: playbackResolvedLayers } = usePlaybackResolvedLayers(visibleLayers, projectId, {
+    variant: "proxy",
+  });
 
   const layersWithProxiedMasks = useMemo(() => playbackResolvedLayers, [playbackResolvedLayers]);
   const currentTime = useProjectStore((s) => s.currentTime);
@@ -95,6 +98,8 @@ export function MobileEditorLayout() {
   // Get assets and pipeline states to build transcriptions at runtime
   const assets = useAssetsStore((s) => s.assets);
   const { states: pipelineStates } = usePipelineStates(projectId);
+  // Word segments of long transcripts are stored outside the pipeline state
+  const transcriptWords = useTranscriptWords(projectId, pipelineStates);
 
   // Build transcriptions from pipeline metadata at runtime (not stored in project)
   const transcriptions = useMemo(() => {
@@ -119,7 +124,7 @@ export function MobileEditorLayout() {
         assetName: asset.name,
         assetUrl: asset.url,
         transcript: transcript ?? "",
-        segments: segments ?? [],
+        segments: segments ?? transcriptWords[asset.id] ?? [],
         status: "completed",
         languageCodes: [],
         createdAt: new Date().toISOString(),
@@ -128,7 +133,7 @@ export function MobileEditorLayout() {
     }
     
     return result;
-  }, [assets, pipelineStates]);
+  }, [assets, pipelineStates, transcriptWords]);
 
   const togglePlay = useCallback(() => {
     if (!player) return;
@@ -78,7 +78,7 @@ export function TimelinePanel({
   const splitClipAtTime = useProjectStore((s) => s.splitClipAtTime);
   const layers = useProjectStore((s) => s.project.layers);
   const projectId = useProjectStore((s) => s.projectId);
-  const { layers: resolvedLayers } = usePlaybackResolvedLayers(layers, projectId);
+  const { layers: resolvedLayers } = usePlaybackResolvedLayers(layers, projectId, { variant: "proxy" });
   const addLayer = useProjectStore((s) => s.addLayer);
   const addClip = useProjectStore((s) => s.addClip);
   const reorderLayers = useProjectStore((s) => s.reorderLayers);
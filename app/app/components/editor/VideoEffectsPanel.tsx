@@ -206,7 +206,7 @@ export function VideoEffectsPanel({ clip }: VideoEffectsPanelProps) {
       try {
         const authHeaders = await getAuthHeaders();
         const response = await fetch(
-          `/api/video-effects?assetId=${asset.id}`,
+          `/api/video-effects?assetId=${asset.id}&view=compact`,
           { signal: controller.signal, headers: authHeaders }
         );
         if (!response.ok) return;
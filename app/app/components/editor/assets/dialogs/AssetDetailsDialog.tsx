@@ -501,9 +501,10 @@ function PipelineStepCard({
       case "transcription": {
         // New format: segments is array of { start, speech } - one per word
         const segments = step.metadata.segments as Array<{ start?: number; speech?: string }> | undefined;
+        const wordCount = (step.metadata.wordCount as number | undefined) ?? segments?.length;
         const transcript = step.metadata.transcript as string | undefined;
         // Each segment is a word in the new format
-        if (segments && segments.length > 0) return `${segments.length} words`;
+        if (wordCount) return `${wordCount} words`;
         if (transcript && transcript.trim()) return `${transcript.split(" ").length} words`;
         // Completed but no speech detected
         if (step.status === "succeeded") return "No speech detected";
@@ -843,14 +844,17 @@ function PipelineStepDetails({
     }
 
     case "transcription": {
-      const segments = metadata.segments as Array<{
-        start?: number;
-        speech?: string;
-      }> | undefined;
+      type WordSegment = { start?: number; speech?: string };
+      // Long transcripts keep their words in a track blob; metadata carries a
+      // preview (first words, then the last few) and wordCount
+      const inlineSegments = metadata.segments as WordSegment[] | undefined;
+      const preview = metadata.segmentsPreview as WordSegment[] | undefined;
+      const wordCount = (metadata.wordCount as number | undefined) ?? inlineSegments?.length ?? 0;
+      const segments = inlineSegments ?? preview?.slice(0, Math.min(20, wordCount));
       const transcript = metadata.transcript as string | undefined;
 
       // Check if transcription completed but found no speech
-      const hasNoSpeech = (!transcript || transcript.trim() === "") && (!segments || segments.length === 0);
+      const hasNoSpeech = (!transcript || transcript.trim() === "") && wordCount === 0;
 
       if (hasNoSpeech) {
         return (
@@ -872,7 +876,7 @@ function PipelineStepDetails({
           )}
           {segments && segments.length > 0 && (
             <div>
-              <p className="text-xs text-muted-foreground mb-1">{segments.length} word(s)</p>
+              <p className="text-xs text-muted-foreground mb-1">{wordCount} word(s)</p>
               <div className="max-h-32 overflow-y-auto space-y-1">
                 {segments.slice(0, 30).map((seg, i) => (
                   <div key={i} className="flex justify-between text-xs bg-muted/30 rounded px-2 py-1">
@@ -882,9 +886,9 @@ function PipelineStepDetails({
                     </span>
                   </div>
                 ))}
-                {segments.length > 30 && (
+                {wordCount > Math.min(segments.length, 30) && (
                   <p className="text-xs text-muted-foreground text-center py-1">
-                    +{segments.length - 30} more words
+                    +{wordCount - Math.min(segments.length, 30)} more words
                   </p>
                 )}
               </div>
@@ -49,6 +49,7 @@ const STEP_ICONS: Record<string, React.ElementType> = {
   transcription: FileText,
   "face-detection": Smile,
   "gemini-analysis": Sparkles,
+  proxy: Video,
   video: Video,
   image: Image,
   music: Music,
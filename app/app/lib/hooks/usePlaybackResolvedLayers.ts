@@ -13,12 +13,14 @@ import type {
 /**
  * Resolve assetId → signed playback URL for each clip.
  * Returns layers with src (and maskSrc for video) set — for preview/render only; never persisted.
+ * variant "proxy" resolves video to low-res editing proxies (falls back to the original).
  */
 export function usePlaybackResolvedLayers(
   layers: Layer[],
   projectId: string | null,
-  _options?: { enabled?: boolean }
+  options?: { enabled?: boolean; variant?: "original" | "proxy" }
 ): { layers: ResolvedLayer[]; ready: boolean } {
+  const variant = options?.variant ?? "original";
   const [urlCache, setUrlCache] = useState<Map<string, string>>(new Map());
   const [fetchPassDone, setFetchPassDone] = useState(false);
 
@@ -52,7 +54,7 @@ export function usePlaybackResolvedLayers(
     Promise.all(
       assetIds.map(async (assetId) => {
         const res = await fetch(
-          `/api/assets/${assetId}/playback-url?projectId=${encodeURIComponent(projectId)}`,
+          `/api/assets/${assetId}/playback-url?projectId=${encodeURIComponent(projectId)}&variant=${variant}`,
           { credentials: "include" }
         );
         if (!res.ok || cancelled) return { assetId, url: null };
@@ -72,7 +74,7 @@ export function usePlaybackResolvedLayers(
     return () => {
       cancelled = true;
     };
-  }, [projectId, assetIds.join(",")]);
+  }, [projectId, assetIds.join(","), variant]);
 
   const resolvedLayers = useMemo((): ResolvedLayer[] => {
     return layers.map((layer) => ({
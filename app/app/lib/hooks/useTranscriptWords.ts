@@ -0,0 +1,92 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { getAuthHeaders } from "@/app/lib/hooks/useAuthFetch";
+import type { PipelineStepState } from "@/app/types/pipeline";
+
+export interface TranscriptWord {
+  start: number;
+  speech: string;
+}
+
+interface TrackPointer {
+  objectName?: string;
+}
+
+// Track blobs are write-once (new object name per transcription), so words can
+// be cached by object name for the lifetime of the page.
+const wordsByObjectName = new Map<string, TranscriptWord[]>();
+const inFlight = new Map<string, Promise<TranscriptWord[]>>();
+
+async function fetchWords(
+  projectId: string,
+  assetId: string,
+  objectName: string
+): Promise<TranscriptWord[]> {
+  const cached = wordsByObjectName.get(objectName);
+  if (cached) return cached;
+  const pending = inFlight.get(objectName);
+  if (pending) return pending;
+
+  const request = (async () => {
+    const headers = await getAuthHeaders();
+    const response = await fetch(
+      `/api/assets/${assetId}/tracks/transcript-words?projectId=${encodeURIComponent(projectId)}`,
+      { headers }
+    );
+    if (!response.ok) {
+      throw new Error(`Failed to load transcript words: ${response.status}`);
+    }
+    const data = (await response.json()) as { items?: TranscriptWord[] };
+    const words = data.items ?? [];
+    wordsByObjectName.set(objectName, words);
+    return words;
+  })();
+  inFlight.set(objectName, request);
+  try {
+    return await request;
+  } finally {
+    inFlight.delete(objectName);
+  }
+}
+
+/**
+ * Word-level transcript segments for assets whose transcription step stores
+ * them outside the pipeline state (metadata.segmentsTrack). Assets with inline
+ * metadata.segments are not fetched.
+ *
+ * @returns Words keyed by assetId
+ */
+export function useTranscriptWords(
+  projectId: string | null,
+  pipelineStates: Record<string, PipelineStepState[]>
+): Record<string, TranscriptWord[]> {
+  const [words, setWords] = useState<Record<string, TranscriptWord[]>>({});
+
+  useEffect(() => {
+    if (!projectId) return;
+    let cancelled = false;
+
+    for (const [assetId, steps] of Object.entries(pipelineStates)) {
+      const step = steps.find((s) => s.id === "transcription" && s.status === "succeeded");
+      const pointer = step?.metadata?.segmentsTrack as TrackPointer | undefined;
+      const objectName = pointer?.objectName;
+      if (!objectName || step?.metadata?.segments) continue;
+
+      fetchWords(projectId, assetId, objectName)
+        .then((assetWords) => {
+          if (cancelled) return;
+          setWords((prev) =>
+            prev[assetId] === assetWords ? prev : { ...prev, [assetId]: assetWords }
+          );
+        })
+        .catch((err) => console.error(`Transcript words for ${assetId}:`, err));
+    }
+
+    return () => {
+      cancelled = true;
+    };
+  }, [projectId, pipelineStates]);
+
+  return words;
+}
@@ -364,6 +364,101 @@ export async function getAssetThumbnailFromService(
   return response.json();
 }
 
+export type PlaybackVariant = "original" | "proxy" | "hls";
+
+export interface AssetPlaybackUrlResponse {
+  url: string | null;
+  variant: PlaybackVariant;
+  height?: number | null;
+  available: boolean;
+  playlist?: string | null;
+}
+
+/**
+ * Get a fresh signed playback URL. variant "proxy" returns a low-res editing
+ * proxy when one exists (falls back to the original).
+ */
+export async function getAssetPlaybackUrlFromService(
+  userId: string,
+  projectId: string,
+  assetId: string,
+  variant: PlaybackVariant = "original",
+  maxHeight?: number
+): Promise<AssetPlaybackUrlResponse> {
+  const query = new URLSearchParams({ variant });
+  if (maxHeight) query.set("maxHeight", String(maxHeight));
+  const response = await fetch(
+    `${ASSET_SERVICE_URL}/api/assets/${userId}/${projectId}/${assetId}/playback-url?${query}`,
+    { method: "GET", cache: "no-store", headers: getAuthHeaders("") }
+  );
+  if (!response.ok) {
+    if (response.status === 404) throw new Error("Asset not found");
+    throw new Error(`Asset service playback-url failed: ${response.status}`);
+  }
+  return response.json();
+}
+
+/**
+ * Get an HLS playlist with signed segment URLs. Nested playlist URIs get
+ * playlistQuery appended so they route back through the caller.
+ */
+export async function getAssetHlsPlaylistFromService(
+  userId: string,
+  projectId: string,
+  assetId: string,
+  playlist: string,
+  playlistQuery: string
+): Promise<string> {
+  const query = new URLSearchParams({ playlistQuery });
+  const response = await fetch(
+    `${ASSET_SERVICE_URL}/api/assets/${userId}/${projectId}/${assetId}/hls/${encodeURIComponent(playlist)}?${query}`,
+    { method: "GET", cache: "no-store", headers: getAuthHeaders("") }
+  );
+  if (!response.ok) {
+    if (response.status === 404) throw new Error("Playlist not found");
+    throw new Error(`Asset service hls failed: ${response.status}`);
+  }
+  return response.text();
+}
+
+export type AssetTrackName = "transcript-words" | "face-boxes";
+
+export interface AssetTrackSlice<T = Record<string, unknown>> {
+  track: AssetTrackName;
+  start: number | null;
+  end: number | null;
+  count: number;
+  total: number;
+  items: T[];
+}
+
+/**
+ * Get a time slice (seconds, start inclusive, end exclusive) of a large
+ * per-asset array that is stored outside the pipeline state: word-level
+ * transcript segments or face bounding boxes.
+ */
+export async function getAssetTrackFromService<T = Record<string, unknown>>(
+  userId: string,
+  projectId: string,
+  assetId: string,
+  track: AssetTrackName,
+  start?: number,
+  end?: number
+): Promise<AssetTrackSlice<T>> {
+  const query = new URLSearchParams();
+  if (start !== undefined) query.set("start", String(start));
+  if (end !== undefined) query.set("end", String(end));
+  const response = await fetch(
+    `${ASSET_SERVICE_URL}/api/assets/${userId}/${projectId}/${assetId}/tracks/${track}?${query}`,
+    { method: "GET", cache: "no-store", headers: getAuthHeaders("") }
+  );
+  if (!response.ok) {
+    if (response.status === 404) throw new Error("Track not found");
+    throw new Error(`Asset service track get failed: ${response.status}`);
+  }
+  return response.json();
+}
+
 /**
  * Get fresh signed frame URLs (generated on-demand, not stored - they expire).
  */
@@ -60,6 +60,11 @@ export async function startVideoEffectJob(options: {
   assetName?: string;
   effectId: string;
   params?: Record<string, unknown>;
+  /** Only send [start, end) seconds of the source video to the provider. */
+  start?: number;
+  end?: number;
+  /** Downscale the source video to at most this height first. */
+  maxHeight?: number;
 }): Promise<VideoEffectJob> {
   const body: Record<string, unknown> = {
     userId: options.userId,
@@ -72,6 +77,9 @@ export async function startVideoEffectJob(options: {
     body.imageUrl = options.imageUrl;
     if (options.assetName) body.assetName = options.assetName;
   }
+  if (options.start !== undefined) body.start = options.start;
+  if (options.end !== undefined) body.end = options.end;
+  if (options.maxHeight !== undefined) body.maxHeight = options.maxHeight;
 
   const response = await fetch(`${VIDEO_EFFECTS_SERVICE_URL}/api/jobs`, {
     method: "POST",
@@ -108,18 +116,37 @@ export async function getVideoEffectJob(jobId: string): Promise<VideoEffectJob |
   return data.job;
 }
 
+export interface ListVideoEffectJobsOptions {
+  /** Page size (service default 50, max 200). */
+  limit?: number;
+  /** `nextCursor` of the previous page. */
+  startAfter?: string;
+  /** Only include jobs in these statuses. */
+  status?: string[];
+  /** `compact` returns only the fields the job list renders. */
+  view?: "full" | "compact";
+}
+
+export interface VideoEffectJobPage {
+  jobs: VideoEffectJob[];
+  nextCursor: string | null;
+}
+
 /**
- * List video effect jobs for an asset or image URL.
+ * List video effect jobs for an asset or image URL, newest first, one page at a time.
  */
 export async function listVideoEffectJobs(
   assetId?: string,
-  imageUrl?: string
-): Promise<VideoEffectJob[]> {
-  const param = assetId
-    ? `assetId=${encodeURIComponent(assetId)}`
-    : `imageUrl=${encodeURIComponent(imageUrl!)}`;
+  imageUrl?: string,
+  options: ListVideoEffectJobsOptions = {}
+): Promise<VideoEffectJobPage> {
+  const params = new URLSearchParams(assetId ? { assetId } : { imageUrl: imageUrl! });
+  if (options.limit) params.set("limit", String(options.limit));
+  if (options.startAfter) params.set("startAfter", options.startAfter);
+  if (options.status?.length) params.set("status", options.status.join(","));
+  if (options.view) params.set("view", options.view);
   const response = await fetch(
-    `${VIDEO_EFFECTS_SERVICE_URL}/api/jobs?${param}`,
+    `${VIDEO_EFFECTS_SERVICE_URL}/api/jobs?${params.toString()}`,
     { method: "GET" }
   );
 
@@ -128,7 +155,7 @@ export async function listVideoEffectJobs(
   }
 
   const data = await response.json();
-  return data.jobs;
+  return { jobs: data.jobs, nextCursor: data.nextCursor ?? null };
 }
 
 /**
@@ -38,6 +38,46 @@ interface FaceData {
   }>;
 }
 
+type FaceBox = NonNullable<FaceData["timestampedBoxes"]>[number] & { faceIndex: number };
+
+// Boxes within this distance (seconds) of a capture time count as "visible then"
+const NEARBY_BOX_SECONDS = 0.1;
+
+/**
+ * Face boxes within NEARBY_BOX_SECONDS of a time. Boxes are stored outside the
+ * pipeline state and fetched as a time slice; results written before that
+ * still carry timestampedBoxes inline on each face.
+ */
+async function fetchFaceBoxesNear(
+  assetId: string,
+  projectId: string,
+  time: number,
+  authHeaders: Record<string, string>,
+  faces: FaceData[]
+): Promise<FaceBox[]> {
+  const inline = faces.flatMap((f) =>
+    (f.timestampedBoxes ?? []).map((tb) => ({ ...tb, faceIndex: f.faceIndex }))
+  );
+  if (inline.length > 0) {
+    return inline.filter((tb) => Math.abs(tb.time - time) < NEARBY_BOX_SECONDS);
+  }
+  const query = new URLSearchParams({
+    projectId,
+    start: String(Math.max(0, time - NEARBY_BOX_SECONDS)),
+    end: String(time + NEARBY_BOX_SECONDS),
+  });
+  try {
+    const response = await fetch(`/api/assets/${assetId}/tracks/face-boxes?${query}`, {
+      headers: authHeaders,
+    });
+    if (!response.ok) return [];
+    const data = (await response.json()) as { items?: FaceBox[] };
+    return data.items ?? [];
+  } catch {
+    return [];
+  }
+}
+
 interface PipelineStep {
   id: string;
   status: string;
@@ -174,13 +214,18 @@ export const captureFacesTool: ToolDefinition<typeof captureFacesSchema, Project
         });
 
         // Also add other faces that have bounding boxes at similar timestamps
+        const nearbyBoxes = await fetchFaceBoxesNear(
+          matchedAsset.id,
+          projectId,
+          time,
+          authHeaders,
+          faces
+        );
         for (const otherFace of faces) {
           if (otherFace.faceIndex === face.faceIndex) continue;
 
           // Find a bounding box for this face near the capture time
-          const nearbyBox = otherFace.timestampedBoxes?.find(
-            (tb) => Math.abs(tb.time - time) < 0.1 // Within 100ms
-          );
+          const nearbyBox = nearbyBoxes.find((tb) => tb.faceIndex === otherFace.faceIndex);
           if (nearbyBox) {
             overlaysAtTime.push({
               faceIndex: otherFace.faceIndex,
@@ -205,8 +205,158 @@ const backgroundRemoverDefinition: VideoEffectDefinition<z.ZodRecord<z.ZodString
   },
 };
 
+// Local effects: the service renders them with ffmpeg, so params go through as-is
+const passParams = ({ params }: { params: Record<string, unknown> }) => ({ ...params });
+const noProviderResult = () => ({});
+
+const chromaKeyFormSchema = z.object({
+  keyColor: z
+    .string()
+    .regex(/^(#|0x)?[0-9a-fA-F]{6}$/, "Use a hex color such as #00ff00")
+    .default("#00ff00"),
+  similarity: z.number().min(0.01).max(1).default(0.1),
+  blend: z.number().min(0).max(1).default(0.05),
+});
+
+const chromaKeyDefinition: VideoEffectDefinition<typeof chromaKeyFormSchema> = {
+  id: "local.chroma-key",
+  label: "Chroma Key",
+  description: "Make a green or blue screen transparent. Output is a WebM video with alpha.",
+  provider: "local" satisfies VideoEffectProvider,
+  formSchema: chromaKeyFormSchema,
+  defaultValues: chromaKeyFormSchema.parse({}),
+  fields: [
+    {
+      name: "keyColor",
+      label: "Key Color",
+      type: "text",
+      placeholder: "#00ff00",
+      description: "Screen color to remove, as hex.",
+      required: true,
+    },
+    {
+      name: "similarity",
+      label: "Similarity",
+      type: "number",
+      description: "How close to the key color a pixel must be to be removed (0.01-1).",
+    },
+    {
+      name: "blend",
+      label: "Edge Blend",
+      type: "number",
+      description: "Softness of the key edges (0-1).",
+    },
+  ],
+  buildProviderInput: passParams,
+  extractResult: noProviderResult,
+};
+
+const blurFormSchema = z.object({
+  strength: z.number().min(0.5).max(50).default(8),
+});
+
+const blurDefinition: VideoEffectDefinition<typeof blurFormSchema> = {
+  id: "local.blur",
+  label: "Blur",
+  description: "Gaussian blur over the whole frame.",
+  provider: "local" satisfies VideoEffectProvider,
+  formSchema: blurFormSchema,
+  defaultValues: blurFormSchema.parse({}),
+  fields: [
+    {
+      name: "strength",
+      label: "Strength",
+      type: "number",
+      description: "Blur radius (0.5-50).",
+      required: true,
+    },
+  ],
+  buildProviderInput: passParams,
+  extractResult: noProviderResult,
+};
+
+const colorGradePresets = [
+  { value: "vintage", label: "Vintage" },
+  { value: "cross_process", label: "Cross process" },
+  { value: "increase_contrast", label: "More contrast" },
+  { value: "strong_contrast", label: "Strong contrast" },
+  { value: "lighter", label: "Lighter" },
+  { value: "darker", label: "Darker" },
+  { value: "negative", label: "Negative" },
+] as const;
+
+const colorGradeFormSchema = z.object({
+  preset: z
+    .enum(colorGradePresets.map((preset) => preset.value) as [string, ...string[]])
+    .default("vintage"),
+  saturation: z.number().min(0).max(3).default(1),
+});
+
+const colorGradeDefinition: VideoEffectDefinition<typeof colorGradeFormSchema> = {
+  id: "local.color-grade",
+  label: "Color Grade",
+  description: "Apply a color grading preset, with optional saturation.",
+  provider: "local" satisfies VideoEffectProvider,
+  formSchema: colorGradeFormSchema,
+  defaultValues: colorGradeFormSchema.parse({}),
+  fields: [
+    {
+      name: "preset",
+      label: "Preset",
+      type: "select",
+      options: colorGradePresets.map((preset) => ({ ...preset })),
+      required: true,
+    },
+    {
+      name: "saturation",
+      label: "Saturation",
+      type: "number",
+      description: "1 keeps the preset's saturation; 0 is black and white (0-3).",
+    },
+  ],
+  buildProviderInput: passParams,
+  extractResult: noProviderResult,
+};
+
+const speedRampFormSchema = z.object({
+  startSpeed: z.number().min(0.25).max(4).default(1),
+  endSpeed: z.number().min(0.25).max(4).default(2),
+});
+
+const speedRampDefinition: VideoEffectDefinition<typeof speedRampFormSchema> = {
+  id: "local.speed-ramp",
+  label: "Speed Ramp",
+  description:
+    "Change playback speed, constant or ramping from a start to an end speed. Ramps drop the audio.",
+  provider: "local" satisfies VideoEffectProvider,
+  formSchema: speedRampFormSchema,
+  defaultValues: speedRampFormSchema.parse({}),
+  fields: [
+    {
+      name: "startSpeed",
+      label: "Start Speed",
+      type: "number",
+      description: "Speed at the start of the clip (0.25-4, 1 is normal).",
+      required: true,
+    },
+    {
+      name: "endSpeed",
+      label: "End Speed",
+      type: "number",
+      description: "Speed at the end of the clip; same as start for a constant speed.",
+      required: true,
+    },
+  ],
+  buildProviderInput: passParams,
+  extractResult: noProviderResult,
+};
+
 export const videoEffectDefinitions: AnyVideoEffectDefinition[] = [
   sam2VideoDefinition,
+  chromaKeyDefinition,
+  blurDefinition,
+  colorGradeDefinition,
+  speedRampDefinition,
 ];
 
 export const imageEffectDefinitions: AnyVideoEffectDefinition[] = [
@@ -1,9 +1,10 @@
 import type { ToolFieldDefinition } from "@/app/lib/tools/types";
 import type { z } from "zod";
 
-export type VideoEffectProvider = "replicate";
+/** "local" effects run as ffmpeg filter graphs on the video effects service. */
+export type VideoEffectProvider = "replicate" | "local";
 
-export type VideoEffectStatus = "pending" | "running" | "completed" | "error";
+export type VideoEffectStatus = "pending" | "running" | "completing" | "completed" | "error";
 
 export interface VideoEffectJob {
   id: string;
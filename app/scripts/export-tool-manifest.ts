@@ -71,6 +71,19 @@ const LANGGRAPH_ONLY_TOOLS: Array<{
     description: "Check the status of a video effect job started by applyVideoEffectToClip.",
     langgraphName: "getVideoEffectJobStatus",
   },
+  {
+    name: "applyVideoEffectToClips",
+    label: "Apply Video Effect to Clips (Batch)",
+    description:
+      "Apply one video effect with the same settings to many assets as a single batch job.",
+    langgraphName: "applyVideoEffectToClips",
+  },
+  {
+    name: "getVideoEffectBatchStatus",
+    label: "Check Video Effect Batch Status",
+    description: "Check the progress of a batch started by applyVideoEffectToClips.",
+    langgraphName: "getVideoEffectBatchStatus",
+  },
   {
     name: "removeBackgroundOnImage",
     label: "Remove Background from Image",
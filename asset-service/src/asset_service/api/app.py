@@ -16,8 +16,12 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from ..api_key_provider import init_api_key_provider
 from ..config import get_settings
-from ..tasks import start_worker, stop_worker, close_task_queue
+from ..http_client import close_http_clients, open_http_clients
+from ..pubsub import flush_pipeline_events
+from ..tasks import start_worker, stop_worker, close_task_queue, get_task_queue
+from ..tasks.admission import get_queue_load, inflight_upload_bytes
 from ..tasks.worker import signal_shutdown
+from ..transcode.notifications import start_transcode_notifications, stop_transcode_notifications
 from .routes import assets, pipeline, search
 
 logger = logging.getLogger(__name__)
@@ -126,6 +130,9 @@ async def lifespan(app: FastAPI):
     logger.info("Asset service starting...")
     init_api_key_provider(get_settings())
 
+    # Pooled outbound clients for the API loop (pipeline threads open their own)
+    await open_http_clients()
+
     # Start background worker
     try:
         await start_worker()
@@ -133,11 +140,24 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to start pipeline worker (Redis may not be available): {e}")
 
+    # Complete Transcoder jobs from Pub/Sub notifications instead of polling
+    try:
+        await start_transcode_notifications(get_settings())
+    except Exception as e:
+        logger.warning(f"Failed to start transcode notification subscriber: {e}")
+
     yield
 
     # Stop worker and close connections
     logger.info("Asset service shutting down...")
     signal_shutdown()  # Signal all threads to stop
+
+    try:
+        await asyncio.wait_for(stop_transcode_notifications(), timeout=5.0)
+    except asyncio.TimeoutError:
+        logger.warning("Transcode notification subscriber stop timed out")
+    except Exception as e:
+        logger.warning(f"Error stopping transcode notification subscriber: {e}")
     
     try:
         # Use timeout to prevent hanging during shutdown
@@ -153,6 +173,21 @@ async def lifespan(app: FastAPI):
         logger.warning("Task queue close timed out")
     except Exception as e:
         logger.warning(f"Error closing task queue: {e}")
+
+    # Send batched and retry-buffered pipeline events
+    try:
+        await asyncio.wait_for(asyncio.to_thread(flush_pipeline_events), timeout=10.0)
+    except asyncio.TimeoutError:
+        logger.warning("Pipeline event flush timed out")
+    except Exception as e:
+        logger.warning(f"Error flushing pipeline events: {e}")
+
+    try:
+        await asyncio.wait_for(close_http_clients(), timeout=2.0)
+    except asyncio.TimeoutError:
+        logger.warning("HTTP client close timed out")
+    except Exception as e:
+        logger.warning(f"Error closing HTTP clients: {e}")
     
     logger.info("Asset service shutdown complete")
 
@@ -188,8 +223,24 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health_check():
-        """Health check endpoint."""
-        return {"status": "healthy"}
+        """
+        Health check endpoint.
+
+        Also reports pipeline queue depth, estimated wait and in-flight upload
+        bytes for autoscalers; queue stats are omitted if Redis is unreachable.
+        """
+        settings = get_settings()
+        health: dict = {
+            "status": "healthy",
+            "admissionControl": settings.admission_control_enabled,
+            "inflightUploadBytes": inflight_upload_bytes(),
+        }
+        try:
+            load = await asyncio.wait_for(get_queue_load(await get_task_queue(), settings), timeout=1.0)
+            health["queue"] = load.to_dict()
+        except Exception as e:
+            logger.warning(f"Queue stats unavailable for health check: {e}")
+        return health
 
     return app
 
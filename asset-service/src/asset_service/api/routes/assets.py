@@ -14,13 +14,14 @@ from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, File, Form, HTTPException, Path, Request, UploadFile
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 # Path segment for asset ID. Reorder is not ambiguous: POST .../reorder is defined before .../{asset_id}.
 ASSET_ID_PATH = Path(..., description="Asset ID")
 
 from ...config import get_settings
-from ...metadata.ffprobe import extract_metadata, determine_asset_type
+from ...metadata.ffprobe import extract_metadata, extract_remote_metadata, determine_asset_type
 from ...storage.firestore import (
     save_asset,
     get_asset,
@@ -29,15 +30,39 @@ from ...storage.firestore import (
     delete_asset,
     batch_update_sort_orders,
 )
-from ...storage.gcs import create_signed_url, delete_from_gcs, upload_to_gcs
+from ...storage.gcs import create_signed_url, delete_from_gcs, download_from_gcs, upload_to_gcs
 from ...pipeline.store import get_pipeline_state
-from ...tasks.queue import get_task_queue
+from ...storage.tracks import (
+    TRACK_FACE_BOXES,
+    TRACK_TRANSCRIPT_WORDS,
+    delete_track,
+    read_track,
+    slice_track,
+    sort_track_records,
+)
+from ...tasks.admission import (
+    ADMISSION_ACCEPT,
+    AdmissionDecision,
+    check_admission,
+    release_upload,
+    try_reserve_upload,
+)
+from ...tasks.queue import PRIORITY_LOW, get_task_queue
 from ...search.algolia import index_asset, delete_asset_index, update_asset_index
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Read size when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Track name -> (pipeline step, metadata key of the blob pointer, inline fallback key)
+TRACK_SOURCES = {
+    TRACK_TRANSCRIPT_WORDS: ("transcription", "segmentsTrack", "segments"),
+    TRACK_FACE_BOXES: ("face-detection", "boxesTrack", "boxes"),
+}
+
 
 class AssetResponse(BaseModel):
     """Response model for asset data."""
@@ -77,6 +102,13 @@ class UploadResponse(BaseModel):
     asset: AssetResponse
     pipelineStarted: bool = False
     transcodeStarted: bool = False
+    # Pipeline queued on the low-priority lane because the queue is busy
+    pipelineDeferred: bool = False
+
+
+def _upload_file_to_gcs(path: str, object_name: str, mime_type: str, settings) -> dict:
+    with open(path, "rb") as f:
+        return upload_to_gcs(f, object_name, mime_type, settings)
 
 
 def _is_unsupported_video_format(mime: str, filename: str) -> bool:
@@ -108,22 +140,33 @@ async def upload_asset(
     - Uploads to GCS immediately
     - Stores metadata in Firestore
     - Queues pipeline for background processing (non-blocking)
+
+    Returns 429 with Retry-After when the pipeline queue or the in-flight
+    upload budget is full; under moderate load the pipeline is deferred to
+    the low-priority lane instead.
     """
     settings = get_settings()
 
-    # Generate asset ID
-    asset_id = str(uuid.uuid4())
+    admission = AdmissionDecision(ADMISSION_ACCEPT)
+    if run_pipeline:
+        admission = await check_admission(await get_task_queue(), settings)
+        if admission.rejected:
+            raise HTTPException(
+                status_code=429,
+                detail=admission.reason,
+                headers={"Retry-After": str(admission.retry_after)},
+            )
 
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
+    upload_size = file.size or int(request.headers.get("content-length") or 0)
+    if not try_reserve_upload(upload_size, settings):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many uploads in progress",
+            headers={"Retry-After": str(settings.admission_upload_retry_after_seconds)},
+        )
 
-    # Verify file hash if HMAC auth is enabled (hash was signed by client)
-    expected_hash = getattr(request.state, "expected_file_hash", None)
-    if expected_hash:
-        actual_hash = hashlib.sha256(content).hexdigest()
-        if not hmac.compare_digest(expected_hash, actual_hash):
-            raise HTTPException(status_code=401, detail="File hash mismatch")
+    # Generate asset ID
+    asset_id = str(uuid.uuid4())
 
     # Get filename and mime type
     original_filename = file.filename or f"asset-{asset_id}"
@@ -139,43 +182,59 @@ async def upload_asset(
     # Determine asset type
     asset_type = determine_asset_type(mime_type, original_filename)
 
-    # Extract metadata using ffprobe (save to temp file first)
     metadata: dict[str, Any] = {}
     temp_path = None
 
     try:
-        # Write to temp file for ffprobe
+        # Stream the upload to a temp file in chunks (also used by ffprobe and the pipeline)
         suffix = os.path.splitext(original_filename)[1] or ""
+        hasher = hashlib.sha256()
+        file_size = 0
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(content)
             temp_path = tmp.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                tmp.write(chunk)
+                file_size += len(chunk)
+
+        # Verify file hash if HMAC auth is enabled (hash was signed by client)
+        expected_hash = getattr(request.state, "expected_file_hash", None)
+        if expected_hash and not hmac.compare_digest(expected_hash, hasher.hexdigest()):
+            raise HTTPException(status_code=401, detail="File hash mismatch")
 
-        # Extract metadata (run in thread pool to avoid blocking)
-        extracted = await asyncio.to_thread(extract_metadata, temp_path)
-        if extracted.width:
-            metadata["width"] = extracted.width
-        if extracted.height:
-            metadata["height"] = extracted.height
-        if extracted.duration:
-            metadata["duration"] = extracted.duration
-        if extracted.codec:
-            metadata["videoCodec"] = extracted.codec
-        if extracted.audio_codec:
-            metadata["audioCodec"] = extracted.audio_codec
-        if extracted.sample_rate:
-            metadata["sampleRate"] = extracted.sample_rate
-        if extracted.channels:
-            metadata["channels"] = extracted.channels
-        if extracted.bitrate:
-            metadata["bitrate"] = extracted.bitrate
-
-    except Exception as e:
-        logger.warning(f"Failed to extract metadata: {e}")
+        # Extract metadata using ffprobe (run in thread pool to avoid blocking)
+        try:
+            extracted = await asyncio.to_thread(extract_metadata, temp_path)
+            if extracted.width:
+                metadata["width"] = extracted.width
+            if extracted.height:
+                metadata["height"] = extracted.height
+            if extracted.duration:
+                metadata["duration"] = extracted.duration
+            if extracted.codec:
+                metadata["videoCodec"] = extracted.codec
+            if extracted.audio_codec:
+                metadata["audioCodec"] = extracted.audio_codec
+            if extracted.sample_rate:
+                metadata["sampleRate"] = extracted.sample_rate
+            if extracted.channels:
+                metadata["channels"] = extracted.channels
+            if extracted.bitrate:
+                metadata["bitrate"] = extracted.bitrate
+        except Exception as e:
+            logger.warning(f"Failed to extract metadata: {e}")
 
-    # Upload to GCS immediately
-    # Run blocking GCS operations in thread pool
-    object_name = f"{user_id}/{project_id}/assets/{asset_id}/{original_filename}"
-    gcs_result = await asyncio.to_thread(upload_to_gcs, content, object_name, mime_type, settings)
+        # Upload to GCS immediately, straight from the temp file
+        object_name = f"{user_id}/{project_id}/assets/{asset_id}/{original_filename}"
+        gcs_result = await asyncio.to_thread(
+            _upload_file_to_gcs, temp_path, object_name, mime_type, settings
+        )
+    except BaseException:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    finally:
+        release_upload(upload_size)
     # Do NOT store signedUrl - it expires. Generate on-demand in list/get.
 
     # Create asset data with GCS info (objectName only, no signed URLs)
@@ -240,6 +299,7 @@ async def upload_asset(
                 params=transcode_params,
                 trigger_pipeline_after=True,
                 agent_metadata=agent_metadata,
+                priority=admission.priority,
             )
             transcode_started = True
             pipeline_started = True
@@ -261,6 +321,7 @@ async def upload_asset(
                 asset_data=saved_asset,
                 asset_path=temp_path or "",
                 agent_metadata=agent_metadata,
+                priority=admission.priority,
             )
             pipeline_started = True
             logger.info(f"Queued pipeline for asset {asset_id}")
@@ -290,6 +351,7 @@ async def upload_asset(
         asset=AssetResponse(**response_asset),
         pipelineStarted=pipeline_started,
         transcodeStarted=transcode_started,
+        pipelineDeferred=pipeline_started and admission.priority == PRIORITY_LOW,
     )
 
 
@@ -316,10 +378,21 @@ async def register_gcs_asset(
     Register an existing GCS file as an asset.
 
     This is used by the renderer to register rendered videos as assets
-    so they can be analyzed by the agent pipeline.
+    so they can be analyzed by the agent pipeline. Subject to the same
+    pipeline admission control as uploads.
     """
     settings = get_settings()
 
+    admission = AdmissionDecision(ADMISSION_ACCEPT)
+    if body.runPipeline:
+        admission = await check_admission(await get_task_queue(), settings)
+        if admission.rejected:
+            raise HTTPException(
+                status_code=429,
+                detail=admission.reason,
+                headers={"Retry-After": str(admission.retry_after)},
+            )
+
     # Parse GCS URI
     if not body.gcsUri.startswith("gs://"):
         raise HTTPException(status_code=400, detail="Invalid GCS URI format")
@@ -361,16 +434,13 @@ async def register_gcs_asset(
 
     # Extract video metadata if it's a video
     metadata: dict[str, Any] = {}
-    temp_path = None
 
     if asset_type == "video":
         try:
-            # Download to temp file for ffprobe
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as tmp:
-                blob.download_to_file(tmp)
-                temp_path = tmp.name
-
-            extracted = await asyncio.to_thread(extract_metadata, temp_path)
+            # Range-read the header/moov over a signed URL instead of downloading the render
+            extracted = await asyncio.to_thread(
+                extract_remote_metadata, body.gcsUri, os.path.splitext(filename)[1], settings
+            )
             if extracted.width:
                 metadata["width"] = extracted.width
             if extracted.height:
@@ -381,9 +451,6 @@ async def register_gcs_asset(
                 metadata["videoCodec"] = extracted.codec
         except Exception as e:
             logger.warning(f"Failed to extract metadata from GCS file: {e}")
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                os.unlink(temp_path)
 
     # Create asset data (objectName only, no signed URLs - generated on-demand)
     now = datetime.utcnow().isoformat() + "Z"
@@ -442,6 +509,7 @@ async def register_gcs_asset(
                 params=parsed_transcode_opts,
                 trigger_pipeline_after=True,
                 agent_metadata=agent_metadata,
+                priority=admission.priority,
             )
             transcode_started = True
             pipeline_started = True
@@ -463,6 +531,7 @@ async def register_gcs_asset(
                 asset_data=saved_asset,
                 asset_path="",  # Already in GCS
                 agent_metadata=agent_metadata,
+                priority=admission.priority,
             )
             pipeline_started = True
             logger.info(f"Queued pipeline for registered GCS asset {asset_id}")
@@ -489,6 +558,7 @@ async def register_gcs_asset(
         asset=AssetResponse(**response_asset),
         pipelineStarted=pipeline_started,
         transcodeStarted=transcode_started,
+        pipelineDeferred=pipeline_started and admission.priority == PRIORITY_LOW,
     )
 
 
@@ -658,6 +728,27 @@ async def delete_asset_by_id(
         except Exception as e:
             logger.warning(f"Failed to delete from GCS: {e}")
 
+    # Delete editing proxies
+    bucket = settings.asset_gcs_bucket
+    for proxy in (asset.get("proxies") or {}).values():
+        proxy_object = proxy.get("objectName")
+        if not proxy_object:
+            continue
+        try:
+            await asyncio.to_thread(delete_from_gcs, f"gs://{bucket}/{proxy_object}", settings)
+        except Exception as e:
+            logger.warning(f"Failed to delete proxy from GCS: {e}")
+
+    # Delete track blobs (word transcripts, face boxes) referenced by the pipeline
+    try:
+        state = await get_pipeline_state(user_id, project_id, asset_id, settings)
+        for step in state.get("steps", []):
+            step_metadata = step.get("metadata") or {}
+            for _, pointer_key, _ in TRACK_SOURCES.values():
+                await asyncio.to_thread(delete_track, step_metadata.get(pointer_key), settings)
+    except Exception as e:
+        logger.warning(f"Failed to delete track blobs: {e}")
+
     # Delete from Firestore (run in thread pool)
     await asyncio.to_thread(delete_asset, user_id, project_id, asset_id, settings)
 
@@ -679,6 +770,7 @@ class TranscodeRequest(BaseModel):
     audioBitrate: int | None = None
     sampleRate: int | None = None
     channels: int | None = None
+    backend: str | None = None  # "local", "cloud" or "auto" (default: routing policy decides)
     triggerPipelineAfter: bool = False
 
 
@@ -758,6 +850,201 @@ async def get_asset_frames(
     }
 
 
+@router.get("/{user_id}/{project_id}/{asset_id}/playback-url")
+async def get_asset_playback_url(
+    user_id: str,
+    project_id: str,
+    asset_id: str = ASSET_ID_PATH,
+    variant: str = "original",
+    maxHeight: int | None = None,
+):
+    """
+    Get a fresh signed playback URL.
+
+    variant=proxy returns the largest editing proxy at or below maxHeight (the
+    largest proxy if maxHeight is omitted) and falls back to the original when
+    no proxy exists yet. variant=hls reports whether an HLS ladder is available;
+    its playlists are served by the hls endpoint.
+    """
+    if variant not in ("original", "proxy", "hls"):
+        raise HTTPException(status_code=400, detail="variant must be original, proxy or hls")
+
+    settings = get_settings()
+    asset = await asyncio.to_thread(get_asset, user_id, project_id, asset_id, settings)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    if variant == "hls":
+        manifest_object_name = asset.get("hlsManifestObjectName")
+        return {
+            "url": None,
+            "variant": "hls",
+            "available": bool(manifest_object_name),
+            "playlist": manifest_object_name.rsplit("/", 1)[-1] if manifest_object_name else None,
+        }
+
+    if variant == "proxy":
+        proxies = sorted(
+            (p for p in (asset.get("proxies") or {}).values() if p.get("objectName")),
+            key=lambda p: p.get("height") or 0,
+        )
+        if proxies:
+            # Largest proxy that fits; if none fit, the smallest one
+            fits = [p for p in proxies if not maxHeight or (p.get("height") or 0) <= maxHeight]
+            best = fits[-1] if fits else proxies[0]
+            url = await asyncio.to_thread(create_signed_url, best["objectName"], None, None, settings)
+            return {"url": url, "variant": "proxy", "height": best.get("height"), "available": True}
+
+    object_name = asset.get("objectName")
+    if not object_name:
+        return {"url": None, "variant": "original", "available": False}
+
+    url = await asyncio.to_thread(create_signed_url, object_name, None, None, settings)
+    return {"url": url, "variant": "original", "height": asset.get("height"), "available": True}
+
+
+@router.get("/{user_id}/{project_id}/{asset_id}/hls/{file_name}")
+async def get_asset_hls_playlist(
+    user_id: str,
+    project_id: str,
+    asset_id: str = ASSET_ID_PATH,
+    file_name: str = Path(..., description="Playlist file name"),
+    playlistQuery: str | None = None,
+):
+    """
+    Serve an HLS playlist with signed segment URLs.
+
+    Segments stay private in GCS: every media URI in the playlist is replaced by a
+    fresh signed URL. Nested playlist URIs stay relative so they come back through
+    this endpoint; playlistQuery is appended to them so a fronting proxy can keep
+    its own query string (e.g. projectId).
+    """
+    if not file_name.endswith(".m3u8") or "/" in file_name or file_name.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid playlist name")
+
+    settings = get_settings()
+    asset = await asyncio.to_thread(get_asset, user_id, project_id, asset_id, settings)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    manifest_object_name = asset.get("hlsManifestObjectName")
+    if not manifest_object_name:
+        raise HTTPException(status_code=404, detail="HLS ladder not available")
+
+    prefix = manifest_object_name.rsplit("/", 1)[0] + "/"
+    bucket = settings.asset_gcs_bucket
+    try:
+        raw = await asyncio.to_thread(download_from_gcs, f"gs://{bucket}/{prefix}{file_name}", settings)
+    except Exception as e:
+        logger.warning(f"Failed to read HLS playlist {prefix}{file_name}: {e}")
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    suffix = f"?{playlistQuery}" if playlistQuery else ""
+
+    def _line_uri(line: str) -> str | None:
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            return stripped
+        if 'URI="' in line:
+            # EXT-X-MAP / EXT-X-MEDIA carry URIs in an attribute
+            return line.split('URI="', 1)[1].split('"', 1)[0]
+        return None
+
+    def _is_segment(uri: str) -> bool:
+        return not uri.startswith(("http://", "https://")) and not uri.endswith(".m3u8")
+
+    raw_lines = raw.decode("utf-8").splitlines()
+    segments = {uri for uri in map(_line_uri, raw_lines) if uri and _is_segment(uri)}
+
+    # One thread hop for the whole playlist instead of one per segment
+    def _sign_all() -> dict[str, str]:
+        return {uri: create_signed_url(f"{prefix}{uri}", None, None, settings) for uri in segments}
+
+    signed = await asyncio.to_thread(_sign_all)
+
+    def _resolve(uri: str) -> str:
+        if _is_segment(uri):
+            return signed[uri]
+        return f"{uri}{suffix}" if uri.endswith(".m3u8") else uri
+
+    lines = []
+    for line in raw_lines:
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            line = _resolve(stripped)
+        elif 'URI="' in line:
+            head, rest = line.split('URI="', 1)
+            uri, tail = rest.split('"', 1)
+            line = f'{head}URI="{_resolve(uri)}"{tail}'
+        lines.append(line)
+
+    return PlainTextResponse(
+        "\n".join(lines) + "\n",
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "private, max-age=300"},
+    )
+
+
+@router.get("/{user_id}/{project_id}/{asset_id}/tracks/{track}")
+async def get_asset_track(
+    user_id: str,
+    project_id: str,
+    asset_id: str = ASSET_ID_PATH,
+    track: str = Path(..., description="Track name: transcript-words or face-boxes"),
+    start: float | None = None,
+    end: float | None = None,
+):
+    """
+    Get a time slice of a large per-asset array (start <= time < end, in seconds).
+
+    transcript-words items are { start (ms), speech }; face-boxes items are
+    { faceIndex, time (s), boundingBox }. Both bounds are optional.
+    """
+    source = TRACK_SOURCES.get(track)
+    if not source:
+        raise HTTPException(status_code=404, detail=f"Unknown track: {track}")
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    settings = get_settings()
+    step_id, pointer_key, inline_key = source
+    state = await get_pipeline_state(user_id, project_id, asset_id, settings)
+    step = next((s for s in state.get("steps", []) if s.get("id") == step_id), None)
+    step_metadata = (step or {}).get("metadata") or {}
+
+    pointer = step_metadata.get(pointer_key)
+    if pointer and pointer.get("objectName"):
+        try:
+            records = await asyncio.to_thread(read_track, pointer["objectName"], settings)
+        except Exception as e:
+            logger.warning(f"Failed to read track {pointer['objectName']}: {e}")
+            raise HTTPException(status_code=404, detail="Track not found")
+    else:
+        # Inline fallback and results written before tracks moved out of Firestore
+        records = step_metadata.get(inline_key)
+        if records is None and track == TRACK_FACE_BOXES:
+            records = [
+                {"faceIndex": face.get("faceIndex"), **box}
+                for face in step_metadata.get("faces") or []
+                for box in face.get("timestampedBoxes") or []
+            ]
+        if not records:
+            if not step or step.get("status") != "succeeded":
+                raise HTTPException(status_code=404, detail="Track not available")
+            records = []
+        records = sort_track_records(records, track)
+
+    items = slice_track(records, track, start, end)
+    return {
+        "track": track,
+        "start": start,
+        "end": end,
+        "count": len(items),
+        "total": len(records),
+        "items": items,
+    }
+
+
 @router.post("/{user_id}/{project_id}/{asset_id}/transcode", response_model=TranscodeResponse)
 async def transcode_asset(
     user_id: str,
@@ -804,6 +1091,8 @@ async def transcode_asset(
         transcode_params["sampleRate"] = body.sampleRate
     if body.channels:
         transcode_params["channels"] = body.channels
+    if body.backend:
+        transcode_params["backend"] = body.backend
 
     try:
         queue = await get_task_queue()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import tempfile
@@ -11,13 +12,19 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from ...config import get_settings
-from ...storage.firestore import get_asset
+from ...storage.firestore import get_asset, list_assets
 from ...storage.gcs import download_from_gcs
 from ...pipeline.registry import get_steps, run_step, run_auto_steps
-from ...pipeline.store import get_pipeline_state, get_all_pipeline_states, update_pipeline_step
+from ...pipeline.store import (
+    get_all_pipeline_states,
+    get_pipeline_state,
+    get_step_statuses,
+    update_pipeline_step,
+)
 from ...transcription.store import find_latest_job_for_asset
 from ...pipeline.types import StoredAsset
-from ...tasks.queue import get_task_queue
+from ...tasks.admission import check_admission, check_bulk_admission
+from ...tasks.queue import PRIORITY_LOW, get_task_queue
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +67,28 @@ class RunStepRequest(BaseModel):
     params: dict[str, Any] = {}
 
 
+class BulkStepRequest(BaseModel):
+    """Request model for running a step across a project."""
+
+    stepId: str
+    assetType: str | None = None  # e.g. "video"; default: every type the step supports
+    statuses: list[str] | None = None  # only assets whose step is in one of these states
+    params: dict[str, Any] = {}
+    startAfter: str | None = None  # nextCursor of the previous response: continue after that asset
+
+
+class BulkStepResponse(BaseModel):
+    """Response model for a bulk step operation."""
+
+    taskId: str | None
+    total: int
+    # Matching assets not queued because the low-priority lane is at its limit
+    remaining: int = 0
+    # Pass as startAfter (same filters) to queue the remaining assets; None when none remain
+    nextCursor: str | None = None
+    message: str
+
+
 @router.get("/steps", response_model=list[StepDefinitionResponse])
 async def list_pipeline_steps():
     """List all available pipeline steps."""
@@ -161,6 +190,8 @@ class RunStepResponse(BaseModel):
 
     taskId: str
     message: str
+    # Queued on the low-priority lane because the pipeline queue is busy
+    deferred: bool = False
 
 
 @router.post("/{user_id}/{project_id}/{asset_id}/{step_id}", response_model=RunStepResponse)
@@ -175,7 +206,7 @@ async def run_pipeline_step(
     Queue a specific pipeline step for background processing.
 
     Returns immediately with a task ID. Poll the pipeline state endpoint
-    to check progress.
+    to check progress. Returns 429 with Retry-After when the queue is full.
     """
     settings = get_settings()
 
@@ -189,9 +220,17 @@ async def run_pipeline_step(
     if not step:
         raise HTTPException(status_code=400, detail=f"Unknown pipeline step: {step_id}")
 
+    queue = await get_task_queue()
+    admission = await check_admission(queue, settings)
+    if admission.rejected:
+        raise HTTPException(
+            status_code=429,
+            detail=admission.reason,
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+
     # Queue the step for background processing
     try:
-        queue = await get_task_queue()
         params = request.params if request else {}
         task_id = await queue.enqueue_step(
             user_id=user_id,
@@ -200,6 +239,7 @@ async def run_pipeline_step(
             asset_data=asset_data,
             step_id=step_id,
             params=params,
+            priority=admission.priority,
         )
         logger.info(f"Queued step {step_id} for asset {asset_id}, task {task_id}")
     except Exception as e:
@@ -209,6 +249,7 @@ async def run_pipeline_step(
     return RunStepResponse(
         taskId=task_id,
         message=f"Step '{step.label}' queued for processing",
+        deferred=admission.priority == PRIORITY_LOW,
     )
 
 
@@ -218,7 +259,7 @@ async def run_auto_pipeline_steps(user_id: str, project_id: str, asset_id: str):
     Queue all auto-start pipeline steps for background processing.
 
     Returns immediately with a task ID. Poll the pipeline state endpoint
-    to check progress.
+    to check progress. Returns 429 with Retry-After when the queue is full.
     """
     settings = get_settings()
 
@@ -227,15 +268,24 @@ async def run_auto_pipeline_steps(user_id: str, project_id: str, asset_id: str):
     if not asset_data:
         raise HTTPException(status_code=404, detail="Asset not found")
 
+    queue = await get_task_queue()
+    admission = await check_admission(queue, settings)
+    if admission.rejected:
+        raise HTTPException(
+            status_code=429,
+            detail=admission.reason,
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+
     # Queue the pipeline for background processing
     try:
-        queue = await get_task_queue()
         task_id = await queue.enqueue_pipeline(
             user_id=user_id,
             project_id=project_id,
             asset_id=asset_id,
             asset_data=asset_data,
             asset_path="",  # Worker will download from GCS
+            priority=admission.priority,
         )
         logger.info(f"Queued auto pipeline for asset {asset_id}, task {task_id}")
     except Exception as e:
@@ -245,4 +295,100 @@ async def run_auto_pipeline_steps(user_id: str, project_id: str, asset_id: str):
     return RunStepResponse(
         taskId=task_id,
         message="Pipeline queued for processing",
+        deferred=admission.priority == PRIORITY_LOW,
     )
+
+
+@router.post("/{user_id}/{project_id}/bulk", response_model=BulkStepResponse)
+async def run_bulk_pipeline_step(user_id: str, project_id: str, body: BulkStepRequest):
+    """
+    Queue a step for every matching asset in a project (backfills, re-runs).
+
+    Assets are filtered by type and, optionally, by the step's current status.
+    All tasks are enqueued in one Redis round trip on the low-priority lane and
+    tracked under one aggregate task id; poll GET .../bulk/{taskId} for progress.
+    Assets are taken in asset id order. Only as many tasks as fit under
+    ADMISSION_LOW_QUEUE_LIMIT are queued; the rest are reported as
+    ``remaining``, and a follow-up request with ``startAfter=nextCursor``
+    continues after the last queued asset.
+    """
+    settings = get_settings()
+
+    step = next((s for s in get_steps() if s.id == body.stepId), None)
+    if not step:
+        raise HTTPException(status_code=400, detail=f"Unknown pipeline step: {body.stepId}")
+
+    supported = {t.value for t in step.supported_types} if step.supported_types else None
+    if body.assetType and supported is not None and body.assetType not in supported:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Step '{step.label}' does not support {body.assetType} assets",
+        )
+
+    assets = await asyncio.to_thread(list_assets, user_id, project_id, settings)
+    assets = [
+        a
+        for a in assets
+        if (not body.assetType or a.get("type") == body.assetType)
+        and (supported is None or a.get("type") in supported)
+        and (not body.startAfter or a["id"] > body.startAfter)
+    ]
+    assets.sort(key=lambda a: a["id"])
+
+    if body.statuses and assets:
+        statuses = await get_step_statuses(
+            user_id, project_id, [a["id"] for a in assets], step.id, settings
+        )
+        wanted = set(body.statuses)
+        assets = [a for a in assets if statuses.get(a["id"], "idle") in wanted]
+
+    if not assets:
+        return BulkStepResponse(taskId=None, total=0, message="No matching assets")
+
+    queue = await get_task_queue()
+    admission, allowed = await check_bulk_admission(queue, len(assets), settings)
+    if admission.rejected:
+        raise HTTPException(
+            status_code=429,
+            detail=admission.reason,
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+    remaining = len(assets) - allowed
+    assets = assets[:allowed]
+
+    try:
+        task_id = await queue.enqueue_bulk_steps(
+            user_id=user_id,
+            project_id=project_id,
+            step_id=step.id,
+            assets=assets,
+            params=body.params,
+            priority=PRIORITY_LOW,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to queue bulk step: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue bulk step: {e}")
+
+    message = f"Step '{step.label}' queued for {len(assets)} assets"
+    if remaining:
+        message += (
+            f"; {remaining} more did not fit in the low-priority queue, "
+            "resubmit with startAfter=nextCursor once it drains"
+        )
+    return BulkStepResponse(
+        taskId=task_id,
+        total=len(assets),
+        remaining=remaining,
+        nextCursor=assets[-1]["id"] if remaining else None,
+        message=message,
+    )
+
+
+@router.get("/{user_id}/{project_id}/bulk/{task_id}")
+async def get_bulk_pipeline_status(user_id: str, project_id: str, task_id: str):
+    """Progress counters of a bulk operation (total, completed, failed, pending)."""
+    queue = await get_task_queue()
+    status = await queue.get_bulk_status(task_id)
+    if not status or status.get("userId") != user_id or status.get("projectId") != project_id:
+        raise HTTPException(status_code=404, detail="Bulk task not found")
+    return status
@@ -1,4 +1,4 @@
-"""CloudConvert API client for file conversion."""
+"""CloudConvert API client for file conversion, with a local HEIC/HEIF decoder."""
 
 from .client import (
     create_conversion_job,
@@ -8,6 +8,12 @@ from .client import (
     ConversionJobStatus,
     ConversionResult,
 )
+from .local import (
+    BACKEND_CLOUDCONVERT,
+    BACKEND_LOCAL,
+    LocalConversion,
+    convert_image_locally,
+)
 from .store import (
     ConversionJob,
     save_conversion_job,
@@ -23,6 +29,10 @@ __all__ = [
     "convert_file",
     "ConversionJobStatus",
     "ConversionResult",
+    "BACKEND_CLOUDCONVERT",
+    "BACKEND_LOCAL",
+    "LocalConversion",
+    "convert_image_locally",
     "ConversionJob",
     "save_conversion_job",
     "get_conversion_job",
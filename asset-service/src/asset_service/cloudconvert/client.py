@@ -17,9 +17,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
-import httpx
-
 from ..config import get_settings
+from ..http_client import request_with_retry
 
 logger = logging.getLogger(__name__)
 
@@ -128,31 +127,31 @@ async def create_conversion_job(
         },
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{api_base}/jobs",
-            headers=headers,
-            json=job_payload,
-            timeout=60.0,
-        )
-        
-        if response.status_code not in (200, 201):
-            error_detail = response.text
-            try:
-                error_json = response.json()
-                error_detail = error_json.get("message", error_detail)
-            except Exception:
-                pass
-            raise RuntimeError(f"CloudConvert API error ({response.status_code}): {error_detail}")
-        
-        data = response.json()
-        job_id = data.get("data", {}).get("id")
-        
-        if not job_id:
-            raise RuntimeError("CloudConvert did not return a job ID")
-        
-        logger.info(f"Created CloudConvert job {job_id}: {input_format} → {output_format}")
-        return job_id
+    response = await request_with_retry(
+        "POST",
+        f"{api_base}/jobs",
+        headers=headers,
+        json=job_payload,
+        timeout=60.0,
+    )
+    
+    if response.status_code not in (200, 201):
+        error_detail = response.text
+        try:
+            error_json = response.json()
+            error_detail = error_json.get("message", error_detail)
+        except Exception:
+            pass
+        raise RuntimeError(f"CloudConvert API error ({response.status_code}): {error_detail}")
+    
+    data = response.json()
+    job_id = data.get("data", {}).get("id")
+    
+    if not job_id:
+        raise RuntimeError("CloudConvert did not return a job ID")
+    
+    logger.info(f"Created CloudConvert job {job_id}: {input_format} → {output_format}")
+    return job_id
 
 
 async def get_job_status(job_id: str) -> ConversionResult:
@@ -165,55 +164,55 @@ async def get_job_status(job_id: str) -> ConversionResult:
     api_base = _get_api_base()
     headers = _get_headers()
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{api_base}/jobs/{job_id}",
-            headers=headers,
-            timeout=30.0,
-        )
-        
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to get job status: {response.text}")
-        
-        data = response.json().get("data", {})
-        status_str = data.get("status", "waiting")
-        
-        # Map CloudConvert status to our enum
-        status_map = {
-            "waiting": ConversionJobStatus.WAITING,
-            "processing": ConversionJobStatus.PROCESSING,
-            "finished": ConversionJobStatus.FINISHED,
-            "error": ConversionJobStatus.ERROR,
-        }
-        status = status_map.get(status_str, ConversionJobStatus.WAITING)
-        
-        result = ConversionResult(
-            status=status,
-            job_id=job_id,
-            metadata=data,
-        )
-        
-        # If finished, extract output URL from export task
-        if status == ConversionJobStatus.FINISHED:
-            tasks = data.get("tasks", [])
-            for task in tasks:
-                if task.get("operation") == "export/url" and task.get("status") == "finished":
-                    result_data = task.get("result", {})
-                    files = result_data.get("files", [])
-                    if files:
-                        result.output_url = files[0].get("url")
-                        result.output_filename = files[0].get("filename")
-                    break
-        
-        # If error, extract error message
-        if status == ConversionJobStatus.ERROR:
-            tasks = data.get("tasks", [])
-            for task in tasks:
-                if task.get("status") == "error":
-                    result.error = task.get("message", "Unknown conversion error")
-                    break
-        
-        return result
+    response = await request_with_retry(
+        "GET",
+        f"{api_base}/jobs/{job_id}",
+        headers=headers,
+        timeout=30.0,
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get job status: {response.text}")
+    
+    data = response.json().get("data", {})
+    status_str = data.get("status", "waiting")
+    
+    # Map CloudConvert status to our enum
+    status_map = {
+        "waiting": ConversionJobStatus.WAITING,
+        "processing": ConversionJobStatus.PROCESSING,
+        "finished": ConversionJobStatus.FINISHED,
+        "error": ConversionJobStatus.ERROR,
+    }
+    status = status_map.get(status_str, ConversionJobStatus.WAITING)
+    
+    result = ConversionResult(
+        status=status,
+        job_id=job_id,
+        metadata=data,
+    )
+    
+    # If finished, extract output URL from export task
+    if status == ConversionJobStatus.FINISHED:
+        tasks = data.get("tasks", [])
+        for task in tasks:
+            if task.get("operation") == "export/url" and task.get("status") == "finished":
+                result_data = task.get("result", {})
+                files = result_data.get("files", [])
+                if files:
+                    result.output_url = files[0].get("url")
+                    result.output_filename = files[0].get("filename")
+                break
+    
+    # If error, extract error message
+    if status == ConversionJobStatus.ERROR:
+        tasks = data.get("tasks", [])
+        for task in tasks:
+            if task.get("status") == "error":
+                result.error = task.get("message", "Unknown conversion error")
+                break
+    
+    return result
 
 
 async def wait_for_job(
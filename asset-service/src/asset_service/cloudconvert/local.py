@@ -0,0 +1,163 @@
+"""Local HEIC/HEIF decode backend.
+
+Converts HEIC/HEIF stills to PNG or WebP on the worker, skipping the
+CloudConvert round trip (signed URL upload, job, polling, download). Uses
+pillow-heif (libheif) when installed and falls back to ffmpeg; when neither
+can decode the file, the caller falls back to CloudConvert.
+
+Decoding is CPU-bound and a 12-48 MP photo takes a few hundred MB of RAM, so
+conversions across all pipeline threads share a bounded semaphore.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+
+from ..config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_CLOUDCONVERT = "cloudconvert"
+BACKEND_LOCAL = "local"
+
+_DECODER_PILLOW_HEIF = "pillow-heif"
+_DECODER_FFMPEG = "ffmpeg"
+
+_heif_opener_registered: bool | None = None
+_heif_lock = threading.Lock()
+
+_decode_slots: threading.BoundedSemaphore | None = None
+_decode_slots_lock = threading.Lock()
+
+
+@dataclass
+class LocalConversion:
+    """Result of a local conversion."""
+
+    content: bytes
+    width: int
+    height: int
+    output_format: str
+    decoder: str
+
+
+def _register_heif_opener() -> bool:
+    """Register pillow-heif with Pillow once. False if it is not installed."""
+    global _heif_opener_registered
+    with _heif_lock:
+        if _heif_opener_registered is None:
+            try:
+                from pillow_heif import register_heif_opener
+
+                register_heif_opener()
+                _heif_opener_registered = True
+            except ImportError:
+                logger.info("pillow-heif not installed; HEIC decode will use ffmpeg")
+                _heif_opener_registered = False
+        return _heif_opener_registered
+
+
+def _get_decode_slots(settings: Settings) -> threading.BoundedSemaphore:
+    global _decode_slots
+    with _decode_slots_lock:
+        if _decode_slots is None:
+            _decode_slots = threading.BoundedSemaphore(settings.effective_image_decode_concurrency)
+        return _decode_slots
+
+
+def _encode(image, output_format: str, settings: Settings) -> tuple[bytes, int, int]:
+    """
+    Encode a Pillow image as PNG or WebP without metadata (EXIF orientation applied).
+
+    Returns:
+        Tuple of (content, width, height) of the encoded image
+    """
+    from PIL import ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    buffer = io.BytesIO()
+    if output_format == "webp":
+        image.save(buffer, format="WEBP", quality=settings.image_convert_webp_quality, method=4)
+    else:
+        image.save(buffer, format="PNG", compress_level=6)
+    width, height = image.size
+    return buffer.getvalue(), width, height
+
+
+def _decode_with_pillow_heif(path: str, output_format: str, settings: Settings) -> LocalConversion:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        content, width, height = _encode(image, output_format, settings)
+    return LocalConversion(content, width, height, output_format, _DECODER_PILLOW_HEIF)
+
+
+def _decode_with_ffmpeg(path: str, output_format: str, settings: Settings) -> LocalConversion:
+    """Decode the primary image with ffmpeg (needs HEIF demuxer support, ffmpeg 7.1+)."""
+    from PIL import Image
+
+    fd, frame_path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostdin", "-y",
+                "-i", path,
+                "-frames:v", "1",
+                frame_path,
+            ],
+            check=True,
+            capture_output=True,
+            timeout=settings.image_convert_timeout_seconds,
+        )
+        with Image.open(frame_path) as image:
+            content, width, height = _encode(image, output_format, settings)
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b"").decode("utf-8", errors="replace")[-500:]
+        raise RuntimeError(f"ffmpeg could not decode image: {stderr}") from e
+    finally:
+        if os.path.exists(frame_path):
+            os.unlink(frame_path)
+    return LocalConversion(content, width, height, output_format, _DECODER_FFMPEG)
+
+
+def convert_image_locally(
+    path: str,
+    output_format: str,
+    settings: Settings | None = None,
+) -> LocalConversion:
+    """
+    Decode a HEIC/HEIF file and re-encode it as PNG or WebP (blocking; run in a thread).
+
+    Waits for a free decode slot first. Tries pillow-heif, then ffmpeg.
+
+    Raises:
+        RuntimeError: If no local decoder could convert the file
+    """
+    settings = settings or get_settings()
+    output_format = output_format.lower()
+    if output_format not in ("png", "webp"):
+        raise ValueError(f"Unsupported local output format: {output_format}")
+
+    errors: list[str] = []
+    with _get_decode_slots(settings):
+        if _register_heif_opener():
+            try:
+                return _decode_with_pillow_heif(path, output_format, settings)
+            except Exception as e:
+                errors.append(f"{_DECODER_PILLOW_HEIF}: {e}")
+        try:
+            return _decode_with_ffmpeg(path, output_format, settings)
+        except Exception as e:
+            errors.append(f"{_DECODER_FFMPEG}: {e}")
+
+    raise RuntimeError("Local image decode failed (" + "; ".join(errors) + ")")
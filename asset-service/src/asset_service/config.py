@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from functools import lru_cache
 from typing import Literal
 
@@ -31,6 +32,11 @@ class Settings(BaseSettings):
     gemini_analysis_model_ids: str | None = Field(default=None, alias="GEMINI_ANALYSIS_MODEL_IDS")
     gemini_description_model: str = Field(default="gemini-2.0-flash", alias="GEMINI_DESCRIPTION_MODEL")
     gemini_description_model_ids: str | None = Field(default=None, alias="GEMINI_DESCRIPTION_MODEL_IDS")
+    # Reuse Files API uploads per (asset, object generation, API key) until shortly before expiry
+    gemini_file_cache_enabled: bool = Field(default=True, alias="GEMINI_FILE_CACHE_ENABLED")
+    gemini_file_cache_refresh_margin_seconds: int = Field(
+        default=7200, alias="GEMINI_FILE_CACHE_REFRESH_MARGIN_SECONDS", ge=0
+    )
 
     # Speech-to-Text
     speech_project_id: str | None = Field(default=None, alias="SPEECH_PROJECT_ID")
@@ -39,6 +45,20 @@ class Settings(BaseSettings):
     speech_model: str = Field(default="chirp_3", alias="SPEECH_MODEL")
     speech_language_codes: str = Field(default="en-US", alias="SPEECH_LANGUAGE_CODES")
     speech_gcs_bucket: str | None = Field(default=None, alias="SPEECH_GCS_BUCKET")
+    # Chunked transcription: audio longer than the threshold is split at silences into
+    # ~target-length chunks that Speech-to-Text recognizes in parallel.
+    transcription_chunking_enabled: bool = Field(default=True, alias="TRANSCRIPTION_CHUNKING_ENABLED")
+    transcription_chunk_min_duration_seconds: float = Field(
+        default=600, alias="TRANSCRIPTION_CHUNK_MIN_DURATION_SECONDS"
+    )
+    transcription_chunk_target_seconds: float = Field(
+        default=300, alias="TRANSCRIPTION_CHUNK_TARGET_SECONDS", gt=30
+    )
+    transcription_chunk_max_count: int = Field(default=30, alias="TRANSCRIPTION_CHUNK_MAX_COUNT", ge=1)
+    transcription_silence_noise_db: float = Field(default=-35.0, alias="TRANSCRIPTION_SILENCE_NOISE_DB")
+    transcription_silence_min_seconds: float = Field(
+        default=0.4, alias="TRANSCRIPTION_SILENCE_MIN_SECONDS", gt=0
+    )
 
     # Transcoder API (uses same GCP service account as GOOGLE_SERVICE_ACCOUNT_KEY)
     transcoder_project_id: str | None = Field(default=None, alias="TRANSCODER_PROJECT_ID")
@@ -46,16 +66,78 @@ class Settings(BaseSettings):
     # Target height for transcoding - width auto-calculated to preserve aspect ratio
     # Common values: 720 (HD), 1080 (Full HD), 480 (SD). If None, preserves original dimensions.
     transcode_target_height: int | None = Field(default=None, alias="TRANSCODE_TARGET_HEIGHT")
+    # Transcoder job-state notifications via Pub/Sub. When both are set, workers hand running
+    # jobs off to the notification subscriber instead of polling; polling remains a slow fallback.
+    transcode_notification_topic: str | None = Field(default=None, alias="TRANSCODE_NOTIFICATION_TOPIC")
+    transcode_notification_subscription: str | None = Field(
+        default=None, alias="TRANSCODE_NOTIFICATION_SUBSCRIPTION"
+    )
+    transcode_fallback_poll_interval_seconds: int = Field(
+        default=120, alias="TRANSCODE_FALLBACK_POLL_INTERVAL_SECONDS", ge=10
+    )
+    # Local ffmpeg transcode backend for short clips (H.264/AAC MP4 only); longer or
+    # larger inputs, and other codecs/formats, go to the Cloud Transcoder API.
+    local_transcode_enabled: bool = Field(default=True, alias="LOCAL_TRANSCODE_ENABLED")
+    local_transcode_max_duration_seconds: float = Field(default=120, alias="LOCAL_TRANSCODE_MAX_DURATION_SECONDS")
+    local_transcode_max_size_mb: int = Field(default=500, alias="LOCAL_TRANSCODE_MAX_SIZE_MB")
+    local_transcode_max_height: int = Field(default=1080, alias="LOCAL_TRANSCODE_MAX_HEIGHT")
+    local_transcode_preset: str = Field(default="veryfast", alias="LOCAL_TRANSCODE_PRESET")
+    local_transcode_threads: int = Field(default=0, alias="LOCAL_TRANSCODE_THREADS", ge=0)  # 0 = all cores
+    local_transcode_timeout_seconds: int = Field(default=600, alias="LOCAL_TRANSCODE_TIMEOUT_SECONDS")
+
+    # Editing proxies (low-res MP4s for preview/scrubbing) and optional HLS ladder
+    proxy_enabled: bool = Field(default=True, alias="PROXY_ENABLED")
+    proxy_heights: str = Field(default="540,360", alias="PROXY_HEIGHTS")
+    proxy_keyframe_interval_seconds: float = Field(default=1.0, alias="PROXY_KEYFRAME_INTERVAL_SECONDS", gt=0)
+    proxy_timeout_seconds: int = Field(default=1800, alias="PROXY_TIMEOUT_SECONDS")
+    proxy_hls_enabled: bool = Field(default=False, alias="PROXY_HLS_ENABLED")
+    proxy_hls_heights: str = Field(default="360,540,720,1080", alias="PROXY_HLS_HEIGHTS")
     
     # CloudConvert API (for image/document conversion)
     cloudconvert_api_key: str | None = Field(default=None, alias="CLOUDCONVERT_API_KEY")
     cloudconvert_sandbox: bool = Field(default=False, alias="CLOUDCONVERT_SANDBOX")
+    # Local HEIC/HEIF decode (pillow-heif, then ffmpeg); CloudConvert is the fallback
+    image_convert_local_enabled: bool = Field(default=True, alias="IMAGE_CONVERT_LOCAL_ENABLED")
+    image_convert_output_format: Literal["png", "webp"] = Field(default="png", alias="IMAGE_CONVERT_OUTPUT_FORMAT")
+    image_convert_webp_quality: int = Field(default=90, alias="IMAGE_CONVERT_WEBP_QUALITY", ge=1, le=100)
+    # Concurrent local decodes across all pipeline jobs (0 = half the CPU cores)
+    image_decode_concurrency: int = Field(default=0, alias="IMAGE_DECODE_CONCURRENCY", ge=0)
+    image_convert_timeout_seconds: int = Field(default=120, alias="IMAGE_CONVERT_TIMEOUT_SECONDS")
+
+    # Outbound HTTP: one pooled client per upstream host (HTTP/2 when h2 is installed)
+    http2_enabled: bool = Field(default=True, alias="HTTP2_ENABLED")
+    http_max_connections_per_host: int = Field(default=20, alias="HTTP_MAX_CONNECTIONS_PER_HOST", ge=1)
+    http_keepalive_expiry_seconds: float = Field(default=60.0, alias="HTTP_KEEPALIVE_EXPIRY_SECONDS", ge=0)
+    http_timeout_seconds: float = Field(default=60.0, alias="HTTP_TIMEOUT_SECONDS", gt=0)
+    # Shared retry policy: attempts per request, and a process-wide budget of retries
+    # (a fraction of requests, plus a small per-second allowance)
+    http_retry_max_attempts: int = Field(default=3, alias="HTTP_RETRY_MAX_ATTEMPTS", ge=1)
+    http_retry_budget_ratio: float = Field(default=0.1, alias="HTTP_RETRY_BUDGET_RATIO", ge=0)
+    http_retry_budget_min_per_second: float = Field(default=1.0, alias="HTTP_RETRY_BUDGET_MIN_PER_SECOND", ge=0)
 
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
 
     # Worker: number of parallel pipeline jobs (default 4 for throughput)
     worker_concurrency: int = Field(default=4, alias="WORKER_CONCURRENCY", ge=1, le=32)
+    # Admission control: beyond the soft limit new pipeline work goes to a low-priority lane,
+    # beyond the hard limit (or the in-flight upload budget) requests get 429 + Retry-After
+    admission_control_enabled: bool = Field(default=True, alias="ADMISSION_CONTROL_ENABLED")
+    admission_queue_soft_limit: int = Field(default=200, alias="ADMISSION_QUEUE_SOFT_LIMIT", ge=0)
+    admission_queue_hard_limit: int = Field(default=1000, alias="ADMISSION_QUEUE_HARD_LIMIT", ge=1)
+    admission_low_queue_limit: int = Field(default=5000, alias="ADMISSION_LOW_QUEUE_LIMIT", ge=1)
+    admission_max_inflight_upload_mb: int = Field(default=1024, alias="ADMISSION_MAX_INFLIGHT_UPLOAD_MB", ge=1)
+    admission_upload_retry_after_seconds: int = Field(default=10, alias="ADMISSION_UPLOAD_RETRY_AFTER_SECONDS", ge=1)
+    # Assumed task run time until workers have reported real ones (wait estimates)
+    admission_default_task_seconds: float = Field(default=60, alias="ADMISSION_DEFAULT_TASK_SECONDS", gt=0)
+
+    # Pipeline runs are checkpointed in Redis under a lease renewed by the owning worker;
+    # runs whose lease lapses (shutdown, crash) are reclaimed and continued by any worker.
+    pipeline_run_lease_seconds: int = Field(default=30, alias="PIPELINE_RUN_LEASE_SECONDS", ge=5)
+    pipeline_run_max_step_attempts: int = Field(default=3, alias="PIPELINE_RUN_MAX_STEP_ATTEMPTS", ge=1)
+    pipeline_run_max_resumes: int = Field(default=5, alias="PIPELINE_RUN_MAX_RESUMES", ge=0)
+    # Local copies of assets kept across interruptions (default: <tmp>/asset-service-runs)
+    pipeline_run_cache_dir: str | None = Field(default=None, alias="PIPELINE_RUN_CACHE_DIR")
 
     # FastAPI
     app_host: str = Field(default="0.0.0.0", alias="APP_HOST")
@@ -64,11 +146,34 @@ class Settings(BaseSettings):
 
     # Pub/Sub for pipeline events
     pipeline_event_topic: str = Field(default="gemini-pipeline-events", alias="PIPELINE_EVENT_TOPIC")
+    # Events are batched and published without blocking; failed publishes wait in a
+    # bounded retry buffer that is flushed on shutdown
+    pipeline_event_batch_max_messages: int = Field(default=100, alias="PIPELINE_EVENT_BATCH_MAX_MESSAGES", ge=1)
+    pipeline_event_batch_max_latency_seconds: float = Field(
+        default=0.05, alias="PIPELINE_EVENT_BATCH_MAX_LATENCY_SECONDS", gt=0
+    )
+    # Asset id as ordering key (subscriptions need message ordering enabled to benefit)
+    pipeline_event_ordering_enabled: bool = Field(default=True, alias="PIPELINE_EVENT_ORDERING_ENABLED")
+    pipeline_event_retry_buffer_size: int = Field(default=1000, alias="PIPELINE_EVENT_RETRY_BUFFER_SIZE", ge=1)
 
     # HMAC authentication (shared secret with Next.js app and LangGraph server)
     # If not set, HMAC verification is disabled (dev mode)
     shared_secret: str | None = Field(default=None, alias="SHARED_SECRET")
 
+    # Shot detection: local ffmpeg scdet for short clips; longer clips get local cuts as a
+    # provisional result (status running) until the Video Intelligence result replaces them
+    shot_detection_local_enabled: bool = Field(default=True, alias="SHOT_DETECTION_LOCAL_ENABLED")
+    shot_detection_local_max_duration_seconds: float = Field(
+        default=120, alias="SHOT_DETECTION_LOCAL_MAX_DURATION_SECONDS", ge=0
+    )
+    shot_detection_provisional_max_duration_seconds: float = Field(
+        default=1800, alias="SHOT_DETECTION_PROVISIONAL_MAX_DURATION_SECONDS", ge=0
+    )
+    shot_detection_scene_threshold: float = Field(
+        default=10.0, alias="SHOT_DETECTION_SCENE_THRESHOLD", gt=0, le=100
+    )
+    shot_detection_local_timeout_seconds: int = Field(default=300, alias="SHOT_DETECTION_LOCAL_TIMEOUT_SECONDS")
+
     # Face detection: skip for clips longer than this (seconds) to avoid timeouts
     face_detection_max_duration_seconds: int = Field(default=120, alias="FACE_DETECTION_MAX_DURATION_SECONDS")
 
@@ -87,6 +192,20 @@ class Settings(BaseSettings):
     def speech_language_codes_list(self) -> list[str]:
         return [code.strip() for code in self.speech_language_codes.split(",") if code.strip()]
 
+    @property
+    def proxy_height_list(self) -> list[int]:
+        return sorted({int(h) for h in self.proxy_heights.split(",") if h.strip()}, reverse=True)
+
+    @property
+    def proxy_hls_height_list(self) -> list[int]:
+        return sorted({int(h) for h in self.proxy_hls_heights.split(",") if h.strip()})
+
+    @property
+    def effective_image_decode_concurrency(self) -> int:
+        if self.image_decode_concurrency:
+            return self.image_decode_concurrency
+        return max(1, (os.cpu_count() or 2) // 2)
+
     @property
     def effective_speech_project_id(self) -> str:
         return self.speech_project_id or self.google_project_id
@@ -99,6 +218,11 @@ class Settings(BaseSettings):
     def effective_transcoder_project_id(self) -> str:
         return self.transcoder_project_id or self.google_project_id
 
+    @property
+    def transcode_notifications_enabled(self) -> bool:
+        """Check if Transcoder Pub/Sub notifications are configured."""
+        return bool(self.transcode_notification_topic and self.transcode_notification_subscription)
+
     @staticmethod
     def _parse_model_ids(ids_env: str | None, single_fallback: str, default: str) -> list[str]:
         if ids_env and ids_env.strip():
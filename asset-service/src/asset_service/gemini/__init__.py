@@ -12,6 +12,13 @@ from .files_api import (
     list_files,
     is_gemini_file_uri,
 )
+from .file_cache import (
+    CachedGeminiFile,
+    get_cached_file,
+    save_cached_file,
+    invalidate_cached_file,
+    get_or_upload_asset_file,
+)
 
 __all__ = [
     "GeminiFile",
@@ -24,4 +31,9 @@ __all__ = [
     "delete_file",
     "list_files",
     "is_gemini_file_uri",
+    "CachedGeminiFile",
+    "get_cached_file",
+    "save_cached_file",
+    "invalidate_cached_file",
+    "get_or_upload_asset_file",
 ]
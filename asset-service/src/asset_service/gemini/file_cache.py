@@ -0,0 +1,197 @@
+"""
+Gemini Files API handle cache.
+
+Uploaded files stay usable for 48 hours, so an asset only needs to be uploaded
+once per API key for repeated analysis. Handles are stored in Firestore,
+keyed by (asset id, GCS object generation, API key fingerprint), and shared
+with the LangGraph server, which reads and writes the same documents.
+
+Files belong to the Cloud project of the API key that uploaded them. Keys don't
+expose their project, so the fingerprint of the key itself stands in for it.
+
+Collection: geminiFileCache/{assetId}_{generation}_{keyFingerprint}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from ..api_key_provider import get_current_key
+from ..config import Settings, get_settings
+from ..storage.firestore import get_firestore_client
+from ..storage.gcs import get_object_generation
+from .files_api import (
+    GeminiFile,
+    GeminiFilesApiError,
+    get_file,
+    upload_file_from_gcs,
+    wait_for_file_active,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_COLLECTION = "geminiFileCache"
+
+
+@dataclass
+class CachedGeminiFile:
+    """A cached Files API handle."""
+
+    name: str
+    uri: str
+    mime_type: str
+    expires_at: str
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CachedGeminiFile:
+        return cls(
+            name=data["fileName"],
+            uri=data["fileUri"],
+            mime_type=data.get("mimeType", ""),
+            expires_at=data.get("expiresAt", ""),
+        )
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _cache_doc_id(asset_id: str, generation: int | str, api_key: str) -> str:
+    return f"{asset_id}_{generation}_{api_key_fingerprint(api_key)}"
+
+
+def _parse_time(value: str) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def get_cached_file(
+    asset_id: str,
+    generation: int | str,
+    api_key: str,
+    settings: Settings | None = None,
+) -> CachedGeminiFile | None:
+    """Return the cached handle unless it is missing or within the refresh margin of expiry."""
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    doc = db.collection(CACHE_COLLECTION).document(_cache_doc_id(asset_id, generation, api_key)).get()
+    if not doc.exists:
+        return None
+
+    cached = CachedGeminiFile.from_dict(doc.to_dict())
+    expires_at = _parse_time(cached.expires_at)
+    margin = timedelta(seconds=settings.gemini_file_cache_refresh_margin_seconds)
+    if not expires_at or expires_at - margin <= datetime.now(timezone.utc):
+        return None
+    return cached
+
+
+def save_cached_file(
+    asset_id: str,
+    generation: int | str,
+    api_key: str,
+    file: GeminiFile,
+    settings: Settings | None = None,
+) -> None:
+    """Store a Files API handle for the asset's current object generation."""
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    expires_at = file.expiration_time or (
+        (datetime.now(timezone.utc) + timedelta(hours=48)).isoformat().replace("+00:00", "Z")
+    )
+    db.collection(CACHE_COLLECTION).document(_cache_doc_id(asset_id, generation, api_key)).set({
+        "assetId": asset_id,
+        "generation": str(generation),
+        "keyFingerprint": api_key_fingerprint(api_key),
+        "fileName": file.name,
+        "fileUri": file.uri,
+        "mimeType": file.mime_type,
+        "expiresAt": expires_at,
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "source": "asset-service",
+    })
+
+
+def invalidate_cached_file(
+    asset_id: str,
+    generation: int | str,
+    api_key: str,
+    settings: Settings | None = None,
+) -> None:
+    """Drop a cached handle (e.g. the file was deleted or is no longer accessible)."""
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    db.collection(CACHE_COLLECTION).document(_cache_doc_id(asset_id, generation, api_key)).delete()
+
+
+async def get_or_upload_asset_file(
+    asset_id: str,
+    gcs_uri: str,
+    mime_type: str,
+    display_name: str | None = None,
+    max_wait_seconds: float = 120.0,
+) -> tuple[GeminiFile, bool]:
+    """
+    Return an ACTIVE Files API handle for an asset, uploading only on a cache miss.
+
+    The handle is scoped to the current API key, so after a key rotation the
+    next call uploads (once) for the new key.
+
+    Returns:
+        Tuple of (active file, whether it came from the cache)
+    """
+    settings = get_settings()
+    # Same key the Files API calls below will use
+    api_key = get_current_key() or settings.gemini_api_key or ""
+
+    generation: int | None = None
+    if settings.gemini_file_cache_enabled and api_key:
+        try:
+            generation = await asyncio.to_thread(get_object_generation, gcs_uri, settings)
+        except Exception as e:
+            logger.warning(f"[gemini-file-cache] Could not read generation of {gcs_uri}: {e}")
+
+    if generation is not None:
+        try:
+            cached = await asyncio.to_thread(get_cached_file, asset_id, generation, api_key, settings)
+        except Exception as e:
+            logger.warning(f"[gemini-file-cache] Cache lookup failed for {asset_id}: {e}")
+            cached = None
+
+        if cached:
+            try:
+                file = await get_file(cached.name)
+                if file.state == "PROCESSING":
+                    file = await wait_for_file_active(file.name, max_wait_seconds=max_wait_seconds)
+                if file.state == "ACTIVE":
+                    logger.info(f"[gemini-file-cache] Reusing {file.name} for asset {asset_id}")
+                    return file, True
+            except GeminiFilesApiError as e:
+                logger.info(f"[gemini-file-cache] Cached {cached.name} unusable ({e}), re-uploading")
+            try:
+                await asyncio.to_thread(invalidate_cached_file, asset_id, generation, api_key, settings)
+            except Exception:
+                pass
+
+    logger.info(f"Uploading {gcs_uri} to Gemini Files API...")
+    file = await upload_file_from_gcs(gcs_uri=gcs_uri, mime_type=mime_type, display_name=display_name)
+    logger.info(f"Uploaded as {file.name}, waiting for processing...")
+    file = await wait_for_file_active(file.name, max_wait_seconds=max_wait_seconds)
+
+    if generation is not None:
+        try:
+            await asyncio.to_thread(save_cached_file, asset_id, generation, api_key, file, settings)
+        except Exception as e:
+            logger.warning(f"[gemini-file-cache] Failed to cache {file.name}: {e}")
+
+    return file, False
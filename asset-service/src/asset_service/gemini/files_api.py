@@ -13,13 +13,14 @@ from __future__ import annotations
 import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Literal
+from typing import AsyncIterator, Literal
 
 import httpx
 
 from ..api_key_provider import get_current_key
 from ..config import get_settings
-from ..storage.gcs import create_signed_url, download_from_gcs
+from ..http_client import get_http_client, get_retry_budget, request_with_retry
+from ..storage.gcs import create_signed_url
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +105,141 @@ def _get_api_key() -> str:
     return key
 
 
+# Resumable upload chunk size (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_CHUNK_ATTEMPTS = 3
+UPLOAD_TIMEOUT_SECONDS = 300.0
+
+
+async def _start_resumable_upload(
+    client: httpx.AsyncClient,
+    api_key: str,
+    num_bytes: int,
+    mime_type: str,
+    display_name: str | None,
+) -> str:
+    """Start a resumable upload session and return its upload URL."""
+    start_response = await client.post(
+        f"{BASE_URL}/upload/v1beta/files",
+        params={"key": api_key},
+        headers={
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(num_bytes),
+            "X-Goog-Upload-Header-Content-Type": mime_type,
+            "Content-Type": "application/json",
+        },
+        json={"file": {"display_name": display_name}} if display_name else {},
+        timeout=UPLOAD_TIMEOUT_SECONDS,
+    )
+
+    if start_response.status_code != 200:
+        raise GeminiFilesApiError(
+            f"Failed to start upload: {start_response.status_code}",
+            start_response.status_code,
+            start_response.text,
+        )
+
+    upload_url = start_response.headers.get("X-Goog-Upload-URL")
+    if not upload_url:
+        raise GeminiFilesApiError(
+            "No upload URL returned from Files API",
+            500,
+        )
+    return upload_url
+
+
+async def _send_chunk(
+    client: httpx.AsyncClient,
+    upload_url: str,
+    chunk: bytes,
+    offset: int,
+    finalize: bool,
+) -> httpx.Response:
+    """
+    Send one chunk of a resumable upload.
+
+    On a network error or 5xx the session is queried for the bytes it already
+    has and only the remainder of the chunk is resent.
+    """
+    command = "upload, finalize" if finalize else "upload"
+    sent_from = 0
+
+    for attempt in range(1, UPLOAD_CHUNK_ATTEMPTS + 1):
+        try:
+            response = await client.post(
+                upload_url,
+                headers={
+                    "Content-Length": str(len(chunk) - sent_from),
+                    "X-Goog-Upload-Offset": str(offset + sent_from),
+                    "X-Goog-Upload-Command": command,
+                },
+                content=chunk[sent_from:],
+                timeout=UPLOAD_TIMEOUT_SECONDS,
+            )
+            if response.status_code == 200:
+                return response
+            if response.status_code < 500:
+                raise GeminiFilesApiError(
+                    f"Failed to upload file: {response.status_code}",
+                    response.status_code,
+                    response.text,
+                )
+            error: Exception = GeminiFilesApiError(
+                f"Failed to upload file: {response.status_code}",
+                response.status_code,
+                response.text,
+            )
+        except httpx.TransportError as e:
+            error = e
+
+        if attempt == UPLOAD_CHUNK_ATTEMPTS or not get_retry_budget().try_spend():
+            raise error
+
+        logger.warning(f"[gemini-files-api] Chunk at offset {offset} failed ({error}), resuming...")
+        await asyncio.sleep(attempt)
+        query = await client.post(upload_url, headers={"X-Goog-Upload-Command": "query"})
+        received = int(query.headers.get("X-Goog-Upload-Size-Received", offset + sent_from))
+        sent_from = min(max(received - offset, 0), len(chunk))
+
+    raise GeminiFilesApiError("Upload failed", 500)
+
+
+async def _upload_stream(
+    chunks: AsyncIterator[bytes],
+    num_bytes: int,
+    mime_type: str,
+    display_name: str | None,
+) -> GeminiFile:
+    """Upload a byte stream of known length with the resumable protocol, chunk by chunk."""
+    api_key = _get_api_key()
+
+    client = get_http_client(BASE_URL)
+    upload_url = await _start_resumable_upload(
+        client, api_key, num_bytes, mime_type, display_name
+    )
+
+    offset = 0
+    buffer = bytearray()
+    async for piece in chunks:
+        buffer.extend(piece)
+        # Keep the tail for the finalize request
+        while len(buffer) >= UPLOAD_CHUNK_SIZE and offset + len(buffer) < num_bytes:
+            chunk = bytes(buffer[:UPLOAD_CHUNK_SIZE])
+            del buffer[:UPLOAD_CHUNK_SIZE]
+            await _send_chunk(client, upload_url, chunk, offset, finalize=False)
+            offset += len(chunk)
+
+    if offset + len(buffer) != num_bytes:
+        raise GeminiFilesApiError(
+            f"Source ended after {offset + len(buffer)} of {num_bytes} bytes",
+            500,
+        )
+
+    response = await _send_chunk(client, upload_url, bytes(buffer), offset, finalize=True)
+    return GeminiFile.from_dict(response.json()["file"])
+
+
 async def upload_file(
     data: bytes,
     mime_type: str,
@@ -128,58 +264,11 @@ async def upload_file(
         # Use file.uri in generateContent requests
         ```
     """
-    api_key = _get_api_key()
-    num_bytes = len(data)
-
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        # Step 1: Start resumable upload and get upload URL
-        start_response = await client.post(
-            f"{BASE_URL}/upload/v1beta/files",
-            params={"key": api_key},
-            headers={
-                "X-Goog-Upload-Protocol": "resumable",
-                "X-Goog-Upload-Command": "start",
-                "X-Goog-Upload-Header-Content-Length": str(num_bytes),
-                "X-Goog-Upload-Header-Content-Type": mime_type,
-                "Content-Type": "application/json",
-            },
-            json={"file": {"display_name": display_name}} if display_name else {},
-        )
+    async def _chunks() -> AsyncIterator[bytes]:
+        for i in range(0, len(data), UPLOAD_CHUNK_SIZE):
+            yield data[i:i + UPLOAD_CHUNK_SIZE]
 
-        if start_response.status_code != 200:
-            raise GeminiFilesApiError(
-                f"Failed to start upload: {start_response.status_code}",
-                start_response.status_code,
-                start_response.text,
-            )
-
-        upload_url = start_response.headers.get("X-Goog-Upload-URL")
-        if not upload_url:
-            raise GeminiFilesApiError(
-                "No upload URL returned from Files API",
-                500,
-            )
-
-        # Step 2: Upload the file data
-        upload_response = await client.post(
-            upload_url,
-            headers={
-                "Content-Length": str(num_bytes),
-                "X-Goog-Upload-Offset": "0",
-                "X-Goog-Upload-Command": "upload, finalize",
-            },
-            content=data,
-        )
-
-        if upload_response.status_code != 200:
-            raise GeminiFilesApiError(
-                f"Failed to upload file: {upload_response.status_code}",
-                upload_response.status_code,
-                upload_response.text,
-            )
-
-        result = upload_response.json()
-        return GeminiFile.from_dict(result["file"])
+    return await _upload_stream(_chunks(), len(data), mime_type, display_name)
 
 
 async def upload_file_from_url(
@@ -190,8 +279,9 @@ async def upload_file_from_url(
     """
     Upload a file to Gemini Files API from a URL.
 
-    This fetches the content from the URL and uploads it to the Files API.
-    Useful for uploading files from GCS signed URLs or other HTTP sources.
+    The content is streamed from the URL into a resumable upload, so only one
+    chunk is held in memory at a time. Useful for uploading files from GCS
+    signed URLs or other HTTP sources.
 
     Args:
         url: The URL to fetch the file from
@@ -211,23 +301,29 @@ async def upload_file_from_url(
         # Use file.uri in generateContent requests
         ```
     """
-    logger.info(f"[gemini-files-api] Fetching file from URL...")
+    logger.info(f"[gemini-files-api] Streaming file from URL...")
 
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        response = await client.get(url)
+    client = get_http_client(url)
+    async with client.stream("GET", url, timeout=UPLOAD_TIMEOUT_SECONDS) as response:
         if response.status_code != 200:
             raise GeminiFilesApiError(
                 f"Failed to fetch file from URL: {response.status_code} {response.reason_phrase}",
                 response.status_code,
             )
 
-        data = response.content
-        size_mb = len(data) / 1024 / 1024
+        content_length = response.headers.get("Content-Length")
+        if not content_length:
+            # No length up front: the resumable protocol needs it, so buffer
+            data = await response.aread()
+            return await upload_file(data, mime_type, display_name)
+
+        num_bytes = int(content_length)
         logger.info(
-            f"[gemini-files-api] Fetched {size_mb:.2f}MB, uploading to Files API..."
+            f"[gemini-files-api] Streaming {num_bytes / 1024 / 1024:.2f}MB to Files API..."
+        )
+        return await _upload_stream(
+            response.aiter_bytes(UPLOAD_CHUNK_SIZE), num_bytes, mime_type, display_name
         )
-
-    return await upload_file(data, mime_type, display_name)
 
 
 async def upload_file_from_gcs(
@@ -288,20 +384,21 @@ async def get_file(name: str) -> GeminiFile:
     """
     api_key = _get_api_key()
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{BASE_URL}/v1beta/{name}",
-            params={"key": api_key},
-        )
+    response = await request_with_retry(
+        "GET",
+        f"{BASE_URL}/v1beta/{name}",
+        params={"key": api_key},
+        timeout=30.0,
+    )
 
-        if response.status_code != 200:
-            raise GeminiFilesApiError(
-                f"Failed to get file: {response.status_code}",
-                response.status_code,
-                response.text,
-            )
+    if response.status_code != 200:
+        raise GeminiFilesApiError(
+            f"Failed to get file: {response.status_code}",
+            response.status_code,
+            response.text,
+        )
 
-        return GeminiFile.from_dict(response.json())
+    return GeminiFile.from_dict(response.json())
 
 
 async def wait_for_file_active(
@@ -362,18 +459,19 @@ async def delete_file(name: str) -> None:
     """
     api_key = _get_api_key()
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.delete(
-            f"{BASE_URL}/v1beta/{name}",
-            params={"key": api_key},
-        )
+    response = await request_with_retry(
+        "DELETE",
+        f"{BASE_URL}/v1beta/{name}",
+        params={"key": api_key},
+        timeout=30.0,
+    )
 
-        if response.status_code != 200:
-            raise GeminiFilesApiError(
-                f"Failed to delete file: {response.status_code}",
-                response.status_code,
-                response.text,
-            )
+    if response.status_code != 200:
+        raise GeminiFilesApiError(
+            f"Failed to delete file: {response.status_code}",
+            response.status_code,
+            response.text,
+        )
 
 
 async def list_files(
@@ -396,24 +494,25 @@ async def list_files(
     if page_token:
         params["pageToken"] = page_token
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{BASE_URL}/v1beta/files",
-            params=params,
-        )
+    response = await request_with_retry(
+        "GET",
+        f"{BASE_URL}/v1beta/files",
+        params=params,
+        timeout=30.0,
+    )
 
-        if response.status_code != 200:
-            raise GeminiFilesApiError(
-                f"Failed to list files: {response.status_code}",
-                response.status_code,
-                response.text,
-            )
+    if response.status_code != 200:
+        raise GeminiFilesApiError(
+            f"Failed to list files: {response.status_code}",
+            response.status_code,
+            response.text,
+        )
 
-        data = response.json()
-        files = [GeminiFile.from_dict(f) for f in data.get("files", [])]
-        next_token = data.get("nextPageToken")
+    data = response.json()
+    files = [GeminiFile.from_dict(f) for f in data.get("files", [])]
+    next_token = data.get("nextPageToken")
 
-        return files, next_token
+    return files, next_token
 
 
 def is_gemini_file_uri(uri: str) -> bool:
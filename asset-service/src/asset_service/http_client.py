@@ -0,0 +1,265 @@
+"""Shared outbound HTTP clients.
+
+One pooled ``httpx.AsyncClient`` per upstream host (keep-alive, at most
+HTTP_MAX_CONNECTIONS_PER_HOST connections, HTTP/2 when the ``h2`` package is
+installed) instead of a fresh client, and TLS handshake, per request.
+
+httpx clients are bound to the event loop they are used on, and pipelines run
+on their own loop in worker threads, so clients are cached per event loop: the
+API loop's clients are opened on startup and closed on shutdown, a pipeline
+thread's clients serve every step and poll of the run and are closed with its
+loop.
+
+``request_with_retry`` applies one backoff policy (full jitter, Retry-After as
+the floor) and draws every retry from a process-wide retry budget, so an
+upstream outage does not multiply outbound traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+from .config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upstream hosts whose clients are opened on app startup
+DEFAULT_HOSTS = (
+    "generativelanguage.googleapis.com",
+    "speech.googleapis.com",
+    "transcoder.googleapis.com",
+    "api.cloudconvert.com",
+)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# Retries the budget can bank for a burst
+RETRY_BUDGET_MAX_TOKENS = 20.0
+
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+_http2_available: bool | None = None
+
+_retry_budget: RetryBudget | None = None
+_retry_budget_lock = threading.Lock()
+
+
+def _http2_enabled(settings: Settings) -> bool:
+    global _http2_available
+    if not settings.http2_enabled:
+        return False
+    if _http2_available is None:
+        try:
+            import h2  # noqa: F401
+
+            _http2_available = True
+        except ImportError:
+            logger.info("h2 not installed; outbound HTTP clients use HTTP/1.1 keep-alive")
+            _http2_available = False
+    return _http2_available
+
+
+def _new_client(settings: Settings) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_enabled(settings),
+        timeout=settings.http_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+    )
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Pooled client for the host of url, bound to the running event loop."""
+    host = httpx.URL(url).host
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(host)
+        if client is None or client.is_closed:
+            client = clients[host] = _new_client(get_settings())
+    return client
+
+
+async def open_http_clients(hosts: tuple[str, ...] = DEFAULT_HOSTS) -> None:
+    """Create the clients for the usual upstream hosts on the running loop."""
+    for host in hosts:
+        get_http_client(f"https://{host}")
+    logger.info(f"Opened HTTP clients for {len(hosts)} upstream hosts")
+
+
+async def close_http_clients() -> None:
+    """Close the clients of the running event loop (shutdown, or before a pipeline loop closes)."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.pop(loop, {})
+    for host, client in clients.items():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP client for {host}: {e}")
+
+
+class RetryBudget:
+    """
+    Process-wide retry budget (token bucket).
+
+    Every request deposits ``ratio`` tokens and every retry costs one, so
+    retries stay around ``ratio`` of traffic. ``min_per_second`` tokens are
+    added over time so retries still work when traffic is low.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = RETRY_BUDGET_MAX_TOKENS):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget. False if it is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def get_retry_budget() -> RetryBudget:
+    global _retry_budget
+    with _retry_budget_lock:
+        if _retry_budget is None:
+            settings = get_settings()
+            _retry_budget = RetryBudget(
+                settings.http_retry_budget_ratio,
+                settings.http_retry_budget_min_per_second,
+            )
+        return _retry_budget
+
+
+def parse_retry_after(response: httpx.Response) -> float | None:
+    """Server-requested delay from the Retry-After header or a Google RetryInfo error detail."""
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(header)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    try:
+        details = response.json().get("error", {}).get("details", [])
+    except Exception:
+        return None
+    for detail in details:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return max(0.0, float(delay[:-1]))
+            except ValueError:
+                pass
+    return None
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: float | None = None,
+    base: float = BACKOFF_BASE_SECONDS,
+    maximum: float = BACKOFF_MAX_SECONDS,
+) -> float:
+    """Full-jitter exponential backoff; a server-provided Retry-After is the floor."""
+    delay = random.uniform(0, min(maximum, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = min(retry_after, maximum) + random.uniform(0, base)
+    return delay
+
+
+async def request_with_retry(
+    method: str,
+    url: str,
+    *,
+    idempotent: bool | None = None,
+    max_attempts: int | None = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Send a request on the shared client for url's host, retrying transient failures.
+
+    Connection failures (nothing was sent) and 429 are retried for any method;
+    5xx and other transport errors only for idempotent requests (GET, HEAD,
+    PUT, DELETE, or ``idempotent=True``). Each retry spends from the retry
+    budget; once attempts or budget run out the last response is returned
+    (or the last error raised) for the caller to handle as before.
+    """
+    settings = get_settings()
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    max_attempts = max_attempts or settings.http_retry_max_attempts
+    budget = get_retry_budget()
+    budget.record_request()
+    client = get_http_client(url)
+    # Never log the query string (API keys)
+    target = f"{httpx.URL(url).host}{httpx.URL(url).path}"
+
+    attempt = 0
+    while True:
+        attempt += 1
+        response: httpx.Response | None = None
+        retry_after: float | None = None
+        try:
+            response = await client.request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            error: Exception = e
+        except httpx.TransportError as e:
+            if not idempotent:
+                raise
+            error = e
+        else:
+            status = response.status_code
+            if status not in RETRY_STATUSES or (status != 429 and not idempotent):
+                return response
+            error = RuntimeError(f"HTTP {status}")
+            retry_after = parse_retry_after(response)
+
+        if attempt >= max_attempts or not budget.try_spend():
+            if response is not None:
+                return response
+            raise error
+
+        delay = backoff_delay(attempt - 1, retry_after)
+        logger.warning(
+            f"{method} {target} failed ({error}), retry {attempt}/{max_attempts - 1} in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
@@ -1,3 +1,3 @@
-from .ffprobe import extract_metadata, MediaMetadata
+from .ffprobe import extract_metadata, extract_metadata_from_url, extract_remote_metadata, MediaMetadata
 
-__all__ = ["extract_metadata", "MediaMetadata"]
+__all__ = ["extract_metadata", "extract_metadata_from_url", "extract_remote_metadata", "MediaMetadata"]
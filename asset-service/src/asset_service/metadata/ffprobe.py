@@ -4,13 +4,21 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import subprocess
+import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ..config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Per-read network timeout for remote probes (seconds)
+REMOTE_READ_TIMEOUT_SECONDS = 15
+
 
 @dataclass
 class MediaMetadata:
@@ -50,13 +58,98 @@ def extract_metadata(file_path: str | Path) -> MediaMetadata:
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
+    return _parse_ffprobe_output(_run_ffprobe(str(path), timeout=30))
+
+
+def extract_metadata_from_url(url: str, timeout: int = 60) -> MediaMetadata:
+    """
+    Extract metadata from a remote media file without downloading it.
+
+    ffprobe reads HTTP(S) inputs with range requests, so only the container
+    header (and, for MP4/MOV, the moov atom - seeking to the tail if needed)
+    is fetched instead of the whole file.
+
+    Args:
+        url: HTTP(S) URL of the media file (e.g. a GCS signed URL)
+        timeout: Overall ffprobe timeout in seconds
+
+    Returns:
+        MediaMetadata with extracted information
+
+    Raises:
+        RuntimeError: If ffprobe fails or times out
+    """
+    # rw_timeout is in microseconds; bound each network read so a stalled
+    # connection fails fast instead of consuming the whole timeout.
+    input_args = ["-rw_timeout", str(REMOTE_READ_TIMEOUT_SECONDS * 1_000_000)]
+    return _parse_ffprobe_output(_run_ffprobe(url, timeout=timeout, input_args=input_args))
+
+
+def extract_remote_metadata(
+    gcs_uri: str,
+    suffix: str = "",
+    settings: Settings | None = None,
+) -> MediaMetadata:
+    """
+    Extract metadata from a GCS object, range-reading it over a signed URL.
+
+    Falls back to downloading the object to a temp file (streamed to disk)
+    only when the remote probe fails, e.g. when the signed URL cannot be
+    created or the container is not seekable over HTTP.
+
+    Args:
+        gcs_uri: gs://bucket/path URI of the object
+        suffix: File suffix for the fallback temp file (helps ffprobe pick a demuxer)
+        settings: Optional settings override
+
+    Returns:
+        MediaMetadata with extracted information
+
+    Raises:
+        ValueError: If the GCS URI is invalid
+        RuntimeError: If both the remote probe and the fallback fail
+    """
+    from ..storage.gcs import create_signed_url, download_gcs_to_file
+
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    parts = gcs_uri[5:].split("/", 1)
+    if len(parts) != 2:
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    bucket_name, object_name = parts
+
+    try:
+        url = create_signed_url(object_name, bucket=bucket_name, expires_in_seconds=15 * 60, settings=settings)
+        return extract_metadata_from_url(url)
+    except Exception as e:
+        logger.warning(f"Remote probe failed for {gcs_uri}, falling back to full download: {e}")
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        temp_path = tmp.name
+    try:
+        download_gcs_to_file(gcs_uri, temp_path, settings)
+        return extract_metadata(temp_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def _run_ffprobe(
+    target: str,
+    timeout: int,
+    input_args: list[str] | None = None,
+) -> dict[str, Any]:
+    """Run ffprobe against a local path or URL and return the parsed JSON output."""
     cmd = [
         "ffprobe",
         "-v", "quiet",
         "-print_format", "json",
         "-show_format",
         "-show_streams",
-        str(path),
+        *(input_args or []),
+        target,
     ]
 
     try:
@@ -64,10 +157,10 @@ def extract_metadata(file_path: str | Path) -> MediaMetadata:
             cmd,
             capture_output=True,
             text=True,
-            timeout=30,
+            timeout=timeout,
         )
     except subprocess.TimeoutExpired:
-        raise RuntimeError(f"ffprobe timed out for {file_path}")
+        raise RuntimeError(f"ffprobe timed out after {timeout}s")
     except FileNotFoundError:
         raise RuntimeError("ffprobe not found. Please install ffmpeg.")
 
@@ -75,12 +168,10 @@ def extract_metadata(file_path: str | Path) -> MediaMetadata:
         raise RuntimeError(f"ffprobe failed: {result.stderr}")
 
     try:
-        data = json.loads(result.stdout)
+        return json.loads(result.stdout)
     except json.JSONDecodeError as e:
         raise RuntimeError(f"Failed to parse ffprobe output: {e}")
 
-    return _parse_ffprobe_output(data)
-
 
 def _parse_ffprobe_output(data: dict[str, Any]) -> MediaMetadata:
     """Parse ffprobe JSON output into MediaMetadata."""
@@ -32,6 +32,7 @@ PARALLEL_STEP_IDS = {
     "face-detection",
     "person-detection",
     "label-detection",
+    "proxy",
 }
 
 EARLY_STEP_IDS = {
@@ -215,12 +216,23 @@ async def run_auto_steps(
     asset: StoredAsset,
     asset_path: str,
     agent_metadata: dict[str, Any] | None = None,
+    on_step: Callable[[str, str], None] | None = None,
+    rerun_step_ids: set[str] | None = None,
 ) -> dict[str, Any]:
     """
     Run all auto-start steps for an asset.
 
     Pipeline order: early steps (cloud-upload, metadata), then Gemini analysis,
     then Video Intelligence steps in parallel.
+
+    Args:
+        on_step: Called with (step_id, status) when a step starts ("running")
+            and whenever a step reports a status
+        rerun_step_ids: Steps left "running" by an interrupted run; these are
+            run again instead of being skipped as in progress
+
+    When interrupted by shutdown, returns without publishing the completion
+    event so a resumed run can finish the pipeline.
     """
     from ..metadata.ffprobe import determine_asset_type
     from ..pubsub import publish_pipeline_event
@@ -242,6 +254,14 @@ async def run_auto_steps(
 
     from ..tasks.worker import is_shutting_down
 
+    def report(step_id: str, status: str) -> None:
+        if on_step is None:
+            return
+        try:
+            on_step(step_id, status)
+        except Exception as e:
+            logger.warning(f"Failed to record status of step {step_id}: {e}")
+
     early_steps = [s for s in applicable_steps if s.id in EARLY_STEP_IDS]
     # Middle steps run sequentially (like gemini-analysis)
     middle_steps = [s for s in applicable_steps if s.id not in PARALLEL_STEP_IDS and s.id not in EARLY_STEP_IDS]
@@ -260,14 +280,18 @@ async def run_auto_steps(
         # Check current status
         current_state = await get_pipeline_state(user_id, project_id, asset.id)
         current = next((s for s in current_state["steps"] if s["id"] == step.id), None)
-        if current and current.get("status") in ("succeeded", "running"):
+        if current and current.get("status") == "succeeded":
+            return None
+        if current and current.get("status") == "running" and step.id not in (rerun_step_ids or ()):
             return None
 
+        report(step.id, "running")
         try:
             # Use the (possibly refreshed) asset
             result_state = await run_step(user_id, project_id, asset, asset_path, step.id)
             step_state = next((s for s in result_state["steps"] if s["id"] == step.id), None)
             if step_state:
+                report(step.id, step_state.get("status", "unknown"))
                 return {
                     "id": step.id,
                     "label": step.label,
@@ -275,6 +299,7 @@ async def run_auto_steps(
                 }
         except Exception as e:
             logger.exception(f"Step {step.id} failed during auto-run: {e}")
+            report(step.id, "failed")
             return {
                 "id": step.id,
                 "label": step.label,
@@ -369,6 +394,7 @@ async def run_auto_steps(
 
                 if step_state:
                     new_status = step_state.get("status", "unknown")
+                    report(step_id, new_status)
 
                     # Update steps_run if status changed
                     existing = next((s for s in steps_run if s["id"] == step_id), None)
@@ -386,6 +412,7 @@ async def run_auto_steps(
 
             except Exception as e:
                 logger.exception(f"Error polling step {step_id}: {e}")
+                report(step_id, "failed")
 
     # Log if we timed out
     if elapsed_seconds >= MAX_PIPELINE_WAIT_SECONDS:
@@ -396,6 +423,10 @@ async def run_auto_steps(
                 f"waiting steps: {waiting_steps}"
             )
 
+    if is_shutting_down():
+        logger.info(f"Pipeline for asset {asset.id} interrupted; leaving completion to the resumed run")
+        return state
+
     # Calculate final counts
     succeeded_count = sum(1 for s in steps_run if s.get("status") == "succeeded")
     total_count = len(steps_run)
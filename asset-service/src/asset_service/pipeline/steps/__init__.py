@@ -11,6 +11,7 @@ from . import shot_detection
 from . import label_detection
 from . import person_detection
 from . import face_detection
+from . import proxy
 from . import transcription
 from . import gemini_analysis
 from . import description
@@ -27,6 +28,7 @@ __all__ = [
     "label_detection",
     "person_detection",
     "face_detection",
+    "proxy",
     "transcription",
     "gemini_analysis",
     "description",
@@ -3,24 +3,36 @@
 Video/audio files may use codecs that Google Speech-to-Text does not decode
 reliably (e.g. some MP4/MOV from screen recorders). Extracting to FLAC ensures
 the transcription step receives a format the API handles well.
+
+Long audio is additionally split at silences into chunks that the
+transcription step recognizes in parallel, so transcript latency scales down
+with the chunk count instead of waiting on one long recognition job.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import re
+import shutil
 import subprocess
 import tempfile
 from pathlib import Path
+from typing import Any
 
 from ...metadata.ffprobe import extract_metadata
 from ...storage.gcs import upload_to_gcs
 from ..registry import register_step
 from ..store import get_pipeline_state
 from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
-from ...config import get_settings
+from ...config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
 
 def _has_audio_stream(file_path: Path) -> bool:
     """Check if the media file has an audio stream."""
@@ -59,6 +71,147 @@ def _extract_audio_to_flac(source_path: Path, output_path: Path) -> None:
         raise RuntimeError("ffmpeg produced empty or missing FLAC file")
 
 
+def _detect_silences(flac_path: Path, noise_db: float, min_seconds: float) -> list[tuple[float, float]]:
+    """Return (start, end) silence intervals found by ffmpeg silencedetect."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostdin",
+            "-i",
+            str(flac_path),
+            "-af",
+            f"silencedetect=noise={noise_db}dB:d={min_seconds}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        timeout=300,
+    )
+    if result.returncode != 0:
+        stderr = (result.stderr or b"").decode(errors="replace")[-500:]
+        raise RuntimeError(f"ffmpeg silencedetect failed: {stderr}")
+
+    silences: list[tuple[float, float]] = []
+    start: float | None = None
+    for line in (result.stderr or b"").decode(errors="replace").splitlines():
+        if (match := _SILENCE_START_RE.search(line)):
+            start = max(0.0, float(match.group(1)))
+        elif (match := _SILENCE_END_RE.search(line)) and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def _choose_cut_points(
+    duration: float,
+    silences: list[tuple[float, float]],
+    target_seconds: float,
+    max_chunks: int,
+) -> list[float]:
+    """
+    Pick chunk boundaries near multiples of the target length.
+
+    Each boundary snaps to the middle of the closest silence within half a
+    chunk of its ideal position, so words are not cut in half; without a
+    nearby silence the ideal position is used as a hard cut.
+    """
+    count = min(max_chunks, math.ceil(duration / target_seconds))
+    if count < 2:
+        return []
+    chunk_len = duration / count
+    midpoints = [(start + end) / 2 for start, end in silences]
+
+    cuts: list[float] = []
+    previous = 0.0
+    for k in range(1, count):
+        ideal = k * chunk_len
+        candidates = [
+            m for m in midpoints
+            if abs(m - ideal) <= chunk_len / 2 and m - previous >= chunk_len / 4
+        ]
+        cut = min(candidates, key=lambda m: (abs(m - ideal), m)) if candidates else ideal
+        if duration - cut < chunk_len / 4:
+            break
+        cuts.append(round(cut, 3))
+        previous = cut
+    return cuts
+
+
+def _split_flac(flac_path: Path, cuts: list[float], output_dir: Path) -> list[Path]:
+    """Split a FLAC file at the given times (sample-accurate re-encode per chunk)."""
+    bounds = [0.0, *cuts, None]
+    chunk_paths: list[Path] = []
+    for index in range(len(bounds) - 1):
+        start, end = bounds[index], bounds[index + 1]
+        chunk_path = output_dir / f"chunk_{index:03d}.flac"
+        cmd = ["ffmpeg", "-y", "-nostdin", "-i", str(flac_path), "-ss", str(start)]
+        if end is not None:
+            cmd += ["-to", str(end)]
+        cmd += ["-acodec", "flac", "-ac", "1", "-ar", "16000", str(chunk_path)]
+        result = subprocess.run(cmd, capture_output=True, timeout=300)
+        if result.returncode != 0 or not chunk_path.is_file():
+            stderr = (result.stderr or b"").decode(errors="replace")[-500:]
+            raise RuntimeError(f"ffmpeg failed to split chunk {index}: {stderr}")
+        chunk_paths.append(chunk_path)
+    return chunk_paths
+
+
+async def _chunk_and_upload(
+    asset_id: str,
+    flac_path: Path,
+    duration: float,
+    settings: Settings,
+) -> list[dict[str, Any]]:
+    """Split long audio at silences and upload the chunks. Returns [] when not chunked."""
+    silences = await asyncio.to_thread(
+        _detect_silences,
+        flac_path,
+        settings.transcription_silence_noise_db,
+        settings.transcription_silence_min_seconds,
+    )
+    cuts = _choose_cut_points(
+        duration,
+        silences,
+        settings.transcription_chunk_target_seconds,
+        settings.transcription_chunk_max_count,
+    )
+    if not cuts:
+        return []
+
+    output_dir = Path(tempfile.mkdtemp(prefix="transcription_chunks_"))
+    try:
+        chunk_paths = await asyncio.to_thread(_split_flac, flac_path, cuts, output_dir)
+
+        def _upload(index: int, chunk_path: Path) -> dict[str, Any]:
+            with open(chunk_path, "rb") as f:
+                return upload_to_gcs(
+                    data=f.read(),
+                    destination=f"assets/{asset_id}/transcription_chunks/{chunk_path.name}",
+                    mime_type="audio/flac",
+                    settings=settings,
+                )
+
+        uploads = await asyncio.gather(
+            *(asyncio.to_thread(_upload, i, p) for i, p in enumerate(chunk_paths))
+        )
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    starts = [0.0, *cuts]
+    ends = [*cuts, duration]
+    return [
+        {
+            "index": i,
+            "gcsUri": upload["gcs_uri"],
+            "offsetMs": int(round(starts[i] * 1000)),
+            "durationMs": int(round((ends[i] - starts[i]) * 1000)),
+        }
+        for i, upload in enumerate(uploads)
+    ]
+
+
 @register_step(
     id="audio-extract",
     label="Extract audio for transcription",
@@ -111,6 +264,18 @@ async def audio_extract_step(context: PipelineContext) -> PipelineResult:
                 settings=settings,
             )
         gcs_uri = result["gcs_uri"]
+
+        chunks: list[dict[str, Any]] = []
+        duration = None
+        if settings.transcription_chunking_enabled:
+            try:
+                duration = extract_metadata(flac_path).duration
+                if duration and duration > settings.transcription_chunk_min_duration_seconds:
+                    chunks = await _chunk_and_upload(context.asset.id, flac_path, duration, settings)
+            except Exception as e:
+                # The whole-file FLAC is still usable; transcription just won't be parallel
+                logger.warning(f"Audio chunking failed for {context.asset.id}, using single file: {e}")
+                chunks = []
     finally:
         if flac_path and flac_path.exists():
             try:
@@ -119,12 +284,15 @@ async def audio_extract_step(context: PipelineContext) -> PipelineResult:
                 pass
 
     logger.info(f"Uploaded audio for transcription to {gcs_uri} for asset {context.asset.id}")
+    metadata: dict[str, Any] = {
+        "audioForTranscriptionGcsUri": gcs_uri,
+        "bucket": result["bucket"],
+        "objectName": result["object_name"],
+    }
+    if duration:
+        metadata["durationSeconds"] = duration
+    if chunks:
+        logger.info(f"Split audio for {context.asset.id} into {len(chunks)} chunks for transcription")
+        metadata["chunks"] = chunks
 
-    return PipelineResult(
-        status=StepStatus.SUCCEEDED,
-        metadata={
-            "audioForTranscriptionGcsUri": gcs_uri,
-            "bucket": result["bucket"],
-            "objectName": result["object_name"],
-        },
-    )
+    return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
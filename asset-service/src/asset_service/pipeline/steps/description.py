@@ -5,8 +5,6 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import httpx
-
 from ..registry import register_step
 from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
 from ..store import get_pipeline_state, update_pipeline_step
@@ -18,6 +16,7 @@ from ...api_key_provider import (
     rotate_next_key,
 )
 from ...config import get_settings
+from ...http_client import get_http_client
 from ...storage.firestore import update_asset
 
 logger = logging.getLogger(__name__)
@@ -51,17 +50,19 @@ async def _generate_description(analysis: str, api_key: str, model_id: str) -> s
 
     url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            url,
-            json=request_body,
-            headers={"Content-Type": "application/json"},
-        )
+    client = get_http_client(url)
+    # No transport-level retries: 429s rotate the API key in the caller
+    response = await client.post(
+        url,
+        json=request_body,
+        headers={"Content-Type": "application/json"},
+        timeout=30.0,
+    )
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Gemini API error: {response.status_code}")
+    if response.status_code != 200:
+        raise RuntimeError(f"Gemini API error: {response.status_code}")
 
-        payload = response.json()
+    payload = response.json()
 
     # Extract description text
     candidates = payload.get("candidates", [])
@@ -13,6 +13,7 @@ from ..registry import register_step
 from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
 from ..store import get_pipeline_state
 from ...config import get_settings
+from ...storage.tracks import TRACK_FACE_BOXES, delete_track, track_object_name, write_track
 
 logger = logging.getLogger(__name__)
 
@@ -57,8 +58,8 @@ def _parse_bounding_box(box) -> dict[str, float]:
     }
 
 
-def _summarize_face_annotation(annotation, index: int) -> dict[str, Any]:
-    """Summarize a face detection annotation."""
+def _summarize_face_annotation(annotation, index: int) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Summarize a face detection annotation. Returns (summary, timestamped boxes)."""
     tracks = list(annotation.tracks or [])
 
     # Get attributes from first track's first timestamped object
@@ -81,6 +82,7 @@ def _summarize_face_annotation(annotation, index: int) -> dict[str, Any]:
             if box:
                 time_offset = getattr(obj, "time_offset", None)
                 all_timestamped_boxes.append({
+                    "faceIndex": index,
                     "time": _time_offset_to_seconds(time_offset),
                     "boundingBox": _parse_bounding_box(box),
                 })
@@ -98,17 +100,18 @@ def _summarize_face_annotation(annotation, index: int) -> dict[str, Any]:
     # Get first appearance
     first_box = all_timestamped_boxes[0] if all_timestamped_boxes else None
 
-    return {
+    summary = {
         "faceIndex": index,
         "trackCount": len(tracks),
         "attributes": attributes,
         "segments": segments,
-        "timestampedBoxes": all_timestamped_boxes,
+        "boxCount": len(all_timestamped_boxes),
         "firstAppearance": {
             "time": first_box["time"],
             "boundingBox": first_box["boundingBox"],
         } if first_box else None,
     }
+    return summary, all_timestamped_boxes
 
 
 @register_step(
@@ -179,19 +182,32 @@ async def face_detection_step(context: PipelineContext) -> PipelineResult:
 
     # Parse results
     faces = []
+    boxes: list[dict[str, Any]] = []
     if result.annotation_results:
         annotations = result.annotation_results[0]
         face_annotations = annotations.face_detection_annotations or []
-        faces = [
-            _summarize_face_annotation(ann, i)
-            for i, ann in enumerate(face_annotations)
-        ]
-
-    return PipelineResult(
-        status=StepStatus.SUCCEEDED,
-        metadata={
-            "faceCount": len(faces),
-            "faces": faces,
-            "gcsUri": gcs_uri,
-        },
-    )
+        for i, ann in enumerate(face_annotations):
+            summary, face_boxes = _summarize_face_annotation(ann, i)
+            faces.append(summary)
+            boxes.extend(face_boxes)
+
+    # Per-frame boxes go to a track blob; the step keeps per-face summaries
+    metadata: dict[str, Any] = {
+        "faceCount": len(faces),
+        "faces": faces,
+        "gcsUri": gcs_uri,
+    }
+    try:
+        metadata["boxesTrack"] = await asyncio.to_thread(
+            write_track,
+            boxes,
+            track_object_name(context.user_id, context.project_id, context.asset.id, TRACK_FACE_BOXES),
+            TRACK_FACE_BOXES,
+            settings,
+        )
+        await asyncio.to_thread(delete_track, (context.step_state.metadata or {}).get("boxesTrack"), settings)
+    except Exception as e:
+        logger.warning(f"Failed to write face box track for {context.asset.id}, storing inline: {e}")
+        metadata["boxes"] = boxes
+
+    return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import mimetypes
 from typing import Any
@@ -20,15 +21,22 @@ from ...api_key_provider import (
     rotate_next_key,
 )
 from ...config import get_settings
+from ...http_client import backoff_delay, get_http_client, get_retry_budget, parse_retry_after
 from ...gemini import (
-    upload_file_from_gcs,
-    wait_for_file_active,
+    GeminiFile,
     delete_file,
-    GeminiFilesApiError,
+    get_or_upload_asset_file,
 )
+from ...gemini.file_cache import api_key_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Backoff between generate attempts (seconds); Retry-After from the API wins when present
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+# Retries of the same key/model on transient 5xx/network errors
+MAX_TRANSIENT_RETRIES = 2
+
 
 # Common media MIME types that Gemini supports
 SUPPORTED_MIME_TYPES = {
@@ -260,97 +268,130 @@ Be thorough and specific. This analysis will be used for asset management.""",
     )
 
 
-async def _call_gemini_api(
-    gcs_uri: str,
+class GeminiGenerateError(RuntimeError):
+    """generateContent returned a non-200 response."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None, details: str | None = None):
+        super().__init__(f"Gemini API error: {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.details = details
+
+
+async def _generate_analysis(
+    gemini_file: GeminiFile,
     mime_type: str,
     prompt: str,
     api_key: str,
-    asset_name: str,
-    model_id: str = "gemini-3-pro-preview",
+    model_id: str,
 ) -> dict[str, Any]:
-    """
-    Call Gemini API with the asset for analysis.
-
-    This uploads the file to the Gemini Files API first, waits for processing,
-    then uses the file URI in the generateContent request.
-    """
-    gemini_file = None
+    """Generate phase: run generateContent against an already ACTIVE file."""
+    parts = [
+        {
+            "fileData": {
+                "fileUri": gemini_file.uri,
+                "mimeType": mime_type,
+            },
+        },
+        {"text": prompt},
+    ]
+
+    request_body = {
+        "contents": [{"role": "user", "parts": parts}],
+        "generationConfig": {
+            "temperature": 0.2,  # Lower temperature for factual analysis
+            "maxOutputTokens": 8192,
+        },
+    }
 
-    try:
-        # Step 1: Upload file to Gemini Files API
-        logger.info(f"Uploading {gcs_uri} to Gemini Files API...")
-        gemini_file = await upload_file_from_gcs(
-            gcs_uri=gcs_uri,
-            mime_type=mime_type,
-            display_name=asset_name,
-        )
-        logger.info(f"Uploaded as {gemini_file.name}, waiting for processing...")
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}"
+
+    client = get_http_client(url)
+    # Retries (key rotation, model fallback, backoff) are handled by the caller,
+    # transient ones drawing from the shared retry budget
+    get_retry_budget().record_request()
+    response = await client.post(
+        url,
+        json=request_body,
+        headers={"Content-Type": "application/json"},
+        timeout=300.0,
+    )
 
-        # Step 2: Wait for file to be ready
-        gemini_file = await wait_for_file_active(
-            gemini_file.name,
-            max_wait_seconds=120.0,
-        )
-        logger.info(f"File {gemini_file.name} is ready, calling generateContent...")
-
-        # Step 3: Build request with Gemini Files API URI
-        parts = [
-            {
-                "fileData": {
-                    "fileUri": gemini_file.uri,
-                    "mimeType": mime_type,
-                },
-            },
-            {"text": prompt},
-        ]
-
-        request_body = {
-            "contents": [{"role": "user", "parts": parts}],
-            "generationConfig": {
-                "temperature": 0.2,  # Lower temperature for factual analysis
-                "maxOutputTokens": 8192,
-            },
-        }
+    if response.status_code != 200:
+        error_text = response.text
+        logger.error(f"Gemini API error: {response.status_code} - {error_text}")
+        raise GeminiGenerateError(response.status_code, parse_retry_after(response), error_text)
 
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:generateContent?key={api_key}"
+    payload = response.json()
 
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                url,
-                json=request_body,
-                headers={"Content-Type": "application/json"},
-            )
+    # Extract analysis text
+    candidates = payload.get("candidates", [])
+    analysis_text = "\n\n".join(
+        part.get("text", "")
+        for candidate in candidates
+        for part in candidate.get("content", {}).get("parts", [])
+        if part.get("text")
+    )
 
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"Gemini API error: {response.status_code} - {error_text}")
-                raise RuntimeError(f"Gemini API error: {response.status_code}")
+    usage = payload.get("usageMetadata", {})
 
-            payload = response.json()
+    return {
+        "analysis": analysis_text,
+        "promptTokens": usage.get("promptTokenCount"),
+        "completionTokens": usage.get("candidatesTokenCount"),
+        "totalTokens": usage.get("totalTokenCount"),
+        "geminiFileUri": gemini_file.uri,
+    }
 
-        # Extract analysis text
-        candidates = payload.get("candidates", [])
-        analysis_text = "\n\n".join(
-            part.get("text", "")
-            for candidate in candidates
-            for part in candidate.get("content", {}).get("parts", [])
-            if part.get("text")
-        )
 
-        usage = payload.get("usageMetadata", {})
+class _AnalysisFiles:
+    """
+    Upload phase: Files API handles for one step run.
 
-        return {
-            "analysis": analysis_text,
-            "promptTokens": usage.get("promptTokenCount"),
-            "completionTokens": usage.get("candidatesTokenCount"),
-            "totalTokens": usage.get("totalTokenCount"),
-            "geminiFileUri": gemini_file.uri,
-        }
+    The asset is uploaded (or taken from the file cache) once and the handle is
+    reused for every model/key attempt. Files belong to the project of the key
+    that uploaded them, so a rotated key from another project gets its own
+    handle, at most once per key. Uploads made here are deleted when the step
+    ends unless the file cache keeps them for reuse.
+    """
 
-    finally:
-        # Clean up: delete the temporary file from Gemini Files API
-        # (files auto-expire after 48h, but good practice to clean up)
-        if gemini_file:
+    def __init__(self, asset_id: str, gcs_uri: str, mime_type: str, display_name: str) -> None:
+        self._asset_id = asset_id
+        self._gcs_uri = gcs_uri
+        self._mime_type = mime_type
+        self._display_name = display_name
+        self._by_key: dict[str, GeminiFile] = {}
+        self._uploaded: list[GeminiFile] = []
+        self.current: GeminiFile | None = None
+
+    def handle_for(self, api_key: str) -> GeminiFile | None:
+        return self._by_key.get(api_key_fingerprint(api_key))
+
+    def share(self, api_key: str, gemini_file: GeminiFile) -> None:
+        """Record that api_key can read gemini_file (keys of the same project)."""
+        self._by_key.setdefault(api_key_fingerprint(api_key), gemini_file)
+
+    async def acquire(self, api_key: str) -> GeminiFile:
+        """Get (or upload) the handle for this key and make it current."""
+        fingerprint = api_key_fingerprint(api_key)
+        if fingerprint not in self._by_key:
+            gemini_file, from_cache = await get_or_upload_asset_file(
+                asset_id=self._asset_id,
+                gcs_uri=self._gcs_uri,
+                mime_type=self._mime_type,
+                display_name=self._display_name,
+            )
+            self._by_key[fingerprint] = gemini_file
+            if not from_cache:
+                self._uploaded.append(gemini_file)
+        self.current = self._by_key[fingerprint]
+        return self.current
+
+    async def cleanup(self) -> None:
+        """Delete this run's uploads when they aren't cached for reuse."""
+        if get_settings().gemini_file_cache_enabled:
+            return
+        for gemini_file in self._uploaded:
             try:
                 await delete_file(gemini_file.name)
                 logger.info(f"Cleaned up temporary file {gemini_file.name}")
@@ -358,6 +399,41 @@ async def _call_gemini_api(
                 logger.warning(f"Failed to clean up file {gemini_file.name}: {e}")
 
 
+async def _generate_with_files(
+    files: _AnalysisFiles,
+    mime_type: str,
+    prompt: str,
+    api_key: str,
+    model_id: str,
+) -> dict[str, Any]:
+    """
+    Generate with the handle of api_key.
+
+    A key without a handle first tries the latest one (readable when both keys
+    belong to the same project) and uploads once for itself if it is not.
+    """
+    gemini_file = files.handle_for(api_key)
+    if gemini_file is None and files.current is not None:
+        try:
+            result = await _generate_analysis(files.current, mime_type, prompt, api_key, model_id)
+        except GeminiGenerateError as e:
+            if e.status_code not in (403, 404):
+                raise
+            logger.info("Gemini file not readable with the rotated API key, uploading for this key")
+        else:
+            files.share(api_key, files.current)
+            return result
+    if gemini_file is None:
+        gemini_file = await files.acquire(api_key)
+    return await _generate_analysis(gemini_file, mime_type, prompt, api_key, model_id)
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, GeminiGenerateError):
+        return exc.status_code in (500, 502, 503, 504)
+    return isinstance(exc, httpx.TransportError)
+
+
 @register_step(
     id="gemini-analysis",
     label="Gemini AI Analysis",
@@ -394,49 +470,20 @@ async def gemini_analysis_step(context: PipelineContext) -> PipelineResult:
     # Build analysis prompt
     prompt = _build_analysis_prompt(category, context.asset.name)
 
-    # Call Gemini API with key rotation on 429 and model priority list
     logger.info(f"Starting Gemini analysis for asset {context.asset.id} ({category}, mime: {resolved_mime_type})")
-    n_keys = max(1, keys_count())
-    analysis_model_ids = settings.analysis_model_ids
-    last_exc: Exception | None = None
-    result = None
-    for model_idx, model_id in enumerate(analysis_model_ids):
-        if model_idx > 0:
-            logger.info("Gemini analysis trying model %s (fallback %d)", model_id, model_idx + 1)
-        for _ in range(n_keys):
-            api_key = get_current_key()
-            if not api_key:
-                return PipelineResult(
-                    status=StepStatus.FAILED,
-                    error="GEMINI_API_KEY / GEMINI_API_KEYS is not configured",
-                )
-            try:
-                result = await _call_gemini_api(
-                    gcs_uri=gcs_uri,
-                    mime_type=resolved_mime_type,
-                    prompt=prompt,
-                    api_key=api_key,
-                    asset_name=context.asset.name,
-                    model_id=model_id,
-                )
-                break
-            except Exception as e:
-                last_exc = e
-                if is_quota_exhausted(e) and keys_count() > 1:
-                    logger.warning("Gemini analysis 429, rotating to next API key: %s", e)
-                    rotate_next_key()
-                    continue
-                raise
-        else:
-            continue
-        break
-    else:
-        reset_key_index_to_zero()
-        if last_exc:
-            raise last_exc
+    files = _AnalysisFiles(context.asset.id, gcs_uri, resolved_mime_type, context.asset.name)
+    try:
+        # Upload phase: once, before any generate attempt
+        await files.acquire(get_current_key() or "")
+        # Generate phase: key rotation on 429 and model priority list, all on the same file
+        result = await _generate_with_fallback(files, resolved_mime_type, prompt, settings)
+    finally:
+        await files.cleanup()
+
+    if result is None:
         return PipelineResult(status=StepStatus.FAILED, error="Gemini analysis failed")
 
-    if not result or not result.get("analysis"):
+    if not result.get("analysis"):
         return PipelineResult(
             status=StepStatus.FAILED,
             error="No analysis generated by Gemini",
@@ -459,3 +506,70 @@ async def gemini_analysis_step(context: PipelineContext) -> PipelineResult:
             "gcsUri": gcs_uri,
         },
     )
+
+
+async def _generate_with_fallback(
+    files: _AnalysisFiles,
+    mime_type: str,
+    prompt: str,
+    settings,
+) -> dict[str, Any] | None:
+    """
+    Try each analysis model in priority order, rotating API keys on 429.
+
+    Rotating to an untried key happens immediately; retrying a key (transient
+    5xx) or moving to the next model after every key hit its quota waits with
+    jittered backoff, honoring the server's Retry-After.
+    """
+    n_keys = max(1, keys_count())
+    last_exc: Exception | None = None
+    attempt = 0
+
+    for model_idx, model_id in enumerate(settings.analysis_model_ids):
+        if model_idx > 0:
+            logger.info("Gemini analysis trying model %s (fallback %d)", model_id, model_idx + 1)
+
+        keys_tried = 0
+        transient_retries = 0
+        while keys_tried < n_keys:
+            api_key = get_current_key()
+            if not api_key:
+                raise RuntimeError("GEMINI_API_KEY / GEMINI_API_KEYS is not configured")
+            try:
+                return await _generate_with_files(files, mime_type, prompt, api_key, model_id)
+            except Exception as e:
+                last_exc = e
+                retry_after = getattr(e, "retry_after", None)
+
+                if is_quota_exhausted(e):
+                    keys_tried += 1
+                    if keys_tried < n_keys:
+                        logger.warning("Gemini analysis 429, rotating to next API key: %s", e)
+                        rotate_next_key()
+                        continue
+                elif (
+                    _is_transient(e)
+                    and transient_retries < MAX_TRANSIENT_RETRIES
+                    and get_retry_budget().try_spend()
+                ):
+                    transient_retries += 1
+                else:
+                    raise
+
+                delay = backoff_delay(attempt, retry_after, BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS)
+                attempt += 1
+                logger.warning(
+                    "Gemini analysis %s on %s, backing off %.1fs",
+                    getattr(e, "status_code", type(e).__name__),
+                    model_id,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                if is_quota_exhausted(e):
+                    # Every key is exhausted for this model; next model
+                    break
+
+    reset_key_index_to_zero()
+    if last_exc:
+        raise last_exc
+    return None
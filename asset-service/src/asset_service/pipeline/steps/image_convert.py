@@ -1,6 +1,7 @@
-"""Image conversion pipeline step using CloudConvert API.
+"""Image conversion pipeline step.
 
-Converts unsupported image formats (HEIC, HEIF) to PNG for broader compatibility.
+Converts unsupported image formats (HEIC, HEIF) to PNG (or WebP) for broader
+compatibility. Decodes locally when possible and falls back to the CloudConvert API.
 """
 
 from __future__ import annotations
@@ -12,13 +13,14 @@ import uuid
 from datetime import datetime
 from typing import Any
 
-import httpx
-
 from ..registry import register_step
 from ..store import update_pipeline_step
 from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
 from ...cloudconvert import (
+    BACKEND_CLOUDCONVERT,
+    BACKEND_LOCAL,
     convert_file,
+    convert_image_locally,
     ConversionJob,
     ConversionJobStatus,
     save_conversion_job,
@@ -26,6 +28,7 @@ from ...cloudconvert import (
     update_conversion_job,
 )
 from ...config import get_settings
+from ...http_client import request_with_retry
 from ...metadata.ffprobe import extract_metadata
 from ...storage.gcs import create_signed_url, upload_to_gcs, download_from_gcs
 from ...storage.firestore import update_asset
@@ -67,6 +70,10 @@ def _needs_conversion(mime_type: str | None, filename: str | None) -> tuple[str,
     return None
 
 
+def _mime_type_for(output_format: str) -> str:
+    return "image/jpeg" if output_format.lower() in ("jpg", "jpeg") else f"image/{output_format.lower()}"
+
+
 def _output_filename(original_name: str, output_format: str) -> str:
     """Generate output filename with new extension."""
     base = os.path.splitext(original_name or "image")[0]
@@ -87,14 +94,30 @@ async def _download_and_upload_to_gcs(
     Returns:
         Tuple of (gcs_uri, object_name, signed_url)
     """
-    settings = get_settings()
-    
     # Download the converted file
-    async with httpx.AsyncClient() as client:
-        response = await client.get(download_url, timeout=120.0)
-        response.raise_for_status()
-        content = response.content
-    
+    response = await request_with_retry("GET", download_url, timeout=120.0)
+    response.raise_for_status()
+    content = response.content
+
+    return await _upload_converted_to_gcs(content, user_id, project_id, asset_id, filename, mime_type)
+
+
+async def _upload_converted_to_gcs(
+    content: bytes,
+    user_id: str,
+    project_id: str,
+    asset_id: str,
+    filename: str,
+    mime_type: str,
+) -> tuple[str, str, str]:
+    """
+    Upload a converted file to GCS.
+
+    Returns:
+        Tuple of (gcs_uri, object_name, signed_url)
+    """
+    settings = get_settings()
+
     # Upload to GCS
     object_name = f"{user_id}/{project_id}/converted/{asset_id}/{filename}"
     gcs_uri = f"gs://{settings.asset_gcs_bucket}/{object_name}"
@@ -156,34 +179,7 @@ async def _reextract_and_save_metadata(
             if extracted.size is not None:
                 metadata_updates["fileSize"] = extracted.size
             
-            if metadata_updates:
-                # Update asset document
-                await asyncio.to_thread(
-                    update_asset, user_id, project_id, asset_id, metadata_updates, settings
-                )
-                logger.info(
-                    f"[image-convert] Updated asset {asset_id} with re-extracted metadata: "
-                    f"width={metadata_updates.get('width')}, height={metadata_updates.get('height')}"
-                )
-                
-                # Also update the metadata pipeline step
-                await update_pipeline_step(
-                    user_id,
-                    project_id,
-                    asset_id,
-                    "metadata",
-                    {
-                        "id": "metadata",
-                        "label": "Extract metadata",
-                        "status": "succeeded",
-                        "metadata": {
-                            **metadata_updates,
-                            "reextractedAfterConversion": True,
-                        },
-                        "updatedAt": datetime.utcnow().isoformat() + "Z",
-                    },
-                )
-            
+            await _save_converted_metadata(user_id, project_id, asset_id, metadata_updates)
             return metadata_updates
             
         finally:
@@ -196,32 +192,61 @@ async def _reextract_and_save_metadata(
         return None
 
 
+async def _save_converted_metadata(
+    user_id: str,
+    project_id: str,
+    asset_id: str,
+    metadata_updates: dict[str, Any],
+) -> None:
+    """Write converted-file dimensions/size to the asset and the metadata pipeline step."""
+    if not metadata_updates:
+        return
+    settings = get_settings()
+
+    # Update asset document
+    await asyncio.to_thread(
+        update_asset, user_id, project_id, asset_id, metadata_updates, settings
+    )
+    logger.info(
+        f"[image-convert] Updated asset {asset_id} with converted metadata: "
+        f"width={metadata_updates.get('width')}, height={metadata_updates.get('height')}"
+    )
+
+    # Also update the metadata pipeline step
+    await update_pipeline_step(
+        user_id,
+        project_id,
+        asset_id,
+        "metadata",
+        {
+            "id": "metadata",
+            "label": "Extract metadata",
+            "status": "succeeded",
+            "metadata": {
+                **metadata_updates,
+                "reextractedAfterConversion": True,
+            },
+            "updatedAt": datetime.utcnow().isoformat() + "Z",
+        },
+    )
+
+
 async def _update_asset_with_converted_file(
     user_id: str,
     project_id: str,
     asset_id: str,
     original_gcs_uri: str,
     original_object_name: str,
-    _original_signed_url: str | None,  # Unused - do not store, expires
     original_mime_type: str,
     converted_gcs_uri: str,
     converted_object_name: str,
-    _converted_signed_url: str,  # Unused - do not store, expires
     converted_filename: str,
     output_format: str,
 ) -> None:
     """Update asset document to point to converted file, backing up original."""
     settings = get_settings()
     
-    # Determine new mime type
-    mime_map = {
-        "png": "image/png",
-        "jpg": "image/jpeg",
-        "jpeg": "image/jpeg",
-        "webp": "image/webp",
-        "gif": "image/gif",
-    }
-    new_mime_type = mime_map.get(output_format.lower(), f"image/{output_format}")
+    new_mime_type = _mime_type_for(output_format)
     
     # Store objectNames only - signed URLs generated on-demand in list/get
     updates = {
@@ -244,10 +269,104 @@ async def _update_asset_with_converted_file(
     logger.info(f"Updated asset {asset_id} with converted file")
 
 
+async def _run_local_conversion(
+    context: PipelineContext,
+    input_format: str,
+    output_format: str,
+) -> PipelineResult:
+    """
+    Decode the HEIC/HEIF on the worker, upload the result and point the asset at it.
+
+    Dimensions come from the decoder and go straight to the asset, so no
+    re-download/ffprobe pass is needed. Raises on failure so the caller can
+    fall back to CloudConvert.
+    """
+    settings = get_settings()
+    result = await asyncio.to_thread(
+        convert_image_locally, context.asset_path, output_format, settings
+    )
+
+    output_filename = _output_filename(context.asset.name, output_format)
+    gcs_uri, object_name, signed_url = await _upload_converted_to_gcs(
+        result.content,
+        context.user_id,
+        context.project_id,
+        context.asset.id,
+        output_filename,
+        _mime_type_for(output_format),
+    )
+
+    await _update_asset_with_converted_file(
+        user_id=context.user_id,
+        project_id=context.project_id,
+        asset_id=context.asset.id,
+        original_gcs_uri=context.asset.gcs_uri or "",
+        original_object_name=context.asset.object_name or "",
+        original_mime_type=context.asset.mime_type,
+        converted_gcs_uri=gcs_uri,
+        converted_object_name=object_name,
+        converted_filename=output_filename,
+        output_format=output_format,
+    )
+    await _save_converted_metadata(
+        context.user_id,
+        context.project_id,
+        context.asset.id,
+        {"width": result.width, "height": result.height, "fileSize": len(result.content)},
+    )
+
+    # Record the job so re-runs reuse the converted file like CloudConvert jobs
+    now = datetime.utcnow().isoformat() + "Z"
+    job = ConversionJob(
+        id=str(uuid.uuid4()),
+        asset_id=context.asset.id,
+        asset_name=context.asset.name,
+        file_name=context.asset.file_name,
+        mime_type=context.asset.mime_type,
+        input_format=input_format,
+        output_format=output_format,
+        input_gcs_uri=context.asset.gcs_uri or "",
+        output_gcs_uri=gcs_uri,
+        output_signed_url=signed_url,
+        output_file_name=output_filename,
+        status="completed",
+        cloudconvert_job_id=None,
+        config={
+            "inputFormat": input_format,
+            "outputFormat": output_format,
+            "backend": BACKEND_LOCAL,
+            "decoder": result.decoder,
+        },
+        error=None,
+        created_at=now,
+        updated_at=now,
+        user_id=context.user_id,
+        project_id=context.project_id,
+    )
+    await save_conversion_job(job)
+
+    return PipelineResult(
+        status=StepStatus.SUCCEEDED,
+        metadata={
+            "message": f"Converted {input_format.upper()} to {output_format.upper()} (local)",
+            "jobId": job.id,
+            "backend": BACKEND_LOCAL,
+            "decoder": result.decoder,
+            "inputFormat": input_format,
+            "outputFormat": output_format,
+            "outputGcsUri": gcs_uri,
+            "outputSignedUrl": signed_url,
+            "outputFileName": output_filename,
+            "width": result.width,
+            "height": result.height,
+        },
+    )
+
+
 @register_step(
     id="image-convert",
     label="Convert image",
-    description="Convert HEIC/HEIF images to PNG for compatibility.",
+    description="Convert HEIC/HEIF images to PNG (or WebP) for compatibility.",
     auto_start=True,
     supported_types=[AssetType.IMAGE],
 )
@@ -256,20 +375,14 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
     Convert image format if needed.
     
     Currently converts:
-    - HEIC → PNG
-    - HEIF → PNG
+    - HEIC → PNG (or WebP, see IMAGE_CONVERT_OUTPUT_FORMAT)
+    - HEIF → PNG (or WebP)
+
+    Decodes on the worker when enabled; CloudConvert is the fallback.
     """
     logger.info(f"[image-convert] Starting for asset {context.asset.id} (mime: {context.asset.mime_type}, name: {context.asset.name})")
     settings = get_settings()
     
-    # Check if CloudConvert is configured
-    if not settings.cloudconvert_api_key:
-        logger.info("[image-convert] CloudConvert API key not configured, skipping")
-        return PipelineResult(
-            status=StepStatus.SUCCEEDED,
-            metadata={"message": "CloudConvert not configured, skipping conversion"},
-        )
-    
     # Check if conversion is needed
     conversion = _needs_conversion(context.asset.mime_type, context.asset.file_name)
     logger.info(f"[image-convert] Needs conversion check: mime={context.asset.mime_type}, file={context.asset.file_name}, result={conversion}")
@@ -281,6 +394,7 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
         )
     
     input_format, output_format = conversion
+    output_format = settings.image_convert_output_format
     logger.info(f"Converting {context.asset.name} from {input_format} to {output_format}")
     
     # Check for existing completed conversion
@@ -302,11 +416,9 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
                 asset_id=context.asset.id,
                 original_gcs_uri=context.asset.gcs_uri or "",
                 original_object_name=context.asset.object_name or "",
-                original_signed_url=context.asset.signed_url,
                 original_mime_type=context.asset.mime_type,
                 converted_gcs_uri=existing_job.output_gcs_uri or "",
                 converted_object_name=existing_job.output_gcs_uri.replace(f"gs://{settings.asset_gcs_bucket}/", "") if existing_job.output_gcs_uri else "",
-                converted_signed_url=existing_job.output_signed_url or "",
                 converted_filename=existing_job.output_file_name or _output_filename(context.asset.name, output_format),
                 output_format=output_format,
             )
@@ -323,7 +435,29 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
             },
         )
     
-    # Need to run conversion
+    # Need to run conversion - locally first
+    local_error: str | None = None
+    if settings.image_convert_local_enabled and context.asset_path and os.path.exists(context.asset_path):
+        try:
+            return await _run_local_conversion(context, input_format, output_format)
+        except Exception as e:
+            local_error = str(e)
+            logger.warning(f"[image-convert] Local conversion failed, trying CloudConvert: {e}")
+
+    # Check if CloudConvert is configured
+    if not settings.cloudconvert_api_key:
+        if local_error:
+            return PipelineResult(
+                status=StepStatus.FAILED,
+                metadata={"message": "Local conversion failed", "error": local_error},
+                error=local_error,
+            )
+        logger.info("[image-convert] No local decoder run and CloudConvert API key not configured, skipping")
+        return PipelineResult(
+            status=StepStatus.SUCCEEDED,
+            metadata={"message": "CloudConvert not configured, skipping conversion"},
+        )
+
     # Get signed URL for input file
     input_signed_url = context.asset.signed_url
     if not input_signed_url and context.asset.object_name:
@@ -411,7 +545,7 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
             project_id=context.project_id,
             asset_id=context.asset.id,
             filename=actual_filename,
-            mime_type=f"image/{output_format}",
+            mime_type=_mime_type_for(output_format),
         )
         
         # Update job record
@@ -436,11 +570,9 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
             asset_id=context.asset.id,
             original_gcs_uri=context.asset.gcs_uri or "",
             original_object_name=context.asset.object_name or "",
-            original_signed_url=context.asset.signed_url,
             original_mime_type=context.asset.mime_type,
             converted_gcs_uri=gcs_uri,
             converted_object_name=object_name,
-            converted_signed_url=signed_url,
             converted_filename=actual_filename,
             output_format=output_format,
         )
@@ -459,6 +591,7 @@ async def image_convert_step(context: PipelineContext) -> PipelineResult:
                 "message": f"Converted {input_format.upper()} to {output_format.upper()}",
                 "jobId": job.id,
                 "cloudconvertJobId": result.job_id,
+                "backend": BACKEND_CLOUDCONVERT,
                 "inputFormat": input_format,
                 "outputFormat": output_format,
                 "outputGcsUri": gcs_uri,
@@ -0,0 +1,213 @@
+"""Editing proxy pipeline step.
+
+Produces low-resolution H.264 MP4 proxies (e.g. 540p/360p) with a short,
+fixed keyframe interval so preview playback and timeline scrubbing don't
+stream and decode the original (often 4K) file. Optionally starts a Cloud
+Transcoder HLS ladder for adaptive browser playback.
+
+Proxy and manifest object names are stored on the asset document; signed
+URLs are generated on demand by the playback-url endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+from ...config import get_settings
+from ...metadata.ffprobe import extract_metadata
+from ...storage.firestore import get_asset, update_asset
+from ...transcode.local import encode_and_upload
+from ...transcode.service import (
+    OutputFormat,
+    TranscodeConfig,
+    TranscodeJobStatus,
+    create_transcode_job,
+    get_transcode_job_status,
+)
+from ..registry import register_step
+from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
+
+logger = logging.getLogger(__name__)
+
+# Proxy bitrates by height; anything else scales from the 540p rate
+PROXY_BITRATES = {360: 600_000, 540: 1_200_000, 720: 2_000_000}
+PROXY_AUDIO_BITRATE = 96_000
+HLS_MANIFEST_FILE = "manifest.m3u8"
+
+
+def _proxy_bitrate(height: int) -> int:
+    return PROXY_BITRATES.get(height) or max(300_000, int(1_200_000 * height / 540))
+
+
+def _proxy_object_name(context: PipelineContext, height: int) -> str:
+    return f"{context.user_id}/{context.project_id}/proxies/{context.asset.id}/proxy_{height}p.mp4"
+
+
+def _hls_output_path(context: PipelineContext) -> str:
+    return f"{context.user_id}/{context.project_id}/proxies/{context.asset.id}/hls/"
+
+
+async def _generate_proxies(
+    context: PipelineContext,
+    source_height: int,
+    has_audio: bool,
+    settings,
+) -> dict[str, dict[str, Any]]:
+    """Encode one MP4 proxy per configured height below the source height."""
+    proxies: dict[str, dict[str, Any]] = {}
+    for height in settings.proxy_height_list:
+        if source_height and height >= source_height:
+            continue
+        config = TranscodeConfig(
+            output_format=OutputFormat.MP4,
+            video_bitrate_bps=_proxy_bitrate(height),
+            target_height=height,
+            audio_bitrate_bps=PROXY_AUDIO_BITRATE,
+            has_audio=has_audio,
+        )
+        result = await encode_and_upload(
+            context.asset_path,
+            _proxy_object_name(context, height),
+            config,
+            settings,
+            keyframe_interval_seconds=settings.proxy_keyframe_interval_seconds,
+            timeout=settings.proxy_timeout_seconds,
+            # Same frame timing as the original so edits map 1:1 onto it
+            preserve_frame_rate=True,
+        )
+        proxies[str(height)] = {
+            "objectName": result["object_name"],
+            "height": height,
+            "size": result["size"],
+            "bitrateBps": config.video_bitrate_bps,
+        }
+        logger.info(f"Generated {height}p proxy for asset {context.asset.id}")
+    return proxies
+
+
+async def _poll_hls_job(job_name: str) -> PipelineResult | None:
+    """Check a running HLS ladder job. Returns None when it is still running."""
+    try:
+        status, job_metadata = await get_transcode_job_status(job_name)
+    except Exception as e:
+        logger.warning(f"Failed to poll HLS job {job_name}: {e}")
+        return None
+
+    if status == TranscodeJobStatus.SUCCEEDED:
+        return PipelineResult(status=StepStatus.SUCCEEDED)
+    if status == TranscodeJobStatus.FAILED:
+        return PipelineResult(
+            status=StepStatus.FAILED,
+            error=f"HLS ladder failed: {job_metadata.get('error', 'Unknown error')}",
+        )
+    return None
+
+
+@register_step(
+    id="proxy",
+    label="Generate editing proxies",
+    description="Create low-resolution MP4 proxies (and optionally an HLS ladder) for fast preview and scrubbing.",
+    auto_start=True,
+    supported_types=[AssetType.VIDEO],
+)
+async def proxy_step(context: PipelineContext) -> PipelineResult:
+    """Generate editing proxies, then start or poll the optional HLS ladder."""
+    settings = get_settings()
+    if not settings.proxy_enabled:
+        return PipelineResult(
+            status=StepStatus.SUCCEEDED,
+            metadata={"skipped": True, "reason": "disabled"},
+        )
+    if not settings.asset_gcs_bucket:
+        raise ValueError("ASSET_GCS_BUCKET must be configured")
+
+    previous = context.step_state.metadata or {}
+    proxies: dict[str, dict[str, Any]] = previous.get("proxies") or {}
+    hls_job_name: str | None = previous.get("hlsJobName")
+
+    # Re-run of a waiting step: proxies are done, only the HLS ladder is pending
+    if hls_job_name and previous.get("hlsStatus") == "processing":
+        result = await _poll_hls_job(hls_job_name)
+        if result is None:
+            return PipelineResult(status=StepStatus.WAITING, metadata=previous)
+
+        metadata = {**previous, "hlsStatus": "completed" if result.status == StepStatus.SUCCEEDED else "error"}
+        if result.status == StepStatus.SUCCEEDED:
+            manifest_object_name = f"{_hls_output_path(context)}{HLS_MANIFEST_FILE}"
+            metadata["hlsManifestObjectName"] = manifest_object_name
+            await asyncio.to_thread(
+                update_asset,
+                context.user_id,
+                context.project_id,
+                context.asset.id,
+                {"hlsManifestObjectName": manifest_object_name},
+                settings,
+            )
+        else:
+            metadata["hlsError"] = result.error
+        # Proxies are usable even if the ladder failed, so the step still succeeds
+        return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
+
+    path = Path(context.asset_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Asset file not found: {context.asset_path}")
+
+    media = await asyncio.to_thread(extract_metadata, path)
+    source_height = media.height or 0
+    has_audio = media.audio_codec is not None
+
+    if not proxies:
+        proxies = await _generate_proxies(context, source_height, has_audio, settings)
+        await asyncio.to_thread(
+            update_asset,
+            context.user_id,
+            context.project_id,
+            context.asset.id,
+            {"proxies": proxies},
+            settings,
+        )
+
+    metadata: dict[str, Any] = {
+        "proxies": proxies,
+        "proxyObjectNames": [p["objectName"] for p in proxies.values()],
+    }
+    if not proxies:
+        metadata["message"] = "Source is already at or below proxy resolution"
+
+    if not settings.proxy_hls_enabled:
+        return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
+
+    # HLS ladder runs on the Cloud Transcoder API; the step waits and is re-polled
+    ladder = [h for h in settings.proxy_hls_height_list if not source_height or h <= source_height]
+    asset_doc = await asyncio.to_thread(
+        get_asset, context.user_id, context.project_id, context.asset.id, settings
+    )
+    input_gcs_uri = (asset_doc or {}).get("gcsUri") or context.asset.gcs_uri
+    if not ladder or not input_gcs_uri:
+        return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
+
+    try:
+        hls_job_name = await create_transcode_job(
+            input_uri=input_gcs_uri,
+            output_uri=f"gs://{settings.asset_gcs_bucket}/{_hls_output_path(context)}",
+            config=TranscodeConfig(
+                output_format=OutputFormat.HLS,
+                has_audio=has_audio,
+                ladder_heights=ladder,
+            ),
+            notify=False,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to start HLS ladder for asset {context.asset.id}: {e}")
+        metadata.update({"hlsStatus": "error", "hlsError": str(e)})
+        return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
+
+    metadata.update({
+        "hlsJobName": hls_job_name,
+        "hlsStatus": "processing",
+        "hlsLadder": ladder,
+    })
+    return PipelineResult(status=StepStatus.WAITING, metadata=metadata)
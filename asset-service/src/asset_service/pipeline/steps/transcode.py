@@ -1,4 +1,4 @@
-"""Transcode pipeline step using Google Cloud Transcoder API."""
+"""Transcode pipeline step using Google Cloud Transcoder API or local ffmpeg for short clips."""
 
 from __future__ import annotations
 
@@ -14,8 +14,8 @@ from typing import Any
 from ..types import AssetType, PipelineContext, PipelineResult, PipelineStepState, StoredAsset, StepStatus
 from ..store import update_pipeline_step
 from ...config import get_settings
-from ...metadata.ffprobe import extract_metadata
-from ...storage.gcs import create_signed_url, download_from_gcs
+from ...metadata.ffprobe import extract_remote_metadata
+from ...storage.gcs import create_signed_url
 from ...storage.firestore import update_asset
 from ...transcode.service import (
     create_transcode_job,
@@ -26,11 +26,13 @@ from ...transcode.service import (
     VideoCodec,
     AudioCodec,
 )
+from ...transcode.local import BACKEND_LOCAL, run_local_transcode, select_transcode_backend
 from ...transcode.store import (
     TranscodeJob,
     save_transcode_job,
     find_latest_transcode_job_for_asset,
     update_transcode_job,
+    claim_transcode_job_for_completion,
 )
 
 logger = logging.getLogger(__name__)
@@ -261,83 +263,66 @@ async def _reextract_and_save_metadata(
     Returns:
         Extracted metadata dict if successful, None otherwise.
     """
-    import tempfile
-    
     settings = get_settings()
     
     try:
-        # Download transcoded file
-        logger.info(f"Downloading transcoded file for metadata re-extraction: {transcoded_gcs_uri}")
-        content = await asyncio.to_thread(download_from_gcs, transcoded_gcs_uri, settings)
+        # Probe the transcoded MP4 over a signed URL (range reads only; no full download)
+        logger.info(f"Probing transcoded file for metadata re-extraction: {transcoded_gcs_uri}")
+        extracted = await asyncio.to_thread(extract_remote_metadata, transcoded_gcs_uri, ".mp4", settings)
         
-        # Write to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
-            tmp.write(content)
-            temp_path = tmp.name
+        # Build metadata update dict
+        metadata_updates: dict[str, Any] = {}
+        if extracted.width is not None:
+            metadata_updates["width"] = extracted.width
+        if extracted.height is not None:
+            metadata_updates["height"] = extracted.height
+        if extracted.duration is not None:
+            metadata_updates["duration"] = extracted.duration
+        if extracted.codec is not None:
+            metadata_updates["videoCodec"] = extracted.codec
+        if extracted.audio_codec is not None:
+            metadata_updates["audioCodec"] = extracted.audio_codec
+        if extracted.sample_rate is not None:
+            metadata_updates["sampleRate"] = extracted.sample_rate
+        if extracted.channels is not None:
+            metadata_updates["channels"] = extracted.channels
+        if extracted.bitrate is not None:
+            metadata_updates["bitrate"] = extracted.bitrate
+        if extracted.format_name is not None:
+            metadata_updates["formatName"] = extracted.format_name
+        if extracted.size is not None:
+            metadata_updates["fileSize"] = extracted.size
         
-        try:
-            # Extract metadata using ffprobe
-            extracted = extract_metadata(temp_path)
-            
-            # Build metadata update dict
-            metadata_updates: dict[str, Any] = {}
-            if extracted.width is not None:
-                metadata_updates["width"] = extracted.width
-            if extracted.height is not None:
-                metadata_updates["height"] = extracted.height
-            if extracted.duration is not None:
-                metadata_updates["duration"] = extracted.duration
-            if extracted.codec is not None:
-                metadata_updates["videoCodec"] = extracted.codec
-            if extracted.audio_codec is not None:
-                metadata_updates["audioCodec"] = extracted.audio_codec
-            if extracted.sample_rate is not None:
-                metadata_updates["sampleRate"] = extracted.sample_rate
-            if extracted.channels is not None:
-                metadata_updates["channels"] = extracted.channels
-            if extracted.bitrate is not None:
-                metadata_updates["bitrate"] = extracted.bitrate
-            if extracted.format_name is not None:
-                metadata_updates["formatName"] = extracted.format_name
-            if extracted.size is not None:
-                metadata_updates["fileSize"] = extracted.size
+        if metadata_updates:
+            # Update asset document
+            await asyncio.to_thread(
+                update_asset, user_id, project_id, asset_id, metadata_updates, settings
+            )
+            logger.info(
+                f"Updated asset {asset_id} with re-extracted metadata: "
+                f"width={metadata_updates.get('width')}, height={metadata_updates.get('height')}, "
+                f"duration={metadata_updates.get('duration')}"
+            )
             
-            if metadata_updates:
-                # Update asset document
-                await asyncio.to_thread(
-                    update_asset, user_id, project_id, asset_id, metadata_updates, settings
-                )
-                logger.info(
-                    f"Updated asset {asset_id} with re-extracted metadata: "
-                    f"width={metadata_updates.get('width')}, height={metadata_updates.get('height')}, "
-                    f"duration={metadata_updates.get('duration')}"
-                )
-                
-                # Also update the metadata pipeline step
-                from datetime import datetime
-                await update_pipeline_step(
-                    user_id,
-                    project_id,
-                    asset_id,
-                    "metadata",
-                    {
-                        "id": "metadata",
-                        "label": "Extract metadata",
-                        "status": "succeeded",
-                        "metadata": {
-                            **metadata_updates,
-                            "reextractedAfterTranscode": True,
-                        },
-                        "updatedAt": datetime.utcnow().isoformat() + "Z",
+            # Also update the metadata pipeline step
+            await update_pipeline_step(
+                user_id,
+                project_id,
+                asset_id,
+                "metadata",
+                {
+                    "id": "metadata",
+                    "label": "Extract metadata",
+                    "status": "succeeded",
+                    "metadata": {
+                        **metadata_updates,
+                        "reextractedAfterTranscode": True,
                     },
-                )
-            
-            return metadata_updates
-            
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+                    "updatedAt": datetime.utcnow().isoformat() + "Z",
+                },
+            )
+        
+        return metadata_updates
                 
     except Exception as e:
         logger.warning(f"Failed to re-extract metadata after transcode: {e}")
@@ -385,12 +370,10 @@ async def _detect_has_audio(asset_doc: dict[str, Any], settings) -> bool:
     Detect if an asset has an audio track.
     
     First checks if audioCodec is already in the asset document (from previous metadata extraction).
-    If not present, downloads the file from GCS and probes it with ffprobe.
+    If not present, probes the GCS object remotely with ffprobe (range reads, no full download).
     
     Returns True if audio track is detected, False otherwise.
     """
-    import tempfile
-    
     # Check if already extracted
     if asset_doc.get("audioCodec"):
         logger.info(f"Asset {asset_doc['id']} has audio (from metadata: {asset_doc['audioCodec']})")
@@ -404,40 +387,178 @@ async def _detect_has_audio(asset_doc: dict[str, Any], settings) -> bool:
     
     try:
         logger.info(f"Probing asset {asset_doc['id']} for audio track")
-        content = await asyncio.to_thread(download_from_gcs, gcs_uri, settings)
-        
-        # Write to temp file and probe
         suffix = os.path.splitext(asset_doc.get("fileName", "video"))[1] or ".mp4"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(content)
-            temp_path = tmp.name
-        
-        try:
-            extracted = extract_metadata(temp_path)
-            has_audio = extracted.audio_codec is not None
-            logger.info(
-                f"Asset {asset_doc['id']} audio probe result: "
-                f"has_audio={has_audio}, audio_codec={extracted.audio_codec}"
-            )
-            return has_audio
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        extracted = await asyncio.to_thread(extract_remote_metadata, gcs_uri, suffix, settings)
+        has_audio = extracted.audio_codec is not None
+        logger.info(
+            f"Asset {asset_doc['id']} audio probe result: "
+            f"has_audio={has_audio}, audio_codec={extracted.audio_codec}"
+        )
+        return has_audio
                 
     except Exception as e:
         logger.warning(f"Failed to probe asset {asset_doc['id']} for audio: {e}, assuming has audio")
         return True  # Default to true on error to avoid breaking
 
 
+async def _apply_transcoded_output(
+    context: PipelineContext,
+    input_gcs_uri: str,
+    metadata: dict[str, Any],
+    *,
+    update_cloud_upload_metadata: bool = False,
+) -> PipelineResult:
+    """Point the asset at a finished transcode output and refresh its metadata."""
+    output_object_name = metadata.get("outputObjectName") or ""
+    if not output_object_name.strip():
+        return PipelineResult(
+            status=StepStatus.FAILED,
+            metadata=metadata,
+            error="Transcode completed but output path missing; asset not updated",
+        )
+    await _update_asset_with_transcoded_url(
+        user_id=context.user_id,
+        project_id=context.project_id,
+        asset_id=context.asset.id,
+        original_gcs_uri=input_gcs_uri,
+        original_object_name=context.asset.object_name or "",
+        transcoded_gcs_uri=metadata.get("outputGcsUri", ""),
+        transcoded_object_name=output_object_name,
+        current_file_name=context.asset.file_name,
+    )
+    
+    # Re-extract metadata from transcoded file (fixes MOV dimension issues)
+    await _reextract_and_save_metadata(
+        context.user_id,
+        context.project_id,
+        context.asset.id,
+        metadata.get("outputGcsUri", ""),
+    )
+    
+    if update_cloud_upload_metadata:
+        await update_pipeline_step(
+            context.user_id,
+            context.project_id,
+            context.asset.id,
+            "cloud-upload",
+            {
+                "id": "cloud-upload",
+                "label": "Cloud Upload",
+                "status": "succeeded",
+                "metadata": {
+                    "gcsUri": metadata.get("outputGcsUri"),
+                    "objectName": metadata.get("outputObjectName"),
+                    "transcoded": True,
+                    "originalGcsUri": input_gcs_uri,
+                },
+                "updatedAt": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+    return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
+
+
+async def _run_local_transcode_job(
+    context: PipelineContext,
+    transcode_config: TranscodeConfig,
+    config_dict: dict[str, Any],
+    config_hash: str,
+    input_gcs_uri: str,
+    output_path: str,
+    *,
+    update_cloud_upload_metadata: bool = False,
+) -> PipelineResult:
+    """
+    Transcode with ffmpeg on this worker and record it as a TranscodeJob.
+
+    Returns a FAILED result (without touching the asset's transcode status) if
+    ffmpeg fails, so the caller can decide whether to fall back to the cloud.
+    """
+    settings = get_settings()
+    output_filename = "output.mp4"
+    output_object_name = f"{output_path}{output_filename}"
+
+    now = datetime.utcnow().isoformat() + "Z"
+    job = TranscodeJob(
+        id=str(uuid.uuid4()),
+        asset_id=context.asset.id,
+        asset_name=context.asset.name,
+        file_name=context.asset.file_name,
+        mime_type=context.asset.mime_type,
+        input_gcs_uri=input_gcs_uri,
+        output_gcs_uri=f"gs://{settings.asset_gcs_bucket}/{output_path}",
+        status="processing",
+        config={**config_dict, "hash": config_hash},
+        created_at=now,
+        updated_at=now,
+        user_id=context.user_id,
+        project_id=context.project_id,
+        backend=BACKEND_LOCAL,
+    )
+    await save_transcode_job(job)
+    await _update_asset_transcode_status(
+        context.user_id, context.project_id, context.asset.id, "processing"
+    )
+    logger.info(f"Started local transcode job {job.id} for asset {context.asset.id}")
+
+    try:
+        upload = await run_local_transcode(input_gcs_uri, output_object_name, transcode_config, settings)
+    except Exception as e:
+        error_msg = f"Local transcode failed: {e}"
+        logger.warning(error_msg)
+        await update_transcode_job(context.user_id, context.project_id, job.id, {
+            "status": "error",
+            "error": error_msg,
+        })
+        return PipelineResult(
+            status=StepStatus.FAILED,
+            metadata={"message": error_msg, "jobId": job.id, "backend": BACKEND_LOCAL, "config": config_dict},
+            error=error_msg,
+        )
+
+    await update_transcode_job(context.user_id, context.project_id, job.id, {
+        "status": "completed",
+        "outputFileName": output_filename,
+        "outputSize": upload["size"],
+    })
+
+    output_signed_url = None
+    try:
+        output_signed_url = create_signed_url(output_object_name, settings=settings)
+    except Exception as e:
+        logger.warning(f"Failed to create signed URL for output: {e}")
+
+    return await _apply_transcoded_output(
+        context,
+        input_gcs_uri,
+        {
+            "message": "Transcoding completed (local)",
+            "jobId": job.id,
+            "backend": BACKEND_LOCAL,
+            "outputGcsUri": upload["gcs_uri"],
+            "outputObjectName": output_object_name,
+            "outputSignedUrl": output_signed_url,
+            "outputFileName": output_filename,
+            "config": config_dict,
+        },
+        update_cloud_upload_metadata=update_cloud_upload_metadata,
+    )
+
+
 async def run_transcode_for_asset(
     user_id: str,
     project_id: str,
     asset_id: str,
     params: dict[str, Any],
+    trigger_pipeline_after: bool = False,
+    agent_metadata: dict[str, Any] | None = None,
 ) -> PipelineResult:
     """
     Run transcode for an asset (on-demand). Updates the asset with transcoded URL.
     Does not update pipeline step metadata.
+
+    When Transcoder Pub/Sub notifications are enabled, returns a WAITING result as soon
+    as the job is started; the notification subscriber finishes it (including the
+    pipeline chaining requested by trigger_pipeline_after).
     """
     from ...storage.firestore import get_asset
 
@@ -451,8 +572,13 @@ async def run_transcode_for_asset(
     # Detect if asset has audio track (probes file if not in metadata)
     has_audio = await _detect_has_audio(asset_doc, settings)
 
-    # Merge has_audio info into params for _transcode_impl
-    merged_params = {**(params or {}), "_has_audio": has_audio}
+    # Merge has_audio and completion info into params for _transcode_impl
+    merged_params = {
+        **(params or {}),
+        "_has_audio": has_audio,
+        "_trigger_pipeline_after": trigger_pipeline_after,
+        "_agent_metadata": agent_metadata,
+    }
 
     context = PipelineContext(
         asset=asset,
@@ -476,7 +602,8 @@ async def _transcode_impl(
 
     This step:
     1. Starts a transcode job via Google Cloud Transcoder API
-    2. Polls until the job completes (blocking)
+    2. Polls until the job completes (blocking), or - when Pub/Sub notifications
+       are enabled - returns WAITING and lets the notification subscriber finish it
     3. Updates the asset record to use the transcoded URL
     4. Backs up the original URL in the asset record
 
@@ -494,8 +621,13 @@ async def _transcode_impl(
     - audioBitrate: Audio bitrate in bps or kbps
     - sampleRate: Audio sample rate in Hz
     - channels: Number of audio channels
+    - backend: "local" (ffmpeg on the worker), "cloud" (Transcoder API) or "auto" (default;
+      short clips go local - see select_transcode_backend)
     """
     settings = get_settings()
+    use_notifications = settings.transcode_notifications_enabled
+    trigger_pipeline_after = bool(context.params.get("_trigger_pipeline_after", False))
+    agent_metadata = context.params.get("_agent_metadata")
 
     # Check if input file has audio (passed via params or default to True for backward compat)
     has_audio = context.params.get("_has_audio", True)
@@ -609,8 +741,25 @@ async def _transcode_impl(
                 error=existing_job.error,
             )
 
+        # Job still processing and owned by the notification subscriber - don't hold this worker
+        if existing_job.status in ("processing", "completing") and existing_job.completion_mode == "pubsub":
+            if trigger_pipeline_after and not existing_job.trigger_pipeline_after:
+                await update_transcode_job(context.user_id, context.project_id, existing_job.id, {
+                    "triggerPipelineAfter": True,
+                    "agentMetadata": agent_metadata,
+                })
+            logger.info(f"Transcode job {existing_job.id} already in progress; completion via Pub/Sub")
+            return PipelineResult(
+                status=StepStatus.WAITING,
+                metadata={
+                    "message": "Transcoding in progress",
+                    "jobId": existing_job.id,
+                    "config": config_dict,
+                },
+            )
+
         # Job still processing - poll until complete
-        if existing_job.status == "processing" and existing_job.job_name:
+        if existing_job.status in ("processing", "completing") and existing_job.job_name:
             logger.info(f"Resuming poll for transcode job {existing_job.job_name}")
             
             success, metadata = await _poll_until_complete(
@@ -671,6 +820,34 @@ async def _transcode_impl(
     output_path = f"{context.user_id}/{context.project_id}/transcoded/{context.asset.id}/{config_hash}/"
     output_gcs_uri = f"gs://{settings.asset_gcs_bucket}/{output_path}"
 
+    # Short clips are faster to encode on the worker than to queue on the Transcoder API
+    requested_backend = context.params.get("backend")
+    backend = select_transcode_backend(
+        transcode_config,
+        context.asset.duration,
+        context.asset.size,
+        requested=requested_backend,
+        settings=settings,
+    )
+    if backend == BACKEND_LOCAL:
+        local_result = await _run_local_transcode_job(
+            context,
+            transcode_config,
+            config_dict,
+            config_hash,
+            input_gcs_uri,
+            output_path,
+            update_cloud_upload_metadata=update_cloud_upload_metadata,
+        )
+        if local_result.status == StepStatus.SUCCEEDED:
+            return local_result
+        if requested_backend == BACKEND_LOCAL:
+            await _update_asset_transcode_status(
+                context.user_id, context.project_id, context.asset.id, "error", local_result.error
+            )
+            return local_result
+        logger.warning(f"Local transcode failed for asset {context.asset.id}; falling back to Cloud Transcoder")
+
     # Create transcode job
     try:
         job_name = await create_transcode_job(
@@ -708,6 +885,9 @@ async def _transcode_impl(
         updated_at=now,
         user_id=context.user_id,
         project_id=context.project_id,
+        completion_mode="pubsub" if use_notifications else "poll",
+        trigger_pipeline_after=trigger_pipeline_after,
+        agent_metadata=agent_metadata,
     )
 
     await save_transcode_job(job)
@@ -718,6 +898,17 @@ async def _transcode_impl(
         context.user_id, context.project_id, context.asset.id, "processing"
     )
 
+    # Completion will be pushed via Pub/Sub - free the worker slot
+    if use_notifications:
+        return PipelineResult(
+            status=StepStatus.WAITING,
+            metadata={
+                "message": "Transcoding started; completion via Pub/Sub",
+                "jobId": job.id,
+                "config": config_dict,
+            },
+        )
+
     # Poll until complete (blocking)
     success, metadata = await _poll_until_complete(
         job_name=job_name,
@@ -729,52 +920,12 @@ async def _transcode_impl(
     )
 
     if success:
-        output_object_name = metadata.get("outputObjectName") or ""
-        if not output_object_name.strip():
-            return PipelineResult(
-                status=StepStatus.FAILED,
-                metadata=metadata,
-                error="Transcode completed but output path missing; asset not updated",
-            )
-        await _update_asset_with_transcoded_url(
-            user_id=context.user_id,
-            project_id=context.project_id,
-            asset_id=context.asset.id,
-            original_gcs_uri=input_gcs_uri,
-            original_object_name=context.asset.object_name or "",
-            transcoded_gcs_uri=metadata.get("outputGcsUri", ""),
-            transcoded_object_name=output_object_name,
-            current_file_name=context.asset.file_name,
-        )
-        
-        # Re-extract metadata from transcoded file (fixes MOV dimension issues)
-        await _reextract_and_save_metadata(
-            context.user_id,
-            context.project_id,
-            context.asset.id,
-            metadata.get("outputGcsUri", ""),
+        return await _apply_transcoded_output(
+            context,
+            input_gcs_uri,
+            metadata,
+            update_cloud_upload_metadata=update_cloud_upload_metadata,
         )
-        
-        if update_cloud_upload_metadata:
-            await update_pipeline_step(
-                context.user_id,
-                context.project_id,
-                context.asset.id,
-                "cloud-upload",
-                {
-                    "id": "cloud-upload",
-                    "label": "Cloud Upload",
-                    "status": "succeeded",
-                    "metadata": {
-                        "gcsUri": metadata.get("outputGcsUri"),
-                        "objectName": metadata.get("outputObjectName"),
-                        "transcoded": True,
-                        "originalGcsUri": input_gcs_uri,
-                    },
-                    "updatedAt": datetime.utcnow().isoformat() + "Z",
-                },
-            )
-        return PipelineResult(status=StepStatus.SUCCEEDED, metadata=metadata)
     else:
         # Update asset with error status
         error_msg = metadata.get("error", metadata.get("message", "Unknown transcode error"))
@@ -786,3 +937,108 @@ async def _transcode_impl(
             metadata=metadata,
             error=error_msg,
         )
+
+
+async def complete_transcode_job(
+    job: TranscodeJob,
+    status: TranscodeJobStatus,
+    poll_metadata: dict[str, Any],
+) -> PipelineResult | None:
+    """
+    Apply a terminal Transcoder state to a job handed off to Pub/Sub completion.
+
+    Called by the notification subscriber and its fallback poll. The job is claimed
+    atomically first, so a notification and a fallback poll racing on the same job
+    finish it exactly once.
+
+    Returns:
+        The transcode result, or None if the state is not terminal or the job
+        was already finished elsewhere.
+    """
+    from ...storage.firestore import get_asset
+
+    if status not in (TranscodeJobStatus.SUCCEEDED, TranscodeJobStatus.FAILED):
+        return None
+
+    if not await claim_transcode_job_for_completion(job.user_id, job.project_id, job.id):
+        return None
+
+    settings = get_settings()
+    config_dict = {k: v for k, v in (job.config or {}).items() if k != "hash"}
+
+    if status == TranscodeJobStatus.FAILED:
+        error_msg = poll_metadata.get("error", "Unknown error")
+        await update_transcode_job(job.user_id, job.project_id, job.id, {
+            "status": "error",
+            "error": error_msg,
+        })
+        await _update_asset_transcode_status(job.user_id, job.project_id, job.asset_id, "error", error_msg)
+        return PipelineResult(
+            status=StepStatus.FAILED,
+            metadata={
+                "message": "Transcoding failed",
+                "jobId": job.id,
+                "error": error_msg,
+                "config": config_dict,
+            },
+            error=error_msg,
+        )
+
+    # Build full object name and GCS URI (folder + output filename)
+    output_filename = "output.mp4"
+    output_folder_uri = (job.output_gcs_uri or "").rstrip("/")
+    output_object_name = ""
+    output_gcs_uri_full = output_folder_uri
+    if output_folder_uri.startswith("gs://"):
+        parts = output_folder_uri[5:].split("/", 1)
+        if len(parts) > 1:
+            output_object_name = f"{parts[1].rstrip('/')}/{output_filename}"
+            output_gcs_uri_full = f"gs://{parts[0]}/{output_object_name}"
+
+    await update_transcode_job(job.user_id, job.project_id, job.id, {
+        "status": "completed",
+        "outputFileName": output_filename,
+    })
+
+    asset_doc = await asyncio.to_thread(get_asset, job.user_id, job.project_id, job.asset_id, settings)
+    if not asset_doc or not output_object_name:
+        error_msg = "Transcode completed but asset or output path missing; asset not updated"
+        await _update_asset_transcode_status(job.user_id, job.project_id, job.asset_id, "error", error_msg)
+        return PipelineResult(
+            status=StepStatus.FAILED,
+            metadata={"message": error_msg, "jobId": job.id, "config": config_dict},
+            error=error_msg,
+        )
+
+    await _update_asset_with_transcoded_url(
+        user_id=job.user_id,
+        project_id=job.project_id,
+        asset_id=job.asset_id,
+        original_gcs_uri=job.input_gcs_uri,
+        original_object_name=asset_doc.get("objectName") or "",
+        transcoded_gcs_uri=output_gcs_uri_full,
+        transcoded_object_name=output_object_name,
+        current_file_name=asset_doc.get("fileName"),
+    )
+
+    # Re-extract metadata from transcoded file (fixes MOV dimension issues)
+    await _reextract_and_save_metadata(job.user_id, job.project_id, job.asset_id, output_gcs_uri_full)
+
+    output_signed_url = None
+    try:
+        output_signed_url = create_signed_url(output_object_name, settings=settings)
+    except Exception as e:
+        logger.warning(f"Failed to create signed URL for output: {e}")
+
+    return PipelineResult(
+        status=StepStatus.SUCCEEDED,
+        metadata={
+            "message": "Transcoding completed",
+            "jobId": job.id,
+            "outputGcsUri": output_gcs_uri_full,
+            "outputObjectName": output_object_name,
+            "outputSignedUrl": output_signed_url,
+            "outputFileName": output_filename,
+            "config": config_dict,
+        },
+    )
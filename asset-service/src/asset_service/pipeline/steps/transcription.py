@@ -1,17 +1,25 @@
-"""Transcription pipeline step using Google Cloud Speech-to-Text API."""
+"""Transcription pipeline step using Google Cloud Speech-to-Text API.
+
+Long audio arrives from the audio-extract step as silence-aligned chunks. The
+chunks are recognized in parallel (batches of files per batchRecognize
+request, all requests started at once) and stitched back together by shifting
+each chunk's word offsets by the chunk's start time.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
+from dataclasses import replace
 from datetime import datetime
 from typing import Any
 
-import httpx
-
 from ..registry import register_step
 from ..types import AssetType, PipelineContext, PipelineResult, StepStatus
 from ..store import get_pipeline_state
+from ...http_client import request_with_retry
+from ...storage.tracks import TRACK_TRANSCRIPT_WORDS, track_object_name, write_track
 from ...transcription.speech import get_speech_env, get_speech_access_token
 from ...transcription.store import (
     TranscriptionJob,
@@ -22,6 +30,12 @@ from ...transcription.store import (
 
 logger = logging.getLogger(__name__)
 
+# batchRecognize accepts at most 15 files per request
+BATCH_RECOGNIZE_MAX_FILES = 15
+# Words kept inline (first + last) next to the track pointer, for quick context
+SEGMENTS_PREVIEW_HEAD = 20
+SEGMENTS_PREVIEW_TAIL = 5
+
 
 def _parse_offset_to_ms(offset: Any) -> int:
     """Parse a Speech API time offset to milliseconds.
@@ -53,10 +67,10 @@ async def _start_batch_recognize(
     location: str,
     recognizer_id: str,
     model: str,
-    gcs_uri: str,
+    gcs_uris: list[str],
     language_codes: list[str],
 ) -> str:
-    """Start a batch recognition job."""
+    """Start a batch recognition job for one or more files."""
     recognizer_path = f"projects/{project_id}/locations/{location}/recognizers/{recognizer_id}"
 
     endpoint = "speech.googleapis.com"
@@ -75,32 +89,32 @@ async def _start_batch_recognize(
                 "enableWordTimeOffsets": True,
             },
         },
-        "files": [{"uri": gcs_uri}],
+        "files": [{"uri": uri} for uri in gcs_uris],
         "recognitionOutputConfig": {
             "inlineResponseConfig": {},
         },
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-            timeout=60.0,
-        )
+    response = await request_with_retry(
+        "POST",
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        json=payload,
+        timeout=60.0,
+    )
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Speech-to-Text request failed: {response.text}")
+    if response.status_code != 200:
+        raise RuntimeError(f"Speech-to-Text request failed: {response.text}")
 
-        data = response.json()
-        operation_name = data.get("name")
-        if not operation_name:
-            raise RuntimeError("Speech-to-Text API did not return an operation name")
+    data = response.json()
+    operation_name = data.get("name")
+    if not operation_name:
+        raise RuntimeError("Speech-to-Text API did not return an operation name")
 
-        return operation_name
+    return operation_name
 
 
 async def _poll_operation(
@@ -119,23 +133,26 @@ async def _poll_operation(
 
     url = f"https://{endpoint}/v2/{operation_name}"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-        )
+    response = await request_with_retry(
+        "GET",
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        timeout=30.0,
+    )
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to poll operation: {response.text}")
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to poll operation: {response.text}")
 
-        return response.json()
+    return response.json()
 
 
-def _parse_transcription_result(operation_response: dict[str, Any]) -> tuple[str, list[dict]]:
+def _parse_transcription_result(
+    operation_response: dict[str, Any],
+    offsets_ms: dict[str, int] | None = None,
+) -> tuple[str, list[dict]]:
     """
     Parse the transcription result from a completed operation.
 
@@ -144,15 +161,24 @@ def _parse_transcription_result(operation_response: dict[str, Any]) -> tuple[str
 
     Each result contains alternatives[] with transcript, confidence, and words[].
 
+    For chunked audio, offsets_ms maps each chunk URI to its start in the full
+    audio; files are merged in offset order and word times shifted by it.
+
     Returns (transcript_text, segments_with_word_timings)
     """
     results = operation_response.get("results", {})
+    offsets_ms = offsets_ms or {}
 
     all_segments = []
     all_text_parts = []
 
     # Results are keyed by the input file URI
-    for file_uri, file_result in results.items():
+    file_uris = list(results)
+    if offsets_ms:
+        file_uris.sort(key=lambda uri: (offsets_ms.get(uri, 0), uri))
+    for file_uri in file_uris:
+        file_result = results[file_uri]
+        offset_ms = offsets_ms.get(file_uri, 0)
         # Check for inline_result (used with inlineResponseConfig)
         inline_result = file_result.get("inlineResult", {})
         transcript_data = inline_result.get("transcript", {})
@@ -182,7 +208,7 @@ def _parse_transcription_result(operation_response: dict[str, Any]) -> tuple[str
                 if not word_text:
                     continue
                 start_offset = word_info.get("startOffset", "0s")
-                start_ms = _parse_offset_to_ms(start_offset)
+                start_ms = _parse_offset_to_ms(start_offset) + offset_ms
                 all_segments.append({
                     "start": start_ms,
                     "speech": word_text,
@@ -192,6 +218,76 @@ def _parse_transcription_result(operation_response: dict[str, Any]) -> tuple[str
     return full_transcript, all_segments
 
 
+def _merge_operation_responses(operations: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine the per-file results of several completed batchRecognize operations."""
+    results: dict[str, Any] = {}
+    for operation in operations:
+        results.update((operation.get("response") or {}).get("results", {}))
+    return {"results": results}
+
+
+def _chunk_error(response: dict[str, Any], chunk_uris: list[str]) -> str | None:
+    """
+    Error message if any file of a finished job failed or has no result.
+
+    A failed chunk would leave a gap in the merged transcript, so the whole
+    job fails instead of being stored as complete.
+    """
+    results = response.get("results", {})
+    for file_uri, file_result in results.items():
+        if file_result.get("error"):
+            message = file_result["error"].get("message", "Unknown error")
+            return f"Transcription of {file_uri} failed: {message}"
+    missing = [uri for uri in chunk_uris if uri not in results]
+    if missing:
+        return f"No transcription result for {', '.join(missing)}"
+    return None
+
+
+def _segments_preview(segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    if len(segments) <= SEGMENTS_PREVIEW_HEAD + SEGMENTS_PREVIEW_TAIL:
+        return segments
+    return segments[:SEGMENTS_PREVIEW_HEAD] + segments[-SEGMENTS_PREVIEW_TAIL:]
+
+
+async def _store_segments(context: PipelineContext, segments: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Write word segments to a track blob and return the job fields to persist.
+
+    Falls back to inline segments if the blob can't be written, so a finished
+    transcription is never lost.
+    """
+    try:
+        pointer = await asyncio.to_thread(
+            write_track,
+            segments,
+            track_object_name(context.user_id, context.project_id, context.asset.id, TRACK_TRANSCRIPT_WORDS),
+            TRACK_TRANSCRIPT_WORDS,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to write transcript track for {context.asset.id}, storing inline: {e}")
+        return {"segments": segments}
+    return {"segmentsTrack": pointer, "segmentsPreview": _segments_preview(segments)}
+
+
+def _completed_metadata(job: TranscriptionJob) -> dict[str, Any]:
+    """Step metadata for a completed job: transcript text, counts and the words pointer."""
+    metadata: dict[str, Any] = {
+        "message": "Transcription completed",
+        "jobId": job.id,
+        "createdAt": job.created_at,
+        "transcript": job.transcript,
+    }
+    if job.segments_track:
+        metadata["wordCount"] = job.segments_track.get("count", 0)
+        metadata["segmentsTrack"] = job.segments_track
+        metadata["segmentsPreview"] = job.segments_preview
+    else:
+        metadata["wordCount"] = len(job.segments)
+        metadata["segments"] = job.segments
+    return metadata
+
+
 @register_step(
     id="transcription",
     label="Transcribe audio/video",
@@ -215,13 +311,7 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
         if existing_job.status == "completed":
             return PipelineResult(
                 status=StepStatus.SUCCEEDED,
-                metadata={
-                    "message": "Transcription completed",
-                    "jobId": existing_job.id,
-                    "createdAt": existing_job.created_at,
-                    "transcript": existing_job.transcript,
-                    "segments": existing_job.segments,
-                },
+                metadata=_completed_metadata(existing_job),
             )
 
         # Job failed
@@ -237,20 +327,27 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
 
         # Job still processing - poll the operation to check status
         if existing_job.status == "processing" and existing_job.operation_name:
-            logger.info(f"Polling transcription operation {existing_job.operation_name}")
+            operation_names = existing_job.operation_names or [existing_job.operation_name]
+            logger.info(f"Polling transcription operation(s) {', '.join(operation_names)}")
             token = get_speech_access_token()
 
             try:
-                operation = await _poll_operation(
-                    token=token,
-                    operation_name=existing_job.operation_name,
-                    location=env.location,
-                )
+                operations = await asyncio.gather(*(
+                    _poll_operation(token=token, operation_name=name, location=env.location)
+                    for name in operation_names
+                ))
+                failed = next((op for op in operations if op.get("done") and "error" in op), None)
+
+                if failed or all(op.get("done") for op in operations):
+                    # Operation(s) completed - check for error or success
+                    if failed:
+                        error_msg = failed["error"].get("message", "Unknown error")
+                    else:
+                        # Success - parse results (chunk results merged in offset order)
+                        response = _merge_operation_responses(operations)
+                        error_msg = _chunk_error(response, [c["gcsUri"] for c in existing_job.chunks])
 
-                if operation.get("done"):
-                    # Operation completed - check for error or success
-                    if "error" in operation:
-                        error_msg = operation["error"].get("message", "Unknown error")
+                    if error_msg:
                         logger.error(f"Transcription operation failed: {error_msg}")
 
                         await update_transcription_job(
@@ -268,48 +365,50 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
                                 "error": error_msg,
                             },
                         )
-                    else:
-                        # Success - parse results
-                        response = operation.get("response", {})
 
-                        # Debug: log response structure
-                        logger.debug(f"Transcription response keys: {response.keys()}")
-                        for uri, result in response.get("results", {}).items():
-                            logger.debug(f"Result for {uri}: keys={result.keys()}")
-                            if "inlineResult" in result:
-                                logger.debug(f"inlineResult keys: {result['inlineResult'].keys()}")
+                    # Debug: log response structure
+                    logger.debug(f"Transcription response keys: {response.keys()}")
+                    for uri, result in response.get("results", {}).items():
+                        logger.debug(f"Result for {uri}: keys={result.keys()}")
+                        if "inlineResult" in result:
+                            logger.debug(f"inlineResult keys: {result['inlineResult'].keys()}")
 
-                        transcript, segments = _parse_transcription_result(response)
+                    offsets_ms = {c["gcsUri"]: c.get("offsetMs", 0) for c in existing_job.chunks}
+                    transcript, segments = _parse_transcription_result(response, offsets_ms)
 
-                        logger.info(
-                            f"Transcription completed for job {existing_job.id}, "
-                            f"{len(segments)} segments, {len(transcript)} chars"
-                        )
+                    logger.info(
+                        f"Transcription completed for job {existing_job.id}, "
+                        f"{len(segments)} segments, {len(transcript)} chars"
+                    )
 
-                        await update_transcription_job(
-                            context.user_id,
-                            context.project_id,
-                            existing_job.id,
-                            {
-                                "status": "completed",
-                                "transcript": transcript,
-                                "segments": segments,
-                            },
-                        )
+                    segment_fields = await _store_segments(context, segments)
+                    await update_transcription_job(
+                        context.user_id,
+                        context.project_id,
+                        existing_job.id,
+                        {
+                            "status": "completed",
+                            "transcript": transcript,
+                            **segment_fields,
+                        },
+                    )
 
-                        return PipelineResult(
-                            status=StepStatus.SUCCEEDED,
-                            metadata={
-                                "message": "Transcription completed",
-                                "jobId": existing_job.id,
-                                "createdAt": existing_job.created_at,
-                                "transcript": transcript,
-                                "segments": segments,
-                            },
-                        )
+                    completed = replace(
+                        existing_job,
+                        status="completed",
+                        transcript=transcript,
+                        segments=segment_fields.get("segments", []),
+                        segments_track=segment_fields.get("segmentsTrack"),
+                        segments_preview=segment_fields.get("segmentsPreview", []),
+                    )
+                    return PipelineResult(
+                        status=StepStatus.SUCCEEDED,
+                        metadata=_completed_metadata(completed),
+                    )
                 else:
                     # Still processing
-                    logger.info(f"Transcription operation {existing_job.operation_name} still processing")
+                    pending = sum(1 for op in operations if not op.get("done"))
+                    logger.info(f"Transcription job {existing_job.id}: {pending} operation(s) still processing")
                     return PipelineResult(
                         status=StepStatus.WAITING,
                         metadata={
@@ -337,13 +436,16 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
     # Get GCS URI: prefer audio-extract FLAC (reliable for Speech-to-Text), then transcode
     # output, then cloud-upload. Raw video/audio codecs are often decoded as silence by the API.
     gcs_uri = context.params.get("audioGcsUri")
+    chunks: list[dict[str, Any]] = []
     if not gcs_uri:
         state = await get_pipeline_state(context.user_id, context.project_id, context.asset.id)
         steps = state.get("steps", [])
 
         audio_extract_step_state = next((s for s in steps if s["id"] == "audio-extract"), None)
         if audio_extract_step_state and audio_extract_step_state.get("status") == "succeeded":
-            gcs_uri = (audio_extract_step_state.get("metadata") or {}).get("audioForTranscriptionGcsUri")
+            audio_metadata = audio_extract_step_state.get("metadata") or {}
+            gcs_uri = audio_metadata.get("audioForTranscriptionGcsUri")
+            chunks = audio_metadata.get("chunks") or []
 
         if not gcs_uri:
             transcode_step = next((s for s in steps if s["id"] == "transcode"), None)
@@ -384,18 +486,36 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
         project_id=context.project_id,
     )
 
-    # Start batch recognition
-    operation_name = await _start_batch_recognize(
-        token=token,
-        project_id=env.project_id,
-        location=env.location,
-        recognizer_id=env.recognizer_id,
-        model=env.model,
-        gcs_uri=gcs_uri,
-        language_codes=language_codes,
-    )
+    # Start batch recognition; chunks go out as several concurrent multi-file requests
+    chunk_uris = [c["gcsUri"] for c in chunks if c.get("gcsUri")]
+    if len(chunk_uris) > 1:
+        batches = [
+            chunk_uris[i:i + BATCH_RECOGNIZE_MAX_FILES]
+            for i in range(0, len(chunk_uris), BATCH_RECOGNIZE_MAX_FILES)
+        ]
+        job.chunks = [
+            {"gcsUri": c["gcsUri"], "offsetMs": c.get("offsetMs", 0)} for c in chunks if c.get("gcsUri")
+        ]
+        logger.info(f"Transcribing {len(chunk_uris)} chunks in {len(batches)} batchRecognize request(s)")
+    else:
+        batches = [[gcs_uri]]
+
+    operation_names = await asyncio.gather(*(
+        _start_batch_recognize(
+            token=token,
+            project_id=env.project_id,
+            location=env.location,
+            recognizer_id=env.recognizer_id,
+            model=env.model,
+            gcs_uris=batch,
+            language_codes=language_codes,
+        )
+        for batch in batches
+    ))
 
-    job.operation_name = operation_name
+    job.operation_name = operation_names[0]
+    if len(operation_names) > 1:
+        job.operation_names = list(operation_names)
     await save_transcription_job(job)
 
     return PipelineResult(
@@ -404,5 +524,6 @@ async def transcription_step(context: PipelineContext) -> PipelineResult:
             "jobId": job.id,
             "createdAt": job.created_at,
             "languageCodes": language_codes,
+            "chunkCount": len(job.chunks) or 1,
         },
     )
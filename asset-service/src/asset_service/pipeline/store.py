@@ -130,6 +130,51 @@ async def get_all_pipeline_states(
     return states
 
 
+# Documents per batched Firestore read
+STATE_READ_BATCH_SIZE = 300
+
+
+async def get_step_statuses(
+    user_id: str,
+    project_id: str,
+    asset_ids: list[str],
+    step_id: str,
+    settings: Settings | None = None,
+) -> dict[str, str]:
+    """
+    Status of one step for many assets, read in batches (no per-asset round trips).
+
+    Assets without a pipeline state, or without the step, are reported as idle.
+    Unlike get_pipeline_state, missing states are not created.
+    """
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    assets_ref = (
+        db.collection("users")
+        .document(user_id)
+        .collection("projects")
+        .document(project_id)
+        .collection("assets")
+    )
+
+    statuses = {asset_id: "idle" for asset_id in asset_ids}
+    for start in range(0, len(asset_ids), STATE_READ_BATCH_SIZE):
+        refs = [
+            assets_ref.document(asset_id).collection("pipeline").document("state")
+            for asset_id in asset_ids[start:start + STATE_READ_BATCH_SIZE]
+        ]
+        docs = await asyncio.to_thread(lambda: list(db.get_all(refs)))
+        for doc in docs:
+            if not doc.exists:
+                continue
+            # .../assets/{assetId}/pipeline/state
+            asset_id = doc.reference.parent.parent.id
+            step = next((s for s in (doc.to_dict() or {}).get("steps", []) if s.get("id") == step_id), None)
+            if step:
+                statuses[asset_id] = step.get("status", "idle")
+    return statuses
+
+
 async def update_pipeline_state(
     user_id: str,
     project_id: str,
@@ -1,9 +1,20 @@
-"""Pub/Sub event publishing for asset pipeline."""
+"""Pub/Sub event publishing for asset pipeline.
+
+Publishing never blocks the caller: messages are handed to the client's
+batching publisher and results are logged from done-callbacks. Events carry
+the asset id as ordering key, so subscribers with message ordering enabled
+see an asset's events in order. Failed publishes go to a bounded in-memory
+retry buffer that is re-published ahead of the next event and flushed on
+shutdown.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
@@ -13,15 +24,123 @@ from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Give up on a buffered event after this many publish attempts
+MAX_PUBLISH_ATTEMPTS = 5
+
 _publisher: pubsub_v1.PublisherClient | None = None
+_publisher_lock = threading.Lock()
+
+
+@dataclass
+class _PendingEvent:
+    """A serialized pipeline event and its publish attempts so far."""
+
+    topic_path: str
+    data: bytes
+    ordering_key: str
+    event_type: str
+    asset_id: str
+    attempts: int = 1
+
+
+_retry_buffer: deque[_PendingEvent] = deque()
+_retry_lock = threading.Lock()
 
 
 def _get_publisher() -> pubsub_v1.PublisherClient:
-    """Get or create the publisher client."""
+    """Get or create the batching publisher client."""
     global _publisher
-    if _publisher is None:
-        _publisher = pubsub_v1.PublisherClient()
-    return _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            settings = get_settings()
+            _publisher = pubsub_v1.PublisherClient(
+                batch_settings=pubsub_v1.types.BatchSettings(
+                    max_messages=settings.pipeline_event_batch_max_messages,
+                    max_latency=settings.pipeline_event_batch_max_latency_seconds,
+                ),
+                publisher_options=pubsub_v1.types.PublisherOptions(
+                    enable_message_ordering=settings.pipeline_event_ordering_enabled,
+                ),
+            )
+        return _publisher
+
+
+def _buffer_for_retry(event: _PendingEvent) -> None:
+    """Keep a failed event for retry; the oldest is dropped when the buffer is full."""
+    if event.attempts >= MAX_PUBLISH_ATTEMPTS:
+        logger.error(
+            "[PIPELINE_PUBSUB] Dropping %s event for asset %s after %d attempts",
+            event.event_type,
+            event.asset_id,
+            event.attempts,
+        )
+        return
+    max_size = get_settings().pipeline_event_retry_buffer_size
+    with _retry_lock:
+        if len(_retry_buffer) >= max_size:
+            dropped = _retry_buffer.popleft()
+            logger.error(
+                "[PIPELINE_PUBSUB] Retry buffer full, dropping %s event for asset %s",
+                dropped.event_type,
+                dropped.asset_id,
+            )
+        _retry_buffer.append(event)
+
+
+def _publish(publisher: pubsub_v1.PublisherClient, event: _PendingEvent) -> None:
+    """Hand an event to the batching publisher; the outcome is handled in a callback."""
+
+    def _on_done(future) -> None:
+        try:
+            message_id = future.result()
+        except Exception as e:
+            logger.warning(
+                "[PIPELINE_PUBSUB] Failed to publish %s event for asset %s (attempt %d): %s",
+                event.event_type,
+                event.asset_id,
+                event.attempts,
+                e,
+            )
+            if event.ordering_key:
+                # A failed ordered publish pauses its key until resumed
+                try:
+                    publisher.resume_publish(event.topic_path, event.ordering_key)
+                except Exception:
+                    pass
+            event.attempts += 1
+            _buffer_for_retry(event)
+            return
+        logger.info(
+            "[PIPELINE_PUBSUB] Published %s event for asset %s (message_id=%s)",
+            event.event_type,
+            event.asset_id,
+            message_id,
+        )
+
+    kwargs = {"ordering_key": event.ordering_key} if event.ordering_key else {}
+    try:
+        future = publisher.publish(event.topic_path, event.data, **kwargs)
+    except Exception as e:
+        logger.warning(
+            "[PIPELINE_PUBSUB] Could not queue %s event for asset %s: %s",
+            event.event_type,
+            event.asset_id,
+            e,
+        )
+        event.attempts += 1
+        _buffer_for_retry(event)
+        return
+    future.add_done_callback(_on_done)
+
+
+def _drain_retry_buffer(publisher: pubsub_v1.PublisherClient) -> int:
+    """Re-publish buffered events (oldest first). Returns how many were queued."""
+    with _retry_lock:
+        pending = list(_retry_buffer)
+        _retry_buffer.clear()
+    for event in pending:
+        _publish(publisher, event)
+    return len(pending)
 
 
 def publish_pipeline_event(
@@ -34,13 +153,13 @@ def publish_pipeline_event(
     metadata: dict[str, Any] | None = None,
 ) -> None:
     """
-    Publish a pipeline event to Pub/Sub.
+    Publish a pipeline event to Pub/Sub without waiting for the result.
 
     Args:
         event_type: Event type (e.g., "pipeline.completed", "pipeline.failed")
         user_id: User ID
         project_id: Project ID
-        asset_id: Asset ID
+        asset_id: Asset ID (also the ordering key)
         asset_name: Asset name (optional)
         steps_summary: Summary of step results (optional)
         metadata: Additional metadata (optional)
@@ -62,22 +181,47 @@ def publish_pipeline_event(
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
+    event = _PendingEvent(
+        topic_path=topic_path,
+        data=json.dumps(payload).encode("utf-8"),
+        ordering_key=asset_id if settings.pipeline_event_ordering_enabled else "",
+        event_type=event_type,
+        asset_id=asset_id,
+    )
+
     try:
         publisher = _get_publisher()
-        data = json.dumps(payload).encode("utf-8")
-        future = publisher.publish(topic_path, data)
-        message_id = future.result(timeout=10)
-        logger.info(
-            "[PIPELINE_PUBSUB] Published %s event for asset %s (message_id=%s)",
-            event_type,
-            asset_id,
-            message_id,
-        )
     except Exception as e:
-        # Log but don't fail the pipeline if pub/sub fails
-        logger.warning(
-            "[PIPELINE_PUBSUB] Failed to publish %s event for asset %s: %s",
-            event_type,
-            asset_id,
-            e,
-        )
+        # Log but don't fail the pipeline if pub/sub is unavailable
+        logger.warning("[PIPELINE_PUBSUB] Publisher unavailable: %s", e)
+        _buffer_for_retry(event)
+        return
+
+    # Earlier failures go first so an asset's events stay in order where possible
+    _drain_retry_buffer(publisher)
+    _publish(publisher, event)
+
+
+def flush_pipeline_events() -> None:
+    """
+    Re-publish buffered events and send all pending batches.
+
+    Blocks until the publisher has flushed; call once on shutdown (in a thread).
+    Events that still fail are logged and lost.
+    """
+    global _publisher
+    with _publisher_lock:
+        publisher = _publisher
+        _publisher = None
+    if publisher is None:
+        with _retry_lock:
+            remaining = len(_retry_buffer)
+        if remaining:
+            logger.warning("[PIPELINE_PUBSUB] %d events were never published", remaining)
+        return
+
+    requeued = _drain_retry_buffer(publisher)
+    if requeued:
+        logger.info("[PIPELINE_PUBSUB] Re-publishing %d buffered events before shutdown", requeued)
+    # stop() sends all pending batches and waits for them
+    publisher.stop()
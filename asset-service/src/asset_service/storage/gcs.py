@@ -107,6 +107,30 @@ def download_from_gcs(
     return blob.download_as_bytes()
 
 
+def download_gcs_to_file(
+    gcs_uri: str,
+    file_path: str | Path,
+    settings: Settings | None = None,
+) -> None:
+    """Download a GCS object straight to a local file (streamed, never held in memory)."""
+    settings = settings or get_settings()
+
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    parts = gcs_uri[5:].split("/", 1)
+    if len(parts) != 2:
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    bucket_name, object_name = parts
+
+    client = _get_storage_client(settings)
+    bucket = client.bucket(bucket_name)
+    blob = bucket.blob(object_name)
+
+    blob.download_to_filename(str(file_path))
+
+
 def create_signed_url(
     object_name: str,
     bucket: str | None = None,
@@ -176,6 +200,27 @@ def delete_from_gcs(
         raise
 
 
+def get_object_generation(
+    gcs_uri: str,
+    settings: Settings | None = None,
+) -> int | None:
+    """Get the generation of a GCS object (changes whenever the object is rewritten)."""
+    settings = settings or get_settings()
+
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    parts = gcs_uri[5:].split("/", 1)
+    if len(parts) != 2:
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    bucket_name, object_name = parts
+
+    client = _get_storage_client(settings)
+    blob = client.bucket(bucket_name).get_blob(object_name)
+    return blob.generation if blob else None
+
+
 def check_exists(
     gcs_uri: str,
     settings: Settings | None = None,
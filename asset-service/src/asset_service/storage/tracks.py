@@ -0,0 +1,153 @@
+"""Out-of-document storage for large time-indexed arrays.
+
+Word-level transcripts and per-frame face boxes can run to tens of thousands of
+entries. Stored inline they push pipeline/job documents towards Firestore's
+1 MiB limit and every pipeline-state read carries them. Instead they are
+written to the asset bucket as gzip-compressed JSON lines sorted by time, and
+Firestore keeps only a small pointer plus summary fields. Slices by time range
+are served from the blob (see the tracks endpoint).
+
+Object: {userId}/{projectId}/tracks/{assetId}/{track}-{token}.jsonl.gz
+
+Object names are unique per write, so a downloaded track never goes stale and
+can be cached in-process.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from ..config import Settings, get_settings
+from .gcs import delete_from_gcs, download_from_gcs, upload_to_gcs
+
+logger = logging.getLogger(__name__)
+
+TRACK_TRANSCRIPT_WORDS = "transcript-words"
+TRACK_FACE_BOXES = "face-boxes"
+
+# Time field of each record and its units per second
+TRACK_TIME_FIELDS: dict[str, tuple[str, float]] = {
+    TRACK_TRANSCRIPT_WORDS: ("start", 1000.0),  # { start (ms), speech }
+    TRACK_FACE_BOXES: ("time", 1.0),  # { faceIndex, time (s), boundingBox }
+}
+
+TRACK_FORMAT = "jsonl.gz"
+TRACK_CACHE_MAX_ENTRIES = 8
+
+_cache: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def track_object_name(user_id: str, project_id: str, asset_id: str, track: str) -> str:
+    """Unique object name for a new version of an asset's track."""
+    return f"{user_id}/{project_id}/tracks/{asset_id}/{track}-{uuid.uuid4().hex[:12]}.{TRACK_FORMAT}"
+
+
+def _time_of(record: dict[str, Any], track: str) -> float:
+    field, per_second = TRACK_TIME_FIELDS[track]
+    value = record.get(field, 0)
+    return float(value) / per_second if isinstance(value, (int, float)) else 0.0
+
+
+def sort_track_records(records: list[dict[str, Any]], track: str) -> list[dict[str, Any]]:
+    """Records ordered by time (stable), as slice_track expects."""
+    if track not in TRACK_TIME_FIELDS:
+        raise ValueError(f"Unknown track: {track}")
+    return sorted(records, key=lambda r: _time_of(r, track))
+
+
+def write_track(
+    records: list[dict[str, Any]],
+    object_name: str,
+    track: str,
+    settings: Settings | None = None,
+) -> dict[str, Any]:
+    """
+    Sort records by time and upload them as a gzip JSON-lines blob.
+
+    Returns:
+        Pointer to store in Firestore: objectName, track, format, count,
+        startSeconds, endSeconds, size
+    """
+    settings = settings or get_settings()
+
+    ordered = sort_track_records(records, track)
+    body = "\n".join(json.dumps(r, separators=(",", ":")) for r in ordered)
+    # mtime=0 keeps the output byte-identical for identical input
+    payload = gzip.compress(body.encode("utf-8"), mtime=0)
+    upload_to_gcs(payload, object_name, "application/gzip", settings)
+
+    with _cache_lock:
+        _cache[object_name] = ordered
+        _cache.move_to_end(object_name)
+        while len(_cache) > TRACK_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+    return {
+        "objectName": object_name,
+        "track": track,
+        "format": TRACK_FORMAT,
+        "count": len(ordered),
+        "startSeconds": _time_of(ordered[0], track) if ordered else None,
+        "endSeconds": _time_of(ordered[-1], track) if ordered else None,
+        "size": len(payload),
+    }
+
+
+def read_track(object_name: str, settings: Settings | None = None) -> list[dict[str, Any]]:
+    """Download and decode a track blob (cached per object name)."""
+    with _cache_lock:
+        if object_name in _cache:
+            _cache.move_to_end(object_name)
+            return _cache[object_name]
+
+    settings = settings or get_settings()
+    payload = download_from_gcs(f"gs://{settings.asset_gcs_bucket}/{object_name}", settings)
+    records = [
+        json.loads(line)
+        for line in gzip.decompress(payload).decode("utf-8").splitlines()
+        if line.strip()
+    ]
+
+    with _cache_lock:
+        _cache[object_name] = records
+        _cache.move_to_end(object_name)
+        while len(_cache) > TRACK_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return records
+
+
+def slice_track(
+    records: list[dict[str, Any]],
+    track: str,
+    start_seconds: float | None = None,
+    end_seconds: float | None = None,
+) -> list[dict[str, Any]]:
+    """Records with start_seconds <= time < end_seconds (records must be time-sorted)."""
+    if track not in TRACK_TIME_FIELDS:
+        raise ValueError(f"Unknown track: {track}")
+    times = [_time_of(r, track) for r in records]
+    lo = bisect.bisect_left(times, start_seconds) if start_seconds is not None else 0
+    hi = bisect.bisect_left(times, end_seconds) if end_seconds is not None else len(records)
+    return records[lo:max(lo, hi)]
+
+
+def delete_track(pointer: dict[str, Any] | None, settings: Settings | None = None) -> None:
+    """Best-effort delete of a track blob."""
+    object_name = (pointer or {}).get("objectName")
+    if not object_name:
+        return
+    settings = settings or get_settings()
+    with _cache_lock:
+        _cache.pop(object_name, None)
+    try:
+        delete_from_gcs(f"gs://{settings.asset_gcs_bucket}/{object_name}", settings)
+    except Exception as e:
+        logger.warning(f"Failed to delete track {object_name}: {e}")
@@ -0,0 +1,222 @@
+"""Admission control for work entering the pipeline queue.
+
+Upload and pipeline endpoints check the live queue before enqueuing:
+
+- below ADMISSION_QUEUE_SOFT_LIMIT tasks on the main queue, work goes to
+  the main queue
+- up to ADMISSION_QUEUE_HARD_LIMIT, it is accepted but deferred to the
+  low-priority lane, which workers only drain when the main queue is empty
+- beyond that, the request is rejected (429 with Retry-After)
+
+Interactive limits count the main queue only, so a large backfill on the
+low-priority lane does not turn uploads away. The low-priority lane has its
+own limit (ADMISSION_LOW_QUEUE_LIMIT): deferrals past it are rejected, and
+bulk operations only enqueue as many tasks as fit under it.
+
+Uploads additionally reserve their size against a per-process in-flight
+budget (ADMISSION_MAX_INFLIGHT_UPLOAD_MB), so a burst of large uploads is
+turned away instead of exhausting the pod's memory.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import Settings, get_settings
+from .queue import PRIORITY_LOW, PRIORITY_NORMAL, TaskQueue
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ACCEPT = "accept"
+ADMISSION_DEFER = "defer"
+ADMISSION_REJECT = "reject"
+
+MIN_RETRY_AFTER_SECONDS = 5
+MAX_RETRY_AFTER_SECONDS = 600
+
+# Bytes of uploads currently being received/uploaded by this process
+_inflight_upload_bytes = 0
+
+
+@dataclass
+class QueueLoad:
+    """Snapshot of the pipeline queue."""
+
+    normal: int
+    low: int
+    worker_slots: int
+    avg_task_seconds: float
+
+    @property
+    def depth(self) -> int:
+        return self.normal + self.low
+
+    @property
+    def estimated_wait_seconds(self) -> float:
+        """Time until a newly queued task starts, if all workers drain the queue."""
+        return self.depth * self.avg_task_seconds / max(1, self.worker_slots)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "normal": self.normal,
+            "low": self.low,
+            "workerSlots": self.worker_slots,
+            "avgTaskSeconds": round(self.avg_task_seconds, 1),
+            "estimatedWaitSeconds": round(self.estimated_wait_seconds, 1),
+        }
+
+
+@dataclass
+class AdmissionDecision:
+    """Outcome of an admission check."""
+
+    action: str
+    priority: str = PRIORITY_NORMAL
+    retry_after: int | None = None
+    reason: str | None = None
+
+    @property
+    def rejected(self) -> bool:
+        return self.action == ADMISSION_REJECT
+
+
+async def get_queue_load(queue: TaskQueue, settings: Settings | None = None) -> QueueLoad:
+    settings = settings or get_settings()
+    depths = await queue.queue_depths()
+    # Workers heartbeat every lease/3 seconds; allow a few missed beats
+    slots = await queue.worker_slots(max_age_seconds=settings.pipeline_run_lease_seconds * 2)
+    avg = await queue.average_task_seconds()
+    return QueueLoad(
+        normal=depths[PRIORITY_NORMAL],
+        low=depths[PRIORITY_LOW],
+        worker_slots=slots or settings.worker_concurrency,
+        avg_task_seconds=avg or settings.admission_default_task_seconds,
+    )
+
+
+def _drain_seconds(tasks: int, load: QueueLoad) -> int:
+    seconds = max(1, tasks) * load.avg_task_seconds / max(1, load.worker_slots)
+    return int(min(MAX_RETRY_AFTER_SECONDS, max(MIN_RETRY_AFTER_SECONDS, seconds)))
+
+
+def _retry_after(load: QueueLoad, settings: Settings) -> int:
+    # Roughly the time for the main-queue backlog above the hard limit to drain
+    return _drain_seconds(load.normal - settings.admission_queue_hard_limit + 1, load)
+
+
+def _low_retry_after(load: QueueLoad, settings: Settings) -> int:
+    # The low lane only drains once the main queue is empty
+    return _drain_seconds(load.normal + load.low - settings.admission_low_queue_limit + 1, load)
+
+
+def decide_admission(load: QueueLoad, settings: Settings | None = None) -> AdmissionDecision:
+    """Map a queue snapshot to accept / defer / reject for interactive work."""
+    settings = settings or get_settings()
+    if not settings.admission_control_enabled:
+        return AdmissionDecision(ADMISSION_ACCEPT)
+    if load.normal >= settings.admission_queue_hard_limit:
+        return AdmissionDecision(
+            ADMISSION_REJECT,
+            retry_after=_retry_after(load, settings),
+            reason=f"Pipeline queue is full ({load.normal} tasks queued)",
+        )
+    if load.normal >= settings.admission_queue_soft_limit:
+        if load.low >= settings.admission_low_queue_limit:
+            return AdmissionDecision(
+                ADMISSION_REJECT,
+                retry_after=_low_retry_after(load, settings),
+                reason=f"Pipeline queue is full ({load.normal} queued, {load.low} deferred)",
+            )
+        return AdmissionDecision(
+            ADMISSION_DEFER,
+            priority=PRIORITY_LOW,
+            reason=f"Pipeline queue is busy ({load.normal} tasks queued)",
+        )
+    return AdmissionDecision(ADMISSION_ACCEPT)
+
+
+def decide_bulk_admission(
+    load: QueueLoad, requested: int, settings: Settings | None = None
+) -> tuple[AdmissionDecision, int]:
+    """
+    How many of requested bulk tasks fit on the low-priority lane.
+
+    Returns:
+        Tuple of (decision, number of tasks to enqueue now)
+    """
+    settings = settings or get_settings()
+    if not settings.admission_control_enabled:
+        return AdmissionDecision(ADMISSION_ACCEPT, priority=PRIORITY_LOW), requested
+    room = settings.admission_low_queue_limit - load.low
+    if room <= 0:
+        return AdmissionDecision(
+            ADMISSION_REJECT,
+            priority=PRIORITY_LOW,
+            retry_after=_low_retry_after(load, settings),
+            reason=f"Low-priority queue is full ({load.low} tasks queued)",
+        ), 0
+    return AdmissionDecision(ADMISSION_ACCEPT, priority=PRIORITY_LOW), min(requested, room)
+
+
+async def check_admission(queue: TaskQueue, settings: Settings | None = None) -> AdmissionDecision:
+    """Admission decision for new pipeline work; fails open if Redis cannot be read."""
+    settings = settings or get_settings()
+    if not settings.admission_control_enabled:
+        return AdmissionDecision(ADMISSION_ACCEPT)
+    try:
+        load = await get_queue_load(queue, settings)
+    except Exception as e:
+        logger.warning(f"Queue load unavailable, admitting without checks: {e}")
+        return AdmissionDecision(ADMISSION_ACCEPT)
+    decision = decide_admission(load, settings)
+    if decision.action != ADMISSION_ACCEPT:
+        logger.info(f"Admission {decision.action}: {decision.reason}")
+    return decision
+
+
+async def check_bulk_admission(
+    queue: TaskQueue, requested: int, settings: Settings | None = None
+) -> tuple[AdmissionDecision, int]:
+    """Bulk admission against the low-priority lane limit; fails open if Redis cannot be read."""
+    settings = settings or get_settings()
+    if not settings.admission_control_enabled:
+        return AdmissionDecision(ADMISSION_ACCEPT, priority=PRIORITY_LOW), requested
+    try:
+        load = await get_queue_load(queue, settings)
+    except Exception as e:
+        logger.warning(f"Queue load unavailable, admitting bulk work without checks: {e}")
+        return AdmissionDecision(ADMISSION_ACCEPT, priority=PRIORITY_LOW), requested
+    decision, allowed = decide_bulk_admission(load, requested, settings)
+    if decision.rejected:
+        logger.info(f"Bulk admission reject: {decision.reason}")
+    elif allowed < requested:
+        logger.info(f"Bulk admission capped at {allowed} of {requested} tasks ({load.low} low-priority queued)")
+    return decision, allowed
+
+
+def inflight_upload_bytes() -> int:
+    return _inflight_upload_bytes
+
+
+def try_reserve_upload(nbytes: int, settings: Settings | None = None) -> bool:
+    """
+    Reserve nbytes of the in-flight upload budget. False if it would be exceeded.
+
+    A single upload larger than the whole budget is still admitted when no
+    other upload is in flight, so large files are slowed down, not refused.
+    """
+    global _inflight_upload_bytes
+    settings = settings or get_settings()
+    budget = settings.admission_max_inflight_upload_mb * 1024 * 1024
+    if settings.admission_control_enabled and _inflight_upload_bytes and _inflight_upload_bytes + nbytes > budget:
+        return False
+    _inflight_upload_bytes += nbytes
+    return True
+
+
+def release_upload(nbytes: int) -> None:
+    global _inflight_upload_bytes
+    _inflight_upload_bytes = max(0, _inflight_upload_bytes - nbytes)
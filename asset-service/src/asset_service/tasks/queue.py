@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
 from typing import Any
@@ -16,7 +17,28 @@ from ..config import get_settings
 logger = logging.getLogger(__name__)
 
 PIPELINE_QUEUE = "pipeline_tasks"
+# Deferred work (admission control); workers only take from it when the main queue is empty
+PIPELINE_LOW_PRIORITY_QUEUE = "pipeline_tasks:low"
 TASK_STATUS_PREFIX = "task_status:"
+# Moving average of task run time, for wait estimates
+AVG_TASK_SECONDS_KEY = "pipeline_stats:avg_task_seconds"
+# Live workers: member "{workerId}|{concurrency}", score = last heartbeat (epoch seconds)
+WORKERS_KEY = "pipeline_workers"
+
+# Aggregate status of a bulk operation: hash of counters, per-task status keys are not written
+BULK_TASK_PREFIX = "bulk_task:"
+BULK_TASK_TTL_SECONDS = 60 * 60 * 24
+# Tasks per LPUSH when enqueuing a bulk operation
+BULK_ENQUEUE_CHUNK_SIZE = 500
+
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+_TASK_DURATION_SMOOTHING = 0.2
+
+
+def _queue_for(priority: str) -> str:
+    return PIPELINE_LOW_PRIORITY_QUEUE if priority == PRIORITY_LOW else PIPELINE_QUEUE
 
 
 class TaskQueue:
@@ -33,6 +55,7 @@ class TaskQueue:
         asset_data: dict[str, Any],
         asset_path: str,
         agent_metadata: dict[str, Any] | None = None,
+        priority: str = PRIORITY_NORMAL,
     ) -> str:
         task_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat() + "Z"
@@ -60,9 +83,9 @@ class TaskQueue:
         )
 
         # Push to queue
-        await self.redis.lpush(PIPELINE_QUEUE, json.dumps(task))
+        await self.redis.lpush(_queue_for(priority), json.dumps(task))
 
-        logger.info(f"Enqueued pipeline task {task_id} for asset {asset_id}")
+        logger.info(f"Enqueued pipeline task {task_id} for asset {asset_id} ({priority} priority)")
         return task_id
 
     async def enqueue_transcode(
@@ -74,6 +97,7 @@ class TaskQueue:
         params: dict[str, Any],
         trigger_pipeline_after: bool = False,
         agent_metadata: dict[str, Any] | None = None,
+        priority: str = PRIORITY_NORMAL,
     ) -> str:
         task_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat() + "Z"
@@ -100,10 +124,10 @@ class TaskQueue:
             ex=60 * 60 * 24,
         )
 
-        await self.redis.lpush(PIPELINE_QUEUE, json.dumps(task))
+        await self.redis.lpush(_queue_for(priority), json.dumps(task))
 
         logger.info(
-            f"Enqueued transcode task {task_id} for asset {asset_id}"
+            f"Enqueued transcode task {task_id} for asset {asset_id} ({priority} priority)"
             + (" (pipeline after)" if trigger_pipeline_after else "")
         )
         return task_id
@@ -117,6 +141,7 @@ class TaskQueue:
         step_id: str,
         asset_path: str = "",
         params: dict[str, Any] | None = None,
+        priority: str = PRIORITY_NORMAL,
     ) -> str:
         """
         Enqueue a single pipeline step for background processing.
@@ -150,18 +175,136 @@ class TaskQueue:
         )
 
         # Push to queue
-        await self.redis.lpush(PIPELINE_QUEUE, json.dumps(task))
+        await self.redis.lpush(_queue_for(priority), json.dumps(task))
 
         logger.info(f"Enqueued step task {task_id} for asset {asset_id}, step {step_id}")
         return task_id
 
+    async def enqueue_bulk_steps(
+        self,
+        user_id: str,
+        project_id: str,
+        step_id: str,
+        assets: list[dict[str, Any]],
+        params: dict[str, Any] | None = None,
+        priority: str = PRIORITY_LOW,
+    ) -> str:
+        """
+        Enqueue one step task per asset as a single bulk operation.
+
+        All writes go out in one Redis pipeline: the aggregate status hash and
+        chunked LPUSHes of the tasks. Returns the bulk task id; workers report
+        progress into its counters (see get_bulk_status).
+        """
+        bulk_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat() + "Z"
+        key = f"{BULK_TASK_PREFIX}{bulk_id}"
+
+        tasks = [
+            json.dumps({
+                "id": str(uuid.uuid4()),
+                "type": "step",
+                "bulk_id": bulk_id,
+                "payload": {
+                    "user_id": user_id,
+                    "project_id": project_id,
+                    "asset_id": asset["id"],
+                    "asset_data": asset,
+                    "step_id": step_id,
+                    "asset_path": "",
+                    "params": params or {},
+                },
+                "status": "pending",
+                "created_at": now,
+            })
+            for asset in assets
+        ]
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "userId": user_id,
+                    "projectId": project_id,
+                    "stepId": step_id,
+                    "total": len(tasks),
+                    "completed": 0,
+                    "failed": 0,
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+            pipe.expire(key, BULK_TASK_TTL_SECONDS)
+            for start in range(0, len(tasks), BULK_ENQUEUE_CHUNK_SIZE):
+                pipe.lpush(_queue_for(priority), *tasks[start:start + BULK_ENQUEUE_CHUNK_SIZE])
+            await pipe.execute()
+
+        logger.info(
+            f"Enqueued bulk task {bulk_id}: step {step_id} for {len(tasks)} assets "
+            f"in project {project_id} ({priority} priority)"
+        )
+        return bulk_id
+
+    async def record_bulk_progress(
+        self,
+        counts: dict[str, dict[str, int]],
+        errors: dict[str, str] | None = None,
+    ) -> None:
+        """Add buffered completed/failed counts (bulk id -> field -> n) in one round trip."""
+        if not counts:
+            return
+        now = datetime.utcnow().isoformat() + "Z"
+        errors = errors or {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for bulk_id, fields in counts.items():
+                key = f"{BULK_TASK_PREFIX}{bulk_id}"
+                for field, amount in fields.items():
+                    pipe.hincrby(key, field, amount)
+                updates = {"updatedAt": now}
+                if bulk_id in errors:
+                    updates["lastError"] = errors[bulk_id]
+                pipe.hset(key, mapping=updates)
+                pipe.expire(key, BULK_TASK_TTL_SECONDS)
+            await pipe.execute()
+
+    async def get_bulk_status(self, bulk_id: str) -> dict[str, Any] | None:
+        """Aggregate progress of a bulk operation."""
+        data = await self.redis.hgetall(f"{BULK_TASK_PREFIX}{bulk_id}")
+        if not data:
+            return None
+        total = int(data.get("total") or 0)
+        completed = int(data.get("completed") or 0)
+        failed = int(data.get("failed") or 0)
+        done = completed + failed
+        if done >= total:
+            status = "completed"
+        elif done:
+            status = "running"
+        else:
+            status = "pending"
+        return {
+            "taskId": bulk_id,
+            "userId": data.get("userId"),
+            "projectId": data.get("projectId"),
+            "stepId": data.get("stepId"),
+            "status": status,
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "pending": max(0, total - done),
+            "lastError": data.get("lastError"),
+            "createdAt": data.get("createdAt"),
+            "updatedAt": data.get("updatedAt"),
+        }
+
     async def dequeue(self, timeout: int = 5) -> dict[str, Any] | None:
         """
-        Dequeue a task from the queue.
+        Dequeue a task, preferring the main queue over the low-priority lane.
 
         Returns None if no task is available within timeout.
         """
-        result = await self.redis.brpop(PIPELINE_QUEUE, timeout=timeout)
+        # BRPOP checks the keys in order
+        result = await self.redis.brpop([PIPELINE_QUEUE, PIPELINE_LOW_PRIORITY_QUEUE], timeout=timeout)
         if result is None:
             return None
 
@@ -195,6 +338,42 @@ class TaskQueue:
             return None
         return json.loads(data)
 
+    async def queue_depths(self) -> dict[str, int]:
+        """Number of queued tasks per priority lane."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(PIPELINE_QUEUE)
+            pipe.llen(PIPELINE_LOW_PRIORITY_QUEUE)
+            normal, low = await pipe.execute()
+        return {PRIORITY_NORMAL: int(normal), PRIORITY_LOW: int(low)}
+
+    async def record_task_duration(self, seconds: float) -> None:
+        """Fold a finished task's run time into the moving average."""
+        previous = await self.redis.get(AVG_TASK_SECONDS_KEY)
+        average = (
+            seconds
+            if previous is None
+            else (1 - _TASK_DURATION_SMOOTHING) * float(previous) + _TASK_DURATION_SMOOTHING * seconds
+        )
+        await self.redis.set(AVG_TASK_SECONDS_KEY, f"{average:.3f}")
+
+    async def average_task_seconds(self) -> float | None:
+        value = await self.redis.get(AVG_TASK_SECONDS_KEY)
+        return float(value) if value is not None else None
+
+    async def register_worker(self, worker_id: str, concurrency: int) -> None:
+        """Heartbeat a worker process and its concurrency."""
+        await self.redis.zadd(WORKERS_KEY, {f"{worker_id}|{concurrency}": time.time()})
+
+    async def unregister_worker(self, worker_id: str, concurrency: int) -> None:
+        await self.redis.zrem(WORKERS_KEY, f"{worker_id}|{concurrency}")
+
+    async def worker_slots(self, max_age_seconds: float) -> int:
+        """Total concurrency of workers that sent a heartbeat within max_age_seconds."""
+        cutoff = time.time() - max_age_seconds
+        await self.redis.zremrangebyscore(WORKERS_KEY, "-inf", cutoff)
+        members = await self.redis.zrangebyscore(WORKERS_KEY, cutoff, "+inf")
+        return sum(int(member.rsplit("|", 1)[1]) for member in members if "|" in member)
+
 
 _task_queue: TaskQueue | None = None
 
@@ -0,0 +1,245 @@
+"""Checkpointed pipeline runs that survive worker restarts.
+
+Every pipeline task gets a run record in Redis (hash ``pipeline_run:{runId}``)
+holding the original task, the run status, the local asset file and, per
+step, the number of attempts and the last status reported by the runner.
+The worker that executes a run holds a lease (``pipeline_run_lease:{runId}``,
+value = worker id) and renews it while the run is in flight.
+
+A run stays in the ``pipeline_runs:active`` set until it completes or fails.
+When a worker stops mid-run (shutdown, deploy, crash) its lease is released
+or expires, and any worker can claim the run and continue it: steps already
+succeeded in the pipeline state are skipped, steps left ``running`` by the
+interrupted attempt are run again (up to a per-step attempt limit), and the
+local file is reused when it is still on disk.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+RUN_PREFIX = "pipeline_run:"
+RUN_LEASE_PREFIX = "pipeline_run_lease:"
+ACTIVE_RUNS_KEY = "pipeline_runs:active"
+RUN_TTL_SECONDS = 60 * 60 * 24
+
+RUN_STATUS_RUNNING = "running"
+RUN_STATUS_INTERRUPTED = "interrupted"
+RUN_STATUS_COMPLETED = "completed"
+RUN_STATUS_FAILED = "failed"
+
+# Renew / release only while the lease still belongs to the caller
+_RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def new_worker_id() -> str:
+    """Identify this process as a lease owner (host:pid:token)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+@dataclass
+class StepAttempt:
+    """Attempt state of one step within a run."""
+
+    attempts: int = 0
+    status: str = "idle"
+
+
+@dataclass
+class PipelineRun:
+    """A pipeline run record as stored in Redis."""
+
+    run_id: str
+    task: dict[str, Any]
+    status: str = RUN_STATUS_RUNNING
+    owner: str | None = None
+    local_path: str | None = None
+    resumes: int = 0
+    created_at: str | None = None
+    updated_at: str | None = None
+    steps: dict[str, StepAttempt] = field(default_factory=dict)
+
+    @classmethod
+    def from_hash(cls, run_id: str, data: dict[str, str]) -> "PipelineRun":
+        steps: dict[str, StepAttempt] = {}
+        for key, value in data.items():
+            if key.startswith("step:"):
+                steps.setdefault(key[5:], StepAttempt()).status = value
+            elif key.startswith("attempts:"):
+                steps.setdefault(key[9:], StepAttempt()).attempts = int(value)
+        return cls(
+            run_id=run_id,
+            task=json.loads(data.get("task") or "{}"),
+            status=data.get("status", RUN_STATUS_RUNNING),
+            owner=data.get("owner") or None,
+            local_path=data.get("localPath") or None,
+            resumes=int(data.get("resumes") or 0),
+            created_at=data.get("createdAt"),
+            updated_at=data.get("updatedAt"),
+            steps=steps,
+        )
+
+    def interrupted_step_ids(self) -> list[str]:
+        """
+        Steps that may have been cut off mid-attempt: started without reporting
+        a result, or waiting (a poll marks the step running in the pipeline state).
+        """
+        return [
+            step_id
+            for step_id, step in self.steps.items()
+            if step.status in ("running", "waiting")
+        ]
+
+
+class PipelineRunStore:
+    """Redis persistence for pipeline run records and their leases."""
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self._renew = redis_client.register_script(_RENEW_LEASE_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_LEASE_SCRIPT)
+
+    async def create(
+        self,
+        run_id: str,
+        task: dict[str, Any],
+        owner: str,
+        lease_seconds: int,
+        local_path: str | None = None,
+    ) -> None:
+        """Record a new run and take its lease."""
+        now = _now()
+        key = f"{RUN_PREFIX}{run_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "task": json.dumps(task),
+                    "status": RUN_STATUS_RUNNING,
+                    "owner": owner,
+                    "localPath": local_path or "",
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+            pipe.expire(key, RUN_TTL_SECONDS)
+            pipe.set(f"{RUN_LEASE_PREFIX}{run_id}", owner, px=lease_seconds * 1000)
+            pipe.sadd(ACTIVE_RUNS_KEY, run_id)
+            await pipe.execute()
+
+    async def get(self, run_id: str) -> PipelineRun | None:
+        data = await self.redis.hgetall(f"{RUN_PREFIX}{run_id}")
+        if not data:
+            return None
+        return PipelineRun.from_hash(run_id, data)
+
+    async def update(self, run_id: str, **fields: Any) -> None:
+        """Set top-level fields (status, owner, localPath) on a run."""
+        key = f"{RUN_PREFIX}{run_id}"
+        mapping = {k: "" if v is None else str(v) for k, v in fields.items()}
+        mapping["updatedAt"] = _now()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, RUN_TTL_SECONDS)
+            await pipe.execute()
+
+    async def record_step(self, run_id: str, step_id: str, status: str) -> None:
+        """Record a step status; a ``running`` status counts as a new attempt."""
+        key = f"{RUN_PREFIX}{run_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={f"step:{step_id}": status, "updatedAt": _now()})
+            if status == "running":
+                pipe.hincrby(key, f"attempts:{step_id}", 1)
+            pipe.expire(key, RUN_TTL_SECONDS)
+            await pipe.execute()
+
+    async def finish(self, run_id: str, owner: str, status: str) -> None:
+        """Mark a run completed/failed, drop it from the active set and release the lease."""
+        await self.update(run_id, status=status)
+        await self.redis.srem(ACTIVE_RUNS_KEY, run_id)
+        await self.release_lease(run_id, owner)
+
+    async def claim_lease(self, run_id: str, owner: str, lease_seconds: int) -> bool:
+        """Take the lease of a run nobody holds."""
+        return bool(
+            await self.redis.set(
+                f"{RUN_LEASE_PREFIX}{run_id}", owner, px=lease_seconds * 1000, nx=True
+            )
+        )
+
+    async def renew_lease(self, run_id: str, owner: str, lease_seconds: int) -> bool:
+        """Extend a lease held by owner. False if it was lost."""
+        renewed = await self._renew(
+            keys=[f"{RUN_LEASE_PREFIX}{run_id}"], args=[owner, lease_seconds * 1000]
+        )
+        return bool(renewed)
+
+    async def release_lease(self, run_id: str, owner: str) -> None:
+        await self._release(keys=[f"{RUN_LEASE_PREFIX}{run_id}"], args=[owner])
+
+    async def claim_interrupted(
+        self, owner: str, lease_seconds: int, limit: int
+    ) -> list[PipelineRun]:
+        """
+        Claim up to ``limit`` active runs whose lease was released or has expired.
+
+        Runs whose record has expired are dropped from the active set.
+        """
+        claimed: list[PipelineRun] = []
+        if limit <= 0:
+            return claimed
+
+        for run_id in await self.redis.smembers(ACTIVE_RUNS_KEY):
+            if len(claimed) >= limit:
+                break
+            if await self.redis.exists(f"{RUN_LEASE_PREFIX}{run_id}"):
+                continue
+            if not await self.claim_lease(run_id, owner, lease_seconds):
+                continue
+
+            run = await self.get(run_id)
+            if run is None or run.status in (RUN_STATUS_COMPLETED, RUN_STATUS_FAILED):
+                # Finished (or expired) between the scan and the claim
+                await self.redis.srem(ACTIVE_RUNS_KEY, run_id)
+                await self.release_lease(run_id, owner)
+                continue
+
+            resumes = await self.redis.hincrby(f"{RUN_PREFIX}{run_id}", "resumes", 1)
+            run.resumes = int(resumes)
+            previous_owner = run.owner
+            run.owner = owner
+            await self.update(run_id, owner=owner, status=RUN_STATUS_RUNNING)
+            logger.info(
+                "Claimed interrupted pipeline run %s (previous owner %s, resume %d)",
+                run_id,
+                previous_owner,
+                run.resumes,
+            )
+            claimed.append(run)
+        return claimed
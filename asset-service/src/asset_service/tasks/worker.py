@@ -7,18 +7,33 @@ import logging
 import os
 import tempfile
 import threading
-from typing import Any
+import time
+from datetime import datetime
+from typing import Any, Callable
 
 from ..config import get_settings
-from ..pipeline.registry import run_auto_steps, run_step
+from ..http_client import close_http_clients
+from ..pipeline.registry import get_step, run_auto_steps, run_step
 from ..pipeline.steps.transcode import run_transcode_for_asset
+from ..pipeline.store import update_pipeline_step
 from ..pipeline.types import StoredAsset
 from ..storage.firestore import get_asset
-from ..storage.gcs import download_from_gcs
+from ..storage.gcs import download_gcs_to_file
 from .queue import TaskQueue, get_task_queue
+from .runs import (
+    RUN_STATUS_COMPLETED,
+    RUN_STATUS_FAILED,
+    RUN_STATUS_INTERRUPTED,
+    PipelineRun,
+    PipelineRunStore,
+    new_worker_id,
+)
 
 logger = logging.getLogger(__name__)
 
+# How often buffered bulk operation counters are written to Redis
+BULK_PROGRESS_FLUSH_SECONDS = 2.0
+
 # Global shutdown event for signaling threads to stop
 _shutdown_event = threading.Event()
 
@@ -38,25 +53,60 @@ def reset_shutdown() -> None:
     _shutdown_event.clear()
 
 
+def _run_cache_dir() -> str:
+    return get_settings().pipeline_run_cache_dir or os.path.join(
+        tempfile.gettempdir(), "asset-service-runs"
+    )
+
+
+def _is_run_cache_file(path: str | None) -> bool:
+    """Whether a file was downloaded for a run (and is the run's to delete)."""
+    if not path:
+        return False
+    return os.path.dirname(os.path.abspath(path)) == os.path.abspath(_run_cache_dir())
+
+
+def _remove_file(path: str | None) -> None:
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove {path}: {e}")
+
+
 def _run_pipeline_in_thread(
     user_id: str,
     project_id: str,
     asset: StoredAsset,
     asset_path: str,
     agent_metadata: dict[str, Any] | None,
+    on_step: Callable[[str, str], None] | None = None,
+    rerun_step_ids: set[str] | None = None,
 ) -> None:
     """
     Run the pipeline in a dedicated thread with its own event loop.
     Keeps blocking I/O (ffmpeg, GCS) from blocking the main server event loop.
+    Outbound HTTP clients opened on this loop are shared by all steps of the run.
     """
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
         loop.run_until_complete(
-            run_auto_steps(user_id, project_id, asset, asset_path, agent_metadata)
+            run_auto_steps(
+                user_id,
+                project_id,
+                asset,
+                asset_path,
+                agent_metadata,
+                on_step=on_step,
+                rerun_step_ids=rerun_step_ids,
+            )
         )
     finally:
-        loop.close()
+        try:
+            loop.run_until_complete(close_http_clients())
+        finally:
+            loop.close()
 
 
 class PipelineWorker:
@@ -67,6 +117,15 @@ class PipelineWorker:
         self.running = False
         self._tasks: list[asyncio.Task[None]] = []
         self._shutdown_event = asyncio.Event()
+        # Pipeline runs: this process is the lease owner of every run it executes
+        self.worker_id = new_worker_id()
+        self.runs = PipelineRunStore(queue.redis)
+        self._held_runs: set[str] = set()
+        self._resumed: asyncio.Queue[PipelineRun] = asyncio.Queue()
+        self._busy = 0
+        # Bulk operation progress, buffered and flushed in batches (bulk id -> field -> count)
+        self._bulk_counts: dict[str, dict[str, int]] = {}
+        self._bulk_errors: dict[str, str] = {}
 
     async def start(self) -> None:
         """Start the worker loops (concurrency determined by config)."""
@@ -84,7 +143,14 @@ class PipelineWorker:
         self._tasks = [
             asyncio.create_task(self._run(worker_id=i)) for i in range(concurrency)
         ]
-        logger.info("Pipeline worker started with %d concurrent workers", concurrency)
+        # Renews leases and picks up interrupted runs (first scan runs immediately)
+        self._tasks.append(asyncio.create_task(self._maintain_runs()))
+        self._tasks.append(asyncio.create_task(self._flush_bulk_progress_loop()))
+        logger.info(
+            "Pipeline worker %s started with %d concurrent workers",
+            self.worker_id,
+            concurrency,
+        )
 
     async def stop(self) -> None:
         """Stop the worker loops gracefully."""
@@ -93,6 +159,20 @@ class PipelineWorker:
         self._shutdown_event.set()
         signal_shutdown()  # Signal threads to stop
 
+        try:
+            await self.queue.unregister_worker(self.worker_id, get_settings().worker_concurrency)
+        except Exception as e:
+            logger.warning(f"Failed to unregister worker: {e}")
+
+        # Hand claimed-but-unstarted runs straight back to other workers
+        while not self._resumed.empty():
+            run = self._resumed.get_nowait()
+            self._held_runs.discard(run.run_id)
+            try:
+                await self.runs.release_lease(run.run_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Failed to release pipeline run {run.run_id}: {e}")
+
         if self._tasks:
             for task in self._tasks:
                 task.cancel()
@@ -106,12 +186,19 @@ class PipelineWorker:
             except Exception as e:
                 logger.warning(f"Error waiting for worker tasks: {e}")
             self._tasks = []
+        await self._flush_bulk_progress()
         logger.info("Pipeline worker stopped")
 
     async def _run(self, worker_id: int = 0) -> None:
         """Main worker loop. Multiple instances run in parallel for concurrency."""
         while self.running:
             try:
+                # Interrupted runs claimed by this process go before new work
+                if not self._resumed.empty():
+                    run = self._resumed.get_nowait()
+                    await self._process_task(run.task, worker_id, run=run)
+                    continue
+
                 # Use shorter timeout and check shutdown more frequently
                 task = await self._dequeue_with_shutdown_check(timeout=1)
                 if task is None:
@@ -143,35 +230,83 @@ class PipelineWorker:
         except asyncio.CancelledError:
             raise
 
+    async def _maintain_runs(self) -> None:
+        """Renew leases of runs in flight and claim interrupted runs while there is capacity."""
+        settings = get_settings()
+        lease_seconds = settings.pipeline_run_lease_seconds
+        while self.running:
+            try:
+                # Worker heartbeat feeds queue wait estimates (admission control, /health)
+                await self.queue.register_worker(self.worker_id, settings.worker_concurrency)
+            except Exception as e:
+                logger.warning(f"Failed to register worker heartbeat: {e}")
+
+            for run_id in list(self._held_runs):
+                try:
+                    if not await self.runs.renew_lease(run_id, self.worker_id, lease_seconds):
+                        logger.warning(f"Lost lease on pipeline run {run_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to renew lease on pipeline run {run_id}: {e}")
+
+            capacity = settings.worker_concurrency - self._busy - self._resumed.qsize()
+            if capacity > 0 and not is_shutting_down():
+                try:
+                    for run in await self.runs.claim_interrupted(
+                        self.worker_id, lease_seconds, capacity
+                    ):
+                        self._held_runs.add(run.run_id)
+                        self._resumed.put_nowait(run)
+                except Exception as e:
+                    logger.warning(f"Failed to claim interrupted pipeline runs: {e}")
+
+            await asyncio.sleep(max(1.0, lease_seconds / 3))
+
     async def _process_task(
-        self, task: dict[str, Any], worker_id: int = 0
+        self,
+        task: dict[str, Any],
+        worker_id: int = 0,
+        run: PipelineRun | None = None,
     ) -> None:
-        """Process a single task."""
+        """Process a single task (or resume an interrupted pipeline run)."""
         task_id = task["id"]
         task_type = task["type"]
         payload = task["payload"]
+        # Tasks of a bulk operation report into its counters instead of a status key each
+        bulk_id = task.get("bulk_id")
 
         logger.info(
-            "Processing task %s (type: %s) [worker %d]",
+            "%s task %s (type: %s) [worker %d]",
+            "Resuming" if run else "Processing",
             task_id,
             task_type,
             worker_id,
         )
 
+        self._busy += 1
+        started = time.monotonic()
+        step_status: str | None = None
         try:
-            await self.queue.update_task_status(task_id, "running")
+            if not bulk_id:
+                await self.queue.update_task_status(task_id, "running")
 
             if task_type == "pipeline":
-                await self._process_pipeline_task(payload)
+                await self._process_pipeline_task(task, run)
             elif task_type == "transcode":
                 await self._process_transcode_task(payload)
             elif task_type == "step":
-                await self._process_step_task(payload)
+                step_status = await self._process_step_task(payload)
             else:
                 raise ValueError(f"Unknown task type: {task_type}")
 
             if not is_shutting_down():
-                await self.queue.update_task_status(task_id, "completed")
+                if bulk_id:
+                    if step_status == "failed":
+                        self._record_bulk(bulk_id, "failed", f"Step failed for asset {payload.get('asset_id')}")
+                    else:
+                        self._record_bulk(bulk_id, "completed")
+                else:
+                    await self.queue.update_task_status(task_id, "completed")
+                await self.queue.record_task_duration(time.monotonic() - started)
                 logger.info(f"Task {task_id} completed")
 
         except asyncio.CancelledError:
@@ -180,10 +315,110 @@ class PipelineWorker:
         except Exception as e:
             logger.exception(f"Task {task_id} failed: {e}")
             if not is_shutting_down():
-                await self.queue.update_task_status(task_id, "failed", str(e))
+                if bulk_id:
+                    self._record_bulk(bulk_id, "failed", f"{payload.get('asset_id')}: {e}")
+                else:
+                    await self.queue.update_task_status(task_id, "failed", str(e))
+        finally:
+            self._busy -= 1
+
+    def _record_bulk(self, bulk_id: str, field: str, error: str | None = None) -> None:
+        counts = self._bulk_counts.setdefault(bulk_id, {})
+        counts[field] = counts.get(field, 0) + 1
+        if error:
+            self._bulk_errors[bulk_id] = error
+
+    async def _flush_bulk_progress(self) -> None:
+        """Write buffered bulk counters in one round trip; kept for the next flush on failure."""
+        if not self._bulk_counts:
+            return
+        counts, errors = self._bulk_counts, self._bulk_errors
+        self._bulk_counts, self._bulk_errors = {}, {}
+        try:
+            await self.queue.record_bulk_progress(counts, errors)
+        except Exception as e:
+            logger.warning(f"Failed to flush bulk progress: {e}")
+            for bulk_id, fields in counts.items():
+                for field, amount in fields.items():
+                    pending = self._bulk_counts.setdefault(bulk_id, {})
+                    pending[field] = pending.get(field, 0) + amount
+            for bulk_id, error in errors.items():
+                self._bulk_errors.setdefault(bulk_id, error)
+
+    async def _flush_bulk_progress_loop(self) -> None:
+        while self.running:
+            try:
+                await asyncio.sleep(BULK_PROGRESS_FLUSH_SECONDS)
+                await self._flush_bulk_progress()
+            except asyncio.CancelledError:
+                break
+
+    async def _download_for_run(self, run_id: str, asset: StoredAsset, gcs_uri: str) -> str:
+        """Download the asset into the run cache (atomically, so a partial file is never reused)."""
+        cache_dir = _run_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        suffix = os.path.splitext(asset.file_name)[1] or ""
+        path = os.path.join(cache_dir, f"{run_id}{suffix}")
+        settings = get_settings()
+        partial = f"{path}.part"
+        # Stream to disk in the thread pool; large videos are never held in memory
+        await asyncio.to_thread(download_gcs_to_file, gcs_uri, partial, settings)
+        os.replace(partial, path)
+        return path
+
+    async def _prepare_resume(
+        self,
+        run: PipelineRun,
+        user_id: str,
+        project_id: str,
+        asset: StoredAsset,
+    ) -> set[str] | None:
+        """
+        Decide which interrupted steps to run again.
+
+        Steps that already used up their attempts are marked failed. Returns
+        None when the run itself has been resumed too often and is abandoned.
+        """
+        settings = get_settings()
+        if run.resumes > settings.pipeline_run_max_resumes:
+            logger.error(
+                f"Abandoning pipeline run {run.run_id} for asset {asset.id} "
+                f"after {run.resumes - 1} resumes"
+            )
+            return None
 
-    async def _process_pipeline_task(self, payload: dict[str, Any]) -> None:
-        """Process a full pipeline task."""
+        rerun: set[str] = set()
+        for step_id in run.interrupted_step_ids():
+            attempts = run.steps[step_id].attempts
+            if attempts < settings.pipeline_run_max_step_attempts:
+                rerun.add(step_id)
+                continue
+            logger.error(f"Step {step_id} of run {run.run_id} interrupted {attempts} times; marking failed")
+            step = get_step(step_id)
+            now = datetime.utcnow().isoformat() + "Z"
+            await update_pipeline_step(
+                user_id,
+                project_id,
+                asset.id,
+                step_id,
+                {
+                    "id": step_id,
+                    "label": step.label if step else step_id,
+                    "status": "failed",
+                    "error": f"Interrupted {attempts} times by worker restarts",
+                    "updatedAt": now,
+                },
+            )
+            await self.runs.record_step(run.run_id, step_id, "failed")
+        logger.info(f"Resuming pipeline run {run.run_id}; re-running interrupted steps {sorted(rerun)}")
+        return rerun
+
+    async def _process_pipeline_task(
+        self, task: dict[str, Any], run: PipelineRun | None = None
+    ) -> None:
+        """Process a full pipeline task as a checkpointed run (run id = task id)."""
+        payload = task["payload"]
+        run_id = task["id"]
         user_id = payload["user_id"]
         project_id = payload["project_id"]
         asset_data = payload["asset_data"]
@@ -191,31 +426,56 @@ class PipelineWorker:
         agent_metadata = payload.get("agent_metadata")
 
         asset = StoredAsset.from_dict(asset_data)
+        settings = get_settings()
+
+        rerun_step_ids: set[str] | None = None
+        if run is None:
+            await self.runs.create(
+                run_id,
+                task,
+                self.worker_id,
+                settings.pipeline_run_lease_seconds,
+                local_path=asset_path or None,
+            )
+            self._held_runs.add(run_id)
+        else:
+            rerun_step_ids = await self._prepare_resume(run, user_id, project_id, asset)
+            if rerun_step_ids is None:
+                await self.runs.finish(run_id, self.worker_id, RUN_STATUS_FAILED)
+                self._held_runs.discard(run_id)
+                if _is_run_cache_file(run.local_path):
+                    _remove_file(run.local_path)
+                raise RuntimeError("Pipeline run interrupted too many times")
+            # Reuse the local copy from the interrupted attempt when it is still on disk
+            if run.local_path and os.path.exists(run.local_path):
+                asset_path = run.local_path
+
+        try:
+            # If no local path provided, download from GCS
+            if not asset_path or not os.path.exists(asset_path):
+                if is_shutting_down():
+                    raise asyncio.CancelledError("Shutdown in progress")
+
+                asset_path = None
+                gcs_uri = asset_data.get("gcsUri")
+                if gcs_uri:
+                    asset_path = await self._download_for_run(run_id, asset, gcs_uri)
+                    await self.runs.update(run_id, localPath=asset_path)
+
+            if not asset_path:
+                raise ValueError("No asset file available for pipeline processing")
 
-        # If no local path provided, download from GCS
-        temp_path = None
-        if not asset_path or not os.path.exists(asset_path):
             if is_shutting_down():
                 raise asyncio.CancelledError("Shutdown in progress")
 
-            gcs_uri = asset_data.get("gcsUri")
-            if gcs_uri:
-                settings = get_settings()
-                # Run blocking GCS download in thread pool
-                content = await asyncio.to_thread(download_from_gcs, gcs_uri, settings)
-                suffix = os.path.splitext(asset.file_name)[1] or ""
-                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                    tmp.write(content)
-                    temp_path = tmp.name
-                asset_path = temp_path
-
-        if not asset_path:
-            raise ValueError("No asset file available for pipeline processing")
+            loop = asyncio.get_running_loop()
 
-        if is_shutting_down():
-            raise asyncio.CancelledError("Shutdown in progress")
+            def on_step(step_id: str, status: str) -> None:
+                # Called from the pipeline thread; the checkpoint is written before the step runs
+                asyncio.run_coroutine_threadsafe(
+                    self.runs.record_step(run_id, step_id, status), loop
+                ).result(timeout=5)
 
-        try:
             # Run pipeline in thread pool so blocking I/O (ffmpeg, GCS uploads)
             # doesn't block the server event loop - keeps API responsive
             await asyncio.to_thread(
@@ -225,14 +485,34 @@ class PipelineWorker:
                 asset,
                 asset_path,
                 agent_metadata,
+                on_step,
+                rerun_step_ids,
             )
-        finally:
-            # Clean up temp file
-            if temp_path and os.path.exists(temp_path):
-                os.unlink(temp_path)
+        except asyncio.CancelledError:
+            # Keep the run and its local file; the lease lapses and the run is resumed
+            self._held_runs.discard(run_id)
+            raise
+        except Exception:
+            self._held_runs.discard(run_id)
+            await self.runs.finish(run_id, self.worker_id, RUN_STATUS_FAILED)
+            if _is_run_cache_file(asset_path):
+                _remove_file(asset_path)
+            raise
 
-    async def _process_step_task(self, payload: dict[str, Any]) -> None:
-        """Process a single step task."""
+        self._held_runs.discard(run_id)
+        if is_shutting_down():
+            # Interrupted between steps: release now so another worker resumes right away
+            await self.runs.update(run_id, status=RUN_STATUS_INTERRUPTED)
+            await self.runs.release_lease(run_id, self.worker_id)
+            logger.info(f"Pipeline run {run_id} interrupted by shutdown; released for resume")
+            return
+
+        await self.runs.finish(run_id, self.worker_id, RUN_STATUS_COMPLETED)
+        if _is_run_cache_file(asset_path):
+            _remove_file(asset_path)
+
+    async def _process_step_task(self, payload: dict[str, Any]) -> str | None:
+        """Process a single step task. Returns the step's resulting status."""
         user_id = payload["user_id"]
         project_id = payload["project_id"]
         asset_data = payload["asset_data"]
@@ -249,11 +529,14 @@ class PipelineWorker:
         if gcs_uri:
             if is_shutting_down():
                 raise asyncio.CancelledError("Shutdown in progress")
-            content = await asyncio.to_thread(download_from_gcs, gcs_uri, settings)
             suffix = os.path.splitext(asset.file_name)[1] or ""
             with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                tmp.write(content)
                 temp_path = tmp.name
+            try:
+                await asyncio.to_thread(download_gcs_to_file, gcs_uri, temp_path, settings)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
 
         if not temp_path:
             raise ValueError("No asset file available for step processing")
@@ -263,7 +546,9 @@ class PipelineWorker:
 
         try:
             # Run step directly in current event loop (no nested asyncio.run)
-            await run_step(user_id, project_id, asset, temp_path, step_id, params)
+            state = await run_step(user_id, project_id, asset, temp_path, step_id, params)
+            step_state = next((s for s in state.get("steps", []) if s["id"] == step_id), None)
+            return step_state.get("status") if step_state else None
         finally:
             if temp_path and os.path.exists(temp_path):
                 os.unlink(temp_path)
@@ -275,46 +560,86 @@ class PipelineWorker:
         asset_id = payload["asset_id"]
         params = payload.get("params", {})
         trigger_pipeline_after = payload.get("trigger_pipeline_after", False)
+        agent_metadata = payload.get("agent_metadata")
 
         from ..pipeline.types import StepStatus
-        from ..pubsub import publish_pipeline_event
 
-        result = await run_transcode_for_asset(user_id, project_id, asset_id, params)
+        result = await run_transcode_for_asset(
+            user_id,
+            project_id,
+            asset_id,
+            params,
+            trigger_pipeline_after=trigger_pipeline_after,
+            agent_metadata=agent_metadata,
+        )
+
+        if result.status == StepStatus.WAITING:
+            # Handed off to the Transcoder notification subscriber, which finishes the job
+            logger.info(f"Transcode for asset {asset_id} handed off to Pub/Sub completion")
+            return
 
         if result.status == StepStatus.SUCCEEDED:
-            # Fetch fresh asset data after transcode
-            settings = get_settings()
-            fresh_asset = await asyncio.to_thread(
-                get_asset, user_id, project_id, asset_id, settings
-            )
-            asset_name = fresh_asset.get("name") if fresh_asset else None
-
-            # Publish transcode.completed event so consumers can act on the asset
-            # before the full pipeline finishes
-            publish_pipeline_event(
-                event_type="transcode.completed",
-                user_id=user_id,
-                project_id=project_id,
-                asset_id=asset_id,
-                asset_name=asset_name,
-                metadata={
-                    "agent": payload.get("agent_metadata") or {},
-                    "transcodeResult": result.metadata or {},
-                },
+            await on_transcode_succeeded(
+                self.queue,
+                user_id,
+                project_id,
+                asset_id,
+                result.metadata or {},
+                trigger_pipeline_after=trigger_pipeline_after,
+                agent_metadata=agent_metadata,
             )
-            logger.info(f"Published transcode.completed event for asset {asset_id}")
-
-            # Queue pipeline if requested
-            if trigger_pipeline_after and fresh_asset:
-                await self.queue.enqueue_pipeline(
-                    user_id=user_id,
-                    project_id=project_id,
-                    asset_id=asset_id,
-                    asset_data=fresh_asset,
-                    asset_path="",
-                    agent_metadata=payload.get("agent_metadata"),
-                )
-                logger.info(f"Queued pipeline for asset {asset_id} after transcode")
+
+
+async def on_transcode_succeeded(
+    queue: TaskQueue,
+    user_id: str,
+    project_id: str,
+    asset_id: str,
+    transcode_result: dict[str, Any],
+    trigger_pipeline_after: bool = False,
+    agent_metadata: dict[str, Any] | None = None,
+) -> None:
+    """
+    Publish transcode.completed and chain the pipeline if requested.
+
+    Shared by the worker (polled transcodes) and the Transcoder notification
+    subscriber (pushed transcodes).
+    """
+    from ..pubsub import publish_pipeline_event
+
+    # Fetch fresh asset data after transcode
+    settings = get_settings()
+    fresh_asset = await asyncio.to_thread(
+        get_asset, user_id, project_id, asset_id, settings
+    )
+    asset_name = fresh_asset.get("name") if fresh_asset else None
+
+    # Publish transcode.completed event so consumers can act on the asset
+    # before the full pipeline finishes
+    publish_pipeline_event(
+        event_type="transcode.completed",
+        user_id=user_id,
+        project_id=project_id,
+        asset_id=asset_id,
+        asset_name=asset_name,
+        metadata={
+            "agent": agent_metadata or {},
+            "transcodeResult": transcode_result,
+        },
+    )
+    logger.info(f"Published transcode.completed event for asset {asset_id}")
+
+    # Queue pipeline if requested
+    if trigger_pipeline_after and fresh_asset:
+        await queue.enqueue_pipeline(
+            user_id=user_id,
+            project_id=project_id,
+            asset_id=asset_id,
+            asset_data=fresh_asset,
+            asset_path="",
+            agent_metadata=agent_metadata,
+        )
+        logger.info(f"Queued pipeline for asset {asset_id} after transcode")
 
 
 _worker: PipelineWorker | None = None
@@ -4,26 +4,50 @@ from .service import (
     create_transcode_job,
     get_transcode_job_status,
     get_transcode_access_token,
+    ladder_bitrate_bps,
+    parse_transcode_job_state,
     TranscodeConfig,
     TranscodeJobStatus,
 )
+from .local import (
+    BACKEND_CLOUD,
+    BACKEND_LOCAL,
+    encode_and_upload,
+    run_local_transcode,
+    select_transcode_backend,
+    supports_local_transcode,
+)
 from .store import (
     TranscodeJob,
     save_transcode_job,
     get_transcode_job,
     update_transcode_job,
     find_latest_transcode_job_for_asset,
+    find_transcode_job_by_name,
+    list_processing_transcode_jobs,
+    claim_transcode_job_for_completion,
 )
 
 __all__ = [
     "create_transcode_job",
     "get_transcode_job_status",
     "get_transcode_access_token",
+    "ladder_bitrate_bps",
+    "parse_transcode_job_state",
     "TranscodeConfig",
     "TranscodeJobStatus",
+    "BACKEND_CLOUD",
+    "BACKEND_LOCAL",
+    "encode_and_upload",
+    "run_local_transcode",
+    "select_transcode_backend",
+    "supports_local_transcode",
     "TranscodeJob",
     "save_transcode_job",
     "get_transcode_job",
     "update_transcode_job",
     "find_latest_transcode_job_for_asset",
+    "find_transcode_job_by_name",
+    "list_processing_transcode_jobs",
+    "claim_transcode_job_for_completion",
 ]
@@ -0,0 +1,242 @@
+"""Local ffmpeg transcode backend.
+
+Implements the MP4 subset of TranscodeConfig (H.264/AAC, target height, bitrate,
+frame rate) with multi-threaded x264 on the worker. Intended for short clips,
+where Cloud Transcoder queueing overhead dwarfs the actual encode time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import subprocess
+import tempfile
+from typing import Any
+
+from ..config import Settings, get_settings
+from ..storage.gcs import create_signed_url, upload_to_gcs
+from .service import AudioCodec, OutputFormat, TranscodeConfig, VideoCodec
+
+logger = logging.getLogger(__name__)
+
+BACKEND_CLOUD = "cloud"
+BACKEND_LOCAL = "local"
+
+
+def supports_local_transcode(config: TranscodeConfig) -> bool:
+    """Check whether the local backend can produce this output (H.264/AAC MP4 only)."""
+    return (
+        config.output_format == OutputFormat.MP4
+        and config.video_codec == VideoCodec.H264
+        and (not config.has_audio or config.audio_codec == AudioCodec.AAC)
+    )
+
+
+def select_transcode_backend(
+    config: TranscodeConfig,
+    duration: float | None,
+    size: int | None,
+    requested: str | None = None,
+    settings: Settings | None = None,
+) -> str:
+    """
+    Pick the transcode backend for a job.
+
+    An explicit "local"/"cloud" request wins (local only if the config is supported).
+    Otherwise short, small clips within the local height limit go local; everything
+    else, including clips of unknown duration, goes to the Cloud Transcoder API.
+
+    Returns:
+        BACKEND_LOCAL or BACKEND_CLOUD
+    """
+    settings = settings or get_settings()
+    requested = (requested or "auto").lower()
+
+    if requested == BACKEND_CLOUD:
+        return BACKEND_CLOUD
+    if not supports_local_transcode(config):
+        return BACKEND_CLOUD
+    if requested == BACKEND_LOCAL:
+        return BACKEND_LOCAL
+    if not settings.local_transcode_enabled:
+        return BACKEND_CLOUD
+
+    if not duration or duration > settings.local_transcode_max_duration_seconds:
+        return BACKEND_CLOUD
+    if size and size > settings.local_transcode_max_size_mb * 1024 * 1024:
+        return BACKEND_CLOUD
+    if config.target_height and config.target_height > settings.local_transcode_max_height:
+        return BACKEND_CLOUD
+
+    return BACKEND_LOCAL
+
+
+def build_ffmpeg_args(
+    input_url: str,
+    output_path: str,
+    config: TranscodeConfig,
+    settings: Settings | None = None,
+    keyframe_interval_seconds: float | None = None,
+    preserve_frame_rate: bool = False,
+) -> list[str]:
+    """Build the ffmpeg command line for an H.264/AAC MP4 transcode."""
+    settings = settings or get_settings()
+    video_bitrate = config.video_bitrate_bps or 2_500_000
+
+    args = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostdin",
+        "-y",
+    ]
+    if input_url.startswith(("http://", "https://")):
+        # Bound each network read (microseconds) so a stalled input fails fast
+        args += ["-rw_timeout", "15000000"]
+    args += [
+        "-i", input_url,
+        "-map", "0:v:0",
+        "-c:v", "libx264",
+        "-preset", settings.local_transcode_preset,
+        "-profile:v", "high",
+        "-pix_fmt", "yuv420p",
+        "-b:v", str(video_bitrate),
+        "-maxrate", str(video_bitrate),
+        "-bufsize", str(video_bitrate * 2),
+        # 0 lets x264 use every core on the worker
+        "-threads", str(settings.local_transcode_threads),
+    ]
+
+    # Only height is set - width auto-calculated (even) to preserve aspect ratio
+    if config.target_height:
+        args += ["-vf", f"scale=-2:{config.target_height}"]
+    if config.frame_rate or not preserve_frame_rate:
+        args += ["-r", str(config.frame_rate or 30.0)]
+    if keyframe_interval_seconds:
+        # Fixed keyframe cadence keeps seeks cheap (used for editing proxies)
+        args += [
+            "-force_key_frames", f"expr:gte(t,n_forced*{keyframe_interval_seconds})",
+            "-sc_threshold", "0",
+        ]
+
+    if config.has_audio:
+        args += [
+            "-map", "0:a:0?",
+            "-c:a", "aac",
+            "-b:a", str(config.audio_bitrate_bps or 64_000),
+        ]
+        if config.sample_rate_hz:
+            args += ["-ar", str(config.sample_rate_hz)]
+        if config.channels:
+            args += ["-ac", str(config.channels)]
+    else:
+        args.append("-an")
+
+    # moov atom up front so the output is progressively playable
+    args += ["-movflags", "+faststart", output_path]
+    return args
+
+
+async def run_local_transcode(
+    input_gcs_uri: str,
+    output_object_name: str,
+    config: TranscodeConfig,
+    settings: Settings | None = None,
+) -> dict[str, Any]:
+    """
+    Transcode a GCS object with ffmpeg on this worker and upload the result.
+
+    ffmpeg reads the input over a signed URL (no separate download step); the
+    encoded file is streamed from disk to GCS.
+
+    Args:
+        input_gcs_uri: gs:// URI of the source video
+        output_object_name: Object name for the MP4 in the asset bucket
+        config: Transcode configuration (must satisfy supports_local_transcode)
+        settings: Optional settings override
+
+    Returns:
+        Dict with gcs_uri, bucket, object_name and size of the output
+
+    Raises:
+        ValueError: If the config or input URI is not supported
+        RuntimeError: If ffmpeg fails or times out
+    """
+    settings = settings or get_settings()
+
+    if not supports_local_transcode(config):
+        raise ValueError("Local transcode supports H.264/AAC MP4 output only")
+
+    if not input_gcs_uri.startswith("gs://"):
+        raise ValueError(f"Invalid GCS URI: {input_gcs_uri}")
+    parts = input_gcs_uri[5:].split("/", 1)
+    if len(parts) != 2:
+        raise ValueError(f"Invalid GCS URI: {input_gcs_uri}")
+    bucket_name, object_name = parts
+
+    input_url = await asyncio.to_thread(
+        create_signed_url, object_name, bucket_name, 60 * 60, settings
+    )
+    return await encode_and_upload(input_url, output_object_name, config, settings)
+
+
+async def encode_and_upload(
+    input_url: str,
+    output_object_name: str,
+    config: TranscodeConfig,
+    settings: Settings | None = None,
+    keyframe_interval_seconds: float | None = None,
+    timeout: int | None = None,
+    preserve_frame_rate: bool = False,
+) -> dict[str, Any]:
+    """
+    Encode a local path or URL to an H.264/AAC MP4 and upload it to the asset bucket.
+
+    Returns:
+        Dict with gcs_uri, bucket, object_name and size of the output
+
+    Raises:
+        RuntimeError: If ffmpeg fails or times out
+    """
+    settings = settings or get_settings()
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
+        output_path = tmp.name
+
+    try:
+        cmd = build_ffmpeg_args(
+            input_url,
+            output_path,
+            config,
+            settings,
+            keyframe_interval_seconds=keyframe_interval_seconds,
+            preserve_frame_rate=preserve_frame_rate,
+        )
+        timeout = timeout or settings.local_transcode_timeout_seconds
+        try:
+            result = await asyncio.to_thread(
+                subprocess.run, cmd, capture_output=True, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Local transcode timed out after {timeout}s")
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg not found. Please install ffmpeg.")
+
+        if result.returncode != 0:
+            stderr = (result.stderr or b"").decode(errors="replace")[-500:]
+            raise RuntimeError(f"ffmpeg failed: {stderr}")
+
+        size = os.path.getsize(output_path)
+        if size == 0:
+            raise RuntimeError("ffmpeg produced an empty output file")
+
+        def _upload() -> dict[str, Any]:
+            with open(output_path, "rb") as f:
+                return upload_to_gcs(f, output_object_name, "video/mp4", settings)
+
+        upload = await asyncio.to_thread(_upload)
+        logger.info(f"Local transcode uploaded {size} bytes to {upload['gcs_uri']}")
+        return {**upload, "size": size}
+    finally:
+        if os.path.exists(output_path):
+            os.unlink(output_path)
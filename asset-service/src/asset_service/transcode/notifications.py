@@ -0,0 +1,227 @@
+"""Transcoder job-state notifications via Pub/Sub.
+
+Transcode jobs created while TRANSCODE_NOTIFICATION_TOPIC is set publish their
+state changes to that topic. This subscriber finishes those jobs (asset update,
+metadata re-extraction, transcode.completed event, pipeline chaining) as soon as
+the Transcoder API reports a terminal state, so no worker slot is held while a
+transcode runs. A slow fallback poll catches notifications that never arrive, and
+jobs whose completion claim went stale.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from google.api_core.exceptions import NotFound
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from ..config import Settings
+from .service import TranscodeJobStatus, get_transcode_job_status, parse_transcode_job_state
+from .store import (
+    TranscodeJob,
+    find_transcode_job_by_name,
+    completion_claim_cutoff,
+    list_processing_transcode_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TranscodeNotificationSubscriber:
+    """Subscribes to Transcoder job-state notifications and completes handed-off jobs."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._subscriber: pubsub_v1.SubscriberClient | None = None
+        self._streaming_future: pubsub_v1.subscriber.futures.StreamingPullFuture | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fallback_task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start listening for Transcoder notifications and the fallback poll."""
+        if self._streaming_future and not self._streaming_future.done():
+            return
+
+        subscription_name = self._settings.transcode_notification_subscription or ""
+        project_id = self._settings.google_project_id
+
+        self._subscriber = pubsub_v1.SubscriberClient()
+        if subscription_name.startswith("projects/"):
+            subscription_path = subscription_name
+        else:
+            subscription_path = self._subscriber.subscription_path(project_id, subscription_name)
+        self._loop = asyncio.get_running_loop()
+
+        def callback(message: Message) -> None:
+            assert self._loop is not None
+            asyncio.run_coroutine_threadsafe(self._handle_message(message), self._loop)
+
+        try:
+            self._streaming_future = self._subscriber.subscribe(subscription_path, callback)
+        except NotFound:
+            logger.error(
+                "Transcode notification subscription '%s' not found in project '%s'.",
+                subscription_name,
+                project_id,
+            )
+            await self._cleanup()
+            return
+
+        self._fallback_task = asyncio.create_task(self._fallback_poll_loop())
+        logger.info(
+            "Subscribed to Transcoder notifications on %s (topic: %s)",
+            subscription_path,
+            self._settings.transcode_notification_topic,
+        )
+
+    async def stop(self) -> None:
+        """Stop listening for notifications."""
+        if self._fallback_task:
+            self._fallback_task.cancel()
+            try:
+                await self._fallback_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._fallback_task = None
+        if self._streaming_future:
+            self._streaming_future.cancel()
+            try:
+                self._streaming_future.result(timeout=5)
+            except Exception:
+                pass
+            self._streaming_future = None
+        await self._cleanup()
+
+    async def _cleanup(self) -> None:
+        """Clean up resources."""
+        if self._subscriber:
+            await asyncio.to_thread(self._subscriber.close)
+            self._subscriber = None
+
+    async def _handle_message(self, message: Message) -> None:
+        """Handle an incoming Transcoder job-state notification."""
+        try:
+            payload = json.loads(message.data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            logger.warning("Discarded malformed transcode notification; acking.")
+            message.ack()
+            return
+
+        job_data = payload.get("job") or {}
+        job_name = job_data.get("name")
+        if not job_name:
+            message.ack()
+            return
+
+        try:
+            status, metadata = parse_transcode_job_state(job_data)
+            if status not in (TranscodeJobStatus.SUCCEEDED, TranscodeJobStatus.FAILED):
+                message.ack()
+                return
+
+            job = await find_transcode_job_by_name(job_name)
+            if not job:
+                logger.warning("No transcode job record for %s; acking.", job_name)
+                message.ack()
+                return
+
+            await self._complete(job, status, metadata)
+            message.ack()
+        except Exception:
+            # Nack so Pub/Sub redelivers; the completion claim makes retries safe
+            logger.exception("Failed to process transcode notification for %s", job_name)
+            message.nack()
+
+    async def _fallback_poll_loop(self) -> None:
+        """Slowly poll handed-off jobs whose notification never arrived."""
+        interval = self._settings.transcode_fallback_poll_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Processing jobs quiet for a whole interval, and completion claims gone stale
+                cutoff = (datetime.utcnow() - timedelta(seconds=interval)).isoformat() + "Z"
+                await self._fallback_poll("processing", cutoff)
+                await self._fallback_poll("completing", completion_claim_cutoff())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Transcode fallback poll iteration failed")
+
+    async def _fallback_poll(self, job_status: str, updated_before: str) -> None:
+        """Poll every handed-off job in job_status not updated since updated_before, page by page."""
+        start_after = None
+        while True:
+            jobs, start_after = await list_processing_transcode_jobs(
+                job_status, updated_before, start_after=start_after
+            )
+            for job in jobs:
+                if not job.job_name:
+                    continue
+                try:
+                    status, metadata = await get_transcode_job_status(job.job_name)
+                    await self._complete(job, status, metadata)
+                except Exception as e:
+                    logger.warning("Fallback poll failed for transcode job %s: %s", job.id, e)
+            if start_after is None:
+                return
+
+    async def _complete(
+        self,
+        job: TranscodeJob,
+        status: TranscodeJobStatus,
+        metadata: dict[str, Any],
+    ) -> None:
+        """Finish a job and run the same follow-ups as a polled transcode."""
+        # Imported here to avoid a circular import (tasks -> pipeline -> transcode)
+        from ..pipeline.steps.transcode import complete_transcode_job
+        from ..pipeline.types import StepStatus
+        from ..tasks.queue import get_task_queue
+        from ..tasks.worker import on_transcode_succeeded
+
+        result = await complete_transcode_job(job, status, metadata)
+        if result is None:
+            return
+
+        logger.info("Transcode job %s finished via notification: %s", job.id, result.status.value)
+        if result.status == StepStatus.SUCCEEDED:
+            queue = await get_task_queue()
+            await on_transcode_succeeded(
+                queue,
+                job.user_id,
+                job.project_id,
+                job.asset_id,
+                result.metadata or {},
+                trigger_pipeline_after=job.trigger_pipeline_after,
+                agent_metadata=job.agent_metadata,
+            )
+
+
+_subscriber: TranscodeNotificationSubscriber | None = None
+
+
+async def start_transcode_notifications(settings: Settings) -> TranscodeNotificationSubscriber | None:
+    """Start the global Transcoder notification subscriber if notifications are configured."""
+    global _subscriber
+
+    if not settings.transcode_notifications_enabled:
+        return None
+
+    if _subscriber is None:
+        _subscriber = TranscodeNotificationSubscriber(settings)
+        await _subscriber.start()
+
+    return _subscriber
+
+
+async def stop_transcode_notifications() -> None:
+    """Stop the global Transcoder notification subscriber."""
+    global _subscriber
+
+    if _subscriber is not None:
+        await _subscriber.stop()
+        _subscriber = None
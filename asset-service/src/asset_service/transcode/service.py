@@ -8,9 +8,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
-import httpx
-
 from ..config import get_settings
+from ..http_client import request_with_retry
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +68,9 @@ class TranscodeConfig:
     # Whether input has audio (set False to skip audio stream for video-only files)
     has_audio: bool = True
 
+    # HLS/DASH only: one video rendition per height (None = single rendition at target_height)
+    ladder_heights: list[int] | None = None
+
     def to_job_config(self) -> dict[str, Any]:
         """Convert to Transcoder API job config format (always custom config, aspect-preserving)."""
         config: dict[str, Any] = {
@@ -118,27 +120,76 @@ class TranscodeConfig:
             config["elementaryStreams"].append(audio_stream)
             mux_elementary_streams.append("audio-stream0")
 
+        # Segmented outputs get one fmp4 mux per elementary stream plus a manifest
+        if self.output_format in (OutputFormat.HLS, OutputFormat.DASH):
+            return {"config": self._build_segmented_config(config)}
+
         # Mux stream (output container)
         mux_stream = {
             "key": "output0",
             "elementaryStreams": mux_elementary_streams,
+            "container": "mp4",
+            "fileName": "output.mp4",
         }
-
-        if self.output_format == OutputFormat.MP4:
-            mux_stream["container"] = "mp4"
-            mux_stream["fileName"] = "output.mp4"
-        elif self.output_format == OutputFormat.HLS:
-            mux_stream["segmentSettings"] = {"segmentDuration": "6s"}
-            # For HLS, we use fmp4 segments
-            mux_stream["container"] = "fmp4"
-        elif self.output_format == OutputFormat.DASH:
-            mux_stream["segmentSettings"] = {"segmentDuration": "6s"}
-            mux_stream["container"] = "fmp4"
-
         config["muxStreams"].append(mux_stream)
 
         return {"config": config}
 
+    def _build_segmented_config(self, config: dict[str, Any]) -> dict[str, Any]:
+        """
+        Build HLS/DASH mux streams and manifest.
+
+        fmp4 muxes carry a single elementary stream, so each video rendition and
+        the audio track get their own mux; the manifest ties them together.
+        """
+        video_template = config["elementaryStreams"][0]
+        codec_key = next(iter(video_template["videoStream"]))
+        has_audio = any(s["key"] == "audio-stream0" for s in config["elementaryStreams"])
+
+        elementary_streams: list[dict[str, Any]] = []
+        mux_streams: list[dict[str, Any]] = []
+        segment_settings = {"segmentDuration": "6s"}
+
+        heights = self.ladder_heights or [self.target_height]
+        for height in heights:
+            codec_cfg = dict(video_template["videoStream"][codec_key])
+            suffix = "src"
+            if height:
+                codec_cfg["heightPixels"] = height
+                suffix = f"{height}p"
+                if self.ladder_heights:
+                    codec_cfg["bitrateBps"] = ladder_bitrate_bps(height)
+            key = f"video-{suffix}"
+            elementary_streams.append({"key": key, "videoStream": {codec_key: codec_cfg}})
+            mux_streams.append({
+                "key": f"{key}-fmp4",
+                "container": "fmp4",
+                "elementaryStreams": [key],
+                "segmentSettings": segment_settings,
+            })
+
+        if has_audio:
+            elementary_streams.append(config["elementaryStreams"][-1])
+            mux_streams.append({
+                "key": "audio-fmp4",
+                "container": "fmp4",
+                "elementaryStreams": ["audio-stream0"],
+                "segmentSettings": segment_settings,
+            })
+
+        is_hls = self.output_format == OutputFormat.HLS
+        manifest = {
+            "fileName": "manifest.m3u8" if is_hls else "manifest.mpd",
+            "type": "HLS" if is_hls else "DASH",
+            "muxStreams": [m["key"] for m in mux_streams],
+        }
+
+        return {
+            "elementaryStreams": elementary_streams,
+            "muxStreams": mux_streams,
+            "manifests": [manifest],
+        }
+
     def _build_h264_config(self) -> dict[str, Any]:
         """Build H264 video config. Only heightPixels set = auto-calculate width to preserve aspect ratio."""
         cfg: dict[str, Any] = {
@@ -175,6 +226,14 @@ class TranscodeConfig:
         return cfg
 
 
+def ladder_bitrate_bps(height: int) -> int:
+    """Video bitrate for one rung of an adaptive ladder (H.264, ~30fps)."""
+    ladder = {360: 800_000, 540: 1_500_000, 720: 2_500_000, 1080: 5_000_000}
+    if height in ladder:
+        return ladder[height]
+    return max(400_000, int(5_000_000 * height / 1080))
+
+
 def get_transcode_access_token() -> str:
     """Get access token for Transcoder API."""
     settings = get_settings()
@@ -231,6 +290,8 @@ async def create_transcode_job(
     input_uri: str,
     output_uri: str,
     config: TranscodeConfig,
+    *,
+    notify: bool = True,
 ) -> str:
     """
     Create a transcode job using the Transcoder API.
@@ -239,6 +300,8 @@ async def create_transcode_job(
         input_uri: GCS URI of the input video (gs://bucket/path/to/video.mp4)
         output_uri: GCS URI prefix for output files (gs://bucket/path/to/output/)
         config: Transcoding configuration
+        notify: Publish job-state notifications when configured. Jobs that are
+            not tracked in transcodeJobs (e.g. proxy ladders) pass False.
 
     Returns:
         Job name (e.g., "projects/123/locations/us-central1/jobs/abc123")
@@ -257,29 +320,36 @@ async def create_transcode_job(
         **job_config,
     }
 
+    # Ask the Transcoder API to publish job-state changes so completion is pushed, not polled
+    if notify and settings.transcode_notifications_enabled:
+        topic = settings.transcode_notification_topic or ""
+        if not topic.startswith("projects/"):
+            topic = f"projects/{settings.google_project_id}/topics/{topic}"
+        job_payload["config"]["pubsubDestination"] = {"topic": topic}
+
     url = f"https://transcoder.googleapis.com/v1/projects/{project_id}/locations/{location}/jobs"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            json=job_payload,
-            timeout=60.0,
-        )
+    response = await request_with_retry(
+        "POST",
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        json=job_payload,
+        timeout=60.0,
+    )
 
-        if response.status_code not in (200, 201):
-            raise RuntimeError(f"Transcoder API request failed: {response.text}")
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Transcoder API request failed: {response.text}")
 
-        data = response.json()
-        job_name = data.get("name")
-        if not job_name:
-            raise RuntimeError("Transcoder API did not return a job name")
+    data = response.json()
+    job_name = data.get("name")
+    if not job_name:
+        raise RuntimeError("Transcoder API did not return a job name")
 
-        logger.info(f"Created transcode job: {job_name}")
-        return job_name
+    logger.info(f"Created transcode job: {job_name}")
+    return job_name
 
 
 async def get_transcode_job_status(job_name: str) -> tuple[TranscodeJobStatus, dict[str, Any]]:
@@ -296,46 +366,58 @@ async def get_transcode_job_status(job_name: str) -> tuple[TranscodeJobStatus, d
 
     url = f"https://transcoder.googleapis.com/v1/{job_name}"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-        )
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to get job status: {response.text}")
-
-        data = response.json()
-        state = data.get("state", "STATE_UNSPECIFIED")
-
-        # Map API states to our status enum
-        status_map = {
-            "PENDING": TranscodeJobStatus.PENDING,
-            "RUNNING": TranscodeJobStatus.RUNNING,
-            "SUCCEEDED": TranscodeJobStatus.SUCCEEDED,
-            "FAILED": TranscodeJobStatus.FAILED,
-        }
-        status = status_map.get(state, TranscodeJobStatus.PENDING)
-
-        # Build metadata
-        metadata: dict[str, Any] = {
-            "state": state,
-            "createTime": data.get("createTime"),
-            "startTime": data.get("startTime"),
-            "endTime": data.get("endTime"),
-        }
+    response = await request_with_retry(
+        "GET",
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        timeout=30.0,
+    )
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get job status: {response.text}")
+
+    return parse_transcode_job_state(response.json())
+
+
+def parse_transcode_job_state(data: dict[str, Any]) -> tuple[TranscodeJobStatus, dict[str, Any]]:
+    """
+    Map a Transcoder API job resource to our status enum and metadata.
+
+    Accepts both the full job returned by jobs.get and the trimmed job
+    carried in Pub/Sub job-state notifications.
+
+    Returns:
+        Tuple of (status, metadata dict)
+    """
+    state = data.get("state", "STATE_UNSPECIFIED")
+
+    # Map API states to our status enum
+    status_map = {
+        "PENDING": TranscodeJobStatus.PENDING,
+        "RUNNING": TranscodeJobStatus.RUNNING,
+        "SUCCEEDED": TranscodeJobStatus.SUCCEEDED,
+        "FAILED": TranscodeJobStatus.FAILED,
+    }
+    status = status_map.get(state, TranscodeJobStatus.PENDING)
+
+    # Build metadata
+    metadata: dict[str, Any] = {
+        "state": state,
+        "createTime": data.get("createTime"),
+        "startTime": data.get("startTime"),
+        "endTime": data.get("endTime"),
+    }
 
-        if status == TranscodeJobStatus.FAILED:
-            error = data.get("error", {})
-            metadata["error"] = error.get("message", "Unknown error")
-            metadata["errorCode"] = error.get("code")
+    if status == TranscodeJobStatus.FAILED:
+        error = data.get("error", {})
+        metadata["error"] = error.get("message", "Unknown error")
+        metadata["errorCode"] = error.get("code")
 
-        if status == TranscodeJobStatus.SUCCEEDED:
-            # Get output info
-            metadata["outputUri"] = data.get("outputUri")
+    if status == TranscodeJobStatus.SUCCEEDED:
+        # Get output info
+        metadata["outputUri"] = data.get("outputUri")
 
-        return status, metadata
+    return status, metadata
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from google.cloud import firestore
@@ -14,6 +14,10 @@ from ..storage.firestore import get_firestore_client
 
 logger = logging.getLogger(__name__)
 
+# A job still 'completing' after this long lost the process finishing it
+# (crash between the claim and the final write); it can be claimed again
+COMPLETING_TIMEOUT_SECONDS = 15 * 60
+
 
 @dataclass
 class TranscodeJob:
@@ -40,6 +44,13 @@ class TranscodeJob:
     output_size: int | None = None
     output_duration: float | None = None
 
+    # Completion handling. "pubsub" jobs are finished by the notification subscriber
+    # (with a slow fallback poll); "poll" jobs are polled by the worker that started them.
+    completion_mode: str = "poll"
+    backend: str = "cloud"  # cloud (Transcoder API) or local (ffmpeg on the worker)
+    trigger_pipeline_after: bool = False
+    agent_metadata: dict[str, Any] | None = None
+
 
 def _get_job_collection(user_id: str, project_id: str) -> Any:
     """Get Firestore collection for transcode jobs."""
@@ -64,6 +75,9 @@ async def save_transcode_job(job: TranscodeJob) -> None:
         "config": job.config,
         "createdAt": job.created_at,
         "updatedAt": job.updated_at,
+        "completionMode": job.completion_mode,
+        "backend": job.backend,
+        "triggerPipelineAfter": job.trigger_pipeline_after,
     }
 
     if job.error:
@@ -75,6 +89,8 @@ async def save_transcode_job(job: TranscodeJob) -> None:
         data["outputSize"] = job.output_size
     if job.output_duration:
         data["outputDuration"] = job.output_duration
+    if job.agent_metadata:
+        data["agentMetadata"] = job.agent_metadata
 
     collection.document(job.id).set(data)
     logger.info(f"Saved transcode job {job.id} for asset {job.asset_id}")
@@ -156,6 +172,117 @@ async def list_transcode_jobs_for_asset(
     return [_doc_to_job(doc.to_dict(), user_id, project_id) for doc in docs]
 
 
+async def find_transcode_job_by_name(job_name: str) -> TranscodeJob | None:
+    """
+    Find a transcode job by its Transcoder API job name, across all users and projects.
+
+    Used by the Pub/Sub notification subscriber, which only knows the API job name.
+    Requires a collection-group index exemption on transcodeJobs.jobName.
+    """
+    db = get_firestore_client()
+    query = db.collection_group("transcodeJobs").where("jobName", "==", job_name).limit(1)
+
+    for doc in query.stream():
+        user_id, project_id = _owner_from_doc(doc)
+        return _doc_to_job(doc.to_dict(), user_id, project_id)
+
+    return None
+
+
+async def list_processing_transcode_jobs(
+    status: str,
+    updated_before: str,
+    limit: int = 100,
+    start_after: Any | None = None,
+) -> tuple[list[TranscodeJob], Any | None]:
+    """
+    List Pub/Sub-completed transcode jobs in status, not updated since
+    updated_before, across all users and projects, oldest update first.
+
+    Used by the notification subscriber's fallback poll to catch lost notifications
+    ('processing') and stale completion claims ('completing').
+    Requires a collection-group composite index on transcodeJobs
+    (status, completionMode, updatedAt).
+
+    Returns:
+        (jobs, cursor): pass cursor as start_after for the next page; it is
+        None on the last page.
+    """
+    db = get_firestore_client()
+    query = (
+        db.collection_group("transcodeJobs")
+        .where("status", "==", status)
+        .where("completionMode", "==", "pubsub")
+        .where("updatedAt", "<", updated_before)
+        .order_by("updatedAt")
+    )
+    if start_after is not None:
+        query = query.start_after(start_after)
+
+    jobs = []
+    last_doc = None
+    for doc in query.limit(limit).stream():
+        user_id, project_id = _owner_from_doc(doc)
+        jobs.append(_doc_to_job(doc.to_dict(), user_id, project_id))
+        last_doc = doc
+    return jobs, last_doc if len(jobs) == limit else None
+
+
+async def claim_transcode_job_for_completion(
+    user_id: str,
+    project_id: str,
+    job_id: str,
+) -> bool:
+    """
+    Atomically claim a transcode job for completion processing.
+
+    Uses a Firestore transaction so a Pub/Sub notification and a fallback poll
+    racing on the same job finish it exactly once. Sets status to 'completing'
+    if the current status is 'processing', or is a 'completing' claim older
+    than COMPLETING_TIMEOUT_SECONDS (its claimer died before finishing).
+
+    Returns:
+        True if successfully claimed, False if already claimed or finished.
+    """
+    db = get_firestore_client()
+    doc_ref = _get_job_collection(user_id, project_id).document(job_id)
+
+    @firestore.transactional
+    def claim_in_transaction(transaction):
+        doc = doc_ref.get(transaction=transaction)
+        if not doc.exists:
+            return False
+
+        data = doc.to_dict()
+        current_status = data.get("status", "")
+        if current_status == "completing" and data.get("updatedAt", "") < completion_claim_cutoff():
+            logger.warning(f"Transcode job {job_id} completion claim timed out; claiming it again")
+        elif current_status != "processing":
+            logger.debug(f"Transcode job {job_id} not claimable, status={current_status}")
+            return False
+
+        transaction.update(doc_ref, {
+            "status": "completing",
+            "updatedAt": datetime.utcnow().isoformat() + "Z",
+        })
+        logger.info(f"Claimed transcode job {job_id} for completion")
+        return True
+
+    return claim_in_transaction(db.transaction())
+
+
+def completion_claim_cutoff() -> str:
+    """'completing' jobs last updated before this have outlived their claim."""
+    return (datetime.utcnow() - timedelta(seconds=COMPLETING_TIMEOUT_SECONDS)).isoformat() + "Z"
+
+
+def _owner_from_doc(doc: Any) -> tuple[str, str]:
+    """Get (user_id, project_id) from a users/{u}/projects/{p}/transcodeJobs/{id} document."""
+    project_ref = doc.reference.parent.parent
+    user_ref = project_ref.parent.parent
+    return user_ref.id, project_ref.id
+
+
 def _doc_to_job(data: dict[str, Any], user_id: str, project_id: str) -> TranscodeJob:
     """Convert Firestore document to TranscodeJob."""
     return TranscodeJob(
@@ -177,4 +304,8 @@ def _doc_to_job(data: dict[str, Any], user_id: str, project_id: str) -> Transcod
         output_file_name=data.get("outputFileName"),
         output_size=data.get("outputSize"),
         output_duration=data.get("outputDuration"),
+        completion_mode=data.get("completionMode", "poll"),
+        backend=data.get("backend", "cloud"),
+        trigger_pipeline_after=data.get("triggerPipelineAfter", False),
+        agent_metadata=data.get("agentMetadata"),
     )
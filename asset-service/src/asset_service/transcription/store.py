@@ -34,6 +34,14 @@ class TranscriptionJob:
     transcript: str | None = None
     error: str | None = None
     segments: list[dict[str, Any]] = field(default_factory=list)
+    # Chunked transcription: one operation per batch of chunk files, and each
+    # chunk's GCS URI with its offset into the full audio
+    operation_names: list[str] = field(default_factory=list)
+    chunks: list[dict[str, Any]] = field(default_factory=list)
+    # Word segments live in a GCS track blob (see storage.tracks); the document
+    # keeps the pointer and a short preview
+    segments_track: dict[str, Any] | None = None
+    segments_preview: list[dict[str, Any]] = field(default_factory=list)
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> TranscriptionJob:
@@ -55,6 +63,10 @@ class TranscriptionJob:
             transcript=data.get("transcript"),
             error=data.get("error"),
             segments=data.get("segments", []),
+            operation_names=data.get("operationNames", data.get("operation_names", [])),
+            chunks=data.get("chunks", []),
+            segments_track=data.get("segmentsTrack"),
+            segments_preview=data.get("segmentsPreview", []),
         )
 
     def to_dict(self) -> dict[str, Any]:
@@ -81,6 +93,14 @@ class TranscriptionJob:
             result["error"] = self.error
         if self.segments:
             result["segments"] = self.segments
+        if self.operation_names:
+            result["operationNames"] = self.operation_names
+        if self.chunks:
+            result["chunks"] = self.chunks
+        if self.segments_track:
+            result["segmentsTrack"] = self.segments_track
+        if self.segments_preview:
+            result["segmentsPreview"] = self.segments_preview
         return result
 
 
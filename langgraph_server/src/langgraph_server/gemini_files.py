@@ -3,18 +3,30 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import io
 import logging
+import os
+import tempfile
 import time
+from datetime import datetime, timedelta, timezone
 from typing import NamedTuple
 
+import httpx
 from google import genai
 
 from .api_key_provider import get_current_key
 from .config import Settings, get_settings
+from .firebase import get_firestore_client
 
 logger = logging.getLogger(__name__)
 
+# Shared with asset-service (gemini/file_cache.py): same collection, doc ids and fields
+FILE_CACHE_COLLECTION = "geminiFileCache"
+# Refresh cached handles this long before the Files API expires them (48h)
+FILE_CACHE_REFRESH_MARGIN_SECONDS = 2 * 60 * 60
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class UploadedFile(NamedTuple):
     """Result of uploading a file to Gemini."""
@@ -23,13 +35,56 @@ class UploadedFile(NamedTuple):
     mime_type: str
 
 
-def _get_client(settings: Settings | None = None) -> genai.Client:
-    """Get a Gemini API client using the current key (supports rotation)."""
+def _get_api_key(settings: Settings | None = None) -> str:
+    """Get the current Gemini API key (supports rotation)."""
     api_key = get_current_key()
     if not api_key:
         resolved = settings or get_settings()
         api_key = resolved.google_api_key or ""
-    return genai.Client(api_key=api_key)
+    return api_key
+
+
+def _get_client(settings: Settings | None = None) -> genai.Client:
+    """Get a Gemini API client using the current key (supports rotation)."""
+    return genai.Client(api_key=_get_api_key(settings))
+
+
+def _wait_until_active(client: genai.Client, uploaded, timeout: float):
+    """Poll an uploaded file until it is ACTIVE; raise if it fails or times out."""
+    # Wait for processing to complete (videos may take a while)
+    # State can be: PROCESSING, ACTIVE, FAILED
+    start_time = time.time()
+    while uploaded.state.name != "ACTIVE":
+        elapsed = time.time() - start_time
+        
+        if uploaded.state.name == "FAILED":
+            # Try to get error details
+            error_msg = "Unknown error"
+            if hasattr(uploaded, 'error') and uploaded.error:
+                error_msg = str(uploaded.error)
+            logger.error(
+                "[GEMINI_FILES] File processing FAILED: name=%s, error=%s",
+                uploaded.name,
+                error_msg,
+            )
+            raise RuntimeError(
+                f"Gemini file processing failed: {uploaded.name} - {error_msg}"
+            )
+        
+        if elapsed > timeout:
+            raise TimeoutError(
+                f"Gemini file processing timed out after {timeout}s "
+                f"(state={uploaded.state.name}, name={uploaded.name})"
+            )
+        
+        logger.info(
+            "[GEMINI_FILES] Waiting for file to become ACTIVE (state=%s, elapsed=%.1fs)",
+            uploaded.state.name,
+            elapsed,
+        )
+        time.sleep(2)
+        uploaded = client.files.get(name=uploaded.name)
+    return uploaded
 
 
 def upload_file_sync(
@@ -69,39 +124,7 @@ def upload_file_sync(
         },
     )
     
-    # Wait for processing to complete (videos may take a while)
-    # State can be: PROCESSING, ACTIVE, FAILED
-    start_time = time.time()
-    while uploaded.state.name != "ACTIVE":
-        elapsed = time.time() - start_time
-        
-        if uploaded.state.name == "FAILED":
-            # Try to get error details
-            error_msg = "Unknown error"
-            if hasattr(uploaded, 'error') and uploaded.error:
-                error_msg = str(uploaded.error)
-            logger.error(
-                "[GEMINI_FILES] File processing FAILED: name=%s, error=%s",
-                uploaded.name,
-                error_msg,
-            )
-            raise RuntimeError(
-                f"Gemini file processing failed: {uploaded.name} - {error_msg}"
-            )
-        
-        if elapsed > timeout:
-            raise TimeoutError(
-                f"Gemini file processing timed out after {timeout}s "
-                f"(state={uploaded.state.name}, name={uploaded.name})"
-            )
-        
-        logger.info(
-            "[GEMINI_FILES] Waiting for file to become ACTIVE (state=%s, elapsed=%.1fs)",
-            uploaded.state.name,
-            elapsed,
-        )
-        time.sleep(2)
-        uploaded = client.files.get(name=uploaded.name)
+    uploaded = _wait_until_active(client, uploaded, timeout)
     
     logger.info(
         "[GEMINI_FILES] Upload complete: uri=%s, state=%s",
@@ -149,6 +172,169 @@ async def upload_file(
     )
 
 
+def _cache_doc_id(asset_id: str, generation: str, api_key: str) -> str:
+    fingerprint = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return f"{asset_id}_{generation}_{fingerprint}"
+
+
+def _probe_generation(url: str) -> str | None:
+    """Read the GCS object generation for a signed URL with a 1-byte ranged GET."""
+    try:
+        response = httpx.get(url, headers={"Range": "bytes=0-0"}, timeout=30.0, follow_redirects=True)
+    except httpx.HTTPError as exc:
+        logger.warning("[GEMINI_FILES] Generation probe failed: %s", exc)
+        return None
+    if response.status_code not in (200, 206):
+        return None
+    return response.headers.get("x-goog-generation")
+
+
+def _get_cached_file(
+    client: genai.Client,
+    asset_id: str,
+    generation: str,
+    api_key: str,
+    settings: Settings,
+) -> UploadedFile | None:
+    """Return a cached, still-ACTIVE handle for this asset version and key, if any."""
+    doc_ref = get_firestore_client(settings).collection(FILE_CACHE_COLLECTION).document(
+        _cache_doc_id(asset_id, generation, api_key)
+    )
+    doc = doc_ref.get()
+    if not doc.exists:
+        return None
+
+    data = doc.to_dict() or {}
+    try:
+        expires_at = datetime.fromisoformat(str(data.get("expiresAt", "")).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    margin = timedelta(seconds=FILE_CACHE_REFRESH_MARGIN_SECONDS)
+    if expires_at - margin <= datetime.now(timezone.utc):
+        return None
+
+    try:
+        cached = client.files.get(name=data["fileName"])
+    except Exception as exc:
+        logger.info("[GEMINI_FILES] Cached file %s unusable (%s), re-uploading", data.get("fileName"), exc)
+        doc_ref.delete()
+        return None
+    if cached.state.name != "ACTIVE":
+        return None
+
+    return UploadedFile(uri=cached.uri, name=cached.name, mime_type=data.get("mimeType", ""))
+
+
+def _save_cached_file(
+    asset_id: str,
+    generation: str,
+    api_key: str,
+    uploaded,
+    mime_type: str,
+    settings: Settings,
+) -> None:
+    expiration = getattr(uploaded, "expiration_time", None)
+    if expiration is None:
+        expiration = datetime.now(timezone.utc) + timedelta(hours=48)
+    get_firestore_client(settings).collection(FILE_CACHE_COLLECTION).document(
+        _cache_doc_id(asset_id, generation, api_key)
+    ).set({
+        "assetId": asset_id,
+        "generation": generation,
+        "keyFingerprint": hashlib.sha256(api_key.encode()).hexdigest()[:16],
+        "fileName": uploaded.name,
+        "fileUri": uploaded.uri,
+        "mimeType": mime_type,
+        "expiresAt": expiration.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "source": "langgraph",
+    })
+
+
+def upload_asset_file_sync(
+    asset_id: str,
+    url: str,
+    mime_type: str,
+    *,
+    display_name: str | None = None,
+    settings: Settings | None = None,
+    timeout: float = 120.0,
+) -> UploadedFile:
+    """
+    Get an ACTIVE Gemini file for an asset, uploading only when no cached handle exists.
+
+    Handles are shared with asset-service through Firestore, keyed by asset id,
+    GCS object generation and API key. On a miss the media is streamed to a
+    temp file and uploaded from disk with the resumable protocol, so it is
+    never held in memory.
+
+    Args:
+        asset_id: Asset ID
+        url: Signed GCS URL of the asset
+        mime_type: MIME type of the file
+        display_name: Optional display name for the file
+        settings: Optional settings (uses default if not provided)
+        timeout: Max seconds to wait for processing
+
+    Returns:
+        UploadedFile with uri, name, and mime_type
+    """
+    resolved = settings or get_settings()
+    api_key = _get_api_key(resolved)
+    client = genai.Client(api_key=api_key)
+
+    generation = _probe_generation(url) if api_key else None
+    if generation:
+        try:
+            cached = _get_cached_file(client, asset_id, generation, api_key, resolved)
+        except Exception as exc:
+            logger.warning("[GEMINI_FILES] Cache lookup failed for %s: %s", asset_id, exc)
+            cached = None
+        if cached:
+            logger.info("[GEMINI_FILES] Reusing cached file %s for asset %s", cached.name, asset_id)
+            return UploadedFile(uri=cached.uri, name=cached.name, mime_type=mime_type)
+
+    suffix = os.path.splitext(display_name or "")[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp_path = tmp.name
+    try:
+        with httpx.stream("GET", url, timeout=300.0, follow_redirects=True) as response:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        size = os.path.getsize(tmp_path)
+        if size == 0:
+            raise ValueError("Asset URL returned empty content.")
+
+        logger.info("[GEMINI_FILES] Uploading asset %s (%d bytes, %s)", asset_id, size, mime_type)
+        uploaded = client.files.upload(
+            file=tmp_path,
+            config={
+                "mime_type": mime_type,
+                "display_name": display_name or f"asset-{asset_id}",
+            },
+        )
+    finally:
+        os.unlink(tmp_path)
+
+    uploaded = _wait_until_active(client, uploaded, timeout)
+
+    if generation:
+        try:
+            _save_cached_file(asset_id, generation, api_key, uploaded, mime_type, resolved)
+        except Exception as exc:
+            logger.warning("[GEMINI_FILES] Failed to cache %s: %s", uploaded.name, exc)
+
+    logger.info(
+        "[GEMINI_FILES] Upload complete: uri=%s, state=%s",
+        uploaded.uri,
+        uploaded.state.name,
+    )
+    return UploadedFile(uri=uploaded.uri, name=uploaded.name, mime_type=mime_type)
+
+
 def delete_file(name: str, *, settings: Settings | None = None) -> bool:
     """
     Delete a file from Gemini File API.
@@ -10,7 +10,12 @@ from langchain_core.tools import BaseTool
 from .add_clip_tool import addClipToTimeline
 from .update_clip_tool import updateClipInTimeline
 from .add_transition_tool import addTransition
-from .apply_video_effect_tool import applyVideoEffectToClip, getVideoEffectJobStatus
+from .apply_video_effect_tool import (
+    applyVideoEffectToClip,
+    applyVideoEffectToClips,
+    getVideoEffectBatchStatus,
+    getVideoEffectJobStatus,
+)
 from .remove_background_tool import removeBackgroundOnImage
 from .delete_clip_tool import deleteClipFromTimeline
 from .remove_transition_tool import removeTransition
@@ -51,6 +56,8 @@ def get_registered_tools() -> Sequence[BaseTool]:
         addTransition,
         applyVideoEffectToClip,
         getVideoEffectJobStatus,
+        applyVideoEffectToClips,
+        getVideoEffectBatchStatus,
         removeBackgroundOnImage,
         deleteClipFromTimeline,
         removeTransition,
@@ -187,3 +187,156 @@ def getVideoEffectJobStatus(
         "error": error_msg,
         "job": job,
     }
+
+
+@tool
+def applyVideoEffectToClips(
+    asset_ids: list[str],
+    effect_id: str = EFFECT_ID_SAM2,
+    params: dict[str, Any] | None = None,
+    _agent_context: dict | None = None,
+) -> dict[str, Any]:
+    """Apply one video effect with the same settings to many clips/assets as a single batch.
+
+    Prefer this over calling applyVideoEffectToClip once per clip when the same
+    effect and settings apply to several assets (e.g. a style pass over all clips).
+    The service starts the predictions under a shared concurrency limit and tracks
+    progress in one batch. Returns a batch ID to check with getVideoEffectBatchStatus.
+
+    Args:
+        asset_ids: IDs of the assets (clips) to apply the effect to.
+        effect_id: Effect to apply. Default is segmentation (replicate.meta.sam2-video).
+        params: Effect parameters applied to every asset (same names as the effect's
+            fields, e.g. {"maskType": "binary", "clickCoordinates": "[391,239]"}).
+            Omitted fields use the effect defaults.
+    """
+    context = _agent_context or {}
+    user_id = context.get("user_id")
+    project_id = context.get("project_id")
+
+    if not user_id or not project_id:
+        return {
+            "status": "error",
+            "message": "user_id and project_id are required (injected from session).",
+        }
+
+    if not asset_ids:
+        return {
+            "status": "error",
+            "message": "asset_ids must include at least one asset ID.",
+        }
+
+    settings = get_settings()
+    base_url = settings.video_effects_service_url or ""
+    if not base_url:
+        return {
+            "status": "error",
+            "message": "Video effects service URL not configured (VIDEO_EFFECTS_SERVICE_URL).",
+        }
+
+    payload = {
+        "assetIds": asset_ids,
+        "effectId": effect_id,
+        "userId": user_id,
+        "projectId": project_id,
+        "params": params or {},
+    }
+
+    endpoint = f"{base_url.rstrip('/')}/api/batches"
+
+    try:
+        response = httpx.post(endpoint, json=payload, timeout=30.0)
+    except httpx.HTTPError as exc:
+        logger.warning("Failed to contact video effects service: %s", exc)
+        return {
+            "status": "error",
+            "message": f"Could not reach video effects service: {exc}",
+        }
+
+    if not response.is_success:
+        detail = response.text[:300] if response.text else "No detail"
+        return {
+            "status": "error",
+            "message": f"Video effects service returned HTTP {response.status_code}: {detail}",
+        }
+
+    try:
+        data = response.json()
+    except Exception as exc:
+        return {
+            "status": "error",
+            "message": f"Invalid response from video effects service: {exc}",
+        }
+
+    batch = data.get("batch", {})
+    batch_id = batch.get("id", "")
+    effect_label = batch.get("effectLabel", effect_id)
+
+    return {
+        "status": "success",
+        "message": (
+            f"Started '{effect_label}' for {batch.get('total', len(asset_ids))} assets. "
+            "Use getVideoEffectBatchStatus with this batchId to check progress."
+        ),
+        "batchId": batch_id,
+        "batch": batch,
+    }
+
+
+@tool
+def getVideoEffectBatchStatus(
+    batch_id: str,
+) -> dict[str, Any]:
+    """Check the progress of a batch started by applyVideoEffectToClips.
+
+    Args:
+        batch_id: The batch ID returned when starting the batch.
+    """
+    settings = get_settings()
+    base_url = settings.video_effects_service_url or ""
+    if not base_url:
+        return {
+            "status": "error",
+            "message": "Video effects service URL not configured (VIDEO_EFFECTS_SERVICE_URL).",
+        }
+
+    endpoint = f"{base_url.rstrip('/')}/api/batches/{batch_id}"
+
+    try:
+        response = httpx.get(endpoint, timeout=15.0)
+    except httpx.HTTPError as exc:
+        logger.warning("Failed to contact video effects service: %s", exc)
+        return {
+            "status": "error",
+            "message": f"Could not reach video effects service: {exc}",
+        }
+
+    if response.status_code == 404:
+        return {
+            "status": "error",
+            "message": f"Batch '{batch_id}' not found.",
+        }
+
+    if response.status_code != 200:
+        return {
+            "status": "error",
+            "message": f"Video effects service returned HTTP {response.status_code}: {response.text[:200]}",
+        }
+
+    try:
+        data = response.json()
+    except Exception as exc:
+        return {
+            "status": "error",
+            "message": f"Invalid response: {exc}",
+        }
+
+    batch = data.get("batch", {})
+
+    return {
+        "status": "success",
+        "batchId": batch_id,
+        "batchStatus": batch.get("status", "unknown"),
+        "counts": batch.get("counts", {}),
+        "items": batch.get("items", []),
+    }
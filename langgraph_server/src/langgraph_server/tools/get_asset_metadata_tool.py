@@ -196,8 +196,9 @@ def getAssetMetadata(
         if metadata_type and step_id != metadata_type:
             continue
 
-        # Only include steps that have succeeded and have metadata
-        if step_status == "succeeded" and step_metadata:
+        # Only include steps that have succeeded (or carry a provisional result) and have metadata
+        provisional = step_status == "running" and bool((step_metadata or {}).get("provisional"))
+        if (step_status == "succeeded" or provisional) and step_metadata:
             metadata_results[step_id] = {
                 "label": step_label,
                 "status": step_status,
@@ -206,6 +207,8 @@ def getAssetMetadata(
 
             # Build human-readable summary
             summary = _format_step_summary(step_id, step_metadata)
+            if summary and provisional:
+                summary += " (provisional, still processing)"
             if summary:
                 summary_items.append({"type": "text", "text": f"**{step_label}**: {summary}"})
         elif step_status == "running":
@@ -282,7 +285,9 @@ def _format_step_summary(step_id: str, metadata: dict) -> str:
     elif step_id == "transcription":
         transcript = metadata.get("transcript", "")
         word_count = len(transcript.split()) if transcript else 0
-        segments = metadata.get("segments", [])
+        # Long transcripts keep only a preview inline; the full word list is in a track blob
+        segments = metadata.get("segments") or metadata.get("segmentsPreview") or []
+        total_segments = metadata.get("wordCount") or len(segments)
         if segments:
             # Show segment timestamps (start_sec + snippet) for narrative trimming
             max_segments = 20
@@ -293,8 +298,9 @@ def _format_step_summary(step_id: str, metadata: dict) -> str:
                 speech = (seg.get("speech") or "")[:20].replace("'", "\\'")
                 parts.append(f"{start_sec:.1f}s '{speech}'")
             seg_line = ", ".join(parts)
-            if len(segments) > max_segments:
-                seg_line += f", ... (+{len(segments) - max_segments} more)"
+            shown = min(len(segments), max_segments)
+            if total_segments > shown:
+                seg_line += f", ... (+{total_segments - shown} more)"
             return f"{word_count} words transcribed. Segments (start_sec, text): {seg_line}"
         return f"{word_count} words transcribed"
 
@@ -12,7 +12,7 @@ import httpx
 from langchain_core.tools import tool
 
 from ..config import get_settings
-from ..gemini_files import upload_file_sync
+from ..gemini_files import upload_asset_file_sync
 from ..hmac_auth import get_asset_service_headers
 
 logger = logging.getLogger(__name__)
@@ -194,32 +194,20 @@ def inspectAsset(
             "message": "GCS URIs require a signed URL. Ensure asset-service returns signedUrl.",
         }
 
-    # Fetch file content and upload to Gemini Files API
+    # Reuse a cached Files API handle, or stream the asset to Gemini once
     try:
-        fetch_resp = httpx.get(asset_url, timeout=300.0, follow_redirects=True)
-        fetch_resp.raise_for_status()
-        file_bytes = fetch_resp.content
+        uploaded = upload_asset_file_sync(
+            asset_id,
+            asset_url,
+            normalized_mime,
+            display_name=asset_name or f"asset-{asset_id}",
+        )
     except httpx.HTTPError as exc:
         logger.warning("Failed to fetch asset from URL: %s", exc)
         return {
             "status": "error",
             "message": f"Could not fetch asset from URL: {exc}",
         }
-
-    if not file_bytes:
-        return {
-            "status": "error",
-            "message": "Asset URL returned empty content.",
-        }
-
-    logger.info("[inspectAsset] Uploading asset to Gemini Files API (%d bytes)", len(file_bytes))
-
-    try:
-        uploaded = upload_file_sync(
-            file_bytes,
-            normalized_mime,
-            display_name=asset_name or f"asset-{asset_id}",
-        )
     except Exception as exc:
         logger.exception("Failed to upload to Gemini Files API")
         return {
@@ -71,9 +71,10 @@ def _build_asset_context(asset_id: str, pipeline_state: dict) -> str:
     parts = [f"Asset: {asset_id}"]
     steps = pipeline_state.get("steps", [])
     for step in steps:
-        if step.get("status") != "succeeded":
-            continue
         meta = step.get("metadata", {})
+        # Provisional shots (local scene cuts) are usable while the cloud result is pending
+        if step.get("status") != "succeeded" and not meta.get("provisional"):
+            continue
         step_id = step.get("id", "")
         if step_id == "metadata":
             duration = meta.get("duration")
@@ -83,7 +84,8 @@ def _build_asset_context(asset_id: str, pipeline_state: dict) -> str:
             transcript = (meta.get("transcript") or "")[:1500]
             if transcript:
                 parts.append(f"  transcript: {transcript}...")
-            segs = meta.get("segments", [])
+            # Long transcripts keep only a preview (first + last words) inline
+            segs = meta.get("segments") or meta.get("segmentsPreview") or []
             if segs:
                 # First/last few segment timings for trimming
                 sample = segs[:5] + segs[-3:] if len(segs) > 8 else segs
@@ -161,6 +161,45 @@ class TestGetAssetMetadata:
         items_text = " ".join(item["text"] for item in list_output["items"])
         assert "Processing" in items_text
 
+    @patch("langgraph_server.tools.get_asset_metadata_tool.get_settings")
+    @patch("langgraph_server.tools.get_asset_metadata_tool.httpx.get")
+    def test_includes_provisional_shots(self, mock_get, mock_get_settings, mock_settings):
+        """Should include provisional shots of a running step, marked as provisional."""
+        mock_get_settings.return_value = mock_settings
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "assetId": "asset-123",
+            "steps": [
+                {
+                    "id": "shot-detection",
+                    "label": "Shot Detection",
+                    "status": "running",
+                    "metadata": {
+                        "shotCount": 2,
+                        "shots": [
+                            {"index": 0, "start": 0, "end": 3.2, "duration": 3.2},
+                            {"index": 1, "start": 3.2, "end": 9.0, "duration": 5.8},
+                        ],
+                        "source": "local",
+                        "provisional": True,
+                    },
+                },
+            ],
+        }
+        mock_get.return_value = mock_response
+
+        result = invoke_with_context(getAssetMetadata, asset_id="asset-123")
+
+        assert result["status"] == "success"
+        json_output = next(o for o in result["outputs"] if o["type"] == "json")
+        assert json_output["data"]["metadata"]["shot-detection"]["status"] == "running"
+        list_output = next(o for o in result["outputs"] if o["type"] == "list")
+        items_text = " ".join(item["text"] for item in list_output["items"])
+        assert "2 shots detected" in items_text
+        assert "provisional" in items_text
+
     def test_invalid_metadata_type(self, mock_settings):
         """Should return error for invalid metadata type."""
         with patch("langgraph_server.tools.get_asset_metadata_tool.get_settings") as mock_get_settings:
@@ -250,6 +250,7 @@ export const createServer = (): Express => {
         input.userId,
         input.projectId,
         input.branchId,
+        input.options?.resolutionScale,
       );
 
       const { project, componentFiles, timelineDuration } = renderData;
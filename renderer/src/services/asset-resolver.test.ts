@@ -0,0 +1,155 @@
+import { afterEach, describe, expect, it, vi } from 'vitest';
+
+vi.mock('../logger.js', () => ({
+  logger: { info: vi.fn(), warn: vi.fn(), error: vi.fn(), debug: vi.fn() },
+}));
+
+import { fetchTranscriptions, resolveClipUrls } from './asset-resolver.js';
+import type { RendererConfig } from '../config.js';
+import type { Project } from '../types/index.js';
+
+const config = { assetServiceUrl: 'http://assets.test/' } as RendererConfig;
+const project = {
+  layers: [{ clips: [{ assetId: 'asset-1' }] }],
+} as unknown as Project;
+
+function jsonResponse(body: unknown, status = 200): Response {
+  return new Response(JSON.stringify(body), {
+    status,
+    headers: { 'Content-Type': 'application/json' },
+  });
+}
+
+function mockFetch(routes: Record<string, () => Response>) {
+  const fetchMock = vi.fn(async (input: string | URL | Request) => {
+    const url = String(input);
+    const route = routes[url];
+    return route ? route() : jsonResponse({ detail: 'not found' }, 404);
+  });
+  vi.stubGlobal('fetch', fetchMock);
+  return fetchMock;
+}
+
+const pipelineUrl = 'http://assets.test/api/pipeline/user-1/project-1/asset-1';
+const trackUrl = 'http://assets.test/api/assets/user-1/project-1/asset-1/tracks/transcript-words';
+
+describe('fetchTranscriptions', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('loads words from the segmentsTrack pointer', async () => {
+    const words = [
+      { start: 0, speech: 'hello' },
+      { start: 400, speech: 'there' },
+      { start: 900, speech: 'world' },
+    ];
+    const fetchMock = mockFetch({
+      [pipelineUrl]: () =>
+        jsonResponse({
+          steps: [
+            {
+              id: 'transcription',
+              status: 'succeeded',
+              metadata: {
+                segmentsTrack: { objectName: 'tracks/asset-1/transcript-words-abc.jsonl.gz' },
+                segmentsPreview: [words[0], words[2]],
+                wordCount: 3,
+              },
+            },
+          ],
+        }),
+      [trackUrl]: () => jsonResponse({ track: 'transcript-words', items: words }),
+    });
+
+    const result = await fetchTranscriptions(config, 'user-1', 'project-1', project);
+
+    expect(result['asset-1']?.segments).toEqual(words);
+    expect(fetchMock).toHaveBeenCalledWith(trackUrl, expect.anything());
+  });
+
+  it('uses inline segments when there is no track', async () => {
+    const words = [{ start: 0, speech: 'inline' }];
+    const fetchMock = mockFetch({
+      [pipelineUrl]: () =>
+        jsonResponse({
+          steps: [{ id: 'transcription', status: 'succeeded', metadata: { segments: words } }],
+        }),
+    });
+
+    const result = await fetchTranscriptions(config, 'user-1', 'project-1', project);
+
+    expect(result['asset-1']?.segments).toEqual(words);
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+  });
+
+  it('skips the asset when the track cannot be read and nothing is inline', async () => {
+    mockFetch({
+      [pipelineUrl]: () =>
+        jsonResponse({
+          steps: [
+            {
+              id: 'transcription',
+              status: 'succeeded',
+              metadata: { segmentsTrack: { objectName: 'tracks/missing.jsonl.gz' } },
+            },
+          ],
+        }),
+    });
+
+    const result = await fetchTranscriptions(config, 'user-1', 'project-1', project);
+
+    expect(result).toEqual({});
+  });
+});
+
+const assetUrl = 'http://assets.test/api/assets/user-1/project-1/asset-1';
+const proxyUrl = `${assetUrl}/playback-url?variant=proxy&maxHeight=360`;
+
+function videoProject(): Project {
+  return {
+    layers: [{ clips: [{ type: 'video', assetId: 'asset-1', src: '' }] }],
+  } as unknown as Project;
+}
+
+describe('resolveClipUrls', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('uses the original without a proxy height', async () => {
+    const fetchMock = mockFetch({
+      [assetUrl]: () => jsonResponse({ signedUrl: 'https://gcs.test/original.mp4' }),
+    });
+    const target = videoProject();
+
+    await resolveClipUrls(config, 'user-1', 'project-1', target);
+
+    expect((target.layers[0].clips[0] as { src: string }).src).toBe('https://gcs.test/original.mp4');
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+  });
+
+  it('uses the proxy for preview renders', async () => {
+    const fetchMock = mockFetch({
+      [proxyUrl]: () => jsonResponse({ url: 'https://gcs.test/proxy-360.mp4', variant: 'proxy' }),
+    });
+    const target = videoProject();
+
+    await resolveClipUrls(config, 'user-1', 'project-1', target, 360);
+
+    expect((target.layers[0].clips[0] as { src: string }).src).toBe('https://gcs.test/proxy-360.mp4');
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+  });
+
+  it('falls back to the original when the proxy lookup fails', async () => {
+    mockFetch({
+      [proxyUrl]: () => jsonResponse({ detail: 'boom' }, 500),
+      [assetUrl]: () => jsonResponse({ signedUrl: 'https://gcs.test/original.mp4' }),
+    });
+    const target = videoProject();
+
+    await resolveClipUrls(config, 'user-1', 'project-1', target, 360);
+
+    expect((target.layers[0].clips[0] as { src: string }).src).toBe('https://gcs.test/original.mp4');
+  });
+});
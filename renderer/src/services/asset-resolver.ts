@@ -58,11 +58,49 @@ async function getAssetSignedUrl(
   return null;
 }
 
+/**
+ * Fetch a signed URL for an asset's editing proxy, the largest one at or below maxHeight.
+ * The asset service falls back to the original itself when the asset has no proxy;
+ * null means the request failed.
+ */
+async function getAssetProxyUrl(
+  config: RendererConfig,
+  userId: string,
+  projectId: string,
+  assetId: string,
+  maxHeight: number,
+): Promise<string | null> {
+  if (!config.assetServiceUrl) return null;
+
+  const endpoint =
+    `${config.assetServiceUrl.replace(/\/$/, '')}/api/assets/${userId}/${projectId}/${assetId}` +
+    `/playback-url?variant=proxy&maxHeight=${maxHeight}`;
+  const headers = getAssetServiceHeaders(config);
+
+  try {
+    const response = await fetch(endpoint, { headers, signal: AbortSignal.timeout(10000) });
+    if (response.ok) {
+      const data = (await response.json()) as { url?: string | null };
+      return data.url ?? null;
+    }
+    logger.warn(
+      { assetId, status: response.status },
+      'Failed to get proxy URL for asset, using original',
+    );
+  } catch (err) {
+    logger.warn({ assetId, err }, 'Error fetching proxy URL for asset, using original');
+  }
+  return null;
+}
+
 /**
  * Resolve all clip asset URLs in a project.
  * Iterates layers -> clips, fetches signed URLs for video/audio/image clips,
  * and sets `src` (and `maskSrc` for video masks).
  *
+ * With proxyMaxHeight (preview renders), media resolves to the editing proxy
+ * at or below that height, falling back to the original.
+ *
  * Mutates the project in place and returns it.
  */
 export async function resolveClipUrls(
@@ -70,6 +108,7 @@ export async function resolveClipUrls(
   userId: string,
   projectId: string,
   project: Project,
+  proxyMaxHeight?: number,
 ): Promise<void> {
   if (!config.assetServiceUrl) {
     logger.warn('Asset service URL not configured, skipping URL resolution');
@@ -100,7 +139,11 @@ export async function resolveClipUrls(
   // Fetch all URLs in parallel
   const assetIds = [...assetIdSet];
   const urlResults = await Promise.all(
-    assetIds.map((id) => getAssetSignedUrl(config, userId, projectId, id)),
+    assetIds.map(async (id) =>
+      (proxyMaxHeight
+        ? await getAssetProxyUrl(config, userId, projectId, id, proxyMaxHeight)
+        : null) ?? getAssetSignedUrl(config, userId, projectId, id),
+    ),
   );
 
   const urlMap = new Map<string, string>();
@@ -110,7 +153,7 @@ export async function resolveClipUrls(
   }
 
   logger.info(
-    { total: assetIdSet.size, resolved: urlMap.size },
+    { total: assetIdSet.size, resolved: urlMap.size, proxyMaxHeight },
     'Resolved asset URLs',
   );
 
@@ -181,10 +224,36 @@ export async function fetchComponentFiles(
   }
 }
 
+type TranscriptWord = { start: number; speech: string };
+
+/**
+ * Fetch the word segments of a transcript stored as a track blob
+ * (metadata.segmentsTrack) through the asset service's tracks endpoint.
+ */
+async function fetchTranscriptWords(
+  config: RendererConfig,
+  baseUrl: string,
+  userId: string,
+  projectId: string,
+  assetId: string,
+): Promise<TranscriptWord[] | null> {
+  const endpoint = `${baseUrl}/api/assets/${userId}/${projectId}/${assetId}/tracks/transcript-words`;
+  const headers = getAssetServiceHeaders(config);
+  const response = await fetch(endpoint, { headers, signal: AbortSignal.timeout(30000) });
+  if (!response.ok) {
+    logger.warn({ assetId, status: response.status }, 'Failed to fetch transcript words track');
+    return null;
+  }
+  const data = (await response.json()) as { items?: TranscriptWord[] };
+  return data.items ?? null;
+}
+
 /**
  * Fetch transcription data from asset pipeline metadata.
  * For each assetId, checks the pipeline for a completed transcription step
- * and extracts the segment data.
+ * and extracts the segment data. Segments stored as a track blob
+ * (segmentsTrack) are fetched from the tracks endpoint; inline `segments`
+ * are the fallback.
  */
 export async function fetchTranscriptions(
   config: RendererConfig,
@@ -232,9 +301,15 @@ export async function fetchTranscriptions(
 
         if (!transcriptionStep?.metadata) return;
 
-        const { segments } = transcriptionStep.metadata as {
-          segments?: Array<{ start: number; speech: string }>;
+        const metadata = transcriptionStep.metadata as {
+          segments?: TranscriptWord[];
+          segmentsTrack?: { objectName?: string };
         };
+        let segments = metadata.segments;
+        if (metadata.segmentsTrack?.objectName) {
+          segments =
+            (await fetchTranscriptWords(config, baseUrl, userId, projectId, assetId)) ?? segments;
+        }
 
         if (!segments || segments.length === 0) return;
 
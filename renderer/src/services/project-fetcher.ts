@@ -3,7 +3,7 @@
  *
  * Given a userId, projectId, and branchId, this module:
  * 1. Fetches and decodes the project from Firebase RTDB (Automerge)
- * 2. Resolves all asset clip URLs via the asset service
+ * 2. Resolves all asset clip URLs via the asset service (editing proxies for preview renders)
  * 3. Fetches custom component source files
  * 4. Fetches transcription data from asset pipelines
  * 5. Calculates timeline duration
@@ -54,6 +54,7 @@ function computeTimelineDuration(layers: Layer[]): number {
  * @param userId - Project owner user ID (trusted, verified by caller)
  * @param projectId - Project ID
  * @param branchId - Branch ID (e.g. "main")
+ * @param resolutionScale - Output scale of a preview render; below 1, media resolves to editing proxies
  * @returns All data needed for rendering
  */
 export async function fetchRenderData(
@@ -61,15 +62,22 @@ export async function fetchRenderData(
   userId: string,
   projectId: string,
   branchId: string,
+  resolutionScale?: number,
 ): Promise<FetchedRenderData> {
   logger.info({ userId, projectId, branchId }, 'Fetching render data');
 
   // Step 1: Fetch and decode project from Firebase
   const project = await fetchBranchProject(config, userId, projectId, branchId);
 
+  // Preview renders only need media as tall as their scaled output
+  const proxyMaxHeight =
+    resolutionScale && resolutionScale < 1 && project.resolution?.height
+      ? Math.ceil(project.resolution.height * resolutionScale)
+      : undefined;
+
   // Step 2 & 3 can run in parallel: resolve URLs + fetch component files
   const [, componentFiles] = await Promise.all([
-    resolveClipUrls(config, userId, projectId, project),
+    resolveClipUrls(config, userId, projectId, project, proxyMaxHeight),
     fetchComponentFiles(config, userId, projectId),
   ]);
 
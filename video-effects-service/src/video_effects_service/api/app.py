@@ -10,8 +10,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from ..config import get_settings
+from ..http_client import close_http_clients, get_http_client_stats, open_http_clients
+from ..providers import shutdown_local_pool
+from ..storage import shutdown_firestore_pool
 from ..tasks import start_worker, stop_worker, close_task_queue
-from .routes import jobs, effects
+from .routes import jobs, effects, batches
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,8 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     logger.info("Video effects service starting...")
 
+    await open_http_clients()
+
     # Start background worker
     try:
         await start_worker()
@@ -47,7 +52,11 @@ async def lifespan(app: FastAPI):
         logger.warning("Task queue close timed out")
     except Exception as e:
         logger.warning(f"Error closing task queue: {e}")
-    
+
+    await close_http_clients()
+    shutdown_firestore_pool()
+    shutdown_local_pool()
+
     logger.info("Video effects service shutdown complete")
 
 
@@ -75,11 +84,12 @@ def create_app() -> FastAPI:
     # Include routers
     app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
     app.include_router(effects.router, prefix="/api/effects", tags=["effects"])
+    app.include_router(batches.router, prefix="/api/batches", tags=["batches"])
 
     @app.get("/health")
     async def health_check():
         """Health check endpoint."""
-        return {"status": "healthy"}
+        return {"status": "healthy", "httpClients": get_http_client_stats()}
 
     return app
 
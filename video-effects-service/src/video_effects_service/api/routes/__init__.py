@@ -1,5 +1,5 @@
 """API routes module."""
 
-from . import jobs, effects
+from . import jobs, effects, batches
 
-__all__ = ["jobs", "effects"]
+__all__ = ["jobs", "effects", "batches"]
@@ -0,0 +1,75 @@
+"""API routes for batch video effect jobs."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from ...batches import batch_to_response, create_batch
+from ...config import get_settings
+from ...effects.definitions import PROVIDER_LOCAL, get_effect_definition
+from ...storage.firestore import get_batch
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class StartBatchRequest(BaseModel):
+    """Request body for applying one effect to many assets."""
+
+    asset_ids: list[str] = Field(..., alias="assetIds", min_length=1)
+    effect_id: str = Field(..., alias="effectId", min_length=1)
+    user_id: str = Field(..., alias="userId", min_length=1)
+    project_id: str = Field(..., alias="projectId", min_length=1)
+    params: dict[str, Any] = Field(default_factory=dict)
+
+    model_config = {"populate_by_name": True}
+
+
+@router.post("")
+async def start_batch(request: StartBatchRequest):
+    """Start a batch job: one effect and params applied to every asset."""
+    definition = get_effect_definition(request.effect_id)
+    if not definition:
+        raise HTTPException(status_code=400, detail=f"Unknown video effect: {request.effect_id}")
+    if definition.provider == PROVIDER_LOCAL:
+        # Batches run on the remote provider's shared concurrency slots
+        raise HTTPException(
+            status_code=400,
+            detail=f"{definition.label} runs locally; start one job per asset instead of a batch",
+        )
+
+    max_assets = get_settings().batch_max_assets
+    if len(request.asset_ids) > max_assets:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can include at most {max_assets} assets",
+        )
+
+    try:
+        batch = await create_batch(
+            definition,
+            request.asset_ids,
+            request.user_id,
+            request.project_id,
+            request.params,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to start batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to start batch: {e}")
+
+    return {"batch": batch_to_response(batch)}
+
+
+@router.get("/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get the aggregate status of a batch job and its items."""
+    batch = await get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return {"batch": batch_to_response(batch)}
@@ -2,26 +2,68 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import json
 import logging
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 
-from ...effects.definitions import get_effect_definition
+from ...effects.definitions import PROVIDER_LOCAL, get_effect_definition
+from ... import result_cache
+from ...config import get_settings
 from ...storage.firestore import (
     get_job,
     list_jobs_by_asset,
     save_job,
 )
 from ...tasks import get_task_queue
-from ...providers.replicate import create_prediction, map_replicate_status
+from ...providers.replicate import (
+    get_webhook_signing_secret,
+    get_webhook_url,
+)
 from ...asset_client import get_asset_from_service
+from ...preprocess import PreprocessOptions
+from ...providers.local import effective_duration
+from ...providers.router import choose_provider
+from ...service import (
+    launch_local_job,
+    launch_preprocessed_job,
+    local_capacity_available,
+    start_prediction,
+)
+from ...hmac_auth import verify_replicate_webhook
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# "completing": the result is being stored (claim_job_for_completion)
+JOB_STATUSES = ("pending", "running", "completing", "completed", "error")
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 200
+# Retry-After of a local-only job refused because local renders are at capacity
+LOCAL_CAPACITY_RETRY_AFTER_SECONDS = 30
+# A result cache key's holder reserves it just before saving its job; how
+# long an identical request waits for that job to appear
+HOLDER_SAVE_WAIT_SECONDS = 2.0
+HOLDER_SAVE_POLL_SECONDS = 0.2
+# Job fields the job list UI renders (``view=compact``)
+COMPACT_JOB_FIELDS = [
+    "effectId",
+    "assetId",
+    "assetName",
+    "status",
+    "resultAssetId",
+    "resultAssetUrl",
+    "error",
+    "createdAt",
+    "updatedAt",
+]
+
 
 class StartJobRequest(BaseModel):
     """Request body for starting a video effect job."""
@@ -33,6 +75,12 @@ class StartJobRequest(BaseModel):
     project_id: str = Field(..., alias="projectId", min_length=1)
     asset_name: str | None = Field(default=None, alias="assetName")
     params: dict[str, Any] = Field(default_factory=dict)
+    # Start a new prediction even if an identical request was processed before
+    skip_cache: bool = Field(default=False, alias="skipCache")
+    # Send only [start, end) seconds of the video, at most maxHeight pixels high
+    start: float | None = Field(default=None, ge=0)
+    end: float | None = Field(default=None, gt=0)
+    max_height: int | None = Field(default=None, alias="maxHeight", ge=16)
 
     model_config = {"populate_by_name": True}
 
@@ -54,6 +102,7 @@ class JobResponse(BaseModel):
     result_asset_id: str | None = Field(default=None, alias="resultAssetId")
     result_asset_url: str | None = Field(default=None, alias="resultAssetUrl")
     metadata: dict[str, Any] | None = None
+    preprocess: dict[str, Any] | None = None
     error: str | None = None
     created_at: str = Field(alias="createdAt")
     updated_at: str = Field(alias="updatedAt")
@@ -79,12 +128,49 @@ def job_to_response(job: dict[str, Any]) -> dict[str, Any]:
         "resultAssetId": job.get("resultAssetId"),
         "resultAssetUrl": job.get("resultAssetUrl"),
         "metadata": job.get("metadata"),
+        "preprocess": job.get("preprocess"),
         "error": job.get("error"),
         "createdAt": job.get("createdAt"),
         "updatedAt": job.get("updatedAt"),
     }
 
 
+def job_to_compact_response(job: dict[str, Any]) -> dict[str, Any]:
+    """Convert a stored job to the compact list format (COMPACT_JOB_FIELDS only)."""
+    definition = get_effect_definition(job.get("effectId", ""))
+    response = {"id": job["id"], "effectLabel": definition.label if definition else job.get("effectId")}
+    response.update({field: job.get(field) for field in COMPACT_JOB_FIELDS})
+    return response
+
+
+def encode_list_cursor(job: dict[str, Any]) -> str:
+    """Opaque cursor pointing after job in the job list."""
+    raw = json.dumps([job.get("createdAt"), job["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_list_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of encode_list_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(job_id, str) or not job_id:
+        raise ValueError("Invalid cursor")
+    return created_at, job_id
+
+
+async def _get_holder_job(job_id: str) -> dict[str, Any] | None:
+    """Get the job holding a result cache key, waiting briefly for it to be saved."""
+    deadline = asyncio.get_running_loop().time() + HOLDER_SAVE_WAIT_SECONDS
+    while True:
+        job = await get_job(job_id)
+        if job is not None or asyncio.get_running_loop().time() >= deadline:
+            return job
+        await asyncio.sleep(HOLDER_SAVE_POLL_SECONDS)
+
+
 @router.post("")
 async def start_job(request: StartJobRequest):
     """Start a new video effect job."""
@@ -108,9 +194,22 @@ async def start_job(request: StartJobRequest):
     if not definition:
         raise HTTPException(status_code=400, detail=f"Unknown video effect: {request.effect_id}")
 
+    preprocess_options = PreprocessOptions(
+        start=request.start, end=request.end, max_height=request.max_height
+    )
+    if preprocess_options.active:
+        if definition.input_type != "video":
+            raise HTTPException(
+                status_code=400,
+                detail="start, end and maxHeight only apply to video effects",
+            )
+        if request.end is not None and request.end <= (request.start or 0):
+            raise HTTPException(status_code=400, detail="end must be after start")
+
     asset_url: str
     asset_name: str
     asset_id: str
+    asset: dict[str, Any] | None = None
 
     if request.image_url:
         # Use image URL directly (for image effects like background-remover)
@@ -136,61 +235,189 @@ async def start_job(request: StartJobRequest):
     # Merge default values with provided params
     merged_params = {**definition.default_values, **request.params}
 
-    # Build provider input
-    provider_input = definition.build_provider_input(
-        asset_url=asset_url,
-        asset_name=asset_name,
-        params=merged_params,
-    )
-
-    # Create prediction with Replicate
+    # Short inputs of effects with an ffmpeg implementation render locally
+    duration = effective_duration((asset or {}).get("duration"), preprocess_options)
     try:
-        prediction = await create_prediction(
-            version=definition.version,
-            input_data=provider_input,
+        provider = choose_provider(definition, duration, local_available=local_capacity_available())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    is_local = provider == PROVIDER_LOCAL
+    if is_local and not local_capacity_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Local renders are at capacity",
+            headers={"Retry-After": str(LOCAL_CAPACITY_RETRY_AFTER_SECONDS)},
+        )
+
+    if is_local:
+        # Params end up in ffmpeg filters; reject bad ones before saving the job.
+        # A speed ramp's real duration is only needed at render time.
+        try:
+            definition.local.build_filter_graph(
+                merged_params, 1.0 if definition.local.needs_duration else None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid params: {e}")
+        provider_input = merged_params
+    else:
+        if preprocess_options.active and not get_settings().preprocess_gcs_bucket:
+            raise HTTPException(
+                status_code=503,
+                detail="Input pre-processing is not configured (PREPROCESS_GCS_BUCKET)",
+            )
+        # Build provider input (from the original URL; a pre-processed input replaces it below)
+        provider_input = definition.build_provider_input(
+            asset_url=asset_url,
+            asset_name=asset_name,
+            params=merged_params,
         )
-    except Exception as e:
-        logger.exception(f"Failed to create prediction: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to start effect: {e}")
 
-    # Create job record
     job_id = str(uuid.uuid4())
+
+    # Reuse an identical job that is running or has completed
+    cache_key: str | None = None
+    if get_settings().result_cache_enabled and not request.skip_cache:
+        source = result_cache.source_identity(request.asset_id, asset, request.image_url)
+        if preprocess_options.active:
+            source = f"{source}|{preprocess_options.cache_tag()}"
+        cache_key = result_cache.compute_cache_key(
+            request.user_id,
+            request.project_id,
+            source,
+            definition.id,
+            definition.backend_version(provider),
+            provider_input,
+            asset_url,
+        )
+        try:
+            existing_id = await result_cache.reserve(cache_key, job_id)
+        except Exception as e:
+            logger.warning(f"Result cache unavailable: {e}")
+            existing_id = None
+            cache_key = None
+
+        if existing_id:
+            existing = await _get_holder_job(existing_id)
+            if existing and existing.get("status") != "error":
+                logger.info(f"Reusing job {existing_id} for identical request ({existing.get('status')})")
+                return {"job": job_to_response(existing), "cached": True}
+            # Held by a job that failed, or was still not saved after
+            # HOLDER_SAVE_WAIT_SECONDS (its request died); run without caching
+            cache_key = None
+
+    webhook_url = get_webhook_url(job_id)
     now = datetime.utcnow().isoformat() + "Z"
 
+    # Save the job before starting the prediction, so identical requests
+    # collapsed onto it can already see it
     job_data = {
         "id": job_id,
         "effectId": definition.id,
-        "provider": definition.provider,
+        "provider": provider,
         "assetId": asset_id,
         "assetName": asset_name,
         "assetUrl": asset_url,
         "userId": request.user_id,
         "projectId": request.project_id,
-        "status": map_replicate_status(prediction.get("status", "")),
+        "status": "running" if is_local else "pending",
         "params": merged_params,
+        "cacheKey": cache_key,
         "createdAt": now,
         "updatedAt": now,
-        "providerState": {
-            "replicate": {
-                "predictionId": prediction["id"],
-                "version": definition.version,
-                "getUrl": prediction.get("urls", {}).get("get"),
-                "streamUrl": prediction.get("urls", {}).get("stream"),
-            }
-        },
     }
+    if preprocess_options.active:
+        job_data["preprocess"] = preprocess_options.to_dict()
+    await save_job(job_data)
+
+    # Local renders apply the trim/maxHeight themselves, in the same ffmpeg pass
+    if is_local:
+        launch_local_job(
+            job_data,
+            definition,
+            asset_url,
+            preprocess_options if preprocess_options.active else None,
+            duration,
+        )
+        return {"job": job_to_response(job_data), "cached": False}
+
+    # Trim/scale the input so the provider only processes the frames in use.
+    # ffmpeg can take minutes, so it runs in the background with the
+    # prediction start; the job stays pending until then.
+    if preprocess_options.active:
+        launch_preprocessed_job(
+            job_data,
+            definition,
+            asset_url,
+            preprocess_options,
+            webhook_url,
+            asset_id=request.asset_id,
+            asset=asset,
+        )
+        return {"job": job_to_response(job_data), "cached": False}
+
+    try:
+        job_data = await start_prediction(job_data, definition, provider_input, webhook_url)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {"job": job_to_response(job_data), "cached": False}
+
+
+async def _apply_webhook(job_id: str, prediction: dict[str, Any]) -> None:
+    """Complete a job from a webhook payload, then stop polling it."""
+    from ...service import handle_prediction_webhook
+
+    try:
+        job = await handle_prediction_webhook(job_id, prediction)
+    except Exception as e:
+        logger.exception(f"Failed to handle webhook for job {job_id}: {e}")
+        return
+
+    if job and job.get("status") in ("completed", "error"):
+        try:
+            queue = await get_task_queue()
+            await queue.complete_poll(job_id)
+            await queue.update_task_status(job_id, "completed")
+        except Exception as e:
+            logger.warning(f"Failed to remove job {job_id} from the poll schedule: {e}")
 
-    # Save to Firestore
-    save_job(job_data)
 
-    # Enqueue for background polling
+@router.post("/webhooks/replicate")
+async def replicate_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    job_id: str = Query(..., alias="jobId"),
+):
+    """
+    Receive a completed prediction from Replicate.
+
+    The signature is checked before anything else; the job is completed in
+    the background so Replicate gets its acknowledgement right away.
+    """
+    body = await request.body()
     try:
-        queue = await get_task_queue()
-        await queue.enqueue_poll(job_id)
+        secret = await get_webhook_signing_secret()
     except Exception as e:
-        logger.warning(f"Failed to enqueue job for polling: {e}")
+        logger.error(f"Webhook signing secret unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Webhook verification unavailable")
+
+    if not verify_replicate_webhook(
+        body,
+        request.headers.get("webhook-id", ""),
+        request.headers.get("webhook-timestamp", ""),
+        request.headers.get("webhook-signature", ""),
+        secret,
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
 
-    return {"job": job_to_response(job_data)}
+    try:
+        prediction = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+
+    logger.info(f"Webhook for job {job_id}: prediction {prediction.get('id')} {prediction.get('status')}")
+    background_tasks.add_task(_apply_webhook, job_id, prediction)
+    return {"received": True}
 
 
 @router.get("/{job_id}")
@@ -210,8 +437,19 @@ async def get_job_status(job_id: str):
 async def list_jobs(
     asset_id: str | None = Query(default=None, alias="assetId"),
     image_url: str | None = Query(default=None, alias="imageUrl"),
+    limit: int = Query(default=DEFAULT_LIST_LIMIT, ge=1, le=MAX_LIST_LIMIT),
+    start_after: str | None = Query(default=None, alias="startAfter"),
+    status: str | None = Query(default=None),
+    view: str = Query(default="full", pattern="^(full|compact)$"),
 ):
-    """List all jobs for an asset or image URL."""
+    """
+    List jobs for an asset or image URL, newest first, one page at a time.
+
+    ``status`` is a comma-separated list of statuses to include. Pass the
+    returned ``nextCursor`` as ``startAfter`` to get the next page; it is
+    null on the last page. ``view=compact`` returns only the fields the job
+    list UI renders.
+    """
     if asset_id and image_url:
         raise HTTPException(
             status_code=400,
@@ -223,6 +461,33 @@ async def list_jobs(
             detail="Either assetId or imageUrl query parameter is required",
         )
 
+    statuses = None
+    if status:
+        statuses = sorted({value.strip() for value in status.split(",") if value.strip()})
+        unknown = [value for value in statuses if value not in JOB_STATUSES]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown status: {', '.join(unknown)}. Expected one of: {', '.join(JOB_STATUSES)}",
+            )
+
+    cursor = None
+    if start_after:
+        try:
+            cursor = decode_list_cursor(start_after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    compact = view == "compact"
     lookup_id = asset_id if asset_id else f"url:{image_url[:80]}"
-    jobs = list_jobs_by_asset(lookup_id)
-    return {"jobs": [job_to_response(job) for job in jobs]}
+    # One extra job tells whether there is a next page
+    jobs = await list_jobs_by_asset(
+        lookup_id,
+        limit=limit + 1,
+        start_after=cursor,
+        statuses=statuses,
+        fields=COMPACT_JOB_FIELDS if compact else None,
+    )
+    next_cursor = encode_list_cursor(jobs[limit - 1]) if len(jobs) > limit else None
+    serialize = job_to_compact_response if compact else job_to_response
+    return {"jobs": [serialize(job) for job in jobs[:limit]], "nextCursor": next_cursor}
@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Any
-
-import httpx
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Any
 
 from .config import get_settings
+from .http_client import get_http_client
 from .hmac_auth import get_asset_service_headers, get_asset_service_upload_headers
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class AssetServiceError(Exception):
     """Error from the asset service."""
@@ -21,6 +25,19 @@ class AssetServiceError(Exception):
         self.status_code = status_code
 
 
+@dataclass
+class DownloadedFile:
+    """A downloaded file spooled to memory or a temp file, with its SHA-256."""
+
+    file: IO[bytes]
+    size: int
+    sha256: str
+    mime_type: str
+
+    def close(self) -> None:
+        self.file.close()
+
+
 async def get_asset_from_service(
     user_id: str,
     project_id: str,
@@ -41,26 +58,60 @@ async def get_asset_from_service(
     url = f"{settings.asset_service_url}/api/assets/{user_id}/{project_id}/{asset_id}"
     headers = get_asset_service_headers("")
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, timeout=30.0)
+    response = await get_http_client(url).get(url, headers=headers, timeout=30.0)
+
+    if not response.is_success:
+        raise AssetServiceError(
+            f"Failed to get asset ({response.status_code}): {response.text}",
+            status_code=response.status_code,
+        )
 
-        if not response.is_success:
-            raise AssetServiceError(
-                f"Failed to get asset ({response.status_code}): {response.text}",
-                status_code=response.status_code,
-            )
+    return response.json()
 
-        return response.json()
+
+async def get_asset_playback_url(
+    user_id: str,
+    project_id: str,
+    asset_id: str,
+    variant: str = "original",
+    max_height: int | None = None,
+) -> dict[str, Any]:
+    """
+    Get a signed playback URL for an asset.
+
+    With variant="proxy" the asset service returns its largest editing proxy
+    at or below max_height, or the original when there is no proxy.
+
+    Returns:
+        Dict with url, variant and height (when known)
+    """
+    settings = get_settings()
+    url = f"{settings.asset_service_url}/api/assets/{user_id}/{project_id}/{asset_id}/playback-url"
+    params: dict[str, Any] = {"variant": variant}
+    if max_height:
+        params["maxHeight"] = max_height
+    headers = get_asset_service_headers("")
+
+    response = await get_http_client(url).get(url, params=params, headers=headers, timeout=30.0)
+
+    if not response.is_success:
+        raise AssetServiceError(
+            f"Failed to get playback URL ({response.status_code}): {response.text}",
+            status_code=response.status_code,
+        )
+
+    return response.json()
 
 
 async def upload_to_asset_service(
     user_id: str,
     project_id: str,
-    file_content: bytes,
+    file_content: bytes | IO[bytes],
     filename: str,
     mime_type: str,
     source: str = "video-effect",
     run_pipeline: bool = True,
+    body_hash: str | None = None,
 ) -> dict[str, Any]:
     """
     Upload a file to the asset service.
@@ -68,41 +119,47 @@ async def upload_to_asset_service(
     Args:
         user_id: User ID
         project_id: Project ID
-        file_content: File content as bytes
+        file_content: File content as bytes, or a binary file positioned at
+            its start (streamed from disk in chunks)
         filename: Name of the file
         mime_type: MIME type of the file
         source: Source of the upload
         run_pipeline: Whether to run the pipeline on the uploaded file
+        body_hash: Hex SHA-256 of the content; required when file_content is a file
 
     Returns:
         Upload response with asset data
     """
     settings = get_settings()
     url = f"{settings.asset_service_url}/api/assets/{user_id}/{project_id}/upload"
-    headers = get_asset_service_upload_headers(file_content)
-
-    async with httpx.AsyncClient() as client:
-        files = {"file": (filename, file_content, mime_type)}
-        data = {
-            "source": source,
-            "runPipeline": "true" if run_pipeline else "false",
-        }
-
-        response = await client.post(
-            url,
-            files=files,
-            data=data,
-            headers=headers,
-            timeout=300.0,  # 5 min timeout for uploads (asset service can be slow)
+    if isinstance(file_content, bytes):
+        headers = get_asset_service_upload_headers(file_content, body_hash)
+    elif body_hash is None:
+        raise ValueError("body_hash is required when uploading from a file")
+    else:
+        headers = get_asset_service_upload_headers(body_hash=body_hash)
+
+    files = {"file": (filename, file_content, mime_type)}
+    data = {
+        "source": source,
+        "runPipeline": "true" if run_pipeline else "false",
+    }
+
+    response = await get_http_client(url).post(
+        url,
+        files=files,
+        data=data,
+        headers=headers,
+        timeout=300.0,  # 5 min timeout for uploads (asset service can be slow)
+    )
+
+    if not response.is_success:
+        raise AssetServiceError(
+            f"Failed to upload asset ({response.status_code}): {response.text}",
+            status_code=response.status_code,
         )
 
-        if not response.is_success:
-            raise AssetServiceError(
-                f"Failed to upload asset ({response.status_code}): {response.text}",
-                status_code=response.status_code,
-            )
-
-        return response.json()
+    return response.json()
 
 
 async def download_remote_file(url: str) -> tuple[bytes, str]:
@@ -115,16 +172,58 @@ async def download_remote_file(url: str) -> tuple[bytes, str]:
     Returns:
         Tuple of (file_content, mime_type)
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, timeout=120.0, follow_redirects=True)
+    response = await get_http_client(url).get(url, timeout=120.0, follow_redirects=True)
+
+    if not response.is_success:
+        raise AssetServiceError(
+            f"Failed to download file ({response.status_code})",
+            status_code=response.status_code,
+        )
+
+    content = response.content
+    mime_type = response.headers.get("content-type", "video/mp4")
+
+    return content, mime_type
+
+
+async def download_remote_file_to_spool(url: str) -> DownloadedFile:
+    """
+    Stream a remote file into a spooled temp file, hashing it on the way.
 
-        if not response.is_success:
-            raise AssetServiceError(
-                f"Failed to download file ({response.status_code})",
-                status_code=response.status_code,
-            )
+    Files up to RESULT_SPOOL_MAX_MEMORY_MB stay in memory; larger ones roll
+    over to disk, so a large result never sits in memory whole. The caller
+    must close the returned file.
 
-        content = response.content
-        mime_type = response.headers.get("content-type", "video/mp4")
+    Args:
+        url: URL to download from
 
-        return content, mime_type
+    Returns:
+        The downloaded file, rewound to its start
+    """
+    settings = get_settings()
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=settings.result_spool_max_memory_mb * 1024 * 1024
+    )
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        client = get_http_client(url)
+        async with client.stream("GET", url, timeout=120.0, follow_redirects=True) as response:
+            if not response.is_success:
+                raise AssetServiceError(
+                    f"Failed to download file ({response.status_code})",
+                    status_code=response.status_code,
+                )
+
+            mime_type = response.headers.get("content-type", "video/mp4")
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return DownloadedFile(file=spool, size=size, sha256=digest.hexdigest(), mime_type=mime_type)
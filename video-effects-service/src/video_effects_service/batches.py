@@ -0,0 +1,349 @@
+"""Batch video effect jobs.
+
+A batch applies one effect, with one set of params, to many assets. It is a
+single Firestore document (``video-effects-batches/{batchId}``) holding the
+items, their aggregate counts and the batch status, and a single entry in
+the poll schedule. Each poll of the batch advances all of its items:
+
+- running predictions are checked, finished ones are stored as assets (an
+  item whose storing poller died is polled again after
+  COMPLETING_TIMEOUT_SECONDS)
+- pending items are started while the provider has free slots (a limit
+  shared by all batches and processes, BATCH_PROVIDER_MAX_INFLIGHT); each
+  is moved to ``starting`` in a transaction before its prediction is
+  created, so a poller that re-claims a slow poll cannot start it twice
+- all item changes go to the document in one transaction, each only if the
+  item is still in the status this poll read, with the counts and status
+  recomputed from the stored items
+
+When the last item finishes, one ``batch.completed`` event is published on
+the Redis events channel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from .asset_client import get_asset_from_service
+from .config import get_settings
+from .effects.definitions import VideoEffectDefinition, get_effect_definition
+from .providers.replicate import create_prediction, get_prediction, map_replicate_status
+from .service import build_result_updates, prediction_error
+from .storage.firestore import (
+    apply_batch_changes,
+    claim_batch_item_for_completion,
+    claim_batch_items_for_start,
+    get_batch,
+    save_batch,
+)
+from .tasks import get_task_queue
+
+logger = logging.getLogger(__name__)
+
+BATCH_STATUS_RUNNING = "running"
+BATCH_STATUS_COMPLETED = "completed"
+# Finished, but some items failed
+BATCH_STATUS_PARTIAL = "partial"
+BATCH_STATUS_ERROR = "error"
+
+ITEM_STATUSES = ("pending", "starting", "running", "completing", "completed", "error")
+
+# An item still 'starting' after this long lost its poller between the claim
+# and the write of its prediction id; it is failed rather than started twice
+STARTING_TIMEOUT_SECONDS = 10 * 60
+
+# An item still 'completing' after this long lost its poller while storing
+# the result; it goes back to 'running' so the next poll stores it again
+COMPLETING_TIMEOUT_SECONDS = 15 * 60
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _count_items(items: dict[str, dict[str, Any]]) -> dict[str, int]:
+    counts = {status: 0 for status in ITEM_STATUSES}
+    for item in items.values():
+        status = item.get("status", "pending")
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _batch_status(counts: dict[str, int]) -> str:
+    if counts["pending"] or counts["starting"] or counts["running"] or counts["completing"]:
+        return BATCH_STATUS_RUNNING
+    if not counts["error"]:
+        return BATCH_STATUS_COMPLETED
+    return BATCH_STATUS_PARTIAL if counts["completed"] else BATCH_STATUS_ERROR
+
+
+def _slot_holder(batch_id: str, item_key: str) -> str:
+    return f"{batch_id}:{item_key}"
+
+
+def _stale(item: dict[str, Any], field: str, timeout_seconds: int) -> bool:
+    try:
+        since = datetime.fromisoformat(item.get(field, "").rstrip("Z"))
+    except ValueError:
+        return True
+    return datetime.utcnow() - since > timedelta(seconds=timeout_seconds)
+
+
+def _start_interrupted(item: dict[str, Any]) -> bool:
+    return _stale(item, "startingAt", STARTING_TIMEOUT_SECONDS)
+
+
+def _completion_interrupted(item: dict[str, Any]) -> bool:
+    return _stale(item, "completingAt", COMPLETING_TIMEOUT_SECONDS)
+
+
+async def create_batch(
+    definition: VideoEffectDefinition,
+    asset_ids: list[str],
+    user_id: str,
+    project_id: str,
+    params: dict[str, Any],
+) -> dict[str, Any]:
+    """Record a batch over asset_ids (duplicates dropped) and schedule its first poll."""
+    unique_ids = list(dict.fromkeys(asset_ids))
+    items = {
+        f"i{index}": {"index": index, "assetId": asset_id, "status": "pending"}
+        for index, asset_id in enumerate(unique_ids)
+    }
+    counts = _count_items(items)
+    batch_data = {
+        "id": str(uuid.uuid4()),
+        "effectId": definition.id,
+        "provider": definition.provider,
+        "userId": user_id,
+        "projectId": project_id,
+        "params": {**definition.default_values, **params},
+        "status": BATCH_STATUS_RUNNING,
+        "total": len(items),
+        "counts": counts,
+        "items": items,
+    }
+    await save_batch(batch_data)
+
+    queue = await get_task_queue()
+    await queue.enqueue_batch_poll(batch_data["id"])
+    return batch_data
+
+
+async def _check_running_item(
+    batch: dict[str, Any],
+    definition: VideoEffectDefinition,
+    item_key: str,
+    item: dict[str, Any],
+) -> tuple[str, dict[str, Any]] | None:
+    """
+    Poll a running item's prediction.
+
+    Returns:
+        (status the change expects the item in, its new fields) if it
+        finished, else None
+    """
+    try:
+        prediction = await get_prediction(item["predictionId"])
+    except Exception as e:
+        logger.warning(f"Failed to poll batch {batch['id']} item {item_key}: {e}")
+        return None
+
+    status = map_replicate_status(prediction.get("status", ""))
+    if status == "error":
+        return "running", {"status": "error", "error": prediction_error(prediction), "finishedAt": _now()}
+    if status != "completed":
+        return None
+
+    if not await claim_batch_item_for_completion(batch["id"], item_key):
+        return None
+
+    owner = {"id": item["assetId"], "userId": batch["userId"], "projectId": batch["projectId"]}
+    try:
+        updates = await build_result_updates(owner, definition, prediction)
+    except Exception as e:
+        logger.exception(f"Failed to store result of batch {batch['id']} item {item_key}: {e}")
+        updates = {"status": "error", "error": str(e)}
+    return "completing", {**updates, "finishedAt": _now()}
+
+
+async def _start_item(
+    batch: dict[str, Any],
+    definition: VideoEffectDefinition,
+    item: dict[str, Any],
+) -> dict[str, Any]:
+    """Create the prediction for a pending item. Returns the item's new fields."""
+    asset_id = item["assetId"]
+    try:
+        asset = await get_asset_from_service(batch["userId"], batch["projectId"], asset_id)
+        asset_url = asset.get("signedUrl") or asset.get("gcsUri")
+        if not asset_url:
+            raise ValueError("Asset does not have a valid URL")
+        provider_input = definition.build_provider_input(
+            asset_url=asset_url,
+            asset_name=asset.get("name", asset_id),
+            params=batch["params"],
+        )
+        prediction = await create_prediction(version=definition.version, input_data=provider_input)
+    except Exception as e:
+        logger.warning(f"Failed to start batch {batch['id']} item for asset {asset_id}: {e}")
+        return {"status": "error", "error": f"Failed to start effect: {e}", "finishedAt": _now()}
+
+    return {
+        "status": "running",
+        "predictionId": prediction["id"],
+        "assetName": asset.get("name", asset_id),
+        "startedAt": _now(),
+    }
+
+
+def _summarize(batch: dict[str, Any]) -> dict[str, Any]:
+    """Batch-level fields (counts, status, completedAt) for the batch's items."""
+    if batch.get("status") != BATCH_STATUS_RUNNING:
+        # Finished once already; its summary stays as it was written then
+        return {}
+    counts = _count_items(batch.get("items") or {})
+    summary: dict[str, Any] = {"counts": counts, "status": _batch_status(counts)}
+    if summary["status"] != BATCH_STATUS_RUNNING:
+        summary["completedAt"] = _now()
+    return summary
+
+
+async def advance_batch(batch_id: str) -> dict[str, Any] | None:
+    """
+    Advance a batch by one poll.
+
+    Returns:
+        The batch after this poll, or None if it does not exist
+    """
+    settings = get_settings()
+    batch = await get_batch(batch_id)
+    if not batch or batch.get("status") != BATCH_STATUS_RUNNING:
+        return batch
+
+    definition = get_effect_definition(batch.get("effectId", ""))
+    items: dict[str, dict[str, Any]] = batch.get("items") or {}
+    # item key -> (status the item had when read, its new fields)
+    changes: dict[str, tuple[str, dict[str, Any]]] = {}
+    queue = await get_task_queue()
+    provider = batch.get("provider", "replicate")
+
+    if definition is None:
+        error = f"Unknown effect: {batch.get('effectId')}"
+        for key, item in items.items():
+            if item.get("status") in ("pending", "starting", "running", "completing"):
+                changes[key] = (item["status"], {"status": "error", "error": error, "finishedAt": _now()})
+    else:
+        running = [key for key, item in items.items() if item.get("status") == "running"]
+        results = await asyncio.gather(
+            *(_check_running_item(batch, definition, key, items[key]) for key in running)
+        )
+        for key, result in zip(running, results):
+            if result is not None:
+                changes[key] = result
+
+        for key, item in items.items():
+            if item.get("status") == "starting" and _start_interrupted(item):
+                changes[key] = ("starting", {"status": "error", "error": "Start was interrupted", "finishedAt": _now()})
+            elif item.get("status") == "completing" and _completion_interrupted(item):
+                logger.warning(f"Batch {batch_id} item {key} was not stored in time, polling it again")
+                changes[key] = ("completing", {"status": "running", "completingAt": None})
+
+        done = {key for key, (_, fields) in changes.items() if fields["status"] in ("completed", "error")}
+        finished = [_slot_holder(batch_id, key) for key in done]
+        # Items being stored keep their slot until the result is written
+        still_running = [
+            _slot_holder(batch_id, key)
+            for key, item in items.items()
+            if item.get("status") in ("running", "completing") and key not in done
+        ]
+        await queue.release_provider_slots(provider, finished)
+        await queue.refresh_provider_slots(provider, still_running, settings.batch_slot_lease_seconds)
+
+        to_start: list[str] = []
+        for key, item in sorted(items.items(), key=lambda entry: entry[1].get("index", 0)):
+            if item.get("status") != "pending":
+                continue
+            if not await queue.acquire_provider_slot(
+                provider,
+                _slot_holder(batch_id, key),
+                settings.batch_provider_max_inflight,
+                settings.batch_slot_lease_seconds,
+            ):
+                break
+            to_start.append(key)
+
+        # Items another poller claimed in the meantime keep their slot (same holder)
+        to_start = await claim_batch_items_for_start(batch_id, to_start)
+        started = await asyncio.gather(*(_start_item(batch, definition, items[key]) for key in to_start))
+        for key, result in zip(to_start, started):
+            changes[key] = ("starting", result)
+            if result["status"] == "error":
+                await queue.release_provider_slots(provider, [_slot_holder(batch_id, key)])
+
+    if not changes:
+        # Nothing new this poll; only write if the stored summary is behind its items
+        summary = _summarize(batch)
+        if all(batch.get(field) == value for field, value in summary.items()):
+            return batch
+
+    # Counts and status are recomputed from the items as stored, in the same
+    # transaction as this poll's changes, so concurrent polls cannot leave
+    # them behind (and the batch stuck as running)
+    previous_status, stored = await apply_batch_changes(batch_id, changes, _summarize)
+    if stored is None:
+        return None
+
+    status = stored.get("status")
+    if previous_status == BATCH_STATUS_RUNNING and status != BATCH_STATUS_RUNNING:
+        counts = stored.get("counts", {})
+        logger.info(f"Batch {batch_id} finished with status {status}: {counts}")
+        try:
+            await queue.publish_event({
+                "type": "batch.completed",
+                "batchId": batch_id,
+                "effectId": stored.get("effectId"),
+                "userId": stored.get("userId"),
+                "projectId": stored.get("projectId"),
+                "status": status,
+                "counts": counts,
+            })
+        except Exception as e:
+            logger.warning(f"Failed to publish completion event for batch {batch_id}: {e}")
+    return stored
+
+
+def batch_to_response(batch: dict[str, Any]) -> dict[str, Any]:
+    """Convert a stored batch to API response format (items in submission order)."""
+    definition = get_effect_definition(batch.get("effectId", ""))
+    items = sorted((batch.get("items") or {}).values(), key=lambda item: item.get("index", 0))
+    return {
+        "id": batch["id"],
+        "effectId": batch.get("effectId"),
+        "effectLabel": definition.label if definition else batch.get("effectId"),
+        "provider": batch.get("provider"),
+        "userId": batch.get("userId"),
+        "projectId": batch.get("projectId"),
+        "status": batch.get("status"),
+        "params": batch.get("params", {}),
+        "total": batch.get("total", len(items)),
+        "counts": batch.get("counts", {}),
+        "items": [
+            {
+                "assetId": item.get("assetId"),
+                "assetName": item.get("assetName"),
+                "status": item.get("status"),
+                "resultAssetId": item.get("resultAssetId"),
+                "resultAssetUrl": item.get("resultAssetUrl"),
+                "error": item.get("error"),
+            }
+            for item in items
+        ],
+        "createdAt": batch.get("createdAt"),
+        "updatedAt": batch.get("updatedAt"),
+        "completedAt": batch.get("completedAt"),
+    }
@@ -15,20 +15,80 @@ class Settings(BaseSettings):
 
     # Replicate API
     replicate_api_token: str = Field(..., alias="REPLICATE_API_TOKEN")
+    # Public base URL of this service; when set, predictions report completion by webhook
+    replicate_webhook_base_url: str | None = Field(default=None, alias="REPLICATE_WEBHOOK_BASE_URL")
+    # Webhook signing secret (whsec_...); fetched from the Replicate API when not set
+    replicate_webhook_signing_secret: str | None = Field(
+        default=None, alias="REPLICATE_WEBHOOK_SIGNING_SECRET"
+    )
 
     # Asset Service
     asset_service_url: str = Field(default="http://localhost:8081", alias="ASSET_SERVICE_URL")
     asset_service_shared_secret: str | None = Field(
         default=None, alias="ASSET_SERVICE_SHARED_SECRET"
     )
+    # Downloaded results larger than this are spooled to a temp file instead of memory
+    result_spool_max_memory_mb: int = Field(default=8, alias="RESULT_SPOOL_MAX_MEMORY_MB")
 
     # Google Cloud / Firebase
     google_project_id: str = Field(..., alias="GOOGLE_PROJECT_ID")
     firebase_service_account_key: str | None = Field(default=None, alias="FIREBASE_SERVICE_ACCOUNT_KEY")
+    # Threads running blocking Firestore calls (bounds concurrent round trips)
+    firestore_max_workers: int = Field(default=16, alias="FIRESTORE_MAX_WORKERS")
+
+    # Outbound HTTP clients (one pooled client per upstream host)
+    http2_enabled: bool = Field(default=True, alias="HTTP2_ENABLED")
+    http_max_connections_per_host: int = Field(default=20, alias="HTTP_MAX_CONNECTIONS_PER_HOST")
+    http_keepalive_expiry_seconds: float = Field(default=30.0, alias="HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    http_timeout_seconds: float = Field(default=30.0, alias="HTTP_TIMEOUT_SECONDS")
+
+    # Input pre-processing (start/end/maxHeight): trimmed inputs are written here
+    preprocess_gcs_bucket: str | None = Field(default=None, alias="PREPROCESS_GCS_BUCKET")
+    preprocess_gcs_prefix: str = Field(default="video-effects/preprocessed", alias="PREPROCESS_GCS_PREFIX")
+    # Lifetime of the signed URL handed to the provider
+    preprocess_url_ttl_seconds: int = Field(default=6 * 60 * 60, alias="PREPROCESS_URL_TTL_SECONDS")
+    # Concurrent ffmpeg runs per process
+    preprocess_max_concurrency: int = Field(default=2, alias="PREPROCESS_MAX_CONCURRENCY")
+    preprocess_timeout_seconds: float = Field(default=300.0, alias="PREPROCESS_TIMEOUT_SECONDS")
+    # Re-encode so the cut starts exactly at start; otherwise stream copy from the keyframe before it
+    preprocess_accurate_seek: bool = Field(default=True, alias="PREPROCESS_ACCURATE_SEEK")
+
+    # Local ffmpeg effects (run in a process pool on this service)
+    local_effects_enabled: bool = Field(default=True, alias="LOCAL_EFFECTS_ENABLED")
+    local_effects_max_workers: int = Field(default=2, alias="LOCAL_EFFECTS_MAX_WORKERS")
+    # Local jobs one process accepts at once (queued + rendering); beyond it, jobs go
+    # to the effect's remote provider, or get 503 when it has none
+    local_effects_max_inflight: int = Field(default=8, alias="LOCAL_EFFECTS_MAX_INFLIGHT")
+    # Longer inputs go to the effect's remote provider, when it has one
+    local_effects_max_duration_seconds: float = Field(
+        default=120.0, alias="LOCAL_EFFECTS_MAX_DURATION_SECONDS"
+    )
+    local_effects_timeout_seconds: float = Field(default=300.0, alias="LOCAL_EFFECTS_TIMEOUT_SECONDS")
 
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
 
+    # Result cache: identical requests reuse the in-flight or completed job
+    result_cache_enabled: bool = Field(default=True, alias="RESULT_CACHE_ENABLED")
+    result_cache_ttl_seconds: int = Field(default=60 * 60 * 24 * 7, alias="RESULT_CACHE_TTL_SECONDS")
+
+    # Batch jobs
+    batch_max_assets: int = Field(default=200, alias="BATCH_MAX_ASSETS")
+    # Concurrent batch predictions per provider, across all processes
+    batch_provider_max_inflight: int = Field(default=8, alias="BATCH_PROVIDER_MAX_INFLIGHT")
+    batch_slot_lease_seconds: int = Field(default=2 * 60 * 60, alias="BATCH_SLOT_LEASE_SECONDS")
+    batch_poll_interval_seconds: float = Field(default=5.0, alias="BATCH_POLL_INTERVAL_SECONDS")
+
+    # Job polling
+    poll_concurrency: int = Field(default=8, alias="POLL_CONCURRENCY")
+    poll_min_interval_seconds: float = Field(default=1.0, alias="POLL_MIN_INTERVAL_SECONDS")
+    poll_max_interval_seconds: float = Field(default=15.0, alias="POLL_MAX_INTERVAL_SECONDS")
+    # Poll interval grows by this fraction of the job's age
+    poll_backoff_ratio: float = Field(default=0.1, alias="POLL_BACKOFF_RATIO")
+    poll_claim_lease_seconds: int = Field(default=120, alias="POLL_CLAIM_LEASE_SECONDS")
+    # Safety-net poll interval for jobs whose completion is reported by webhook
+    poll_webhook_interval_seconds: float = Field(default=60.0, alias="POLL_WEBHOOK_INTERVAL_SECONDS")
+
     # FastAPI
     app_host: str = Field(default="0.0.0.0", alias="APP_HOST")
     app_port: int = Field(default=8082, alias="APP_PORT")
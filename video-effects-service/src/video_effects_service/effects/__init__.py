@@ -1,6 +1,9 @@
 """Video effect definitions module."""
 
 from .definitions import (
+    PROVIDER_LOCAL,
+    LocalEffect,
+    LocalFilterGraph,
     VideoEffectDefinition,
     get_effect_definition,
     get_effect_definitions,
@@ -8,6 +11,9 @@ from .definitions import (
 )
 
 __all__ = [
+    "PROVIDER_LOCAL",
+    "LocalEffect",
+    "LocalFilterGraph",
     "VideoEffectDefinition",
     "get_effect_definition",
     "get_effect_definitions",
@@ -1,10 +1,19 @@
-"""Video effect definitions registry."""
+"""Video effect definitions registry.
+
+An effect runs on a remote provider (``provider``/``version``), on this
+service with ffmpeg (``local``), or on either; providers/router.py picks the
+backend per job.
+"""
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 from typing import Any, Callable
 
+# Effects with this provider only run locally
+PROVIDER_LOCAL = "local"
+
 # Replicate versions
 REPLICATE_VERSION_SAM2 = "meta/sam-2-video:33432afdfc06a10da6b4018932893d39b0159f838b6d11dd1236dff85cc5ec1d"
 REPLICATE_VERSION_BACKGROUND_REMOVER = "851-labs/background-remover:a029dff38972b5fda4ec5d75d7d1cd25aeff621d2cf4946a41055d7db66b80bc"
@@ -31,15 +40,42 @@ class FieldDefinition:
     options: list[FieldOption] | None = None
 
 
+@dataclass
+class LocalFilterGraph:
+    """ffmpeg filters for one local render."""
+
+    video_filters: list[str]
+    # None drops the audio track
+    audio_filters: list[str] | None = field(default_factory=list)
+
+
+@dataclass
+class LocalEffect:
+    """ffmpeg implementation of an effect, run by the local provider."""
+
+    # Bump when the output for the same params changes (result cache key)
+    version: str
+    # (params, input duration in seconds if known) -> filters; raises ValueError for bad params
+    build_filter_graph: Callable[[dict[str, Any], float | None], LocalFilterGraph]
+    # "mp4" (H.264/AAC) or "webm" (VP9 with alpha/Opus)
+    output_format: str = "mp4"
+    # The filter graph needs the input duration
+    needs_duration: bool = False
+
+
 @dataclass
 class VideoEffectDefinition:
     """Definition of a video effect."""
 
     id: str
     label: str
+    # Remote provider ("replicate"), or PROVIDER_LOCAL for local-only effects
     provider: str
-    version: str
+    # Remote provider model version
+    version: str = ""
     description: str | None = None
+    # Media the effect takes as input: "video" or "image"
+    input_type: str = "video"
     fields: list[FieldDefinition] = field(default_factory=list)
     default_values: dict[str, Any] = field(default_factory=dict)
     build_provider_input: Callable[[str, str, dict[str, Any]], dict[str, Any]] = field(
@@ -48,6 +84,21 @@ class VideoEffectDefinition:
     extract_result: Callable[[Any, str], dict[str, Any]] = field(
         default=lambda output, status: {}
     )
+    local: LocalEffect | None = None
+
+    @property
+    def backends(self) -> list[str]:
+        """Backends that can run the effect, local first."""
+        backends = [PROVIDER_LOCAL] if self.local else []
+        if self.provider != PROVIDER_LOCAL:
+            backends.append(self.provider)
+        return backends
+
+    def backend_version(self, provider: str) -> str:
+        """Version of the effect on a backend (result cache key)."""
+        if provider == PROVIDER_LOCAL and self.local:
+            return f"{PROVIDER_LOCAL}:{self.local.version}"
+        return self.version
 
 
 def _normalize_comma_list(value: str) -> str | None:
@@ -207,6 +258,7 @@ BACKGROUND_REMOVER_DEFINITION = VideoEffectDefinition(
     description="Remove the background from an image using AI. Output is a PNG with transparent background.",
     provider="replicate",
     version=REPLICATE_VERSION_BACKGROUND_REMOVER,
+    input_type="image",
     fields=[],
     default_values={},
     build_provider_input=_build_background_remover_input,
@@ -214,10 +266,204 @@ BACKGROUND_REMOVER_DEFINITION = VideoEffectDefinition(
 )
 
 
+def _number_param(params: dict[str, Any], name: str, default: float, low: float, high: float) -> float:
+    """Numeric param within [low, high]; filter graphs only ever see validated numbers."""
+    value = params.get(name, default)
+    if value is None or value == "":
+        value = default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not low <= number <= high:
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return number
+
+
+_HEX_COLOR = re.compile(r"^(?:#|0x)?([0-9a-fA-F]{6})$")
+
+
+def _build_chroma_key_graph(params: dict[str, Any], duration: float | None) -> LocalFilterGraph:
+    match = _HEX_COLOR.match(str(params.get("keyColor", "#00ff00")).strip())
+    if not match:
+        raise ValueError("keyColor must be a hex color such as #00ff00")
+    similarity = _number_param(params, "similarity", 0.1, 0.01, 1.0)
+    blend = _number_param(params, "blend", 0.05, 0.0, 1.0)
+    return LocalFilterGraph(
+        video_filters=[f"chromakey=color=0x{match.group(1)}:similarity={similarity:g}:blend={blend:g}"]
+    )
+
+
+def _build_blur_graph(params: dict[str, Any], duration: float | None) -> LocalFilterGraph:
+    sigma = _number_param(params, "strength", 8, 0.5, 50)
+    return LocalFilterGraph(video_filters=[f"gblur=sigma={sigma:g}"])
+
+
+COLOR_GRADE_PRESETS = {
+    "vintage": "Vintage",
+    "cross_process": "Cross process",
+    "increase_contrast": "More contrast",
+    "strong_contrast": "Strong contrast",
+    "lighter": "Lighter",
+    "darker": "Darker",
+    "negative": "Negative",
+}
+
+
+def _build_color_grade_graph(params: dict[str, Any], duration: float | None) -> LocalFilterGraph:
+    preset = params.get("preset") or "vintage"
+    if preset not in COLOR_GRADE_PRESETS:
+        raise ValueError(f"preset must be one of: {', '.join(COLOR_GRADE_PRESETS)}")
+    saturation = _number_param(params, "saturation", 1.0, 0.0, 3.0)
+    filters = [f"curves=preset={preset}"]
+    if saturation != 1.0:
+        filters.append(f"eq=saturation={saturation:g}")
+    return LocalFilterGraph(video_filters=filters)
+
+
+def _atempo_chain(speed: float) -> list[str]:
+    """atempo filters for a speed factor (one atempo covers 0.5-2.0)."""
+    filters = []
+    while speed > 2.0:
+        filters.append("atempo=2.0")
+        speed /= 2.0
+    while speed < 0.5:
+        filters.append("atempo=0.5")
+        speed /= 0.5
+    filters.append(f"atempo={speed:.6f}")
+    return filters
+
+
+def _build_speed_ramp_graph(params: dict[str, Any], duration: float | None) -> LocalFilterGraph:
+    start_speed = _number_param(params, "startSpeed", 1.0, 0.25, 4.0)
+    end_speed = _number_param(params, "endSpeed", start_speed, 0.25, 4.0)
+    if abs(end_speed - start_speed) < 1e-6:
+        return LocalFilterGraph(
+            video_filters=[f"setpts=PTS/{start_speed:.6f}"],
+            audio_filters=_atempo_chain(start_speed),
+        )
+
+    if not duration:
+        raise ValueError("Input duration is unknown; a speed ramp needs it")
+    # Speed changes linearly from start to end over the input. An input frame
+    # at T seconds is shown at the integral of 1/speed up to T.
+    slope = (end_speed - start_speed) / duration
+    return LocalFilterGraph(
+        video_filters=[
+            f"setpts='log(({start_speed:.6f}+{slope:.9f}*T)/{start_speed:.6f})/{slope:.9f}/TB'"
+        ],
+        # Audio cannot follow a ramp without pitch artifacts; drop it
+        audio_filters=None,
+    )
+
+
+CHROMA_KEY_DEFINITION = VideoEffectDefinition(
+    id="local.chroma-key",
+    label="Chroma Key",
+    description="Make a green or blue screen transparent. Output is a WebM video with alpha.",
+    provider=PROVIDER_LOCAL,
+    fields=[
+        FieldDefinition(
+            name="keyColor",
+            label="Key Color",
+            type="text",
+            placeholder="#00ff00",
+            description="Screen color to remove, as hex.",
+            required=True,
+        ),
+        FieldDefinition(
+            name="similarity",
+            label="Similarity",
+            type="number",
+            description="How close to the key color a pixel must be to be removed (0.01-1).",
+        ),
+        FieldDefinition(
+            name="blend",
+            label="Edge Blend",
+            type="number",
+            description="Softness of the key edges (0-1).",
+        ),
+    ],
+    default_values={"keyColor": "#00ff00", "similarity": 0.1, "blend": 0.05},
+    local=LocalEffect(version="1", build_filter_graph=_build_chroma_key_graph, output_format="webm"),
+)
+
+BLUR_DEFINITION = VideoEffectDefinition(
+    id="local.blur",
+    label="Blur",
+    description="Gaussian blur over the whole frame.",
+    provider=PROVIDER_LOCAL,
+    fields=[
+        FieldDefinition(
+            name="strength",
+            label="Strength",
+            type="number",
+            description="Blur radius (0.5-50).",
+            required=True,
+        ),
+    ],
+    default_values={"strength": 8},
+    local=LocalEffect(version="1", build_filter_graph=_build_blur_graph),
+)
+
+COLOR_GRADE_DEFINITION = VideoEffectDefinition(
+    id="local.color-grade",
+    label="Color Grade",
+    description="Apply a color grading preset, with optional saturation.",
+    provider=PROVIDER_LOCAL,
+    fields=[
+        FieldDefinition(
+            name="preset",
+            label="Preset",
+            type="select",
+            options=[FieldOption(value=value, label=label) for value, label in COLOR_GRADE_PRESETS.items()],
+            required=True,
+        ),
+        FieldDefinition(
+            name="saturation",
+            label="Saturation",
+            type="number",
+            description="1 keeps the preset's saturation; 0 is black and white (0-3).",
+        ),
+    ],
+    default_values={"preset": "vintage", "saturation": 1.0},
+    local=LocalEffect(version="1", build_filter_graph=_build_color_grade_graph),
+)
+
+SPEED_RAMP_DEFINITION = VideoEffectDefinition(
+    id="local.speed-ramp",
+    label="Speed Ramp",
+    description="Change playback speed, constant or ramping from a start to an end speed. Ramps drop the audio.",
+    provider=PROVIDER_LOCAL,
+    fields=[
+        FieldDefinition(
+            name="startSpeed",
+            label="Start Speed",
+            type="number",
+            description="Speed at the start of the clip (0.25-4, 1 is normal).",
+            required=True,
+        ),
+        FieldDefinition(
+            name="endSpeed",
+            label="End Speed",
+            type="number",
+            description="Speed at the end of the clip; same as start for a constant speed.",
+            required=True,
+        ),
+    ],
+    default_values={"startSpeed": 1.0, "endSpeed": 2.0},
+    local=LocalEffect(version="1", build_filter_graph=_build_speed_ramp_graph, needs_duration=True),
+)
+
+
 # Registry of all effect definitions
 EFFECT_DEFINITIONS: list[VideoEffectDefinition] = [
     SAM2_VIDEO_DEFINITION,
     BACKGROUND_REMOVER_DEFINITION,
+    CHROMA_KEY_DEFINITION,
+    BLUR_DEFINITION,
+    COLOR_GRADE_DEFINITION,
+    SPEED_RAMP_DEFINITION,
 ]
 
 EFFECT_DEFINITIONS_MAP: dict[str, VideoEffectDefinition] = {
@@ -243,6 +489,8 @@ def get_effect_definitions_for_api() -> list[dict[str, Any]]:
             "label": definition.label,
             "description": definition.description,
             "provider": definition.provider,
+            "backends": definition.backends,
+            "inputType": definition.input_type,
             "fields": [
                 {
                     "name": field.name,
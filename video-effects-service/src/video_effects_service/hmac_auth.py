@@ -1,13 +1,17 @@
-"""HMAC authentication for asset service requests."""
+"""HMAC authentication for asset service requests and provider webhooks."""
 
 from __future__ import annotations
 
+import base64
 import hashlib
 import hmac
 import time
 
 from .config import get_settings
 
+# Webhooks with an older (or future) timestamp are rejected as replays
+WEBHOOK_TOLERANCE_SECONDS = 300
+
 
 def _sign_request(body: str, timestamp: int, secret: str) -> str:
     """Sign a request body with HMAC-SHA256."""
@@ -30,12 +34,18 @@ def get_asset_service_headers(body: str = "") -> dict[str, str]:
     }
 
 
-def get_asset_service_upload_headers(file_bytes: bytes) -> dict[str, str]:
-    """Get headers for authenticated asset service file uploads."""
+def get_asset_service_upload_headers(
+    file_bytes: bytes | None = None,
+    body_hash: str | None = None,
+) -> dict[str, str]:
+    """Get headers for authenticated asset service file uploads.
+    Pass body_hash (hex SHA-256 of the file) when it was computed while streaming.
+    """
     settings = get_settings()
     if not settings.asset_service_shared_secret:
         return {}
-    body_hash = hashlib.sha256(file_bytes).hexdigest()
+    if body_hash is None:
+        body_hash = hashlib.sha256(file_bytes or b"").hexdigest()
     timestamp = int(time.time() * 1000)
     signature = _sign_request(body_hash, timestamp, settings.asset_service_shared_secret)
     return {
@@ -43,3 +53,35 @@ def get_asset_service_upload_headers(file_bytes: bytes) -> dict[str, str]:
         "X-Timestamp": str(timestamp),
         "X-Body-Hash": body_hash,
     }
+
+
+def verify_replicate_webhook(
+    body: bytes,
+    webhook_id: str,
+    webhook_timestamp: str,
+    webhook_signature: str,
+    secret: str,
+) -> bool:
+    """
+    Verify a Replicate webhook signature.
+
+    Replicate signs ``"{webhook-id}.{webhook-timestamp}.{body}"`` with
+    HMAC-SHA256, keyed by the base64 part of the ``whsec_`` secret, and sends
+    one or more space-separated ``v1,<base64 signature>`` values.
+    """
+    try:
+        timestamp = int(webhook_timestamp)
+    except (TypeError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > WEBHOOK_TOLERANCE_SECONDS:
+        return False
+
+    key = base64.b64decode(secret.split("_", 1)[-1])
+    signed = f"{webhook_id}.{webhook_timestamp}.".encode() + body
+    expected = base64.b64encode(hmac.new(key, signed, hashlib.sha256).digest()).decode()
+
+    for candidate in (webhook_signature or "").split():
+        _, _, signature = candidate.partition(",")
+        if hmac.compare_digest(signature, expected):
+            return True
+    return False
@@ -0,0 +1,128 @@
+"""Shared outbound HTTP clients.
+
+One pooled ``httpx.AsyncClient`` per upstream host (Replicate, the asset
+service, the provider's file delivery host), kept for the lifetime of the
+app instead of a new client, and TLS handshake, per call. Clients use
+keep-alive, at most HTTP_MAX_CONNECTIONS_PER_HOST connections, and HTTP/2
+when the ``h2`` package is installed.
+
+Each client counts its requests and the connections it had to open, so
+connection reuse is visible in ``/health``.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from .config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_stats: dict[str, HostStats] = {}
+_http2_available: bool | None = None
+
+
+@dataclass
+class HostStats:
+    """Connection reuse counters for one upstream host."""
+
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    http2_requests: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "newConnections": self.new_connections,
+            "tlsHandshakes": self.tls_handshakes,
+            "http2Requests": self.http2_requests,
+            "reuseRatio": round(reused / self.requests, 3) if self.requests else None,
+        }
+
+
+def _http2_enabled(settings: Settings) -> bool:
+    global _http2_available
+    if not settings.http2_enabled:
+        return False
+    if _http2_available is None:
+        try:
+            import h2  # noqa: F401
+
+            _http2_available = True
+        except ImportError:
+            logger.info("h2 not installed; outbound HTTP clients use HTTP/1.1 keep-alive")
+            _http2_available = False
+    return _http2_available
+
+
+def _tracer(stats: HostStats):
+    async def trace(event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            stats.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            stats.tls_handshakes += 1
+        elif event_name == "http2.send_request_headers.started":
+            stats.http2_requests += 1
+
+    return trace
+
+
+def _new_client(host: str, settings: Settings) -> httpx.AsyncClient:
+    stats = _stats.setdefault(host, HostStats())
+    trace = _tracer(stats)
+
+    async def on_request(request: httpx.Request) -> None:
+        stats.requests += 1
+        request.extensions["trace"] = trace
+
+    return httpx.AsyncClient(
+        http2=_http2_enabled(settings),
+        timeout=settings.http_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        event_hooks={"request": [on_request]},
+    )
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Pooled client for the host of url (created on first use)."""
+    host = httpx.URL(url).host
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _clients[host] = _new_client(host, get_settings())
+    return client
+
+
+async def open_http_clients() -> None:
+    """Create the clients for Replicate and the asset service on startup."""
+    from .providers.replicate import API_BASE_URL
+
+    for url in (API_BASE_URL, get_settings().asset_service_url):
+        get_http_client(url)
+    logger.info(f"Opened HTTP clients for {len(_clients)} upstream hosts")
+
+
+async def close_http_clients() -> None:
+    """Close all clients (shutdown)."""
+    clients = list(_clients.items())
+    _clients.clear()
+    for host, client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP client for {host}: {e}")
+
+
+def get_http_client_stats() -> dict[str, dict[str, Any]]:
+    """Connection reuse counters per upstream host."""
+    return {host: stats.to_dict() for host, stats in _stats.items()}
@@ -0,0 +1,256 @@
+"""Input pre-processing: trim and downscale a video before the provider sees it.
+
+Provider runtime grows with the frames processed, so a job over a 4 second
+clip of a long, high-resolution asset should not send the whole original.
+When a job has ``start``/``end``/``maxHeight``, ffmpeg cuts (and scales) the
+source into a temporary Cloud Storage object, and the provider gets a signed
+URL of that object instead:
+
+- for ``maxHeight``, the asset service's largest editing proxy at or below
+  that height is the source when there is one, so only the trim is left
+- the trim is a stream copy (no re-encode) unless frames must be scaled or
+  the cut must start exactly at ``start`` (PREPROCESS_ACCURATE_SEEK); a
+  stream copy starts at the keyframe before ``start``
+- ffmpeg reads the source over HTTP and seeks with range requests, so only
+  the part it needs is downloaded
+
+The temporary object is deleted when the job finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any
+
+from .asset_client import get_asset_playback_url
+from .config import Settings, get_settings
+from .storage.gcs import create_signed_url, delete_object, upload_temp_file
+
+logger = logging.getLogger(__name__)
+
+PREPROCESSED_CONTENT_TYPE = "video/mp4"
+
+_slots: asyncio.Semaphore | None = None
+
+
+@dataclass
+class PreprocessOptions:
+    """Requested trim (seconds in the source) and maximum output height."""
+
+    start: float | None = None
+    end: float | None = None
+    max_height: int | None = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.start) or self.end is not None or self.max_height is not None
+
+    def cache_tag(self) -> str:
+        """Source identity suffix, so trimmed and full inputs never share a cached result."""
+        end = "" if self.end is None else self.end
+        return f"trim={self.start or 0}-{end};maxHeight={self.max_height or ''}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"start": self.start, "end": self.end, "maxHeight": self.max_height}
+
+
+@dataclass
+class PreprocessedInput:
+    """A trimmed/scaled input stored in Cloud Storage."""
+
+    url: str
+    gcs_uri: str
+    source_variant: str
+    stream_copy: bool
+    size: int
+
+
+def _get_slots(settings: Settings) -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.preprocess_max_concurrency)
+    return _slots
+
+
+def scale_filter(max_height: int) -> str:
+    """ffmpeg filter that downscales to at most max_height (even, for yuv420p); never upscales."""
+    return f"scale=-2:'trunc(min(ih,{max_height})/2)*2'"
+
+
+def build_ffmpeg_command(
+    source_url: str,
+    output_path: str,
+    options: PreprocessOptions,
+    *,
+    scale: bool,
+    stream_copy: bool,
+) -> list[str]:
+    """ffmpeg arguments for cutting [start, end) of source_url to an MP4 at output_path."""
+    command = ["ffmpeg", "-hide_banner", "-nostdin", "-y"]
+    if options.start:
+        command += ["-ss", f"{options.start:.3f}"]
+    command += ["-i", source_url]
+    if options.end is not None:
+        command += ["-t", f"{options.end - (options.start or 0):.3f}"]
+    command += ["-map", "0:v:0", "-map", "0:a:0?"]
+    if stream_copy:
+        command += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+    else:
+        if scale:
+            command += ["-vf", scale_filter(options.max_height)]
+        command += [
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+        ]
+    command += ["-movflags", "+faststart", output_path]
+    return command
+
+
+async def _run_ffmpeg(command: list[str], settings: Settings) -> None:
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(
+            process.communicate(), timeout=settings.preprocess_timeout_seconds
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise RuntimeError(f"ffmpeg timed out after {settings.preprocess_timeout_seconds}s")
+    if process.returncode != 0:
+        tail = stderr.decode("utf-8", errors="replace")[-500:]
+        raise RuntimeError(f"ffmpeg exited with {process.returncode}: {tail}")
+
+
+async def _resolve_source(
+    source_url: str,
+    options: PreprocessOptions,
+    asset: dict[str, Any] | None,
+    asset_id: str | None,
+    user_id: str,
+    project_id: str,
+) -> tuple[str, int | None, str]:
+    """
+    Pick the input to cut from.
+
+    Returns:
+        Tuple of (url, height if known, "original" or "proxy")
+    """
+    height = (asset or {}).get("height")
+    if not options.max_height or not asset_id or (height and height <= options.max_height):
+        return source_url, height, "original"
+
+    try:
+        playback = await get_asset_playback_url(
+            user_id, project_id, asset_id, variant="proxy", max_height=options.max_height
+        )
+    except Exception as e:
+        logger.warning(f"Proxy lookup failed for asset {asset_id}, using the original: {e}")
+        return source_url, height, "original"
+
+    proxy_height = playback.get("height") or 0
+    if playback.get("variant") == "proxy" and playback.get("url") and 0 < proxy_height <= options.max_height:
+        return playback["url"], proxy_height, "proxy"
+    return source_url, height, "original"
+
+
+async def preprocess_input(
+    job_id: str,
+    source_url: str,
+    options: PreprocessOptions,
+    *,
+    user_id: str,
+    project_id: str,
+    asset_id: str | None = None,
+    asset: dict[str, Any] | None = None,
+) -> PreprocessedInput:
+    """
+    Trim/scale source_url into a temporary Cloud Storage object.
+
+    Args:
+        job_id: Job the input is for (names the object)
+        source_url: Signed URL of the original
+        options: Requested trim and maximum height
+        user_id: Owner of the asset (proxy lookup)
+        project_id: Project of the asset (proxy lookup)
+        asset_id: Asset id, when the source is a project asset
+        asset: The asset (its height, when known, avoids needless scaling)
+
+    Raises:
+        RuntimeError: If pre-processing is not configured or ffmpeg fails
+    """
+    settings = get_settings()
+    if not settings.preprocess_gcs_bucket:
+        raise RuntimeError("Input pre-processing is not configured (PREPROCESS_GCS_BUCKET)")
+
+    url, height, variant = await _resolve_source(
+        source_url, options, asset, asset_id, user_id, project_id
+    )
+    if not url.startswith(("http://", "https://")):
+        raise RuntimeError("Source has no HTTP(S) URL to read from")
+
+    scale = bool(options.max_height) and (height is None or height > options.max_height)
+    stream_copy = not scale and not (options.start and settings.preprocess_accurate_seek)
+
+    with tempfile.TemporaryDirectory(prefix="vfx-preprocess-") as tmp_dir:
+        output_path = os.path.join(tmp_dir, "input.mp4")
+        async with _get_slots(settings):
+            try:
+                await _run_ffmpeg(
+                    build_ffmpeg_command(url, output_path, options, scale=scale, stream_copy=stream_copy),
+                    settings,
+                )
+            except RuntimeError as e:
+                if not stream_copy:
+                    raise
+                # Codecs that do not fit in MP4, broken timestamps, ...
+                logger.info(f"Stream copy failed for job {job_id}, re-encoding: {e}")
+                stream_copy = False
+                await _run_ffmpeg(
+                    build_ffmpeg_command(url, output_path, options, scale=scale, stream_copy=False),
+                    settings,
+                )
+
+        size = os.path.getsize(output_path)
+        object_name = f"{settings.preprocess_gcs_prefix.strip('/')}/{job_id}.mp4"
+        gcs_uri = await asyncio.to_thread(
+            upload_temp_file, output_path, object_name, PREPROCESSED_CONTENT_TYPE, settings
+        )
+
+    try:
+        signed_url = await asyncio.to_thread(
+            create_signed_url, gcs_uri, settings.preprocess_url_ttl_seconds, settings
+        )
+    except BaseException:
+        # The job never records gcsUri, so nothing else would delete the object
+        await cleanup_preprocessed_input({"id": job_id, "preprocess": {"gcsUri": gcs_uri}})
+        raise
+    logger.info(
+        f"Pre-processed input for job {job_id}: {options.to_dict()} from {variant}, "
+        f"{'stream copy' if stream_copy else 're-encoded'}, {size} bytes"
+    )
+    return PreprocessedInput(
+        url=signed_url,
+        gcs_uri=gcs_uri,
+        source_variant=variant,
+        stream_copy=stream_copy,
+        size=size,
+    )
+
+
+async def cleanup_preprocessed_input(job: dict[str, Any]) -> None:
+    """Delete a finished job's temporary input, if it has one."""
+    gcs_uri = (job.get("preprocess") or {}).get("gcsUri")
+    if not gcs_uri:
+        return
+    try:
+        await asyncio.to_thread(delete_object, gcs_uri)
+    except Exception as e:
+        logger.warning(f"Failed to delete pre-processed input of job {job.get('id')}: {e}")
@@ -1,15 +1,20 @@
 """Video effect providers module."""
 
+from .local import render_local_effect, shutdown_local_pool
 from .replicate import (
     create_prediction,
     get_prediction,
     map_replicate_status,
     ReplicateProviderError,
 )
+from .router import choose_provider
 
 __all__ = [
+    "choose_provider",
     "create_prediction",
     "get_prediction",
     "map_replicate_status",
+    "render_local_effect",
+    "shutdown_local_pool",
     "ReplicateProviderError",
 ]
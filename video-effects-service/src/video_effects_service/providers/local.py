@@ -0,0 +1,229 @@
+"""Local ffmpeg provider.
+
+Runs an effect's ffmpeg filter graph on this service instead of a remote
+provider: no remote queueing, and a few seconds for simple effects (chroma
+key, blur, color grades, speed changes). Renders run in a process pool of
+LOCAL_EFFECTS_MAX_WORKERS processes. Each render reads the source over HTTP,
+applies the job's trim/maxHeight in the same pass, and writes a temp file
+that is streamed to the asset service.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from ..asset_client import DownloadedFile
+from ..config import Settings, get_settings
+from ..effects.definitions import LocalFilterGraph, VideoEffectDefinition
+from ..preprocess import PreprocessOptions, scale_filter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROBE_TIMEOUT_SECONDS = 30.0
+HASH_CHUNK_SIZE = 1024 * 1024
+
+OUTPUT_MIME_TYPES = {"mp4": "video/mp4", "webm": "video/webm"}
+_ENCODER_ARGS = {
+    "mp4": [
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-movflags", "+faststart",
+    ],
+    # VP9 keeps the alpha channel; realtime settings favour turnaround over size
+    "webm": [
+        "-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1",
+        "-b:v", "0", "-crf", "32", "-auto-alt-ref", "0",
+        "-c:a", "libopus",
+    ],
+}
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(settings: Settings) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs gRPC/Firestore threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.local_effects_max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_local_pool() -> None:
+    """Stop the render processes (app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def _in_pool(fn: Callable[..., T], *args: Any) -> T:
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = _get_pool(get_settings())
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # A render process died (OOM kill); start a fresh pool for the next job
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise RuntimeError("Local render process crashed")
+
+
+def _render_in_worker(command: list[str], output_path: str, timeout: float) -> tuple[int, str]:
+    """Run ffmpeg (in a pool process). Returns size and SHA-256 of the output."""
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=timeout)
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b"").decode("utf-8", errors="replace")[-500:]
+        raise RuntimeError(f"ffmpeg failed: {stderr}") from None
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"ffmpeg timed out after {timeout}s") from None
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(output_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def _probe_duration_in_worker(source_url: str, timeout: float) -> float | None:
+    """Container duration in seconds (in a pool process), None if unknown."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            source_url,
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def effective_duration(source_duration: float | None, options: PreprocessOptions | None) -> float | None:
+    """Duration of the part of the source a job uses."""
+    if not source_duration:
+        return None
+    if not options:
+        return source_duration
+    start = options.start or 0
+    end = source_duration if options.end is None else min(options.end, source_duration)
+    return max(0.0, end - start)
+
+
+def build_local_command(
+    source_url: str,
+    output_path: str,
+    graph: LocalFilterGraph,
+    output_format: str,
+    options: PreprocessOptions | None = None,
+) -> list[str]:
+    """ffmpeg arguments for rendering graph over the (trimmed) source."""
+    command = ["ffmpeg", "-hide_banner", "-nostdin", "-y"]
+    # Trim on the input side, so speed changes do not change what is read
+    if options and options.start:
+        command += ["-ss", f"{options.start:.3f}"]
+    if options and options.end is not None:
+        command += ["-t", f"{options.end - (options.start or 0):.3f}"]
+    command += ["-i", source_url, "-map", "0:v:0"]
+
+    video_filters = list(graph.video_filters)
+    if options and options.max_height:
+        video_filters.insert(0, scale_filter(options.max_height))
+    if output_format == "webm":
+        video_filters.append("format=yuva420p")
+    if video_filters:
+        command += ["-vf", ",".join(video_filters)]
+
+    if graph.audio_filters is None:
+        command += ["-an"]
+    else:
+        command += ["-map", "0:a:0?"]
+        if graph.audio_filters:
+            command += ["-af", ",".join(graph.audio_filters)]
+
+    command += _ENCODER_ARGS[output_format]
+    command.append(output_path)
+    return command
+
+
+async def render_local_effect(
+    definition: VideoEffectDefinition,
+    source_url: str,
+    params: dict[str, Any],
+    options: PreprocessOptions | None = None,
+    duration: float | None = None,
+) -> DownloadedFile:
+    """
+    Render an effect locally.
+
+    Args:
+        definition: Effect with a local implementation
+        source_url: HTTP(S) URL of the source video
+        params: Effect params
+        options: Trim and maximum height to apply in the same pass
+        duration: Duration of the part of the source used, if known
+
+    Returns:
+        The rendered file; the caller must close it
+
+    Raises:
+        ValueError: If the effect has no local implementation or params are invalid
+        RuntimeError: If ffmpeg fails
+    """
+    settings = get_settings()
+    local = definition.local
+    if local is None:
+        raise ValueError(f"Effect {definition.id} has no local implementation")
+    if not source_url.startswith(("http://", "https://")):
+        raise RuntimeError("Source has no HTTP(S) URL to read from")
+
+    if local.needs_duration and not duration:
+        probed = await _in_pool(_probe_duration_in_worker, source_url, PROBE_TIMEOUT_SECONDS)
+        duration = effective_duration(probed, options)
+    graph = local.build_filter_graph(params, duration)
+
+    tmp_dir = tempfile.mkdtemp(prefix="vfx-local-")
+    output_path = os.path.join(tmp_dir, f"output.{local.output_format}")
+    try:
+        command = build_local_command(source_url, output_path, graph, local.output_format, options)
+        size, sha256 = await _in_pool(
+            _render_in_worker, command, output_path, settings.local_effects_timeout_seconds
+        )
+        # The open handle keeps the data readable after the directory is removed
+        output = open(output_path, "rb")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return DownloadedFile(
+        file=output,
+        size=size,
+        sha256=sha256,
+        mime_type=OUTPUT_MIME_TYPES[local.output_format],
+    )
@@ -3,16 +3,23 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Any
-
-import httpx
+from urllib.parse import urlencode
 
 from ..config import get_settings
+from ..http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
 API_BASE_URL = "https://api.replicate.com/v1"
 
+# Route that receives prediction webhooks (see api/routes/jobs.py)
+WEBHOOK_PATH = "/api/jobs/webhooks/replicate"
+WEBHOOK_EVENTS = ["completed"]
+
+_webhook_signing_secret: str | None = None
+
 
 class ReplicateProviderError(Exception):
     """Error from the Replicate provider."""
@@ -24,20 +31,35 @@ class ReplicateProviderError(Exception):
 
 def _get_headers() -> dict[str, str]:
     """Get headers for Replicate API requests."""
-    settings = get_settings()
-    if not settings.replicate_api_token:
+    token = get_settings().replicate_api_token
+    if not token:
         raise ReplicateProviderError(
             "REPLICATE_API_TOKEN is not configured in the environment"
         )
+    return _auth_headers(token)
+
+
+@lru_cache(maxsize=1)
+def _auth_headers(token: str) -> dict[str, str]:
     return {
-        "Authorization": f"Bearer {settings.replicate_api_token}",
+        "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
 
+def get_webhook_url(job_id: str) -> str | None:
+    """Webhook URL for a job's prediction, or None if webhooks are not configured."""
+    settings = get_settings()
+    if not settings.replicate_webhook_base_url:
+        return None
+    base_url = settings.replicate_webhook_base_url.rstrip("/")
+    return f"{base_url}{WEBHOOK_PATH}?{urlencode({'jobId': job_id})}"
+
+
 async def create_prediction(
     version: str,
     input_data: dict[str, Any],
+    webhook_url: str | None = None,
 ) -> dict[str, Any]:
     """
     Create a new prediction on Replicate.
@@ -45,6 +67,7 @@ async def create_prediction(
     Args:
         version: Model version string (e.g., "owner/model:version_id")
         input_data: Input parameters for the model
+        webhook_url: URL Replicate calls when the prediction completes
 
     Returns:
         Prediction response from Replicate API
@@ -52,23 +75,28 @@ async def create_prediction(
     # Extract version ID from full version string if needed
     version_id = version.split(":")[-1] if ":" in version else version
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{API_BASE_URL}/predictions",
-            headers=_get_headers(),
-            json={
-                "version": version_id,
-                "input": input_data,
-            },
-            timeout=30.0,
+    payload: dict[str, Any] = {
+        "version": version_id,
+        "input": input_data,
+    }
+    if webhook_url:
+        payload["webhook"] = webhook_url
+        payload["webhook_events_filter"] = WEBHOOK_EVENTS
+
+    url = f"{API_BASE_URL}/predictions"
+    response = await get_http_client(url).post(
+        url,
+        headers=_get_headers(),
+        json=payload,
+        timeout=30.0,
+    )
+
+    if not response.is_success:
+        raise ReplicateProviderError(
+            f"Failed to create prediction ({response.status_code}): {response.text}"
         )
 
-        if not response.is_success:
-            raise ReplicateProviderError(
-                f"Failed to create prediction ({response.status_code}): {response.text}"
-            )
-
-        return response.json()
+    return response.json()
 
 
 async def get_prediction(prediction_id: str) -> dict[str, Any]:
@@ -81,19 +109,37 @@ async def get_prediction(prediction_id: str) -> dict[str, Any]:
     Returns:
         Prediction response from Replicate API
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/predictions/{prediction_id}",
-            headers=_get_headers(),
-            timeout=30.0,
+    url = f"{API_BASE_URL}/predictions/{prediction_id}"
+    response = await get_http_client(url).get(url, headers=_get_headers(), timeout=30.0)
+
+    if not response.is_success:
+        raise ReplicateProviderError(
+            f"Failed to get prediction ({response.status_code}): {response.text}"
         )
 
+    return response.json()
+
+
+async def get_webhook_signing_secret() -> str:
+    """
+    Secret Replicate signs webhooks with.
+
+    Uses REPLICATE_WEBHOOK_SIGNING_SECRET when set, otherwise fetches the
+    account's default secret once and caches it.
+    """
+    global _webhook_signing_secret
+    settings = get_settings()
+    if settings.replicate_webhook_signing_secret:
+        return settings.replicate_webhook_signing_secret
+    if _webhook_signing_secret is None:
+        url = f"{API_BASE_URL}/webhooks/default/secret"
+        response = await get_http_client(url).get(url, headers=_get_headers(), timeout=30.0)
         if not response.is_success:
             raise ReplicateProviderError(
-                f"Failed to get prediction ({response.status_code}): {response.text}"
+                f"Failed to get webhook signing secret ({response.status_code}): {response.text}"
             )
-
-        return response.json()
+        _webhook_signing_secret = response.json()["key"]
+    return _webhook_signing_secret
 
 
 def map_replicate_status(status: str) -> str:
@@ -0,0 +1,46 @@
+"""Backend routing for effect jobs."""
+
+from __future__ import annotations
+
+from ..config import Settings, get_settings
+from ..effects.definitions import PROVIDER_LOCAL, VideoEffectDefinition
+
+
+def choose_provider(
+    definition: VideoEffectDefinition,
+    duration: float | None = None,
+    settings: Settings | None = None,
+    local_available: bool = True,
+) -> str:
+    """
+    Pick the backend that runs a job.
+
+    The local provider is chosen when the effect has a local implementation,
+    local effects are enabled, and the input is no longer than
+    LOCAL_EFFECTS_MAX_DURATION_SECONDS (when its duration is known).
+    Otherwise the effect's remote provider runs it; so does a job that
+    arrives while this process is at LOCAL_EFFECTS_MAX_INFLIGHT local jobs.
+    Effects with no remote provider always run locally.
+
+    Args:
+        definition: The effect
+        duration: Duration of the part of the source the job uses, if known
+        local_available: Whether this process takes another local job
+
+    Raises:
+        ValueError: If the effect only runs locally and local effects are disabled
+    """
+    settings = settings or get_settings()
+    if definition.local is None:
+        return definition.provider
+
+    remote = definition.provider if definition.provider != PROVIDER_LOCAL else None
+    if not settings.local_effects_enabled:
+        if remote is None:
+            raise ValueError(f"Effect {definition.id} needs local effects, which are disabled")
+        return remote
+
+    too_long = duration is not None and duration > settings.local_effects_max_duration_seconds
+    if (too_long or not local_available) and remote is not None:
+        return remote
+    return PROVIDER_LOCAL
@@ -0,0 +1,136 @@
+"""Result cache for video effect jobs.
+
+Identical requests (same user and project, same source content, same effect
+version and provider input) map to one cache key. The key points at the job
+that produced, or is producing, the result:
+
+- while the job runs, further identical requests get that job back instead
+  of starting another prediction
+- once it completes, they get its result asset right away
+- if it fails, the key is dropped so the next request starts afresh
+
+Keys live in Redis (``vfx_result_cache:{sha256}`` -> job id).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any
+
+from .config import get_settings
+from .tasks import get_task_queue
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "vfx_result_cache:"
+# How long a reservation may stay unresolved (prediction never finished)
+INFLIGHT_TTL_SECONDS = 60 * 60 * 6
+
+# Extend / drop a key only while it still points at the given job
+_SETTLE_SCRIPT = """
+if redis.call("get", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == "0" then
+    return redis.call("del", KEYS[1])
+end
+return redis.call("expire", KEYS[1], ARGV[2])
+"""
+
+
+def source_identity(
+    asset_id: str | None,
+    asset: dict[str, Any] | None = None,
+    image_url: str | None = None,
+) -> str:
+    """
+    Identify the source content of a job.
+
+    Assets are identified by id plus their GCS generation when the asset
+    service reports one, otherwise by size and last update, so a replaced
+    file gets a new key. Plain image URLs are identified by the URL itself.
+    """
+    if image_url:
+        return f"url:{image_url}"
+    asset = asset or {}
+    version = asset.get("generation")
+    if not version:
+        version = f"{asset.get('size', '')}:{asset.get('updatedAt') or asset.get('uploadedAt', '')}"
+    return f"asset:{asset_id}:{version}"
+
+
+def compute_cache_key(
+    user_id: str,
+    project_id: str,
+    source: str,
+    effect_id: str,
+    effect_version: str,
+    provider_input: dict[str, Any],
+    asset_url: str,
+) -> str:
+    """
+    Cache key for a job request.
+
+    The source URL is left out of the provider input, since signed URLs
+    differ on every request; the source identity stands in for it.
+    """
+    canonical_input = {key: value for key, value in provider_input.items() if value != asset_url}
+    payload = json.dumps(
+        {
+            "userId": user_id,
+            "projectId": project_id,
+            "source": source,
+            "effectId": effect_id,
+            "version": effect_version,
+            "input": canonical_input,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def reserve(cache_key: str, job_id: str) -> str | None:
+    """
+    Claim a cache key for a new job.
+
+    Returns:
+        None if the key was claimed for job_id, otherwise the id of the job
+        already holding it
+    """
+    queue = await get_task_queue()
+    key = f"{CACHE_PREFIX}{cache_key}"
+    if await queue.redis.set(key, job_id, nx=True, ex=INFLIGHT_TTL_SECONDS):
+        return None
+    existing = await queue.redis.get(key)
+    if existing is None:
+        # Expired between the two calls; try once more
+        if await queue.redis.set(key, job_id, nx=True, ex=INFLIGHT_TTL_SECONDS):
+            return None
+        existing = await queue.redis.get(key)
+    return existing
+
+
+async def release(cache_key: str, job_id: str) -> None:
+    """Drop a key held by job_id (failed or abandoned job)."""
+    try:
+        queue = await get_task_queue()
+        await queue.redis.eval(_SETTLE_SCRIPT, 1, f"{CACHE_PREFIX}{cache_key}", job_id, "0")
+    except Exception as e:
+        logger.warning(f"Failed to release result cache key for job {job_id}: {e}")
+
+
+async def settle(job: dict[str, Any]) -> None:
+    """Keep a completed job's key for RESULT_CACHE_TTL_SECONDS; drop a failed job's key."""
+    cache_key = job.get("cacheKey")
+    if not cache_key:
+        return
+    ttl = get_settings().result_cache_ttl_seconds if job.get("status") == "completed" else 0
+    try:
+        queue = await get_task_queue()
+        await queue.redis.eval(_SETTLE_SCRIPT, 1, f"{CACHE_PREFIX}{cache_key}", job["id"], str(ttl))
+    except Exception as e:
+        logger.warning(f"Failed to settle result cache for job {job['id']}: {e}")
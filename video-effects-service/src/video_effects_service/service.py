@@ -2,16 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import time
+from datetime import datetime
 from typing import Any
 
-from .effects.definitions import get_effect_definition
-from .providers.replicate import get_prediction, map_replicate_status
+from . import result_cache
+from .preprocess import PreprocessOptions, cleanup_preprocessed_input, preprocess_input
+from .effects.definitions import PROVIDER_LOCAL, VideoEffectDefinition, get_effect_definition
+from .providers.local import render_local_effect
+from .providers.replicate import create_prediction, get_prediction, map_replicate_status
 from .storage.firestore import get_job, update_job, claim_job_for_completion
-from .asset_client import download_remote_file, upload_to_asset_service
+from .asset_client import DownloadedFile, download_remote_file_to_spool, upload_to_asset_service
+from .config import get_settings
+from .tasks import get_task_queue
 
 logger = logging.getLogger(__name__)
 
+# Local jobs of this process, queued or rendering, by job id (kept referenced until done)
+_local_tasks: dict[str, asyncio.Task] = {}
+_render_slots: asyncio.Semaphore | None = None
+# Remote jobs of this process whose input is being pre-processed, by job id
+_preprocess_tasks: dict[str, asyncio.Task] = {}
+
 
 async def poll_job(job_id: str) -> dict[str, Any] | None:
     """
@@ -23,7 +38,7 @@ async def poll_job(job_id: str) -> dict[str, Any] | None:
     Returns:
         Updated job data, or None if not found
     """
-    job = get_job(job_id)
+    job = await get_job(job_id)
     if not job:
         return None
 
@@ -37,7 +52,12 @@ async def poll_job(job_id: str) -> dict[str, Any] | None:
     definition = get_effect_definition(effect_id)
     if not definition:
         logger.error(f"Unknown effect: {effect_id}")
-        return update_job(job_id, {"status": "error", "error": f"Unknown effect: {effect_id}"})
+        return await update_job(
+            job_id, {"status": "error", "error": f"Unknown effect: {effect_id}"}, current=job
+        )
+
+    if job.get("provider") == PROVIDER_LOCAL:
+        return await _check_local_job(job)
 
     # Get provider state
     provider_state = job.get("providerState", {})
@@ -45,6 +65,8 @@ async def poll_job(job_id: str) -> dict[str, Any] | None:
     prediction_id = replicate_state.get("predictionId")
 
     if not prediction_id:
+        if job.get("preprocess") is not None:
+            return await _check_preprocessing_job(job)
         logger.warning(f"Job {job_id} has no prediction ID")
         return job
 
@@ -55,14 +77,377 @@ async def poll_job(job_id: str) -> dict[str, Any] | None:
         logger.exception(f"Failed to poll prediction: {e}")
         return job
 
+    return await _apply_prediction(job, definition, prediction)
+
+
+def _seconds_since(timestamp: Any) -> float | None:
+    try:
+        then = datetime.fromisoformat(timestamp.rstrip("Z"))
+    except (AttributeError, ValueError):
+        return None
+    return (datetime.utcnow() - then).total_seconds()
+
+
+async def _check_local_job(job: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    A local job has nothing to poll; its render updates the job when done.
+
+    A job of another process (or of an earlier run of this one) still running
+    well past the render timeout lost its process (restart, scale-in) and is
+    failed, so clients stop waiting for it. The render timeout counts from
+    renderStartedAt; a job that never started may also have waited behind a
+    full set of in-flight jobs.
+    """
+    if job["id"] in _local_tasks:
+        return job
+
+    settings = get_settings()
+    limit = settings.local_effects_timeout_seconds * 2
+    age = _seconds_since(job.get("renderStartedAt"))
+    if age is None:
+        rounds = math.ceil(settings.local_effects_max_inflight / max(1, settings.local_effects_max_workers))
+        limit += rounds * settings.local_effects_timeout_seconds
+        age = _seconds_since(job.get("createdAt"))
+    if age is None or age < limit:
+        return job
+    logger.warning(f"Local job {job['id']} has been running for {age:.0f}s; marking it failed")
+    updated = await update_job(
+        job["id"], {"status": "error", "error": "Local render was interrupted"}, current=job
+    )
+    if updated:
+        await result_cache.settle(updated)
+    return updated
+
+
+async def _check_preprocessing_job(job: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    A job whose input is being pre-processed has no prediction to poll yet.
+
+    As with local jobs, one that is not pre-processed by this process and is
+    well past the time pre-processing can take (a slot, two ffmpeg runs, the
+    upload) lost its process and is failed.
+    """
+    if job["id"] in _preprocess_tasks:
+        return job
+    age = _seconds_since(job.get("createdAt"))
+    if age is None or age < get_settings().preprocess_timeout_seconds * 4:
+        return job
+    logger.warning(f"Job {job['id']} has been pre-processing for {age:.0f}s; marking it failed")
+    updated = await update_job(
+        job["id"], {"status": "error", "error": "Input pre-processing was interrupted"}, current=job
+    )
+    if updated:
+        await result_cache.settle(updated)
+    return updated
+
+
+async def start_prediction(
+    job: dict[str, Any],
+    definition: VideoEffectDefinition,
+    provider_input: dict[str, Any],
+    webhook_url: str | None,
+) -> dict[str, Any]:
+    """
+    Create the Replicate prediction of a saved job and schedule its polls.
+
+    Returns:
+        The updated job
+
+    Raises:
+        RuntimeError: If the prediction could not be created (the job is failed)
+    """
+    job_id = job["id"]
+    try:
+        prediction = await create_prediction(
+            version=definition.version,
+            input_data=provider_input,
+            webhook_url=webhook_url,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to create prediction: {e}")
+        await _fail_unstarted_job(job, f"Failed to start effect: {e}")
+        raise RuntimeError(f"Failed to start effect: {e}") from e
+
+    updates = {
+        "status": map_replicate_status(prediction.get("status", "")),
+        "providerState": {
+            "replicate": {
+                "predictionId": prediction["id"],
+                "version": definition.version,
+                "getUrl": prediction.get("urls", {}).get("get"),
+                "streamUrl": prediction.get("urls", {}).get("stream"),
+                "webhook": webhook_url is not None,
+            }
+        },
+    }
+    if "gcsUri" in (job.get("preprocess") or {}):
+        updates["preprocess"] = job["preprocess"]
+    job = await update_job(job_id, updates, current=job) or {**job, **updates}
+
+    # Enqueue for background polling (a safety net when the webhook is used)
+    try:
+        queue = await get_task_queue()
+        await queue.enqueue_poll(job_id)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue job for polling: {e}")
+    return job
+
+
+async def _fail_unstarted_job(job: dict[str, Any], error: str) -> None:
+    """Fail a job that has no prediction, release its cache key and temporary input."""
+    updated = await update_job(job["id"], {"status": "error", "error": error}, current=job)
+    if updated:
+        await result_cache.settle(updated)
+    await cleanup_preprocessed_input(job)
+
+
+def launch_preprocessed_job(
+    job: dict[str, Any],
+    definition: VideoEffectDefinition,
+    source_url: str,
+    options: PreprocessOptions,
+    webhook_url: str | None,
+    asset_id: str | None = None,
+    asset: dict[str, Any] | None = None,
+) -> None:
+    """Pre-process a saved job's input and start its prediction in the background."""
+    job_id = job["id"]
+    task = asyncio.create_task(
+        run_preprocessed_job(job, definition, source_url, options, webhook_url, asset_id, asset)
+    )
+    _preprocess_tasks[job_id] = task
+    task.add_done_callback(lambda _: _preprocess_tasks.pop(job_id, None))
+
+
+async def run_preprocessed_job(
+    job: dict[str, Any],
+    definition: VideoEffectDefinition,
+    source_url: str,
+    options: PreprocessOptions,
+    webhook_url: str | None,
+    asset_id: str | None = None,
+    asset: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Trim/scale a job's input, then start its prediction on that input.
+
+    Args:
+        asset_id: Asset id, when the source is a project asset (proxy lookup)
+        asset: The asset, when known
+
+    Returns:
+        The updated job, or None if it failed
+    """
+    job_id = job["id"]
+    started = time.monotonic()
+    try:
+        preprocessed = await preprocess_input(
+            job_id,
+            source_url,
+            options,
+            user_id=job["userId"],
+            project_id=job["projectId"],
+            asset_id=asset_id,
+            asset=asset,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to pre-process input for job {job_id}: {e}")
+        await _fail_unstarted_job(job, f"Failed to pre-process input: {e}")
+        return None
+
+    job["preprocess"] = {
+        **options.to_dict(),
+        "gcsUri": preprocessed.gcs_uri,
+        "sourceVariant": preprocessed.source_variant,
+        "streamCopy": preprocessed.stream_copy,
+        "size": preprocessed.size,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    if await _job_finished_elsewhere(job_id):
+        await cleanup_preprocessed_input(job)
+        return None
+
+    provider_input = definition.build_provider_input(
+        asset_url=preprocessed.url,
+        asset_name=job.get("assetName", ""),
+        params=job.get("params") or {},
+    )
+    try:
+        return await start_prediction(job, definition, provider_input, webhook_url)
+    except RuntimeError:
+        return None
+
+
+def launch_local_job(
+    job: dict[str, Any],
+    definition: VideoEffectDefinition,
+    source_url: str,
+    options: PreprocessOptions | None = None,
+    duration: float | None = None,
+) -> None:
+    """Render a saved job with the local provider in the background."""
+    job_id = job["id"]
+    task = asyncio.create_task(run_local_job(job, definition, source_url, options, duration))
+    _local_tasks[job_id] = task
+    task.add_done_callback(lambda _: _local_tasks.pop(job_id, None))
+
+
+def local_capacity_available() -> bool:
+    """Whether this process takes another local job (LOCAL_EFFECTS_MAX_INFLIGHT)."""
+    return len(_local_tasks) < get_settings().local_effects_max_inflight
+
+
+def _get_render_slots() -> asyncio.Semaphore:
+    global _render_slots
+    if _render_slots is None:
+        _render_slots = asyncio.Semaphore(get_settings().local_effects_max_workers)
+    return _render_slots
+
+
+async def run_local_job(
+    job: dict[str, Any],
+    definition: VideoEffectDefinition,
+    source_url: str,
+    options: PreprocessOptions | None = None,
+    duration: float | None = None,
+) -> dict[str, Any] | None:
+    """
+    Render a job with the local provider and store the output as an asset.
+
+    Renders wait for one of LOCAL_EFFECTS_MAX_WORKERS slots, so none queue
+    inside the process pool, and record renderStartedAt once they start.
+
+    Returns:
+        The updated job
+    """
+    job_id = job["id"]
+    started = time.monotonic()
+    try:
+        async with _get_render_slots():
+            job = await update_job(
+                job_id, {"renderStartedAt": datetime.utcnow().isoformat() + "Z"}, current=job
+            ) or job
+            render_started = time.monotonic()
+            rendered = await render_local_effect(
+                definition, source_url, job.get("params") or {}, options, duration
+            )
+            render_seconds = time.monotonic() - render_started
+        try:
+            result = await _upload_result(job, definition, rendered)
+        finally:
+            rendered.close()
+    except Exception as e:
+        logger.exception(f"Local render of job {job_id} failed: {e}")
+        if await _job_finished_elsewhere(job_id):
+            return None
+        updated = await update_job(
+            job_id, {"status": "error", "error": f"Local render failed: {e}"}, current=job
+        )
+    else:
+        total_seconds = time.monotonic() - started
+        logger.info(
+            f"Local job {job_id} ({definition.id}) done in {total_seconds:.1f}s "
+            f"(render {render_seconds:.1f}s, {rendered.size} bytes)"
+        )
+        if await _job_finished_elsewhere(job_id):
+            return None
+        result_asset = result.get("asset", result)
+        updated = await update_job(
+            job_id,
+            {
+                "status": "completed",
+                "resultAssetId": result_asset.get("id"),
+                "resultAssetUrl": result_asset.get("signedUrl"),
+                "metadata": {
+                    **(job.get("metadata") or {}),
+                    "localMetrics": {
+                        "queueSeconds": round(render_started - started, 3),
+                        "renderSeconds": round(render_seconds, 3),
+                        "totalSeconds": round(total_seconds, 3),
+                        "outputBytes": rendered.size,
+                    },
+                },
+            },
+            current=job,
+        )
+
+    if updated:
+        await result_cache.settle(updated)
+    return updated
+
+
+async def _job_finished_elsewhere(job_id: str) -> bool:
+    """True if the job was already finished (failed as interrupted by another process)."""
+    current = await get_job(job_id)
+    if current and current.get("status") in ("completed", "error"):
+        logger.warning(f"Job {job_id} was already {current['status']}; dropping this process's result")
+        return True
+    return False
+
+
+async def handle_prediction_webhook(
+    job_id: str,
+    prediction: dict[str, Any],
+) -> dict[str, Any] | None:
+    """
+    Apply a prediction delivered by a Replicate webhook to its job.
+
+    Goes through the same claim/completion path as polling, so a webhook and
+    a poll racing on the same prediction complete the job once.
+
+    Returns:
+        Updated job data, or None if the job does not exist
+    """
+    job = await get_job(job_id)
+    if not job:
+        return None
+
+    status = job.get("status", "")
+    if status in ("completed", "completing", "error"):
+        return job
+
+    prediction_id = job.get("providerState", {}).get("replicate", {}).get("predictionId")
+    if prediction.get("id") != prediction_id:
+        raise ValueError(f"Prediction {prediction.get('id')} does not belong to job {job_id}")
+
+    effect_id = job.get("effectId", "")
+    definition = get_effect_definition(effect_id)
+    if not definition:
+        logger.error(f"Unknown effect: {effect_id}")
+        return await update_job(
+            job_id, {"status": "error", "error": f"Unknown effect: {effect_id}"}, current=job
+        )
+
+    return await _apply_prediction(job, definition, prediction)
+
+
+async def _apply_prediction(
+    job: dict[str, Any],
+    definition: Any,
+    prediction: dict[str, Any],
+) -> dict[str, Any] | None:
+    """Update a job from a Replicate prediction (polled or pushed)."""
+    updated_job = await _update_from_prediction(job, definition, prediction)
+    if updated_job and updated_job.get("status") in ("completed", "error"):
+        await result_cache.settle(updated_job)
+        await cleanup_preprocessed_input(updated_job)
+    return updated_job
+
+
+async def _update_from_prediction(
+    job: dict[str, Any],
+    definition: Any,
+    prediction: dict[str, Any],
+) -> dict[str, Any] | None:
+    job_id = job["id"]
     new_status = map_replicate_status(prediction.get("status", ""))
 
     if new_status == "completed":
         # Try to claim the job for completion (prevents race conditions)
-        if not claim_job_for_completion(job_id):
+        if not await claim_job_for_completion(job_id):
             # Another worker is already handling completion
             logger.debug(f"Job {job_id} completion already being handled")
-            return get_job(job_id)
+            return await get_job(job_id)
 
         # Handle completion
         try:
@@ -70,45 +455,69 @@ async def poll_job(job_id: str) -> dict[str, Any] | None:
             return updated_job
         except Exception as e:
             logger.exception(f"Failed to handle completion: {e}")
-            return update_job(job_id, {"status": "error", "error": str(e)})
+            return await update_job(job_id, {"status": "error", "error": str(e)}, current=job)
 
     if new_status == "error":
-        # Handle error
-        error_message = (
-            prediction.get("error")
-            or (
-                prediction.get("output")
-                if isinstance(prediction.get("output"), str)
-                else (
-                    "\n".join(prediction.get("output", []))
-                    if isinstance(prediction.get("output"), list)
-                    else "Video effect failed"
-                )
-            )
+        return await update_job(
+            job_id, {"status": "error", "error": prediction_error(prediction)}, current=job
         )
-        return update_job(job_id, {"status": "error", "error": error_message})
 
-    # Still running, update status and metrics
-    return update_job(
+    # Still running, update status and metrics (no write if neither changed)
+    metadata = job.get("metadata") or {}
+    if new_status == job.get("status") and prediction.get("metrics") == metadata.get("providerMetrics"):
+        return job
+    return await update_job(
         job_id,
         {
             "status": new_status,
             "metadata": {
-                **(job.get("metadata") or {}),
+                **metadata,
                 "providerMetrics": prediction.get("metrics"),
             },
         },
+        current=job,
     )
 
 
+def prediction_error(prediction: dict[str, Any]) -> str:
+    """Error message of a failed or canceled prediction."""
+    output = prediction.get("output")
+    if prediction.get("error"):
+        return prediction["error"]
+    if isinstance(output, str):
+        return output
+    if isinstance(output, list):
+        return "\n".join(str(item) for item in output)
+    return "Video effect failed"
+
+
 async def _handle_completion(
     job: dict[str, Any],
     definition: Any,
     prediction: dict[str, Any],
 ) -> dict[str, Any]:
     """Handle job completion - download result and upload to asset service."""
-    job_id = job["id"]
+    updates = await build_result_updates(job, definition, prediction)
+    if updates["status"] == "completed":
+        updates["metadata"] = {**(job.get("metadata") or {}), **updates["metadata"]}
+    return await update_job(job["id"], updates, current=job)
+
 
+async def build_result_updates(
+    job: dict[str, Any],
+    definition: Any,
+    prediction: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Store the output of a succeeded prediction as an asset.
+
+    Args:
+        job: Anything with id, userId and projectId (a job, or a batch item)
+
+    Returns:
+        Fields to record: status "completed" with resultAssetId,
+        resultAssetUrl and metadata, or status "error" with error
+    """
     # Extract result from prediction
     extraction = definition.extract_result(
         prediction.get("output"),
@@ -116,27 +525,44 @@ async def _handle_completion(
     )
 
     if extraction.get("error"):
-        return update_job(job_id, {"status": "error", "error": extraction["error"]})
+        return {"status": "error", "error": extraction["error"]}
 
     result_url = extraction.get("result_url")
     if not result_url:
-        return update_job(
-            job_id,
-            {"status": "error", "error": "Processed video URL was not returned by the provider."},
-        )
+        return {"status": "error", "error": "Processed video URL was not returned by the provider."}
 
     # Check if we have userId and projectId
-    user_id = job.get("userId")
-    project_id = job.get("projectId")
-    if not user_id or not project_id:
-        return update_job(
-            job_id,
-            {"status": "error", "error": "Cannot save result: missing userId or projectId"},
-        )
+    if not job.get("userId") or not job.get("projectId"):
+        return {"status": "error", "error": "Cannot save result: missing userId or projectId"}
 
     # Download the processed video
     logger.info(f"Downloading processed video from {result_url}")
-    file_content, mime_type = await download_remote_file(result_url)
+    download = await download_remote_file_to_spool(result_url)
+    try:
+        result = await _upload_result(job, definition, download)
+    finally:
+        download.close()
+
+    result_asset = result.get("asset", result)
+    return {
+        "status": "completed",
+        "resultAssetId": result_asset.get("id"),
+        "resultAssetUrl": result_asset.get("signedUrl"),
+        "metadata": {
+            **(extraction.get("metadata") or {}),
+            "providerMetrics": prediction.get("metrics"),
+        },
+    }
+
+
+async def _upload_result(
+    job: dict[str, Any],
+    definition: Any,
+    download: DownloadedFile,
+) -> dict[str, Any]:
+    """Stream a downloaded result from its spool file to the asset service."""
+    job_id = job["id"]
+    mime_type = download.mime_type
 
     # Use extension that matches actual format (webm, gif, mp4, png) so download filename is correct
     ext = ".mp4"
@@ -153,30 +579,15 @@ async def _handle_completion(
         elif mt.startswith("video/"):
             ext = ".mp4"
     filename = f"{definition.label or definition.id}-{job_id[:8]}{ext}"
-    logger.info(f"Uploading result as {filename}")
+    logger.info(f"Uploading result as {filename} ({download.size} bytes)")
 
-    result = await upload_to_asset_service(
-        user_id=user_id,
-        project_id=project_id,
-        file_content=file_content,
+    return await upload_to_asset_service(
+        user_id=job["userId"],
+        project_id=job["projectId"],
+        file_content=download.file,
         filename=filename,
         mime_type=mime_type,
         source="video-effect",
         run_pipeline=True,
-    )
-
-    # Update job with result
-    result_asset = result.get("asset", result)
-    return update_job(
-        job_id,
-        {
-            "status": "completed",
-            "resultAssetId": result_asset.get("id"),
-            "resultAssetUrl": result_asset.get("signedUrl"),
-            "metadata": {
-                **(job.get("metadata") or {}),
-                **(extraction.get("metadata") or {}),
-                "providerMetrics": prediction.get("metrics"),
-            },
-        },
+        body_hash=download.sha256,
     )
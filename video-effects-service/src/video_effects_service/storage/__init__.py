@@ -5,6 +5,10 @@ from .firestore import (
     save_job,
     update_job,
     list_jobs_by_asset,
+    get_batch,
+    save_batch,
+    update_batch,
+    shutdown_firestore_pool,
 )
 
 __all__ = [
@@ -12,4 +16,8 @@ __all__ = [
     "save_job",
     "update_job",
     "list_jobs_by_asset",
+    "get_batch",
+    "save_batch",
+    "update_batch",
+    "shutdown_firestore_pool",
 ]
@@ -1,23 +1,40 @@
-"""Firestore operations for video effect jobs."""
+"""Firestore operations for video effect jobs.
+
+The Firestore client is synchronous, so every operation is a coroutine that
+runs the blocking calls on a dedicated thread pool (FIRESTORE_MAX_WORKERS
+threads), keeping the event loop free while pollers and handlers wait on
+Firestore, and bounding how many round trips are in flight at once.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable, TypeVar
 
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.exceptions import NotFound
 
 from ..config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 _app: firebase_admin.App | None = None
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
 
 # Collection path: video-effects-jobs/{jobId}
 COLLECTION_NAME = "video-effects-jobs"
+# Collection path: video-effects-batches/{batchId}
+BATCH_COLLECTION_NAME = "video-effects-batches"
 
 
 def _get_credentials(settings: Settings):
@@ -59,6 +76,37 @@ def _initialize_firebase(settings: Settings) -> firebase_admin.App:
     return _app
 
 
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().firestore_max_workers,
+                thread_name_prefix="firestore",
+            )
+        return _executor
+
+
+def _in_firestore_pool(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Turn a blocking Firestore function into a coroutine run on the Firestore pool."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+    return wrapper
+
+
+def shutdown_firestore_pool() -> None:
+    """Stop the Firestore thread pool (app shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
 def get_firestore_client(settings: Settings | None = None):
     """Get a Firestore client."""
     settings = settings or get_settings()
@@ -66,6 +114,7 @@ def get_firestore_client(settings: Settings | None = None):
     return firestore.client()
 
 
+@_in_firestore_pool
 def save_job(job_data: dict[str, Any], settings: Settings | None = None) -> dict[str, Any]:
     """
     Save a video effect job to Firestore.
@@ -95,6 +144,7 @@ def save_job(job_data: dict[str, Any], settings: Settings | None = None) -> dict
     return job_data
 
 
+@_in_firestore_pool
 def get_job(job_id: str, settings: Settings | None = None) -> dict[str, Any] | None:
     """Get a job by ID."""
     settings = settings or get_settings()
@@ -111,23 +161,36 @@ def get_job(job_id: str, settings: Settings | None = None) -> dict[str, Any] | N
     return data
 
 
+@_in_firestore_pool
 def update_job(
     job_id: str,
     updates: dict[str, Any],
     settings: Settings | None = None,
+    current: dict[str, Any] | None = None,
 ) -> dict[str, Any] | None:
-    """Update a job."""
+    """
+    Update a job.
+
+    Args:
+        current: The job as just read by the caller; when given, the updated
+            job is built from it instead of being read back (one round trip
+            instead of two)
+
+    Returns:
+        The updated job, or None if it does not exist
+    """
     settings = settings or get_settings()
     db = get_firestore_client(settings)
 
     doc_ref = db.collection(COLLECTION_NAME).document(job_id)
-    doc = doc_ref.get()
-
-    if not doc.exists:
+    updates["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+    try:
+        doc_ref.update(updates)
+    except NotFound:
         return None
 
-    updates["updatedAt"] = datetime.utcnow().isoformat() + "Z"
-    doc_ref.update(updates)
+    if current is not None:
+        return {**current, **updates, "id": job_id}
 
     # Return updated document
     updated_doc = doc_ref.get()
@@ -136,22 +199,49 @@ def update_job(
     return data
 
 
+@_in_firestore_pool
 def list_jobs_by_asset(
     asset_id: str,
     settings: Settings | None = None,
+    limit: int | None = None,
+    start_after: tuple[str, str] | None = None,
+    statuses: list[str] | None = None,
+    fields: list[str] | None = None,
 ) -> list[dict[str, Any]]:
-    """List all jobs for an asset, ordered by creation time (newest first)."""
+    """
+    List jobs for an asset, ordered by creation time (newest first).
+
+    Args:
+        asset_id: Asset id (or ``url:`` lookup id) of the jobs
+        settings: Optional settings override
+        limit: Maximum number of jobs to return (all if None)
+        start_after: (createdAt, jobId) of the last job of the previous page
+        statuses: Only return jobs in one of these statuses
+        fields: Only read these fields of each job (``id`` is always set)
+
+    Ties on createdAt are broken by job id, so pages never skip or repeat a
+    job. Queries are served by the composite indexes in firestore.indexes.json.
+    """
     settings = settings or get_settings()
     db = get_firestore_client(settings)
 
     collection_ref = db.collection(COLLECTION_NAME)
-    query = collection_ref.where("assetId", "==", asset_id).order_by(
-        "createdAt", direction=firestore.Query.DESCENDING
+    query = collection_ref.where("assetId", "==", asset_id)
+    if statuses:
+        query = query.where("status", "in", statuses)
+    query = query.order_by("createdAt", direction=firestore.Query.DESCENDING).order_by(
+        firestore.FieldPath.document_id(), direction=firestore.Query.DESCENDING
     )
-    docs = query.stream()
+    if fields:
+        query = query.select(fields)
+    if start_after:
+        created_at, job_id = start_after
+        query = query.start_after([created_at, collection_ref.document(job_id)])
+    if limit:
+        query = query.limit(limit)
 
     jobs = []
-    for doc in docs:
+    for doc in query.stream():
         data = doc.to_dict()
         data["id"] = doc.id
         jobs.append(data)
@@ -159,6 +249,7 @@ def list_jobs_by_asset(
     return jobs
 
 
+@_in_firestore_pool
 def claim_job_for_completion(
     job_id: str,
     settings: Settings | None = None,
@@ -200,3 +291,195 @@ def claim_job_for_completion(
 
     transaction = db.transaction()
     return claim_in_transaction(transaction)
+
+
+@_in_firestore_pool
+def save_batch(batch_data: dict[str, Any], settings: Settings | None = None) -> dict[str, Any]:
+    """Save a batch job (one document holding all of its items)."""
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+
+    batch_id = batch_data.get("id")
+    if not batch_id:
+        raise ValueError("batch_data must include 'id'")
+
+    now = datetime.utcnow().isoformat() + "Z"
+    batch_data.setdefault("createdAt", now)
+    batch_data["updatedAt"] = now
+
+    db.collection(BATCH_COLLECTION_NAME).document(batch_id).set(batch_data)
+
+    logger.info(f"Saved video effect batch {batch_id}")
+    return batch_data
+
+
+@_in_firestore_pool
+def get_batch(batch_id: str, settings: Settings | None = None) -> dict[str, Any] | None:
+    """Get a batch job by ID."""
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+
+    doc = db.collection(BATCH_COLLECTION_NAME).document(batch_id).get()
+    if not doc.exists:
+        return None
+
+    data = doc.to_dict()
+    data["id"] = doc.id
+    return data
+
+
+@_in_firestore_pool
+def update_batch(
+    batch_id: str,
+    updates: dict[str, Any],
+    settings: Settings | None = None,
+) -> None:
+    """
+    Update a batch job in one write.
+
+    Item changes are passed as ``items.{itemKey}`` field paths, so only the
+    changed items are rewritten.
+    """
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+
+    updates["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+    db.collection(BATCH_COLLECTION_NAME).document(batch_id).update(updates)
+
+
+@_in_firestore_pool
+def claim_batch_item_for_completion(
+    batch_id: str,
+    item_key: str,
+    settings: Settings | None = None,
+) -> bool:
+    """
+    Atomically claim a batch item for completion processing.
+
+    Same as claim_job_for_completion, for one item of a batch: sets the item
+    status to 'completing' (and completingAt) if it is 'running'.
+    """
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    doc_ref = db.collection(BATCH_COLLECTION_NAME).document(batch_id)
+
+    @firestore.transactional
+    def claim_in_transaction(transaction):
+        doc = doc_ref.get(transaction=transaction)
+        if not doc.exists:
+            return False
+
+        item = (doc.to_dict().get("items") or {}).get(item_key) or {}
+        if item.get("status") != "running":
+            logger.debug(f"Batch {batch_id} item {item_key} not claimable, status={item.get('status')}")
+            return False
+
+        transaction.update(doc_ref, {
+            f"items.{item_key}.status": "completing",
+            f"items.{item_key}.completingAt": datetime.utcnow().isoformat() + "Z",
+        })
+        return True
+
+    transaction = db.transaction()
+    return claim_in_transaction(transaction)
+
+
+@_in_firestore_pool
+def claim_batch_items_for_start(
+    batch_id: str,
+    item_keys: list[str],
+    settings: Settings | None = None,
+) -> list[str]:
+    """
+    Atomically claim pending batch items before their predictions are created.
+
+    Sets each item that is still 'pending' to 'starting', so a second poller
+    of the same batch (after its claim lease ran out) cannot start it again.
+
+    Returns:
+        The keys that were claimed, in the given order
+    """
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    doc_ref = db.collection(BATCH_COLLECTION_NAME).document(batch_id)
+
+    @firestore.transactional
+    def claim_in_transaction(transaction):
+        doc = doc_ref.get(transaction=transaction)
+        if not doc.exists:
+            return []
+
+        items = doc.to_dict().get("items") or {}
+        now = datetime.utcnow().isoformat() + "Z"
+        claimed = [key for key in item_keys if (items.get(key) or {}).get("status") == "pending"]
+        if claimed:
+            updates: dict[str, Any] = {}
+            for key in claimed:
+                updates[f"items.{key}.status"] = "starting"
+                updates[f"items.{key}.startingAt"] = now
+            transaction.update(doc_ref, updates)
+        return claimed
+
+    if not item_keys:
+        return []
+    transaction = db.transaction()
+    return claim_in_transaction(transaction)
+
+
+@_in_firestore_pool
+def apply_batch_changes(
+    batch_id: str,
+    changes: dict[str, tuple[str, dict[str, Any]]],
+    summarize: Callable[[dict[str, Any]], dict[str, Any]],
+    settings: Settings | None = None,
+) -> tuple[str | None, dict[str, Any] | None]:
+    """
+    Apply one poll's item changes and the batch summary in a transaction.
+
+    Each change is (expected status, new fields) and is only applied if the
+    item is still in the expected status, so a poller working from an older
+    read cannot undo another poller's progress. summarize maps the batch, with
+    the changes applied, to its batch-level fields (counts, status, ...), so
+    they are always computed from the items as stored, never from the
+    caller's read.
+
+    Returns:
+        Tuple of (batch status before, batch after), or (None, None) if the
+        batch does not exist
+    """
+    settings = settings or get_settings()
+    db = get_firestore_client(settings)
+    doc_ref = db.collection(BATCH_COLLECTION_NAME).document(batch_id)
+
+    @firestore.transactional
+    def apply_in_transaction(transaction):
+        doc = doc_ref.get(transaction=transaction)
+        if not doc.exists:
+            return None, None
+
+        data = doc.to_dict()
+        data["id"] = doc.id
+        previous_status = data.get("status")
+        items = data.get("items") or {}
+        updates: dict[str, Any] = {}
+        for key, (expected, fields) in changes.items():
+            item = items.get(key)
+            if item is None or item.get("status", "pending") != expected:
+                logger.debug(f"Batch {batch_id} item {key} moved on from {expected}; change dropped")
+                continue
+            items[key] = {**item, **fields}
+            updates[f"items.{key}"] = items[key]
+
+        summary = summarize({**data, "items": items})
+        for field, value in summary.items():
+            if data.get(field) != value:
+                updates[field] = value
+        if not updates:
+            return previous_status, data
+
+        updates["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+        transaction.update(doc_ref, updates)
+        return previous_status, {**data, **summary, "items": items, "updatedAt": updates["updatedAt"]}
+
+    transaction = db.transaction()
+    return apply_in_transaction(transaction)
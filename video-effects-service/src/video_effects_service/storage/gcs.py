@@ -0,0 +1,92 @@
+"""Temporary Cloud Storage objects (pre-processed provider inputs).
+
+Uses the Firebase Admin app's credentials, so no extra key is needed. All
+functions are blocking; call them with ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from firebase_admin import storage
+
+from ..config import Settings, get_settings
+from .firestore import _initialize_firebase
+
+logger = logging.getLogger(__name__)
+
+
+def _get_bucket(bucket_name: str, settings: Settings):
+    return storage.bucket(bucket_name, app=_initialize_firebase(settings))
+
+
+def _signing_kwargs(settings: Settings) -> dict[str, str]:
+    """
+    Signing arguments for generate_signed_url.
+
+    Service account keys sign locally. Other credentials (Cloud Run default
+    credentials) sign through the IAM API with their access token.
+    """
+    import google.auth.transport.requests
+    from google.auth.credentials import Signing
+
+    credentials = _initialize_firebase(settings).credential.get_credential()
+    if isinstance(credentials, Signing):
+        return {}
+    if not credentials.valid:
+        credentials.refresh(google.auth.transport.requests.Request())
+    return {
+        "service_account_email": credentials.service_account_email,
+        "access_token": credentials.token,
+    }
+
+
+def upload_temp_file(
+    path: str,
+    object_name: str,
+    content_type: str,
+    settings: Settings | None = None,
+) -> str:
+    """
+    Upload a local file to the pre-processing bucket.
+
+    Returns:
+        gs:// URI of the object
+    """
+    settings = settings or get_settings()
+    bucket_name = settings.preprocess_gcs_bucket
+    if not bucket_name:
+        raise RuntimeError("PREPROCESS_GCS_BUCKET is not configured")
+
+    blob = _get_bucket(bucket_name, settings).blob(object_name)
+    blob.upload_from_filename(path, content_type=content_type)
+    return f"gs://{bucket_name}/{object_name}"
+
+
+def create_signed_url(gcs_uri: str, ttl_seconds: int, settings: Settings | None = None) -> str:
+    """V4 signed GET URL for a gs:// URI."""
+    settings = settings or get_settings()
+    bucket_name, _, object_name = gcs_uri.removeprefix("gs://").partition("/")
+    if not bucket_name or not object_name:
+        raise ValueError(f"Invalid GCS URI: {gcs_uri}")
+
+    blob = _get_bucket(bucket_name, settings).blob(object_name)
+    return blob.generate_signed_url(
+        version="v4",
+        expiration=timedelta(seconds=ttl_seconds),
+        method="GET",
+        **_signing_kwargs(settings),
+    )
+
+
+def delete_object(gcs_uri: str, settings: Settings | None = None) -> None:
+    """Delete a gs:// object; a missing object is not an error."""
+    from google.api_core.exceptions import NotFound
+
+    settings = settings or get_settings()
+    bucket_name, _, object_name = gcs_uri.removeprefix("gs://").partition("/")
+    try:
+        _get_bucket(bucket_name, settings).blob(object_name).delete()
+    except NotFound:
+        pass
@@ -1,9 +1,17 @@
-"""Redis-based task queue for video effect job polling."""
+"""Redis-based task queue for video effect job polling.
+
+Jobs waiting for their next poll live in a sorted set (``POLL_SCHEDULE``)
+with the time of the next poll as the score, one member per job. Pollers
+claim due jobs atomically; a claim pushes the job's score forward by a
+lease, so a job whose poller dies is picked up again once the lease runs
+out. After a poll the job is rescheduled (or removed when it finished).
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Any
 
@@ -13,45 +21,192 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Legacy FIFO list, drained into the schedule on worker start
 POLL_QUEUE = "video_effects_poll"
+POLL_SCHEDULE = "video_effects_poll_schedule"
+POLL_STATE_PREFIX = "vfx_poll:"
 TASK_STATUS_PREFIX = "vfx_task_status:"
+TASK_TTL_SECONDS = 60 * 60 * 24
+# Schedule members for batch jobs are "batch:{batchId}"; plain members are job IDs
+BATCH_MEMBER_PREFIX = "batch:"
+PROVIDER_SLOTS_PREFIX = "vfx_provider_slots:"
+EVENTS_CHANNEL = "video_effects_events"
+
+# Take a provider slot for ARGV[1] if fewer than ARGV[2] unexpired slots are held;
+# slots expire at ARGV[4] (score) so a lost release cannot leak capacity
+_ACQUIRE_SLOT_SCRIPT = """
+redis.call("zremrangebyscore", KEYS[1], "-inf", ARGV[3])
+if redis.call("zscore", KEYS[1], ARGV[1]) then
+    return 1
+end
+if redis.call("zcard", KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call("zadd", KEYS[1], ARGV[4], ARGV[1])
+return 1
+"""
+
+# Claim up to ARGV[2] jobs due at ARGV[1] and lease them until ARGV[3]
+_CLAIM_DUE_SCRIPT = """
+local due = redis.call("zrangebyscore", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+for _, job_id in ipairs(due) do
+    redis.call("zadd", KEYS[1], ARGV[3], job_id)
+end
+return due
+"""
 
 
 class TaskQueue:
-    """Simple Redis-based task queue for polling jobs."""
+    """Redis-based delay queue for polling jobs."""
 
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
+        self._claim_due = redis_client.register_script(_CLAIM_DUE_SCRIPT)
+        self._acquire_slot = redis_client.register_script(_ACQUIRE_SLOT_SCRIPT)
 
-    async def enqueue_poll(self, job_id: str) -> None:
+    async def enqueue_poll(self, job_id: str, delay: float = 0) -> None:
         """
-        Enqueue a job for status polling.
+        Schedule a job for status polling.
+
+        Enqueuing a job that is already scheduled moves its next poll to
+        ``delay`` seconds from now instead of adding a duplicate.
 
         Args:
             job_id: The video effect job ID to poll
+            delay: Seconds until the first poll
         """
         now = datetime.utcnow().isoformat() + "Z"
+        state_key = f"{POLL_STATE_PREFIX}{job_id}"
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(
+                f"{TASK_STATUS_PREFIX}{job_id}",
+                json.dumps({"status": "pending", "enqueued_at": now}),
+                ex=TASK_TTL_SECONDS,
+            )
+            pipe.hsetnx(state_key, "firstEnqueuedAt", time.time())
+            pipe.expire(state_key, TASK_TTL_SECONDS)
+            pipe.zadd(POLL_SCHEDULE, {job_id: time.time() + delay})
+            await pipe.execute()
+
+        logger.info(f"Enqueued job {job_id} for polling")
+
+    async def claim_due(self, limit: int, lease_seconds: float) -> list[str]:
+        """
+        Claim up to ``limit`` jobs whose next poll is due.
 
-        task = {
-            "job_id": job_id,
-            "enqueued_at": now,
+        Claimed jobs stay in the schedule with their score moved
+        ``lease_seconds`` ahead, so they are retried if the claimer never
+        reschedules or completes them.
+        """
+        now = time.time()
+        claimed = await self._claim_due(keys=[POLL_SCHEDULE], args=[now, limit, now + lease_seconds])
+        return list(claimed)
+
+    async def extend_claim(self, job_id: str, lease_seconds: float) -> None:
+        """
+        Move a claimed job's lease ``lease_seconds`` ahead while it is still
+        being processed. Does nothing if it was completed meanwhile.
+        """
+        await self.redis.zadd(POLL_SCHEDULE, {job_id: time.time() + lease_seconds}, xx=True)
+
+    async def reschedule_poll(self, job_id: str, delay: float) -> int:
+        """
+        Schedule the next poll of a claimed job ``delay`` seconds from now.
+
+        Returns:
+            Number of polls done for the job so far (including this one)
+        """
+        state_key = f"{POLL_STATE_PREFIX}{job_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(state_key, "polls", 1)
+            pipe.expire(state_key, TASK_TTL_SECONDS)
+            pipe.zadd(POLL_SCHEDULE, {job_id: time.time() + delay})
+            polls, _, _ = await pipe.execute()
+        return int(polls)
+
+    async def complete_poll(self, job_id: str) -> None:
+        """Stop polling a job."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(POLL_SCHEDULE, job_id)
+            pipe.delete(f"{POLL_STATE_PREFIX}{job_id}")
+            await pipe.execute()
+
+    async def get_poll_state(self, job_id: str) -> dict[str, Any]:
+        """Poll bookkeeping of a job: seconds since first enqueued and poll count."""
+        data = await self.redis.hgetall(f"{POLL_STATE_PREFIX}{job_id}")
+        first = float(data.get("firstEnqueuedAt") or time.time())
+        return {
+            "age_seconds": max(0.0, time.time() - first),
+            "polls": int(data.get("polls") or 0),
         }
 
-        # Store task status
-        await self.redis.set(
-            f"{TASK_STATUS_PREFIX}{job_id}",
-            json.dumps({"status": "pending", "enqueued_at": now}),
-            ex=60 * 60 * 24,  # Expire after 24 hours
+    async def next_due_in(self) -> float | None:
+        """Seconds until the earliest scheduled poll (0 if overdue), None if nothing is scheduled."""
+        earliest = await self.redis.zrange(POLL_SCHEDULE, 0, 0, withscores=True)
+        if not earliest:
+            return None
+        _, score = earliest[0]
+        return max(0.0, score - time.time())
+
+    async def scheduled_count(self) -> int:
+        return await self.redis.zcard(POLL_SCHEDULE)
+
+    async def drain_legacy_queue(self) -> int:
+        """Move jobs left in the legacy list queue into the schedule (due now)."""
+        moved = 0
+        while True:
+            task_json = await self.redis.rpop(POLL_QUEUE)
+            if task_json is None:
+                return moved
+            job_id = json.loads(task_json).get("job_id")
+            if job_id:
+                await self.redis.zadd(POLL_SCHEDULE, {job_id: time.time()}, nx=True)
+                moved += 1
+
+    async def enqueue_batch_poll(self, batch_id: str, delay: float = 0) -> None:
+        """Schedule a batch job; one schedule entry drives all of its items."""
+        await self.enqueue_poll(f"{BATCH_MEMBER_PREFIX}{batch_id}", delay)
+
+    async def acquire_provider_slot(
+        self, provider: str, holder: str, limit: int, lease_seconds: float
+    ) -> bool:
+        """
+        Take one of ``limit`` concurrent prediction slots for a provider.
+
+        Slots are shared by all processes. Taking a slot already held by
+        ``holder`` succeeds and keeps it. Slots expire after lease_seconds
+        unless refreshed.
+        """
+        now = time.time()
+        acquired = await self._acquire_slot(
+            keys=[f"{PROVIDER_SLOTS_PREFIX}{provider}"],
+            args=[holder, limit, now, now + lease_seconds],
         )
+        return bool(acquired)
 
-        # Push to queue
-        await self.redis.lpush(POLL_QUEUE, json.dumps(task))
+    async def refresh_provider_slots(
+        self, provider: str, holders: list[str], lease_seconds: float
+    ) -> None:
+        """Extend the leases of slots that are still in use."""
+        if not holders:
+            return
+        expires = time.time() + lease_seconds
+        await self.redis.zadd(
+            f"{PROVIDER_SLOTS_PREFIX}{provider}", {holder: expires for holder in holders}, xx=True
+        )
 
-        logger.info(f"Enqueued job {job_id} for polling")
+    async def release_provider_slots(self, provider: str, holders: list[str]) -> None:
+        if holders:
+            await self.redis.zrem(f"{PROVIDER_SLOTS_PREFIX}{provider}", *holders)
+
+    async def publish_event(self, event: dict[str, Any]) -> None:
+        """Publish an event on the service's Redis channel."""
+        await self.redis.publish(EVENTS_CHANNEL, json.dumps(event))
 
     async def dequeue(self, timeout: int = 5) -> dict[str, Any] | None:
         """
-        Dequeue a task from the queue.
+        Dequeue a task from the legacy list queue.
 
         Returns None if no task is available within timeout.
         """
@@ -79,7 +234,7 @@ class TaskQueue:
         await self.redis.set(
             f"{TASK_STATUS_PREFIX}{job_id}",
             json.dumps(data),
-            ex=60 * 60 * 24,
+            ex=TASK_TTL_SECONDS,
         )
 
     async def get_task_status(self, job_id: str) -> dict[str, Any] | None:
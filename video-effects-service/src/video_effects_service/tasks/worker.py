@@ -4,51 +4,90 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+import random
+from typing import Awaitable, TypeVar
 
-from .queue import TaskQueue, get_task_queue
+from ..config import Settings, get_settings
+from .queue import BATCH_MEMBER_PREFIX, TaskQueue, get_task_queue
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Longest a poller sleeps when nothing is due, so newly enqueued jobs are seen promptly
+IDLE_SLEEP_SECONDS = 0.5
+
+
+def next_poll_delay(age_seconds: float, settings: Settings | None = None) -> float:
+    """
+    Seconds until the next poll of a job that has been running for age_seconds.
+
+    Starts at POLL_MIN_INTERVAL_SECONDS and grows with the job's age
+    (POLL_BACKOFF_RATIO of it) up to POLL_MAX_INTERVAL_SECONDS, with +-10%
+    jitter so jobs started together don't stay in lockstep.
+    """
+    settings = settings or get_settings()
+    delay = max(settings.poll_min_interval_seconds, age_seconds * settings.poll_backoff_ratio)
+    delay = min(settings.poll_max_interval_seconds, delay)
+    return delay * random.uniform(0.9, 1.1)
+
 
 class VideoEffectsWorker:
-    """Background worker that polls video effect jobs from Redis queue."""
+    """Background worker that polls video effect jobs from the Redis schedule."""
 
-    def __init__(self, queue: TaskQueue):
+    def __init__(self, queue: TaskQueue, concurrency: int | None = None):
         self.queue = queue
+        self.settings = get_settings()
+        self.concurrency = max(1, concurrency or self.settings.poll_concurrency)
         self.running = False
-        self._task: asyncio.Task | None = None
+        self._tasks: list[asyncio.Task] = []
 
     async def start(self) -> None:
-        """Start the worker loop."""
+        """Start the poller loops."""
         if self.running:
             logger.warning("Worker already running")
             return
 
         self.running = True
-        self._task = asyncio.create_task(self._run())
-        logger.info("Video effects worker started")
+        try:
+            moved = await self.queue.drain_legacy_queue()
+            if moved:
+                logger.info(f"Moved {moved} jobs from the legacy poll queue to the schedule")
+        except Exception as e:
+            logger.warning(f"Failed to drain legacy poll queue: {e}")
+
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"Video effects worker started with {self.concurrency} pollers")
 
     async def stop(self) -> None:
-        """Stop the worker loop."""
+        """Stop the poller loops."""
         self.running = False
-        if self._task:
-            self._task.cancel()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
             try:
-                await self._task
+                await task
             except asyncio.CancelledError:
                 pass
+        self._tasks = []
         logger.info("Video effects worker stopped")
 
     async def _run(self) -> None:
-        """Main worker loop."""
+        """Poller loop: claim one due job at a time, sleep until the next one is due."""
         while self.running:
             try:
-                task = await self.queue.dequeue(timeout=5)
-                if task is None:
+                claimed = await self.queue.claim_due(1, self.settings.poll_claim_lease_seconds)
+                if not claimed:
+                    due_in = await self.queue.next_due_in()
+                    if due_in is None:
+                        due_in = IDLE_SLEEP_SECONDS
+                    await asyncio.sleep(min(IDLE_SLEEP_SECONDS, due_in))
                     continue
 
-                await self._process_task(task)
+                if claimed[0].startswith(BATCH_MEMBER_PREFIX):
+                    await self._process_batch(claimed[0])
+                else:
+                    await self._process_task(claimed[0])
 
             except asyncio.CancelledError:
                 break
@@ -56,21 +95,47 @@ class VideoEffectsWorker:
                 logger.exception(f"Worker error: {e}")
                 await asyncio.sleep(1)
 
-    async def _process_task(self, task: dict[str, Any]) -> None:
-        """Process a single poll task."""
+    async def _keep_claimed(self, member: str, work: Awaitable[T]) -> T:
+        """
+        Await work while moving the member's claim lease ahead every third of
+        POLL_CLAIM_LEASE_SECONDS, so a slow poll is not re-claimed by another
+        poller. The heartbeat stops before the caller reschedules the member.
+        """
+        lease = self.settings.poll_claim_lease_seconds
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(lease / 3)
+                try:
+                    await self.queue.extend_claim(member, lease)
+                except Exception as e:
+                    logger.warning(f"Failed to extend poll claim of {member}: {e}")
+
+        task = asyncio.create_task(heartbeat())
+        try:
+            return await work
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _process_task(self, job_id: str) -> None:
+        """Poll a claimed job once and reschedule or complete it."""
         from ..service import poll_job
 
-        job_id = task["job_id"]
-        logger.info(f"Processing poll task for job {job_id}")
+        logger.debug(f"Processing poll task for job {job_id}")
 
         try:
             await self.queue.update_task_status(job_id, "running")
 
             # Poll the job
-            job = await poll_job(job_id)
+            job = await self._keep_claimed(job_id, poll_job(job_id))
 
             if job is None:
                 logger.warning(f"Job {job_id} not found")
+                await self.queue.complete_poll(job_id)
                 await self.queue.update_task_status(job_id, "failed", "Job not found")
                 return
 
@@ -78,23 +143,46 @@ class VideoEffectsWorker:
 
             if status == "completed" or status == "error":
                 # Job is done, no need to re-poll
+                await self.queue.complete_poll(job_id)
                 await self.queue.update_task_status(job_id, "completed")
                 logger.info(f"Job {job_id} finished with status: {status}")
             elif status == "completing":
-                # Job is being completed by another worker, re-check shortly
-                await asyncio.sleep(2)
-                await self.queue.enqueue_poll(job_id)
+                # Job is being completed by another poller, re-check shortly
+                await self.queue.reschedule_poll(job_id, self.settings.poll_min_interval_seconds)
                 logger.debug(f"Job {job_id} is completing, will re-check")
             else:
-                # Job still running, re-enqueue for polling
-                await asyncio.sleep(3)  # Wait before re-polling
-                await self.queue.enqueue_poll(job_id)
-                logger.info(f"Re-enqueued job {job_id} for polling (status: {status})")
+                state = await self.queue.get_poll_state(job_id)
+                delay = next_poll_delay(state["age_seconds"], self.settings)
+                if job.get("providerState", {}).get("replicate", {}).get("webhook"):
+                    # Completion is pushed by webhook; polling only covers lost deliveries
+                    delay = max(delay, self.settings.poll_webhook_interval_seconds)
+                polls = await self.queue.reschedule_poll(job_id, delay)
+                logger.debug(
+                    f"Job {job_id} still {status or 'pending'} after {polls} polls, next poll in {delay:.1f}s"
+                )
 
         except Exception as e:
             logger.exception(f"Failed to poll job {job_id}: {e}")
+            await self.queue.complete_poll(job_id)
             await self.queue.update_task_status(job_id, "failed", str(e))
 
+    async def _process_batch(self, member: str) -> None:
+        """Advance a batch job by one poll and reschedule it while it runs."""
+        from ..batches import BATCH_STATUS_RUNNING, advance_batch
+
+        batch_id = member[len(BATCH_MEMBER_PREFIX):]
+        try:
+            batch = await self._keep_claimed(member, advance_batch(batch_id))
+        except Exception as e:
+            logger.exception(f"Failed to advance batch {batch_id}: {e}")
+            await self.queue.reschedule_poll(member, self.settings.batch_poll_interval_seconds)
+            return
+
+        if batch is None or batch.get("status") != BATCH_STATUS_RUNNING:
+            await self.queue.complete_poll(member)
+            return
+        await self.queue.reschedule_poll(member, self.settings.batch_poll_interval_seconds)
+
 
 _worker: VideoEffectsWorker | None = None
 